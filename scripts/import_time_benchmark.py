@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the Ghost Writer CLI
+
+Runs ``python -X importtime`` in fresh interpreters and fails when a tracked
+module takes longer than its budget to import, or when it pulls in a module
+that must stay deferred (numpy, the OCR stack, cloud SDKs, ...). Budgets live
+in scripts/import_time_budget.json next to this file. Wall-clock budgets
+depend on the machine; ``--modules-only`` checks just the deferred modules.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Set
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BUDGET_FILE = Path(__file__).resolve().parent / "import_time_budget.json"
+
+
+def measure_import_ms(module: str, runs: int = 5) -> float:
+    """Best-of-N cumulative import time for a module, in milliseconds"""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, cwd=REPO_ROOT, check=True
+        )
+        for line in result.stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package"
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module:
+                samples.append(int(parts[1]) / 1000.0)
+                break
+    if not samples:
+        raise RuntimeError(f"No import timing reported for {module}")
+    return min(samples)
+
+
+def loaded_modules(module: str) -> Set[str]:
+    """Names of all modules loaded after importing ``module`` in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print('\\n'.join(sys.modules))"],
+        capture_output=True, text=True, cwd=REPO_ROOT, check=True
+    )
+    return set(result.stdout.split())
+
+
+def check_budgets(
+    budgets: Dict[str, Dict], runs: int, timing: bool = True
+) -> List[str]:
+    """Return a list of budget violations (empty when everything passes)"""
+    failures = []
+    for module, budget in budgets.items():
+        if timing:
+            elapsed = measure_import_ms(module, runs)
+            limit = budget["budget_ms"]
+            status = "ok" if elapsed <= limit else "OVER BUDGET"
+            print(f"{module:<24} {elapsed:8.1f} ms  (budget {limit} ms)  {status}")
+            if elapsed > limit:
+                failures.append(
+                    f"{module} imports in {elapsed:.1f} ms, budget is {limit} ms"
+                )
+
+        loaded = loaded_modules(module)
+        for forbidden in budget.get("forbidden_modules", []):
+            if forbidden in loaded:
+                failures.append(f"{module} eagerly imports {forbidden}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Check CLI import time against budgets"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Interpreter runs per module (best is kept)"
+    )
+    parser.add_argument(
+        "--budget-file", type=Path, default=BUDGET_FILE, help="JSON budget file"
+    )
+    parser.add_argument(
+        "--modules-only",
+        action="store_true",
+        help="Only check for eagerly imported modules, not import time",
+    )
+    args = parser.parse_args()
+
+    budgets = json.loads(args.budget_file.read_text())
+    failures = check_budgets(budgets, args.runs, timing=not args.modules_only)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
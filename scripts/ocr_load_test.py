@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Load test for hybrid OCR routing with simulated providers
+
+Replaces every OCR provider with a ``type: simulated`` stand-in drawn from
+the profiles below, then pushes the same pages through ``HybridOCR`` for
+each combination of worker count and routing policy. Reports throughput
+(pages/min), spend against the daily budget, provider mix and tail latency.
+Sleeps are shortened by ``--time-scale``; every figure is reported in
+simulated time.
+
+    python scripts/ocr_load_test.py --pages 200 --workers 1,4,16 \\
+        --policies fast,balanced,premium
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from PIL import Image  # noqa: E402
+
+from src.utils.config import config  # noqa: E402
+from src.utils.ocr_providers import HybridOCR  # noqa: E402
+
+# Rough shapes of the real providers: local models are free but slow,
+# cloud ones cost per page
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "qwen": {
+        "latency_ms": {"distribution": "lognormal", "median": 6000, "sigma": 0.4},
+        "latency_per_megapixel_ms": 800,
+        "confidence": {"distribution": "normal", "mean": 0.86, "stdev": 0.06},
+        "failure_rate": 0.02, "timeout_rate": 0.01, "timeout": 120,
+    },
+    "tesseract": {
+        "latency_ms": {"distribution": "lognormal", "median": 900, "sigma": 0.3},
+        "latency_per_megapixel_ms": 250,
+        "confidence": {"distribution": "normal", "mean": 0.70, "stdev": 0.10},
+    },
+    "google_vision": {
+        "latency_ms": {"distribution": "lognormal", "median": 1200, "sigma": 0.5},
+        "confidence": {"distribution": "normal", "mean": 0.90, "stdev": 0.04},
+        "cost": 0.0015, "failure_rate": 0.01, "timeout_rate": 0.005, "timeout": 30,
+    },
+    "gpt4_vision": {
+        "latency_ms": {"distribution": "lognormal", "median": 5000, "sigma": 0.5},
+        "confidence": {"distribution": "normal", "mean": 0.93, "stdev": 0.03},
+        "cost": 0.01, "failure_rate": 0.01, "timeout_rate": 0.005, "timeout": 60,
+    },
+}
+
+# Page sizes cycled through, so size-dependent latency shows up
+PAGE_SIZES = ((1404, 1872), (702, 936), (2106, 2808))
+
+
+def make_pages(directory: Path, count: int) -> List[Path]:
+    """Blank PNG pages of a few sizes; simulated providers only read the dimensions"""
+    images = []
+    for index, size in enumerate(PAGE_SIZES):
+        path = directory / f"page_{index}.png"
+        Image.new("L", size, 255).save(path)
+        images.append(path)
+    return [images[index % len(images)] for index in range(count)]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_scenario(
+    pages: List[Path],
+    workers: int,
+    policy: str,
+    budget: float,
+    time_scale: float,
+    seed: int,
+    work_dir: Path,
+) -> Dict[str, Any]:
+    """Route every page through a fresh HybridOCR and summarise the run"""
+    providers = {
+        name: {
+            **profile,
+            "type": "simulated",
+            "time_scale": time_scale,
+            "seed": seed + offset,
+        }
+        for offset, (name, profile) in enumerate(PROFILES.items())
+    }
+    hybrid_config = {**config.get("ocr", {}).get("providers", {}).get("hybrid", {}),
+                     "quality_mode": policy, "cost_limit_per_day": budget,
+                     "usage_db": str(work_dir / f"usage_{workers}_{policy}.db")}
+    hybrid = HybridOCR(hybrid_config, providers_config=providers)
+
+    def process(page: Path):
+        started = time.perf_counter()
+        result = hybrid.extract_text(page)
+        return result, (time.perf_counter() - started) / time_scale
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(process, pages))
+    elapsed = (time.perf_counter() - started) / time_scale
+
+    latencies = [latency for _, latency in outcomes]
+    by_provider: Dict[str, int] = {}
+    for result, _ in outcomes:
+        by_provider[result.provider] = by_provider.get(result.provider, 0) + 1
+    spent = sum(
+        costs.get("cost", 0) or 0
+        for costs in hybrid._usage_db().get_daily_ocr_cost().values()
+    )
+
+    return {
+        "workers": workers,
+        "policy": policy,
+        "pages": len(pages),
+        "pages_per_min": len(pages) / elapsed * 60 if elapsed else 0.0,
+        "spent": spent,
+        "budget": budget,
+        "budget_used": spent / budget if budget else 0.0,
+        "failed": by_provider.get("hybrid_failed", 0),
+        "providers": dict(sorted(by_provider.items())),
+        "latency_p50_s": statistics.median(latencies),
+        "latency_p95_s": percentile(latencies, 0.95),
+        "latency_p99_s": percentile(latencies, 0.99),
+        "latency_max_s": max(latencies),
+    }
+
+
+def format_row(row: Dict[str, Any]) -> str:
+    mix = ", ".join(f"{name} {count}" for name, count in row["providers"].items())
+    return (
+        f"{row['workers']:>7} {row['policy']:<9} {row['pages_per_min']:>9.1f} "
+        f"${row['spent']:>7.3f} {row['budget_used']:>6.0%} "
+        f"{row['latency_p50_s']:>7.1f} {row['latency_p95_s']:>7.1f} "
+        f"{row['latency_p99_s']:>7.1f}  {mix}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Load-test hybrid OCR routing with simulated providers")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--workers", default="1,4,16",
+                        help="Comma-separated worker counts")
+    parser.add_argument("--policies", default="fast,balanced,premium",
+                        help="Comma-separated quality modes")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="Daily cost limit in dollars")
+    parser.add_argument("--time-scale", type=float, default=0.01,
+                        help="Fraction of simulated latency actually slept "
+                             "(real overheads are not scaled)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Also write the results here")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Keep provider and routing log output")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.disable(logging.ERROR)
+    if args.time_scale <= 0:
+        parser.error("--time-scale must be positive")
+    worker_counts = [int(value) for value in args.workers.split(",")]
+    policies = args.policies.split(",")
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="ghost_writer_load_") as tmp:
+        work_dir = Path(tmp)
+        pages = make_pages(work_dir, args.pages)
+        print(
+            f"{'workers':>7} {'policy':<9} {'pages/min':>9} {'spent':>8} {'budget':>6} "
+            f"{'p50 s':>7} {'p95 s':>7} {'p99 s':>7}  providers"
+        )
+        for workers in worker_counts:
+            for policy in policies:
+                row = run_scenario(pages, workers, policy, args.budget,
+                                   args.time_scale, args.seed, work_dir)
+                rows.append(row)
+                print(format_row(row))
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(rows, indent=2) + "\n", encoding="utf-8")
+        print(f"Results saved to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,20 @@
 Ghost Writer CLI - Command-line interface for processing Supernote files
 """
 
+from __future__ import annotations
+
+import functools
+import hashlib
+import importlib
+import json
 import logging
 import sys
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional, Union
 
 import click
 from rich.console import Console
@@ -13,13 +23,7 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 from rich.table import Table
 
 from .utils.config import config
-from .utils.database import DatabaseManager
 from .utils.logging_setup import GhostWriterLogger
-from .utils.ocr_providers import HybridOCR
-from .utils.ocr_factory import OCRProviderFactory, create_ocr_result_without_extraction
-from .utils.relationship_detector import RelationshipDetector
-from .utils.concept_clustering import ConceptExtractor, ConceptClusterer
-from .utils.structure_generator import StructureGenerator
 from .utils.exceptions import (
     GhostWriterError,
     OCRError,
@@ -31,9 +35,109 @@ from .utils.exceptions import (
     ConfigurationError
 )
 
+if TYPE_CHECKING:
+    from .utils import memory_budget, metrics, profiling, tracing
+    from .utils.artifact_cache import ArtifactCache
+    from .utils.concept_clustering import ConceptClusterer, ConceptExtractor
+    from .utils.database import DatabaseManager
+    from .utils.job_manifest import JobManifest
+    from .utils.ocr_factory import (
+        OCRProviderFactory,
+        create_ocr_result_without_extraction,
+    )
+    from .utils.ocr_providers import HybridOCR
+    from .utils.region_ocr import RegionOCR
+    from .utils.relationship_detector import RelationshipDetector
+    from .utils.structure_generator import StructureGenerator
+    from .utils.tracing import span
+
 console = Console()
 logger = logging.getLogger(__name__)
 
+# Mirrors artifact_cache.STAGES, which is not imported at startup
+ARTIFACT_STAGES = (
+    "decode",
+    "ocr",
+    "elements",
+    "relationships",
+    "concepts",
+    "clusters",
+    "structures",
+)
+# Mirror profiling.MODES, PER_STAGE and PER_FILE for the same reason
+PROFILE_MODES = ("cprofile", "sample")
+PROFILE_PER = ("stage", "file")
+
+# Pipeline dependencies pull in numpy, PIL and the OCR stack, so they are
+# imported the first time a command needs them rather than at startup.
+# Tests and callers can still patch them as attributes of this module.
+_LAZY_IMPORTS = {
+    "DatabaseManager": (".utils.database", "DatabaseManager"),
+    "HybridOCR": (".utils.ocr_providers", "HybridOCR"),
+    "OCRProviderFactory": (".utils.ocr_factory", "OCRProviderFactory"),
+    "create_ocr_result_without_extraction": (
+        ".utils.ocr_factory",
+        "create_ocr_result_without_extraction",
+    ),
+    "RegionOCR": (".utils.region_ocr", "RegionOCR"),
+    "JobManifest": (".utils.job_manifest", "JobManifest"),
+    "ArtifactCache": (".utils.artifact_cache", "ArtifactCache"),
+    "RelationshipDetector": (".utils.relationship_detector", "RelationshipDetector"),
+    "ConceptExtractor": (".utils.concept_clustering", "ConceptExtractor"),
+    "ConceptClusterer": (".utils.concept_clustering", "ConceptClusterer"),
+    "StructureGenerator": (".utils.structure_generator", "StructureGenerator"),
+    # Instrumentation modules (``None`` binds the module itself)
+    "memory_budget": (".utils.memory_budget", None),
+    "metrics": (".utils.metrics", None),
+    "profiling": (".utils.profiling", None),
+    "tracing": (".utils.tracing", None),
+    "span": (".utils.tracing", "span"),
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        module_name, attribute = _LAZY_IMPORTS[name]
+        value = importlib.import_module(module_name, __package__)
+        if attribute is not None:
+            value = getattr(value, attribute)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _require(*names: str) -> None:
+    """Bind lazily imported names as module globals before a command uses them
+
+    Names already bound (for example by ``unittest.mock.patch``) are kept.
+    """
+    for name in names:
+        if name not in globals():
+            __getattr__(name)
+
+
+def _instrumented(stage: str):
+    """Time, profile and measure a stage function
+
+    Stands in for stacking ``metrics.timed``, ``profiling.profiled`` and
+    ``memory_budget.measured_stage``, which are applied on the first call
+    so those modules stay out of CLI startup.
+    """
+    def decorator(func):
+        wrapped = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal wrapped
+            if wrapped is None:
+                _require("metrics", "profiling", "memory_budget")
+                wrapped = metrics.timed("stage_ms", stage=stage)(
+                    profiling.profiled(stage)(memory_budget.measured_stage(stage)(func))
+                )
+            return wrapped(*args, **kwargs)
+        return wrapper
+    return decorator
+
 
 def setup_cli_logging(debug: bool = False):
     """Setup logging for CLI with rich console output"""
@@ -63,34 +167,110 @@ def cli(ctx, debug, config_path):
 @cli.command()
 @click.argument("input_path", type=click.Path(exists=True))
 @click.option("--output", "-o", type=click.Path(), help="Output directory")
-@click.option("--format", "-f", type=click.Choice(["markdown", "pdf", "json", "all"]), 
+@click.option("--format", "-f",
+              type=click.Choice(["markdown", "pdf", "json", "ndjson", "all"]),
               default="markdown", help="Output format")
 @click.option("--quality", "-q", type=click.Choice(["fast", "balanced", "premium"]), 
               default="balanced", help="Processing quality mode")
 @click.option("--local-only", is_flag=True, help="Use only local processing (no cloud APIs)")
+@click.option("--regions", is_flag=True,
+              help="OCR inked regions concurrently instead of whole pages")
+@click.option("--workers", "-w", type=click.IntRange(min=1), default=None,
+              help="Files processed concurrently "
+                   "(default: processing.pipeline.workers)")
+@click.option("--stage-workers", default=None, metavar="STAGE=N,...",
+              help="Per-stage concurrency, e.g. ocr=8,decode=2 "
+                   "(stages: decode, ocr, store, analyze, export)")
+@click.option("--force", is_flag=True,
+              help="Reprocess files the job manifest records as completed")
+@click.option("--artifacts/--no-artifacts", default=None,
+              help="Cache stage outputs on disk "
+                   "(default: processing.artifacts.enabled)")
+@click.option("--from-stage", type=click.Choice(ARTIFACT_STAGES), default=None,
+              help="Recompute this stage and everything after it, "
+                   "reusing cached earlier stages")
+@click.option("--until-stage", type=click.Choice(ARTIFACT_STAGES[1:]), default=None,
+              help="Stop after this stage without exporting")
+@click.option("--trace", "trace_path", type=click.Path(dir_okay=False), default=None,
+              help="Write a Chrome trace of every processing step to this JSON file")
+@click.option(
+    "--profile",
+    "profile_mode",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help="Profile processing: cprofile writes pstats dumps, "
+    "sample writes collapsed stacks for flame graphs",
+)
+@click.option("--profile-per", type=click.Choice(PROFILE_PER), default=None,
+              help="Profile each stage or each whole file "
+                   "(default: processing.profiling.per)")
+@click.option("--profile-every", type=click.IntRange(min=1), default=None, metavar="N",
+              help="Only profile every Nth stage call or file")
+@click.option("--profile-slower-than", type=click.FloatRange(min=0), default=None,
+              metavar="SECONDS",
+              help="Only keep profiles of stages or files that took at least this long")
 @click.pass_context
-def process(ctx, input_path: str, output: Optional[str], format: str, 
-            quality: str, local_only: bool):
+def process(
+    ctx,
+    input_path: str,
+    output: Optional[str],
+    format: str,
+    quality: str,
+    local_only: bool,
+    regions: bool,
+    workers: Optional[int],
+    stage_workers: Optional[str],
+    force: bool,
+    artifacts: Optional[bool],
+    from_stage: Optional[str],
+    until_stage: Optional[str],
+    trace_path: Optional[str],
+    profile_mode: Optional[str],
+    profile_per: Optional[str],
+    profile_every: Optional[int],
+    profile_slower_than: Optional[float],
+):
     """Process handwritten notes from files or directories"""
-    
+
+    _require("memory_budget", "profiling", "tracing", "span")
+    if trace_path:
+        tracing.enable(trace_path)
+        ctx.call_on_close(_write_trace)
+    if profile_mode:
+        _start_profiling(
+            ctx, profile_mode, profile_per, profile_every, profile_slower_than
+        )
+
+    _require(
+        "DatabaseManager",
+        "OCRProviderFactory",
+        "RegionOCR",
+        "JobManifest",
+        "ArtifactCache",
+        "RelationshipDetector",
+        "ConceptExtractor",
+        "ConceptClusterer",
+        "StructureGenerator",
+    )
+
     console.print("🎯 [bold blue]Ghost Writer v2.0[/bold blue] - Processing Notes")
     console.print(f"📁 Input: {input_path}")
-    
+
     input_path_obj = Path(input_path)
-    
+
     # Determine output directory
     if output:
         output_dir = Path(output)
     else:
         output_dir = input_path_obj.parent / "ghost_writer_output"
-    
+
     output_dir.mkdir(exist_ok=True)
     console.print(f"📤 Output: {output_dir}")
-    
+
     # Find files to process
     files_to_process = []
     supported_extensions = {".png", ".jpg", ".jpeg", ".note", ".pdf"}
-    
+
     if input_path_obj.is_file():
         # Check if single file has supported extension
         if input_path_obj.suffix.lower() in supported_extensions:
@@ -99,18 +279,19 @@ def process(ctx, input_path: str, output: Optional[str], format: str,
         # Find supported file types in directory
         for ext in supported_extensions:
             files_to_process.extend(input_path_obj.glob(f"**/*{ext}"))
-    
+
     if not files_to_process:
         console.print("❌ [red]No supported files found![/red]")
         console.print("Supported formats: .png, .jpg, .jpeg, .note, .pdf")
         return
-    
+
     console.print(f"📊 Found {len(files_to_process)} files to process")
-    
+
     # Initialize processing components
     try:
         db_manager = DatabaseManager()
-        
+        _start_metrics(ctx, db_manager)
+
         # Configure OCR based on quality and local-only settings
         ocr_config = config.get("ocr", {})
         if local_only:
@@ -119,13 +300,18 @@ def process(ctx, input_path: str, output: Optional[str], format: str,
                 "tesseract": ocr_config.get("providers", {}).get("tesseract", {})
             }
             ocr_config["hybrid"]["provider_priority"] = ["tesseract"]
-        
+
         ocr_provider = OCRProviderFactory.get_provider(provider_config=ocr_config)
-        relationship_detector = RelationshipDetector()
-        concept_extractor = ConceptExtractor()
-        concept_clusterer = ConceptClusterer()  
-        structure_generator = StructureGenerator()
-        
+        region_config = ocr_config.get("region", {})
+        if regions or region_config.get("enabled", False):
+            ocr_provider = RegionOCR(ocr_provider, region_config)
+        (
+            relationship_detector,
+            concept_extractor,
+            concept_clusterer,
+            structure_generator,
+        ) = _analysis_components()
+
     except (OCRConfigurationError, DatabaseError, ConfigurationError) as e:
         console.print(f"❌ [red]Failed to initialize components: {e}[/red]")
         if ctx.obj["debug"]:
@@ -137,7 +323,84 @@ def process(ctx, input_path: str, output: Optional[str], format: str,
         if ctx.obj["debug"]:
             console.print_exception()
         return
-    
+
+    pipeline_config = config.get("processing.pipeline", {}) or {}
+    try:
+        stage_workers_map = _parse_stage_workers(stage_workers) if stage_workers else {}
+    except click.BadParameter as e:
+        console.print(f"❌ [red]{e.format_message()}[/red]")
+        return
+    workers = workers or pipeline_config.get("workers", 1)
+
+    ocr_settings = {
+        "quality": quality,
+        "local_only": local_only,
+        "regions": bool(regions or region_config.get("enabled", False))
+    }
+
+    # Stage artifacts let partial re-runs skip decode and OCR
+    artifact_config = config.get("processing.artifacts", {}) or {}
+    use_artifacts = (
+        artifacts
+        if artifacts is not None
+        else bool(artifact_config.get("enabled", False))
+    )
+    stages = StageOptions(
+        until_stage=until_stage, ocr_settings={**ocr_settings, "ocr": ocr_config}
+    )
+    if use_artifacts or from_stage or until_stage:
+        stages.artifacts = ArtifactCache(
+            artifact_config.get("path", "data/artifacts/"), from_stage=from_stage
+        )
+        console.print(f"🗃️  Stage artifacts: {stages.artifacts.root}"
+                      + (f" (recomputing from {from_stage})" if from_stage else ""))
+
+    # Skip files the manifest already records as done with these options.
+    # Partial re-runs always run and are not recorded as completed jobs.
+    manifest = JobManifest(
+        db_manager,
+        {**ocr_settings, "format": format, "output_dir": str(output_dir.resolve())},
+        output_dir,
+        force=force or bool(from_stage or until_stage),
+        record=not until_stage,
+    )
+    entries = []
+    skipped = 0
+    for file_path in files_to_process:
+        entry = manifest.plan(file_path)
+        if manifest.is_done(entry):
+            skipped += 1
+        else:
+            entries.append(entry)
+
+    if skipped:
+        console.print(
+            f"⏭️  Skipping {skipped} unchanged files already processed "
+            "(use --force to redo)"
+        )
+    if not entries:
+        console.print(
+            "🎉 [bold green]Nothing to do - all files are up to date[/bold green]"
+        )
+        return
+
+    if len(entries) > 1 and (workers > 1 or stage_workers_map):
+        profiler = profiling.get_profiler()
+        if profiler and profiler.options.per == profiling.PER_FILE:
+            # A file's stages run on different workers, so only stages can be profiled
+            console.print(
+                "⚠️  [yellow]Pipelined runs profile each stage, "
+                "not whole files[/yellow]"
+            )
+            profiler.options.per = profiling.PER_STAGE
+        _process_with_pipeline(
+            ctx, entries, manifest, ocr_provider, db_manager, output_dir, format,
+            workers, stage_workers_map, pipeline_config, stages
+        )
+        console.print("🎉 [bold green]Processing complete![/bold green]")
+        console.print(f"📁 Results saved to: {output_dir}")
+        return
+
     # Process files with progress tracking
     with Progress(
         SpinnerColumn(),
@@ -146,49 +409,391 @@ def process(ctx, input_path: str, output: Optional[str], format: str,
         TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
         console=console,
     ) as progress:
-        
-        task = progress.add_task("Processing files...", total=len(files_to_process))
-        
-        for file_path in files_to_process:
+
+        task = progress.add_task("Processing files...", total=len(entries))
+
+        for entry in entries:
+            file_path = entry.file_path
+            started = time.perf_counter()
+            result = None
             try:
                 progress.update(task, description=f"Processing {file_path.name}...")
-                
+                manifest.start(entry)
+
                 # Process single file
-                result = process_single_file(
-                    file_path=file_path,
-                    ocr_provider=ocr_provider,
-                    relationship_detector=relationship_detector,
-                    concept_extractor=concept_extractor,
-                    concept_clusterer=concept_clusterer,
-                    structure_generator=structure_generator,
-                    db_manager=db_manager,
-                    output_dir=output_dir,
-                    output_format=format,
-                    quality=quality
-                )
-                
+                with (
+                    span("file", file=file_path.name),
+                    profiling.file_region(file_path),
+                    memory_budget.measured("file"),
+                ):
+                    result = process_single_file(
+                        file_path=file_path,
+                        ocr_provider=ocr_provider,
+                        relationship_detector=relationship_detector,
+                        concept_extractor=concept_extractor,
+                        concept_clusterer=concept_clusterer,
+                        structure_generator=structure_generator,
+                        db_manager=db_manager,
+                        output_dir=output_dir,
+                        output_format=format,
+                        quality=quality,
+                        note_id=entry.note_id,
+                        ocr_result=manifest.resume_ocr_result(entry),
+                        stages=stages
+                    )
+                manifest.complete(entry, result, time.perf_counter() - started)
+
                 if result:
-                    console.print(f"✅ [green]{file_path.name}[/green] → {result}")
+                    outputs = _describe_result(result)
+                    console.print(f"✅ [green]{file_path.name}[/green] → {outputs}")
                 else:
                     console.print(f"❌ [red]Failed to process {file_path.name}[/red]")
-                
+
             except (FileProcessingError, SupernoteParsingError, OCRError) as e:
+                manifest.fail(entry, str(e), time.perf_counter() - started)
                 console.print(f"❌ [red]Error processing {file_path.name}: {e}[/red]")
                 logger.warning(f"Processing error for {file_path}: {e}")
                 if ctx.obj["debug"]:
                     logger.exception(f"Error processing {file_path}")
             except Exception as e:
+                manifest.fail(entry, str(e), time.perf_counter() - started)
                 logger.error(f"Unexpected error processing {file_path}: {e}")
                 console.print(f"❌ [red]Unexpected error processing {file_path.name}: {e}[/red]")
                 if ctx.obj["debug"]:
                     logger.exception(f"Unexpected error processing {file_path}")
-            
+
             progress.update(task, advance=1)
-    
+
+    _print_artifact_stats(stages)
     console.print("🎉 [bold green]Processing complete![/bold green]")
     console.print(f"📁 Results saved to: {output_dir}")
 
 
+def _start_metrics(ctx, db_manager):
+    """Record stage and provider histograms for this command, flushed when it exits"""
+    _require("metrics")
+    metrics_config = config.get("metrics", {}) or {}
+    if metrics_config.get("enabled", True):
+        metrics.configure(
+            db_manager, float(metrics_config.get("flush_interval_seconds", 60))
+        )
+        ctx.call_on_close(metrics.shutdown)
+
+
+def _start_profiling(ctx, mode: str, per: Optional[str], every_nth: Optional[int],
+                     slower_than: Optional[float]):
+    """Profile stages or files of this command; reports the profiles written on exit"""
+    _require("profiling")
+    profile_config = config.get("processing.profiling", {}) or {}
+    if slower_than is None:
+        slower_than = profile_config.get("slower_than_seconds", 0.0)
+    profiler = profiling.enable(
+        profiling.ProfileOptions(
+            mode=mode,
+            output_dir=profile_config.get("output_dir", "data/profiles/"),
+            per=per or profile_config.get("per", profiling.PER_STAGE),
+            every_nth=every_nth or profile_config.get("every_nth", 1),
+            slower_than=slower_than,
+            sample_interval=profile_config.get("sample_interval_ms", 5) / 1000.0,
+        )
+    )
+    console.print(
+        f"🔬 Profiling ({mode}, per {profiler.options.per}) → {profiler.output_dir}"
+    )
+    ctx.call_on_close(_finish_profiling)
+
+
+def _finish_profiling():
+    _require("profiling")
+    profiler = profiling.disable()
+    if profiler and profiler.written:
+        console.print(
+            f"🔬 Wrote {len(profiler.written)} profiles to {profiler.output_dir}"
+        )
+
+
+def _write_trace():
+    _require("tracing")
+    trace_file = tracing.finish()
+    if trace_file:
+        console.print(
+            f"🔎 Trace written to {trace_file} "
+            "(open in chrome://tracing or ui.perfetto.dev)"
+        )
+
+
+def _print_artifact_stats(stages: StageOptions):
+    # Only meaningful for serial runs; pipeline workers count in their own processes
+    if stages.artifacts:
+        console.print(
+            f"🗃️  Artifacts reused: {stages.artifacts.hits}, "
+            f"computed: {stages.artifacts.misses}"
+        )
+
+
+PIPELINE_STAGES = ("decode", "ocr", "store", "analyze", "export")
+
+
+def _parse_stage_workers(value: str) -> dict:
+    """Parse ``ocr=8,decode=2`` into a stage -> worker count mapping"""
+    stage_workers = {}
+    for part in value.split(","):
+        name, _, count = part.strip().partition("=")
+        if name not in PIPELINE_STAGES or not count.isdigit() or int(count) < 1:
+            raise click.BadParameter(
+                f"Invalid stage worker setting '{part.strip()}' "
+                f"(expected STAGE=N with STAGE one of {', '.join(PIPELINE_STAGES)})",
+                param_hint="--stage-workers"
+            )
+        stage_workers[name] = int(count)
+    return stage_workers
+
+
+def _process_with_pipeline(
+    ctx,
+    entries,
+    manifest,
+    ocr_provider,
+    db_manager,
+    output_dir: Path,
+    output_format: str,
+    workers: int,
+    stage_workers: dict,
+    pipeline_config: dict,
+    stages: StageOptions,
+):
+    """Process many files concurrently through the staged pipeline
+
+    Decoding and analysis are CPU-bound and run in worker processes (or
+    threads when ``processing.pipeline.cpu_executor`` is ``thread``); OCR,
+    database writes and exports run on threads sharing the warm provider.
+    """
+    _require("memory_budget", "metrics")
+    from functools import partial
+    from .utils.pipeline import Pipeline, Stage, PROCESS, THREAD
+
+    cpu_kind = (
+        PROCESS if pipeline_config.get("cpu_executor", "process") == PROCESS else THREAD
+    )
+    stage_workers = {**(pipeline_config.get("stage_workers") or {}), **stage_workers}
+
+    def workers_for(name: str) -> int:
+        return stage_workers.get(name, workers)
+
+    budget = memory_budget.from_config(config.get("processing.memory", {}))
+    pipeline = Pipeline(
+        [
+            Stage(
+                "decode",
+                partial(_decode_stage, output_dir=output_dir, stages=stages),
+                workers_for("decode"),
+                cpu_kind,
+            ),
+            Stage(
+                "ocr",
+                partial(_ocr_stage, ocr_provider=ocr_provider, stages=stages),
+                workers_for("ocr"),
+            ),
+            Stage(
+                "store",
+                partial(_store_stage, db_manager=db_manager),
+                workers_for("store"),
+            ),
+            Stage(
+                "analyze",
+                partial(_analyze_stage, stages=stages),
+                workers_for("analyze"),
+                cpu_kind,
+            ),
+            Stage(
+                "export",
+                partial(
+                    _export_stage,
+                    output_dir=output_dir,
+                    output_format=output_format,
+                    stages=stages,
+                ),
+                workers_for("export"),
+            ),
+        ],
+        queue_size=pipeline_config.get("queue_size") or None,
+        budget=budget,
+        weigh=_job_footprint if budget else None,
+    )
+
+    stage_workers = ", ".join(f"{s.name}×{s.workers}" for s in pipeline.stages)
+    budget_note = ""
+    if budget:
+        budget_note = f", {budget.limit // memory_budget.MB}MB memory budget"
+    console.print(f"⚙️  Pipeline: {stage_workers}{budget_note}")
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+        console=console,
+    ) as progress:
+
+        task = progress.add_task("Processing files...", total=len(entries))
+
+        jobs = []
+        for entry in entries:
+            manifest.start(entry)
+            resumed_result = manifest.resume_ocr_result(entry)
+            jobs.append(
+                FileJob(
+                    file_path=entry.file_path,
+                    note_id=entry.note_id,
+                    ocr_result=resumed_result,
+                    resumed=resumed_result is not None,
+                )
+            )
+        started = time.perf_counter()
+
+        def on_result(result):
+            entry = entries[result.index]
+            file_path = entry.file_path
+            elapsed = time.perf_counter() - (result.started or started)
+            if result.peak_rss:
+                metrics.observe(
+                    "peak_rss_mb", result.peak_rss / memory_budget.MB, stage="file"
+                )
+            if result.error is not None:
+                manifest.fail(entry, str(result.error), elapsed)
+            else:
+                manifest.complete(entry, result.value, elapsed)
+
+            if result.ok:
+                outputs = _describe_result(result.value)
+                console.print(f"✅ [green]{file_path.name}[/green] → {outputs}")
+            elif result.error is not None:
+                console.print(f"❌ [red]Error processing {file_path.name} "
+                              f"({result.failed_stage}): {result.error}[/red]")
+                if ctx.obj["debug"]:
+                    logger.error(
+                        f"Pipeline error for {file_path}", exc_info=result.error
+                    )
+            else:
+                console.print(f"❌ [red]Failed to process {file_path.name}[/red]")
+            progress.update(task, advance=1)
+
+        pipeline.run(jobs, on_result=on_result)
+
+
+@dataclass
+class FileJob:
+    """A file moving through the pipeline stages"""
+    file_path: Path
+    note_id: Optional[str] = None
+    image_paths: Optional[list] = None
+    ocr_key: Optional[str] = None
+    ocr_result: object = None
+    analysis: Optional["NoteAnalysis"] = None
+    resumed: bool = False
+
+
+_worker_state = threading.local()
+
+
+def _job_footprint(job) -> int:
+    """Estimated bytes a file still holds in memory at its current stage"""
+    _require("memory_budget")
+    if not isinstance(job, FileJob):
+        return 0
+    if job.ocr_result is not None:
+        # Elements, relationships and structures built from the text
+        return 64 * len(getattr(job.ocr_result, "text", "") or "")
+    if job.image_paths:
+        return memory_budget.estimate_pages_bytes(job.image_paths)
+    return memory_budget.estimate_file_bytes(job.file_path)
+
+
+def _analysis_components():
+    """Build analysis components from the ``analysis`` config section"""
+    _require(
+        "RelationshipDetector",
+        "ConceptExtractor",
+        "ConceptClusterer",
+        "StructureGenerator",
+    )
+    return (
+        RelationshipDetector(config.get("analysis.relationships", {})),
+        ConceptExtractor(config.get("analysis.concepts", {})),
+        ConceptClusterer(config.get("analysis.clustering", {})),
+        StructureGenerator(config.get("analysis.structures", {}))
+    )
+
+
+def _worker_components():
+    """Analysis components owned by the current worker thread or process"""
+    components = getattr(_worker_state, "components", None)
+    if components is None:
+        components = _analysis_components()
+        _worker_state.components = components
+    return components
+
+
+def _decode_stage(
+    job: FileJob, output_dir: Path, stages: StageOptions
+) -> Optional[FileJob]:
+    file_path = job.file_path
+    if job.resumed:
+        return job
+
+    job.ocr_key, job.ocr_result = load_cached_ocr(file_path, stages)
+    if job.ocr_result is None and file_path.suffix.lower() == ".note":
+        try:
+            job.image_paths = decode_note_pages(
+                file_path, note_temp_dir(output_dir, file_path), stages
+            )
+        except Exception as e:
+            logger.error(f"Failed to decode .note file {file_path}: {e}")
+            return None
+    return job
+
+
+def _ocr_stage(job: FileJob, ocr_provider, stages: StageOptions) -> Optional[FileJob]:
+    if job.ocr_result is not None:
+        return job
+    ocr_result = ocr_file(job.file_path, job.image_paths, ocr_provider)
+    if ocr_result is None:
+        return None
+    # Provider responses are not needed downstream and may not be picklable
+    job.ocr_result = replace(ocr_result, raw_response=None)
+    if stages.artifacts and job.ocr_key:
+        stages.artifacts.save("ocr", job.ocr_key, job.ocr_result)
+    return job
+
+
+def _store_stage(job: FileJob, db_manager) -> FileJob:
+    if not job.resumed:
+        store_ocr_result(job.file_path, job.ocr_result, db_manager, job.note_id)
+    return job
+
+
+def _analyze_stage(job: FileJob, stages: StageOptions) -> FileJob:
+    _require("profiling")
+    if stages.until_stage != "ocr":
+        with profiling.file_region(job.file_path):
+            job.analysis = analyze_ocr_result(
+                job.ocr_result,
+                *_worker_components(),
+                artifacts=stages.artifacts,
+                until_stage=stages.until_stage,
+            )
+    return job
+
+
+def _export_stage(job: FileJob, output_dir: Path, output_format: str,
+                  stages: StageOptions) -> Union[List[str], str, None]:
+    if stages.until_stage:
+        return f"stopped after {stages.until_stage}"
+    structure_generator = _worker_components()[3]
+    return export_note(job.file_path, job.ocr_result, job.analysis, output_dir,
+                       output_format, structure_generator)
+
+
 def process_single_file(
     file_path: Path,
     ocr_provider: HybridOCR,
@@ -199,87 +804,300 @@ def process_single_file(
     db_manager: DatabaseManager,
     output_dir: Path,
     output_format: str,
-    quality: str
-) -> Optional[str]:
-    """Process a single file through the complete pipeline"""
-    
-    # Step 1: OCR Processing
+    quality: str,
+    note_id: Optional[str] = None,
+    ocr_result=None,
+    stages: Optional[StageOptions] = None
+) -> Union[List[str], str, None]:
+    """Process a single file through the complete pipeline
+
+    Returns the names of the written files, or a note saying where a
+    partial run stopped. ``note_id`` fixes the ID of the stored note (a
+    random one is used otherwise). Passing an ``ocr_result`` resumes an
+    interrupted job: OCR is skipped and the note already stored for it is
+    kept. ``stages`` enables the artifact cache and partial runs.
+    """
+
+    _require("StructureGenerator")
+    stages = stages or StageOptions()
+    resumed = ocr_result is not None
+
+    if not resumed:
+        # Step 1: OCR Processing, reusing stored decode and OCR artifacts when possible
+        _, ocr_result = _run_ocr_stages(file_path, ocr_provider, output_dir, stages)
+        if ocr_result is None:
+            return None
+
+        # Step 2: Store in database
+        store_ocr_result(file_path, ocr_result, db_manager, note_id)
+
+    if stages.until_stage == "ocr":
+        return "stopped after ocr"
+
+    # Steps 3-6: Build elements, detect relationships, cluster concepts, structure
+    analysis = analyze_ocr_result(
+        ocr_result,
+        relationship_detector,
+        concept_extractor,
+        concept_clusterer,
+        structure_generator,
+        artifacts=stages.artifacts,
+        until_stage=stages.until_stage,
+    )
+    if stages.until_stage:
+        return f"stopped after {stages.until_stage}"
+
+    # Step 7: Export in requested format(s)
+    return export_note(
+        file_path, ocr_result, analysis, output_dir, output_format, structure_generator
+    )
+
+
+def _run_ocr_stages(
+    file_path: Path, ocr_provider, output_dir: Path, stages: StageOptions
+):
+    """Decode and OCR a file through the artifact cache
+
+    Returns ``(ocr_key, ocr_result)``.
+    """
+    ocr_key, ocr_result = load_cached_ocr(file_path, stages)
+    if ocr_result is not None:
+        return ocr_key, ocr_result
+
+    image_paths = None
     if file_path.suffix.lower() == ".note":
-        # Convert .note file to images using enhanced clean room decoder
-        from .utils.supernote_parser_enhanced import convert_note_to_images
-        
-        temp_dir = output_dir / "temp_images"
-        temp_dir.mkdir(exist_ok=True)
-        
         try:
-            # Use enhanced clean room decoder for pixel extraction
-            image_paths = convert_note_to_images(file_path, temp_dir)
-            
-            if not image_paths:
-                logger.warning(f"No images extracted from {file_path}")
-                return None
-            
-            logger.info(f"Enhanced decoder extracted {len(image_paths)} pages from {file_path.name}")
-            
-            # Process all images and combine results
-            all_text_results = []
-            for i, img_path in enumerate(image_paths, 1):
-                logger.info(f"Processing page {i}: {img_path.name}")
-                page_result = ocr_provider.extract_text(str(img_path))
-                if page_result and page_result.text.strip():
-                    all_text_results.append(f"=== Page {i} ===\n{page_result.text}")
-            
-            if all_text_results:
-                # Create combined OCR result without redundant extraction
-                combined_text = "\n\n".join(all_text_results)
-                # Get a sample result to extract metadata
-                sample_result = ocr_provider.extract_text(str(image_paths[0])) if image_paths else None
-                if sample_result:
-                    ocr_result = create_ocr_result_without_extraction(
-                        text=combined_text,
-                        provider=f"{sample_result.provider} (Enhanced Clean Room Decoder)",
-                        confidence=sample_result.confidence,
-                        cost=sample_result.cost * len(image_paths)  # Scale cost by number of pages
-                    )
-                else:
-                    ocr_result = create_ocr_result_without_extraction(
-                        text=combined_text,
-                        provider="Enhanced Clean Room Decoder",
-                        confidence=0.85,
-                        cost=0.0
-                    )
-                logger.info(f"Combined OCR result: {len(combined_text)} characters from {len(all_text_results)} pages")
-            else:
-                ocr_result = None
-            
-            # Clean up temp images
-            for img_path in image_paths:
-                try:
-                    img_path.unlink()
-                except (OSError, IOError) as e:
-                    logger.debug(f"Could not remove temp image {img_path}: {e}")
-            temp_dir.rmdir() if temp_dir.exists() and not list(temp_dir.iterdir()) else None
-            
+            image_paths = decode_note_pages(
+                file_path, note_temp_dir(output_dir, file_path), stages
+            )
         except SupernoteParsingError as e:
             logger.error(f"Failed to parse .note file {file_path}: {e}")
-            return None
+            return ocr_key, None
+        except Exception as e:
+            logger.error(f"Unexpected error processing .note file {file_path}: {e}")
+            return ocr_key, None
+
+    ocr_result = ocr_file(file_path, image_paths, ocr_provider)
+    if ocr_result is not None and stages.artifacts:
+        stages.artifacts.save("ocr", ocr_key, replace(ocr_result, raw_response=None))
+    return ocr_key, ocr_result
+
+
+@dataclass
+class StageOptions:
+    """Artifact cache and partial-run settings shared by the processing stages"""
+    artifacts: Optional[ArtifactCache] = None
+    # Everything that changes OCR output
+    ocr_settings: dict = field(default_factory=dict)
+    until_stage: Optional[str] = None
+
+
+@dataclass
+class NoteAnalysis:
+    """Intermediate results of the analysis stages for one note
+
+    Stages after ``until_stage`` are left as None.
+    """
+    elements: Optional[list] = None
+    relationships: Optional[list] = None
+    concepts: Optional[list] = None
+    clusters: Optional[list] = None
+    structures: Optional[list] = None
+
+
+def _decode_key(file_path: Path, artifacts: ArtifactCache) -> str:
+    from .utils.job_manifest import file_content_hash
+    return artifacts.stage_key("decode", [file_content_hash(file_path)])
+
+
+def load_cached_ocr(file_path: Path, stages: StageOptions):
+    """Look up the OCR artifact of a file; returns (ocr_key, ocr_result or None)"""
+    if not stages.artifacts:
+        return None, None
+    ocr_key = stages.artifacts.stage_key(
+        "ocr", [_decode_key(file_path, stages.artifacts)], stages.ocr_settings
+    )
+    _, ocr_result = stages.artifacts.load("ocr", ocr_key)
+    return ocr_key, ocr_result
+
+
+def _component_config(component) -> dict:
+    settings = getattr(component, "config", None)
+    return settings if isinstance(settings, dict) else {}
+
+
+def ocr_fingerprint(ocr_result) -> str:
+    """Hash of the OCR output that note elements are built from"""
+    payload = json.dumps(
+        [ocr_result.text, ocr_result.confidence, ocr_result.metadata.get("regions")],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def note_temp_dir(output_dir: Path, file_path: Path) -> Path:
+    """Per-file directory for rendered pages, so concurrent files never collide"""
+    digest = hashlib.sha1(str(file_path.resolve()).encode("utf-8")).hexdigest()[:8]
+    return output_dir / "temp_images" / f"{file_path.stem}-{digest}"
+
+
+@_instrumented("decode")
+def decode_note_pages(
+    file_path: Path, temp_dir: Path, stages: Optional[StageOptions] = None
+) -> list:
+    """Decode a .note file and render its pages to PNGs
+
+    Pure CPU work with picklable arguments, so the pipeline can run it in a
+    worker process. With an artifact cache, stored pages are written out
+    instead of decoding again.
+    """
+    _require("span")
+    with span("decode", "decode", file=file_path.name):
+        return _decode_note_pages(file_path, temp_dir, stages)
+
+
+def _decode_note_pages(
+    file_path: Path, temp_dir: Path, stages: Optional[StageOptions]
+) -> list:
+    _require("metrics")
+    from .utils.supernote_parser_enhanced import convert_note_to_images
+
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    artifacts = stages.artifacts if stages else None
+
+    if artifacts:
+        decode_key = _decode_key(file_path, artifacts)
+        found, pages = artifacts.load("decode", decode_key)
+        if found:
+            image_paths = []
+            for name, data in pages:
+                page_path = temp_dir / name
+                page_path.write_bytes(data)
+                image_paths.append(page_path)
+            return image_paths
+
+    # Use enhanced clean room decoder for pixel extraction
+    image_paths = convert_note_to_images(file_path, temp_dir)
+    if image_paths:
+        logger.info(
+            f"Enhanced decoder extracted {len(image_paths)} pages from {file_path.name}"
+        )
+        metrics.observe("decoded_bytes", file_path.stat().st_size)
+        if artifacts:
+            artifacts.save(
+                "decode",
+                decode_key,
+                [(Path(p).name, Path(p).read_bytes()) for p in image_paths],
+            )
+    return image_paths
+
+
+@_instrumented("ocr")
+def ocr_file(file_path: Path, image_paths, ocr_provider: HybridOCR):
+    """OCR an image file, or the rendered pages of a .note file
+
+    Returns None when no text could be extracted. Rendered pages are removed
+    afterwards.
+    """
+    _require("metrics", "span", "create_ocr_result_without_extraction")
+
+    if image_paths is None:
+        # Image processing
+        with span("ocr", "ocr", file=file_path.name):
+            ocr_result = ocr_provider.extract_text(str(file_path))
+    elif not image_paths:
+        logger.warning(f"No images extracted from {file_path}")
+        return None
+    else:
+        try:
+            started = time.perf_counter()
+            with span("ocr", "ocr", file=file_path.name, pages=len(image_paths)):
+                ocr_result = _ocr_note_pages(image_paths, ocr_provider)
+            metrics.observe(
+                "ocr_pages_per_second",
+                len(image_paths) / max(time.perf_counter() - started, 1e-6),
+            )
         except OCRError as e:
             logger.error(f"OCR failed for .note file {file_path}: {e}")
             return None
         except Exception as e:
             logger.error(f"Unexpected error processing .note file {file_path}: {e}")
             return None
-    else:
-        # Image processing
-        ocr_result = ocr_provider.extract_text(str(file_path))
+        finally:
+            _remove_page_images(image_paths)
     
     if not ocr_result or not ocr_result.text.strip():
         logger.warning(f"No text extracted from {file_path}")
         return None
     
-    # Step 2: Store in database
+    return ocr_result
+
+
+def _ocr_note_pages(image_paths, ocr_provider: HybridOCR):
+    """OCR rendered pages and combine them into one result"""
+    # OCR all pages in one batch so batch-capable providers can group requests
+    page_results = ocr_provider.extract_text_batch([str(p) for p in image_paths])
+
+    all_text_results = []
+    text_results = []
+    for i, page_result in enumerate(page_results, 1):
+        if page_result and page_result.text.strip():
+            all_text_results.append(f"=== Page {i} ===\n{page_result.text}")
+            text_results.append(page_result)
+
+    if not all_text_results:
+        return None
+
+    # Create combined OCR result without redundant extraction
+    combined_text = "\n\n".join(all_text_results)
+    first_result = page_results[0]
+    ocr_result = create_ocr_result_without_extraction(
+        text=combined_text,
+        provider=f"{first_result.provider} (Enhanced Clean Room Decoder)",
+        confidence=sum(r.confidence for r in text_results) / len(text_results),
+        cost=sum(r.cost for r in page_results),
+        metadata=merge_page_regions(page_results)
+    )
+    logger.info(
+        f"Combined OCR result: {len(combined_text)} characters "
+        f"from {len(all_text_results)} pages"
+    )
+    return ocr_result
+
+
+def _remove_page_images(image_paths):
+    """Clean up rendered pages and their temp directories once they are empty"""
+    directories = set()
+    for img_path in image_paths:
+        img_path = Path(img_path)
+        directories.add(img_path.parent)
+        try:
+            img_path.unlink()
+        except (OSError, IOError) as e:
+            logger.debug(f"Could not remove temp image {img_path}: {e}")
+
+    # The per-file directory first, then the shared temp_images parent
+    for directory in directories:
+        for candidate in (directory, directory.parent):
+            if "temp_images" not in candidate.parts:
+                break
+            try:
+                candidate.rmdir()
+            except OSError:
+                break
+
+
+@_instrumented("store")
+def store_ocr_result(file_path: Path, ocr_result, db_manager: DatabaseManager,
+                     note_id: Optional[str] = None) -> str:
+    """Store the OCR text as a note and return its ID
+
+    A given ``note_id`` replaces any earlier note with that ID.
+    """
     import uuid
-    note_id = str(uuid.uuid4())
+    replace = note_id is not None
+    note_id = note_id or str(uuid.uuid4())
     db_manager.insert_note(
         note_id=note_id,
         source_file=str(file_path),
@@ -287,56 +1105,197 @@ def process_single_file(
         clean_text=ocr_result.text,
         ocr_provider=ocr_result.provider,
         ocr_confidence=ocr_result.confidence,
-        processing_cost=ocr_result.cost
-    )
-    
-    # Step 3: Create note elements for further processing
-    elements = create_note_elements_from_ocr(ocr_result)
-    
-    # Step 4: Detect relationships
-    relationships = relationship_detector.detect_relationships(elements)
-    
-    # Step 5: Extract and cluster concepts
-    concepts = concept_extractor.extract_concepts(elements)
-    clusters = concept_clusterer.cluster_concepts(concepts, relationships)
-    
-    # Step 6: Generate structures
-    structures = structure_generator.generate_structures(
-        elements, concepts, clusters, relationships
+        processing_cost=ocr_result.cost,
+        replace=replace
     )
+    return note_id
+
+
+@_instrumented("analyze")
+def analyze_ocr_result(
+    ocr_result,
+    relationship_detector: RelationshipDetector,
+    concept_extractor: ConceptExtractor,
+    concept_clusterer: ConceptClusterer,
+    structure_generator: StructureGenerator,
+    artifacts: Optional[ArtifactCache] = None,
+    until_stage: Optional[str] = None,
+) -> NoteAnalysis:
+    """Run relationship detection, concept clustering and structure generation
     
-    # Step 7: Export in requested format(s)
+    With an artifact cache each step is keyed by its inputs and its
+    component's config, so only steps whose settings changed are recomputed.
+    """
+    _require("span")
+    if artifacts is None:
+        # Create note elements for further processing
+        with span("elements", "analysis"):
+            elements = create_note_elements_from_ocr(ocr_result)
+
+        # Detect relationships
+        with span("relationships", "analysis", elements=len(elements)):
+            relationships = relationship_detector.detect_relationships(elements)
+
+        # Extract and cluster concepts
+        with span("concepts", "analysis"):
+            concepts = concept_extractor.extract_concepts(elements)
+        with span("clusters", "analysis", concepts=len(concepts)):
+            clusters = concept_clusterer.cluster_concepts(concepts, relationships)
+
+        # Generate structures
+        with span("structures", "analysis"):
+            structures = structure_generator.generate_structures(
+                elements, concepts, clusters, relationships
+            )
+
+        return NoteAnalysis(elements, relationships, concepts, clusters, structures)
+
+    analysis = NoteAnalysis()
+
+    with span("elements", "analysis"):
+        elements_key, analysis.elements = artifacts.compute(
+            "elements", [ocr_fingerprint(ocr_result)], {},
+            lambda: create_note_elements_from_ocr(ocr_result))
+    if until_stage == "elements":
+        return analysis
+
+    with span("relationships", "analysis", elements=len(analysis.elements)):
+        relationships_key, analysis.relationships = artifacts.compute(
+            "relationships", [elements_key], _component_config(relationship_detector),
+            lambda: relationship_detector.detect_relationships(analysis.elements))
+    if until_stage == "relationships":
+        return analysis
+
+    with span("concepts", "analysis"):
+        concepts_key, analysis.concepts = artifacts.compute(
+            "concepts", [elements_key], _component_config(concept_extractor),
+            lambda: concept_extractor.extract_concepts(analysis.elements))
+    if until_stage == "concepts":
+        return analysis
+
+    with span("clusters", "analysis", concepts=len(analysis.concepts)):
+        clusters_key, analysis.clusters = artifacts.compute(
+            "clusters",
+            [concepts_key, relationships_key],
+            _component_config(concept_clusterer),
+            lambda: concept_clusterer.cluster_concepts(
+                analysis.concepts, analysis.relationships
+            ),
+        )
+    if until_stage == "clusters":
+        return analysis
+
+    with span("structures", "analysis"):
+        _, analysis.structures = artifacts.compute(
+            "structures", [elements_key, concepts_key, clusters_key, relationships_key],
+            _component_config(structure_generator),
+            lambda: structure_generator.generate_structures(
+                analysis.elements,
+                analysis.concepts,
+                analysis.clusters,
+                analysis.relationships,
+            ),
+        )
+
+    return analysis
+
+
+@_instrumented("export")
+def export_note(
+    file_path: Path,
+    ocr_result,
+    analysis: NoteAnalysis,
+    output_dir: Path,
+    output_format: str,
+    structure_generator: StructureGenerator,
+) -> Optional[List[str]]:
+    """Write the requested output format(s) and return the written file names"""
+    _require("span")
     output_files = []
     
     if output_format in ["markdown", "all"]:
-        output_file = export_as_markdown(
-            file_path, structures, output_dir, ocr_result, structure_generator
-        )
+        with span("export", "export", format="markdown"):
+            output_file = export_as_markdown(
+                file_path,
+                analysis.structures,
+                output_dir,
+                ocr_result,
+                structure_generator,
+            )
         if output_file:
             output_files.append(output_file)
     
-    if output_format in ["json", "all"]:
-        output_file = export_as_json(
-            file_path, structures, elements, concepts, clusters, 
-            relationships, output_dir, ocr_result
-        )
-        if output_file:
-            output_files.append(output_file)
+    if output_format in ["json", "ndjson", "all"]:
+        with span(
+            "export", "export", format="ndjson" if output_format == "ndjson" else "json"
+        ):
+            json_files = export_as_json(
+                file_path,
+                analysis.structures,
+                analysis.elements,
+                analysis.concepts,
+                analysis.clusters,
+                analysis.relationships,
+                output_dir,
+                ocr_result,
+                ndjson=output_format == "ndjson",
+            )
+        if json_files:
+            output_files.extend(json_files)
     
     if output_format in ["pdf", "all"]:
-        output_file = export_as_pdf(
-            file_path, structures, output_dir, ocr_result, structure_generator
-        )
+        with span("export", "export", format="pdf"):
+            output_file = export_as_pdf(
+                file_path,
+                analysis.structures,
+                output_dir,
+                ocr_result,
+                structure_generator,
+            )
         if output_file:
             output_files.append(output_file)
     
-    return ", ".join(output_files) if output_files else None
+    return output_files or None
+
+
+def _describe_result(result: Union[List[str], str]) -> str:
+    """Console text for a processed file: its outputs, or where the run stopped"""
+    return ", ".join(result) if isinstance(result, list) else result
+
+
+def merge_page_regions(page_results) -> dict:
+    """Stack per-page OCR regions into one coordinate space
+
+    Pages are laid out top to bottom, so each page's regions are shifted down
+    by the heights of the pages before it. Returns empty metadata when the
+    pages were not OCR'd region by region.
+    """
+    if not any(r and r.metadata.get("regions") for r in page_results):
+        return {}
+
+    regions = []
+    y_offset = 0
+    for page_number, page_result in enumerate(page_results, 1):
+        if not page_result:
+            continue
+        for region in page_result.metadata.get("regions", []):
+            x, y, w, h = region["bbox"]
+            regions.append(
+                {**region, "bbox": (x, y + y_offset, w, h), "page": page_number}
+            )
+        y_offset += page_result.metadata.get("image_size", (0, 0))[1]
+
+    return {"regions": regions}
 
 
 def create_note_elements_from_ocr(ocr_result):
     """Convert OCR result to note elements for processing"""
     from .utils.relationship_detector import NoteElement
     
+    regions = [r for r in ocr_result.metadata.get("regions", []) if r.get("text")]
+    if regions:
+        return _create_note_elements_from_regions(regions)
+
     # Simple implementation - split text into elements by lines
     lines = [line.strip() for line in ocr_result.text.split("\n") if line.strip()]
     
@@ -353,10 +1312,36 @@ def create_note_elements_from_ocr(ocr_result):
     return elements
 
 
+def _create_note_elements_from_regions(regions):
+    """Build note elements from region OCR output using real bounding boxes"""
+    from .utils.relationship_detector import NoteElement
+
+    elements = []
+    for region in regions:
+        x, y, w, h = region["bbox"]
+        lines = [line.strip() for line in region["text"].split("\n") if line.strip()]
+
+        # A region holding several lines is divided evenly between them
+        line_height = h / len(lines)
+        for j, line in enumerate(lines):
+            element = NoteElement(
+                element_id=f"element_{len(elements)}",
+                text=line,
+                bbox=(x, int(y + j * line_height), w, max(1, int(line_height))),
+                confidence=region["confidence"],
+                metadata={"page": region["page"]} if "page" in region else {}
+            )
+            elements.append(element)
+
+    return elements
+
+
 def export_as_markdown(file_path: Path, structures, output_dir: Path, ocr_result, 
                       structure_generator: StructureGenerator = None) -> Optional[str]:
     """Export processed note as Markdown"""
     
+    _require("StructureGenerator")
+
     output_file = output_dir / f"{file_path.stem}_processed.md"
     
     try:
@@ -389,39 +1374,41 @@ def export_as_markdown(file_path: Path, structures, output_dir: Path, ocr_result
         return None
 
 
-def export_as_json(file_path: Path, structures, elements, concepts, clusters, 
-                   relationships, output_dir: Path, ocr_result) -> Optional[str]:
-    """Export complete processing results as JSON"""
-    import json
-    from dataclasses import asdict
-    
-    output_file = output_dir / f"{file_path.stem}_data.json"
-    
-    try:
-        # Convert dataclasses to dictionaries for JSON serialization
-        data = {
-            "source_file": str(file_path),
-            "ocr_result": asdict(ocr_result),
-            "elements": [asdict(elem) for elem in elements],
-            "concepts": [asdict(concept) for concept in concepts],
-            "clusters": [asdict(cluster) for cluster in clusters],
-            "relationships": [asdict(rel) for rel in relationships],
-            "structures": [asdict(struct) for struct in structures]
-        }
-        
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, default=str)
-        
-        return str(output_file.name)
-    
-    except Exception as e:
-        logger.error(f"Failed to export JSON: {e}")
-        return None
+def export_as_json(
+    file_path: Path,
+    structures,
+    elements,
+    concepts,
+    clusters,
+    relationships,
+    output_dir: Path,
+    ocr_result,
+    ndjson: bool = False,
+) -> Optional[List[str]]:
+    """Export complete processing results as JSON, or as NDJSON records"""
+    from .utils.exporters import export_note_json
+
+    json_config = config.get("export.json", {}) or {}
+    suffix = "ndjson" if ndjson else "json"
+
+    return export_note_json(
+        output_dir / f"{file_path.stem}_data.{suffix}",
+        str(file_path),
+        ocr_result,
+        [("elements", elements), ("concepts", concepts), ("clusters", clusters),
+         ("relationships", relationships), ("structures", structures)],
+        ndjson=ndjson,
+        pretty=json_config.get("pretty", False),
+        raw_responses=json_config.get("raw_responses", "omit")
+    )
 
 
 def export_as_pdf(file_path: Path, structures, output_dir: Path, ocr_result, 
                   structure_generator: StructureGenerator = None) -> Optional[str]:
     """Export processed note as PDF"""
+
+    _require("StructureGenerator")
+
     from reportlab.lib.pagesizes import A4
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -500,56 +1487,127 @@ def export_as_pdf(file_path: Path, structures, output_dir: Path, ocr_result,
 @click.argument("directory", type=click.Path(exists=True, file_okay=False))
 @click.option("--output", "-o", type=click.Path(), help="Output directory") 
 @click.option("--interval", "-i", type=int, default=5, help="Watch interval in seconds")
-@click.option("--format", "-f", type=click.Choice(["markdown", "pdf", "json", "all"]), 
+@click.option("--format", "-f",
+              type=click.Choice(["markdown", "pdf", "json", "ndjson", "all"]),
               default="markdown", help="Output format")
+@click.option("--workers", "-w", type=click.IntRange(min=1), default=None,
+              help="Files processed concurrently (default: processing.watch.workers)")
+@click.option("--debounce", type=click.FloatRange(min=0), default=None,
+              help="Seconds a file's size and mtime must hold still before processing")
+@click.option(
+    "--profile",
+    "profile_mode",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help="Profile processing: cprofile writes pstats dumps, "
+    "sample writes collapsed stacks for flame graphs",
+)
+@click.option("--profile-per", type=click.Choice(PROFILE_PER), default=None,
+              help="Profile each stage or each whole file "
+                   "(default: processing.profiling.per)")
+@click.option("--profile-every", type=click.IntRange(min=1), default=None, metavar="N",
+              help="Only profile every Nth stage call or file")
+@click.option("--profile-slower-than", type=click.FloatRange(min=0), default=None,
+              metavar="SECONDS",
+              help="Only keep profiles of stages or files that took at least this long")
 @click.pass_context  
-def watch(ctx, directory: str, output: Optional[str], interval: int, format: str):
+def watch(
+    ctx,
+    directory: str,
+    output: Optional[str],
+    interval: int,
+    format: str,
+    workers: Optional[int],
+    debounce: Optional[float],
+    profile_mode: Optional[str],
+    profile_per: Optional[str],
+    profile_every: Optional[int],
+    profile_slower_than: Optional[float],
+):
     """Watch directory for new files and process them automatically"""
     
+    _require("memory_budget", "profiling")
+    if profile_mode:
+        _start_profiling(
+            ctx, profile_mode, profile_per, profile_every, profile_slower_than
+        )
+
     console.print(f"👁️  [bold blue]Watching directory:[/bold blue] {directory}")
     console.print("Press Ctrl+C to stop watching...")
     
     from .utils.file_watcher import FileWatcher
+    _require("DatabaseManager", "OCRProviderFactory")
     
     directory_path = Path(directory)
     output_dir = Path(output) if output else directory_path / "ghost_writer_output"
     output_dir.mkdir(exist_ok=True)
     
+    watch_config = config.get("processing.watch", {}) or {}
+    workers = workers or watch_config.get("workers", 1)
+    debounce = (
+        debounce if debounce is not None else watch_config.get("debounce_seconds", 1.0)
+    )
+
+    # Shared, thread-safe components are created once; each worker thread
+    # builds its own analysis components on first use and keeps them warm
+    ocr_provider = OCRProviderFactory.get_provider(config.get("ocr", {}))
+    db_manager = DatabaseManager()
+    _start_metrics(ctx, db_manager)
+    budget = memory_budget.from_config(config.get("processing.memory", {}))
+
     def on_file_added(file_path: Path):
-        console.print(f"📄 New file detected: {file_path.name}")
+        console.print(
+            f"📄 Processing {file_path.name} (queue depth {watcher.queue_depth})"
+        )
         try:
-            # Initialize components
-            from .utils.ocr_providers import HybridOCR
-            from .utils.relationship_detector import RelationshipDetector
-            from .utils.concept_clustering import ConceptExtractor, ConceptClusterer
-            from .utils.structure_generator import StructureGenerator
-            from .utils.database import DatabaseManager
-            
-            ocr_provider = OCRProviderFactory.get_provider({})
-            detector = RelationshipDetector()
-            extractor = ConceptExtractor()
-            clusterer = ConceptClusterer()
-            generator = StructureGenerator()
-            db_manager = DatabaseManager()
+            detector, extractor, clusterer, generator = _worker_components()
             
-            # Process the file
-            result = process_single_file(
-                file_path=file_path,
-                ocr_provider=ocr_provider,
-                relationship_detector=detector,
-                concept_extractor=extractor,
-                concept_clusterer=clusterer,
-                structure_generator=generator,
-                db_manager=db_manager,
-                output_dir=output_dir,
-                output_format=format,
-                quality="balanced"
+            # Process the file once it fits in the memory budget
+            reservation = nullcontext()
+            if budget:
+                estimate = memory_budget.estimate_file_bytes(file_path)
+                reservation = budget.reserve(estimate)
+            with (
+                reservation,
+                profiling.file_region(file_path),
+                memory_budget.measured("file"),
+            ):
+                result = process_single_file(
+                    file_path=file_path,
+                    ocr_provider=ocr_provider,
+                    relationship_detector=detector,
+                    concept_extractor=extractor,
+                    concept_clusterer=clusterer,
+                    structure_generator=generator,
+                    db_manager=db_manager,
+                    output_dir=output_dir,
+                    output_format=format,
+                    quality="balanced"
+                )
+            console.print(
+                f"✅ Processed: {file_path.name} -> {_describe_result(result)}"
             )
-            console.print(f"✅ Processed: {file_path.name} -> {result}")
         except Exception as e:
             console.print(f"❌ Error processing {file_path.name}: {e}")
     
-    watcher = FileWatcher(directory_path, on_file_added, interval)
+    # Polling mode remembers what it has seen per watched directory across restarts
+    snapshot_path = None
+    if watch_config.get("snapshot_dir"):
+        digest = hashlib.sha1(
+            str(directory_path.resolve()).encode("utf-8")
+        ).hexdigest()[:16]
+        snapshot_path = Path(watch_config["snapshot_dir"]) / f"{digest}.json"
+
+    watcher = FileWatcher(
+        directory_path,
+        on_file_added,
+        interval,
+        workers=workers,
+        debounce=debounce,
+        max_queued=watch_config.get("max_queued", 64),
+        snapshot_path=snapshot_path,
+    )
+    console.print(f"⚙️  {workers} workers, {debounce}s debounce")
     
     try:
         watcher.start()
@@ -562,6 +1620,8 @@ def watch(ctx, directory: str, output: Optional[str], interval: int, format: str
 def status():
     """Show system status and configuration"""
     
+    _require("DatabaseManager")
+
     console.print("🤖 [bold blue]Ghost Writer v2.0 - System Status[/bold blue]\n")
     
     # System info table
@@ -573,17 +1633,29 @@ def status():
     # Check database
     try:
         db_manager = DatabaseManager()
-        note_count = len(db_manager.get_all_notes())
+        note_count = db_manager.get_database_stats().get("total_notes", 0)
         table.add_row("Database", "✅ Connected", f"Notes: {note_count}")
     except Exception as e:
         table.add_row("Database", "❌ Error", str(e))
     
-    # Check OCR providers
+    # Check OCR providers against their config; clients are only built on first use
     try:
-        ocr_config = config.get("ocr", {})
-        ocr = HybridOCR(provider_config=ocr_config)
-        available_providers = list(ocr.providers.keys())
-        table.add_row("OCR Providers", "✅ Ready", ", ".join(available_providers))
+        from .utils import ocr_providers
+        providers_config = config.get("ocr", {}).get("providers", {})
+        valid, invalid = [], []
+        for name, provider_config in providers_config.items():
+            if name == "hybrid":
+                continue
+            _, _, problems = ocr_providers.HybridOCR.check_provider(
+                name, provider_config
+            )
+            if problems:
+                invalid.append(f"{name} ({'; '.join(problems)})")
+            else:
+                valid.append(name)
+        table.add_row("OCR Providers", "✅ Configured", ", ".join(valid) or "none")
+        if invalid:
+            table.add_row("", "⚠️  Invalid", ", ".join(invalid))
     except Exception as e:
         table.add_row("OCR Providers", "❌ Error", str(e))
     
@@ -602,6 +1674,305 @@ def status():
     console.print(f"Daily Budget: ${daily_limit:.2f}")
 
 
+def _parse_window(value: str) -> str:
+    """Start of a window like ``30m``, ``24h``, ``7d`` or a date, as a UTC timestamp"""
+    from datetime import datetime, timedelta, timezone
+
+    units = {"m": "minutes", "h": "hours", "d": "days"}
+    value = value.strip().lower()
+    if value[:-1].isdigit() and value[-1:] in units:
+        start = datetime.now(timezone.utc) - timedelta(
+            **{units[value[-1]]: int(value[:-1])}
+        )
+    else:
+        try:
+            start = datetime.fromisoformat(value)
+        except ValueError:
+            raise click.BadParameter(
+                f"invalid window: {value}. Use e.g. 30m, 24h, 7d or YYYY-MM-DD",
+                param_hint="--since",
+            )
+        if start.tzinfo is not None:
+            start = start.astimezone(timezone.utc)
+    return start.strftime("%Y-%m-%d %H:%M:%S")
+
+
+@cli.command()
+@click.option("--since", "-s", default="24h", show_default=True,
+              help="Time window: 30m, 24h, 7d or a date (YYYY-MM-DD)")
+@click.option("--metric", "-m", default=None,
+              help="Only show one metric, e.g. stage_ms or provider_ms")
+def stats(since: str, metric: Optional[str]):
+    """Show latency and throughput percentiles per stage and provider"""
+
+    _require("DatabaseManager", "metrics")
+
+    window_start = _parse_window(since)
+    rows = DatabaseManager().get_metric_histograms(since=window_start, metric=metric)
+    if not rows:
+        console.print(
+            f"ℹ️  [yellow]No metrics recorded since {window_start} UTC[/yellow]"
+        )
+        return
+
+    table = Table(title=f"Pipeline metrics since {window_start} UTC")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Labels", style="white")
+    for column in ("Count", "p50", "p95", "p99", "Max"):
+        table.add_column(column, justify="right", style="green")
+
+    for entry in metrics.summarize(rows):
+        labels = ", ".join(f"{k}={v}" for k, v in entry["labels"].items())
+        table.add_row(entry["metric"], labels, str(entry["count"]),
+                      *(f"{entry[key]:.2f}" for key in ("p50", "p95", "p99", "max")))
+
+    console.print(table)
+
+
+def _parse_list(value: str, cast, param_hint: str) -> list:
+    """Comma-separated option values, e.g. ``1,2,4``"""
+    try:
+        values = [cast(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise click.BadParameter(f"invalid list: {value}", param_hint=param_hint)
+    if not values:
+        raise click.BadParameter("expected at least one value", param_hint=param_hint)
+    return values
+
+
+@cli.group()
+def bench():
+    """Benchmark the processing pipeline"""
+
+
+@bench.command("e2e")
+@click.option("--corpus", "corpus_path", type=click.Path(exists=True, file_okay=False),
+              default=None,
+              help="Process this directory instead of generating notebooks")
+@click.option("--files", type=click.IntRange(min=1), default=8, show_default=True,
+              help="Notebooks per generated corpus")
+@click.option("--pages", default="10", show_default=True, metavar="N,...",
+              help="Pages per generated notebook; one corpus per value")
+@click.option("--blank-share", default="0", show_default=True, metavar="F,...",
+              help="Share of blank pages per generated corpus; one corpus per value")
+@click.option("--workers", "-w", "worker_counts", default="1,2,4,8,16",
+              show_default=True, metavar="N,...",
+              help="Worker counts to run each corpus with")
+@click.option("--ocr-latency-ms", type=click.FloatRange(min=0), default=200,
+              show_default=True,
+              help="Median latency of the simulated OCR provider per page")
+@click.option("--format", "-f", "output_format",
+              type=click.Choice(["markdown", "json", "ndjson"]),
+              default="json", show_default=True, help="Export format for the runs")
+@click.option("--report", "report_path", type=click.Path(dir_okay=False),
+              default="reports/benchmarks/e2e.json", show_default=True,
+              help="Where to write the report")
+@click.option("--compare", "compare_path",
+              type=click.Path(exists=True, dir_okay=False), default=None,
+              help="Report to compare against "
+                   "(default: the previous report at --report)")
+@click.option("--work-dir", type=click.Path(file_okay=False), default=None,
+              help="Keep corpora and run directories here "
+                   "instead of a temporary directory")
+@click.option("--seed", type=int, default=0, show_default=True,
+              help="Seed for generated notebooks")
+def bench_e2e(
+    corpus_path: Optional[str],
+    files: int,
+    pages: str,
+    blank_share: str,
+    worker_counts: str,
+    ocr_latency_ms: float,
+    output_format: str,
+    report_path: str,
+    compare_path: Optional[str],
+    work_dir: Optional[str],
+    seed: int,
+):
+    """Throughput of `process` across worker counts and corpus shapes, with stub OCR"""
+    import shutil
+    import tempfile
+    from .utils import throughput_bench
+
+    worker_list = _parse_list(worker_counts, int, "--workers")
+    if any(count < 1 for count in worker_list):
+        raise click.BadParameter("worker counts must be at least 1",
+                                 param_hint="--workers")
+    if corpus_path:
+        corpora = [(None, Path(corpus_path))]
+    else:
+        page_counts = _parse_list(pages, int, "--pages")
+        blank_shares = _parse_list(blank_share, float, "--blank-share")
+        if (any(count < 1 for count in page_counts)
+                or any(not 0 <= share <= 1 for share in blank_shares)):
+            raise click.BadParameter(
+                "pages must be at least 1 and blank shares between 0 and 1"
+            )
+        corpora = [
+            (throughput_bench.CorpusSpec(files=files, pages=count,
+                                         blank_share=share, seed=seed), None)
+            for count in page_counts
+            for share in blank_shares
+        ]
+
+    previous = None
+    baseline_path = Path(compare_path or report_path)
+    if baseline_path.exists():
+        try:
+            previous = throughput_bench.load_report(baseline_path)
+        except (ValueError, OSError) as e:
+            console.print(
+                f"⚠️  [yellow]Not comparing against {baseline_path}: {e}[/yellow]"
+            )
+
+    if work_dir:
+        root = Path(work_dir)
+    else:
+        root = Path(tempfile.mkdtemp(prefix="ghost_writer_bench_"))
+    root.mkdir(parents=True, exist_ok=True)
+    results = []
+    try:
+        for index, (spec, corpus_dir) in enumerate(corpora):
+            if spec is not None:
+                corpus_dir = throughput_bench.generate_corpus(
+                    root / f"corpus_{index}", spec
+                )
+            corpus_files, corpus_pages = throughput_bench.count_corpus(corpus_dir)
+            label = spec.label if spec else str(corpus_dir)
+            console.print(
+                f"📚 Corpus {label}: {corpus_files} files, {corpus_pages} pages"
+            )
+
+            for workers in worker_list:
+                result = throughput_bench.run_process(
+                    corpus_dir, root / f"run_{index}_w{workers}", workers,
+                    config._config, ocr_latency_ms, output_format,
+                )
+                result.update(throughput_bench.corpus_fields(spec, corpus_dir))
+                results.append(result)
+                status = ""
+                if result["returncode"] != 0:
+                    status = f"  [red]exit {result['returncode']}[/red]"
+                console.print(
+                    f"   workers={workers:<3} "
+                    f"{result['pages_per_min']:8.1f} pages/min  "
+                    f"p95 {result['file_p95_s']:6.2f}s  "
+                    f"peak {result['peak_rss_mb']:7.1f} MB  "
+                    f"db +{result['db_growth_bytes'] / 1024:,.0f} KB  "
+                    f"failed {result['failed']}{status}"
+                )
+    finally:
+        if not work_dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = throughput_bench.build_report(results, ocr_latency_ms)
+    saved = throughput_bench.save_report(Path(report_path), report)
+    console.print(f"📄 Report: {saved}")
+
+    if previous is None:
+        return
+    comparisons = throughput_bench.compare_reports(report, previous)
+    if not comparisons:
+        console.print("ℹ️  [yellow]The previous report has no matching corpus "
+                      "and worker counts[/yellow]")
+        return
+
+    created = previous.get('created', 'unknown date')
+    table = Table(title=f"Compared with {baseline_path} ({created})")
+    table.add_column("Corpus", style="cyan")
+    table.add_column("Workers", justify="right")
+    for name in throughput_bench.COMPARED:
+        table.add_column(name, justify="right")
+    for comparison in comparisons:
+        cells = []
+        for name in throughput_bench.COMPARED:
+            change = comparison["changes"].get(name)
+            if change is None:
+                cells.append("-")
+            else:
+                color = "red" if change["worse"] else "green"
+                cells.append(f"[{color}]{change['change']:+.1%}[/{color}]")
+        table.add_row(str(comparison["corpus"]), str(comparison["workers"]), *cells)
+    console.print(table)
+
+
+@cli.command("export-corpus")
+@click.argument("output_path", type=click.Path(dir_okay=False))
+@click.option("--format", "-f", "fmt", type=click.Choice(["ndjson", "csv"]),
+              default="ndjson", help="Output format")
+@click.option("--columns", default=None, metavar="COL,...",
+              help="Columns to export (default: all note columns)")
+@click.option("--since", help="Only notes created on or after this date (YYYY-MM-DD)")
+@click.option("--until", help="Only notes created before this date (YYYY-MM-DD)")
+@click.option("--provider", "providers", multiple=True,
+              help="Only notes OCR'd by this provider (repeatable)")
+@click.option("--gzip", "compress", is_flag=True, help="Gzip-compress the output")
+@click.option("--batch-size", type=click.IntRange(min=1), default=500,
+              help="Rows read per query")
+def export_corpus(
+    output_path: str,
+    fmt: str,
+    columns: Optional[str],
+    since: Optional[str],
+    until: Optional[str],
+    providers,
+    compress: bool,
+    batch_size: int,
+):
+    """Stream processed notes from the database to NDJSON or CSV"""
+
+    _require("DatabaseManager")
+    import sqlite3
+    from datetime import datetime
+    from .utils.database import NOTE_COLUMNS
+    from .utils.exporters import write_corpus
+
+    selected = (
+        [c.strip() for c in columns.split(",") if c.strip()]
+        if columns
+        else list(NOTE_COLUMNS)
+    )
+    unknown = [c for c in selected if c not in NOTE_COLUMNS]
+    if unknown:
+        raise click.BadParameter(
+            f"unknown columns: {', '.join(unknown)} "
+            f"(available: {', '.join(NOTE_COLUMNS)})",
+            param_hint="--columns",
+        )
+
+    # created_at is stored as 'YYYY-MM-DD HH:MM:SS', so bounds are compared in that form
+    bounds = {}
+    for name, value in (("since", since), ("until", until)):
+        if value:
+            try:
+                bounds[name] = datetime.fromisoformat(value).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                )
+            except ValueError:
+                raise click.BadParameter(
+                    f"invalid date: {value}. Use YYYY-MM-DD", param_hint=f"--{name}"
+                )
+
+    if compress and not output_path.endswith(".gz"):
+        output_path += ".gz"
+
+    db_manager = DatabaseManager()
+    rows = db_manager.iter_notes(
+        columns=selected,
+        since=bounds.get("since"),
+        until=bounds.get("until"),
+        providers=list(providers) or None,
+        batch_size=batch_size,
+    )
+    try:
+        count = write_corpus(rows, output_path, fmt, selected, compress=compress)
+    except (OSError, sqlite3.Error) as e:
+        console.print(f"❌ [red]Export failed, partial output removed: {e}[/red]")
+        sys.exit(1)
+
+    console.print(f"✅ [green]Exported {count} notes to {output_path}[/green]")
+
+
 @cli.command()
 @click.option("--since", "-s", help="Sync files modified since (YYYY-MM-DD)")
 @click.option("--output", "-o", type=click.Path(), help="Local directory for synced files")
@@ -692,6 +2063,8 @@ def sync(ctx, since: Optional[str], output: Optional[str]):
 def init():
     """Initialize Ghost Writer configuration and database"""
     
+    _require("DatabaseManager", "HybridOCR")
+
     console.print("🚀 [bold blue]Initializing Ghost Writer...[/bold blue]")
     
     try:
@@ -708,7 +2081,8 @@ def init():
         # Test OCR providers
         ocr_config = config.get("ocr", {})
         ocr = HybridOCR(provider_config=ocr_config)
-        console.print(f"✅ OCR providers ready: {', '.join(ocr.providers.keys())}")
+        names = ", ".join(ocr.providers.keys())
+        console.print(f"✅ OCR providers configured (started on first use): {names}")
         
         console.print("\n🎉 [bold green]Ghost Writer initialized successfully![/bold green]")
         console.print("🏃 Ready to process notes with: [bold]ghost-writer process <path>[/bold]")
@@ -724,4 +2098,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,155 @@
+"""
+Versioned on-disk artifacts for each processing stage
+
+Every stage output (decoded pages, OCR result, elements, relationships,
+concepts, clusters, structures) is stored under a key derived from the keys
+of its inputs, the stage's own configuration and the version of the code
+that produced it. Changing a setting of one stage therefore only
+invalidates that stage and the stages downstream of it; everything
+upstream is loaded from disk.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout or meaning of stored artifacts changes
+ARTIFACT_VERSION = "1"
+
+ANALYSIS_STAGES = ("elements", "relationships", "concepts", "clusters", "structures")
+STAGES = ("decode", "ocr") + ANALYSIS_STAGES
+
+# Version of the code behind each stage, part of its artifact keys. Bump a
+# stage's entry whenever a change to it can alter its output for the same
+# inputs and config, or --from-stage reruns keep serving the old results.
+# Later stages are invalidated too, since their keys include this one's.
+STAGE_VERSIONS = {
+    "decode": "1",
+    "ocr": "1",
+    "elements": "1",
+    "relationships": "1",
+    "concepts": "1",
+    "clusters": "1",
+    "structures": "1",
+}
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ArtifactCache:
+    """Content-addressed store of stage outputs
+
+    ``from_stage`` ignores stored artifacts of that stage and every later
+    one, so they are recomputed (and overwritten) even when nothing changed.
+    """
+
+    def __init__(self, root: Union[str, Path], from_stage: Optional[str] = None):
+        if from_stage is not None and from_stage not in STAGES:
+            raise ValueError(f"Unknown stage: {from_stage}")
+        self.root = Path(root)
+        self.from_stage = from_stage
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def stage_key(
+        self,
+        stage: str,
+        inputs: List[str],
+        stage_config: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Key of a stage output given its input keys and configuration"""
+        payload = _canonical(
+            [
+                ARTIFACT_VERSION,
+                stage,
+                STAGE_VERSIONS[stage],
+                list(inputs),
+                stage_config or {},
+            ]
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, stage: str, key: str) -> Path:
+        return self.root / stage / key[:2] / f"{key}.pkl"
+
+    def _recompute(self, stage: str) -> bool:
+        return self.from_stage is not None and STAGES.index(stage) >= STAGES.index(
+            self.from_stage
+        )
+
+    def load(self, stage: str, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for a stored artifact"""
+        path = self._path(stage, key)
+        if self._recompute(stage) or not path.exists():
+            self._count(hit=False)
+            return False, None
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable {stage} artifact {key[:12]}: {e}")
+            self._count(hit=False)
+            return False, None
+        self._count(hit=True)
+        return True, value
+
+    def save(self, stage: str, key: str, value: Any) -> bool:
+        """Store an artifact atomically; failures only cost a future cache miss"""
+        path = self._path(stage, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_name, path)
+            except BaseException:
+                os.unlink(temp_name)
+                raise
+            return True
+        except Exception as e:
+            logger.warning(f"Could not store {stage} artifact {key[:12]}: {e}")
+            return False
+
+    def compute(
+        self,
+        stage: str,
+        inputs: List[str],
+        stage_config: Optional[Dict[str, Any]],
+        producer: Callable[[], Any],
+    ) -> Tuple[str, Any]:
+        """Load a stage output, or produce and store it; returns (key, value)"""
+        key = self.stage_key(stage, inputs, stage_config)
+        found, value = self.load(stage, key)
+        if not found:
+            value = producer()
+            self.save(stage, key, value)
+        return key, value
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def __getstate__(self):
+        # Worker processes get their own lock and counters
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
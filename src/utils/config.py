@@ -3,20 +3,28 @@ Configuration management for Ghost Writer
 """
 
 import os
-import yaml
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional
 import logging
-from dotenv import load_dotenv
-
-# Load environment variables from .env file if it exists
-load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+_dotenv_loaded = False
+
+
+def _load_dotenv_once() -> None:
+    """Load environment variables from .env file if it exists (first call only)"""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+
 
 class Config:
     def __init__(self, config_path: Optional[str] = None):
+        _load_dotenv_once()
         if config_path is None:
             config_path = os.getenv("GHOST_WRITER_CONFIG_PATH", "config/config.yaml")
         
@@ -31,6 +39,8 @@ class Config:
                 logger.warning(f"Config file not found at {self.config_path}, using defaults")
                 return self._get_default_config()
             
+            import yaml
+
             with open(self.config_path, 'r') as f:
                 config = yaml.safe_load(f)
             
@@ -238,6 +248,8 @@ class Config:
                 path_obj = Path(output_path)
             path_obj.parent.mkdir(parents=True, exist_ok=True)
             
+            import yaml
+
             with open(path_obj, 'w') as f:
                 yaml.dump(self._config, f, default_flow_style=False, indent=2)
             
@@ -256,5 +268,35 @@ class Config:
         return self.__str__()
 
 
+_config_instance: Optional[Config] = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> Config:
+    """Return the global configuration, loading it on first use"""
+    global _config_instance
+    if _config_instance is None:
+        with _config_lock:
+            if _config_instance is None:
+                _config_instance = Config()
+    return _config_instance
+
+
+class _DeferredConfig:
+    """Stand-in for the global Config that loads it on first attribute access
+
+    Importing this module stays cheap: .env and YAML are only read when a
+    command actually asks for a setting.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_config(), name)
+
+    def __repr__(self) -> str:
+        if _config_instance is None:
+            return "Config(<not loaded>)"
+        return repr(_config_instance)
+
+
 # Global configuration instance
-config = Config()
\ No newline at end of file
+config = _DeferredConfig()
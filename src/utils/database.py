@@ -6,11 +6,16 @@ import sqlite3
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Sequence, Tuple
 import logging
 
+from .tracing import traced
+
 logger = logging.getLogger(__name__)
 
+NOTE_COLUMNS = ("note_id", "source_file", "raw_text", "clean_text", "ocr_provider",
+                "ocr_confidence", "processing_cost", "created_at")
+
 
 class DatabaseManager:
     def __init__(self, db_path: str = "data/database/ghost_writer.db"):
@@ -76,23 +81,82 @@ class DatabaseManager:
                 )
             """)
 
+            # Job manifest for idempotent, resumable batch processing
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS processing_jobs (
+                    job_key TEXT PRIMARY KEY,
+                    source_file TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    pipeline_version TEXT NOT NULL,
+                    options TEXT,
+                    status TEXT NOT NULL,
+                    note_id TEXT,
+                    outputs TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    error TEXT,
+                    started_at TIMESTAMP,
+                    completed_at TIMESTAMP,
+                    duration REAL
+                )
+            """)
+
+            # Latency and throughput histograms, one row per flush interval and process
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS metric_histograms (
+                    histogram_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    metric TEXT NOT NULL,
+                    labels TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    min_value REAL,
+                    max_value REAL,
+                    buckets TEXT NOT NULL,
+                    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
             # Create indexes for performance
             conn.execute("CREATE INDEX IF NOT EXISTS idx_notes_created ON notes(created_at)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_notes_provider ON notes(ocr_provider)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_notes_created_id "
+                "ON notes(created_at, note_id)"
+            )
             conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_date ON ocr_usage(date)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_provider ON ocr_usage(provider)")
-            
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_status ON processing_jobs(status)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_metrics_recorded "
+                "ON metric_histograms(recorded_at, metric)"
+            )
+
             conn.commit()
             logger.info("Database initialized successfully")
 
-    def insert_note(self, note_id: str, source_file: str, raw_text: str, 
-                   clean_text: str, ocr_provider: str, ocr_confidence: float, 
-                   processing_cost: float = 0.0) -> bool:
-        """Insert a new note record with OCR metadata"""
+    @traced("db.insert_note", "db")
+    def insert_note(
+        self,
+        note_id: str,
+        source_file: str,
+        raw_text: str,
+        clean_text: str,
+        ocr_provider: str,
+        ocr_confidence: float,
+        processing_cost: float = 0.0,
+        replace: bool = False,
+    ) -> bool:
+        """Insert a new note record with OCR metadata
+
+        With ``replace`` an existing note with the same ID is overwritten,
+        which keeps reruns with deterministic note IDs from duplicating rows.
+        """
+        verb = "INSERT OR REPLACE" if replace else "INSERT"
         try:
             with self.get_connection() as conn:
-                conn.execute("""
-                    INSERT INTO notes 
+                conn.execute(f"""
+                    {verb} INTO notes
                     (note_id, source_file, raw_text, clean_text, ocr_provider, 
                      ocr_confidence, processing_cost)
                     VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -123,14 +187,82 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 query = "SELECT * FROM notes ORDER BY created_at DESC"
+                params: tuple = ()
                 if limit:
-                    query += f" LIMIT {limit}"
-                cursor = conn.execute(query)
+                    query += " LIMIT ?"
+                    params = (int(limit),)
+                cursor = conn.execute(query, params)
                 return [dict(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
             logger.error(f"Error retrieving notes: {e}")
             return []
 
+    def iter_notes(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        providers: Optional[Sequence[str]] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream notes oldest first without loading the table into memory
+
+        Rows are read in pages of ``batch_size`` using keyset pagination on
+        (created_at, note_id), so each page is an index range scan and the
+        connection holds no long-running read. ``since`` is inclusive and
+        ``until`` exclusive; both compare against ``created_at``.
+        """
+        columns = list(columns or NOTE_COLUMNS)
+        unknown = [c for c in columns if c not in NOTE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown note columns: {', '.join(unknown)}")
+        batch_size = max(1, int(batch_size))
+
+        # The pagination key is always selected and dropped again if not requested
+        selected = columns + [
+            key for key in ("created_at", "note_id") if key not in columns
+        ]
+        filters, params = [], []
+        if since:
+            filters.append("created_at >= ?")
+            params.append(since)
+        if until:
+            filters.append("created_at < ?")
+            params.append(until)
+        if providers:
+            filters.append(f"ocr_provider IN ({', '.join('?' * len(providers))})")
+            params.extend(providers)
+
+        base = f"SELECT {', '.join(selected)} FROM notes"
+        last_key = None
+        conn = self.get_connection()
+        try:
+            while True:
+                page_filters, page_params = list(filters), list(params)
+                if last_key is not None:
+                    page_filters.append(
+                        "(created_at > ? OR (created_at = ? AND note_id > ?))"
+                    )
+                    page_params.extend([last_key[0], last_key[0], last_key[1]])
+                query = base
+                if page_filters:
+                    query += " WHERE " + " AND ".join(page_filters)
+                query += " ORDER BY created_at, note_id LIMIT ?"
+
+                cursor = conn.execute(query, page_params + [batch_size])
+                rows = cursor.fetchmany(batch_size)
+                for row in rows:
+                    yield {column: row[column] for column in columns}
+                if len(rows) < batch_size:
+                    return
+                last_key = (rows[-1]["created_at"], rows[-1]["note_id"])
+        except sqlite3.Error as e:
+            # Ending quietly would pass a truncated stream off as complete
+            logger.error(f"Error streaming notes: {e}")
+            raise
+        finally:
+            conn.close()
+
     def update_note_text(self, note_id: str, clean_text: str) -> bool:
         """Update cleaned text for a note"""
         try:
@@ -215,6 +347,7 @@ class DatabaseManager:
             logger.error(f"Error retrieving expansions for {note_id}: {e}")
             return []
 
+    @traced("db.track_ocr_usage", "db")
     def track_ocr_usage(self, provider: str, cost: float, images_processed: int = 1) -> bool:
         """Track OCR usage for cost monitoring"""
         usage_id = str(uuid.uuid4())
@@ -233,6 +366,48 @@ class DatabaseManager:
             logger.error(f"Error tracking OCR usage: {e}")
             return False
 
+    def insert_metric_histograms(
+        self,
+        rows: List[Tuple[str, str, int, float, Optional[float], Optional[float], str]],
+    ) -> bool:
+        """Store serialized histograms
+
+        Rows are (metric, labels, count, total, min, max, buckets) tuples.
+        """
+        if not rows:
+            return True
+        try:
+            with self.get_connection() as conn:
+                conn.executemany("""
+                    INSERT INTO metric_histograms
+                        (metric, labels, count, total, min_value, max_value, buckets)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            logger.error(f"Error storing metric histograms: {e}")
+            return False
+
+    def get_metric_histograms(self, since: Optional[str] = None,
+                              metric: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Histogram rows recorded at or after ``since`` (UTC, 'YYYY-MM-DD HH:MM:SS')"""
+        query = "SELECT * FROM metric_histograms WHERE 1 = 1"
+        params: List[Any] = []
+        if since:
+            query += " AND recorded_at >= ?"
+            params.append(since)
+        if metric:
+            query += " AND metric = ?"
+            params.append(metric)
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(query + " ORDER BY recorded_at", params)
+                return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving metric histograms: {e}")
+            return []
+
     def get_daily_ocr_cost(self, date: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
         """Get OCR costs by provider for a specific date (default: today)"""
         if not date:
@@ -333,4 +508,89 @@ class DatabaseManager:
                 return stats
         except sqlite3.Error as e:
             logger.error(f"Error retrieving database stats: {e}")
-            return {}
\ No newline at end of file
+            return {}
+
+    def get_job(self, job_key: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a processing job from the manifest"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(
+                    "SELECT * FROM processing_jobs WHERE job_key = ?", (job_key,)
+                )
+                row = cursor.fetchone()
+                return dict(row) if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving job {job_key}: {e}")
+            return None
+
+    @traced("db.start_job", "db")
+    def start_job(self, job_key: str, source_file: str, content_hash: str,
+                  pipeline_version: str, options: str, note_id: str) -> bool:
+        """Mark a job as in progress, creating it if needed"""
+        try:
+            with self.get_connection() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO processing_jobs
+                    (job_key, source_file, content_hash, pipeline_version, options,
+                     status, note_id, attempts, started_at)
+                    VALUES (?, ?, ?, ?, ?, 'in_progress', ?, 1, CURRENT_TIMESTAMP)
+                    ON CONFLICT(job_key) DO UPDATE SET
+                        source_file = excluded.source_file,
+                        status = 'in_progress',
+                        note_id = excluded.note_id,
+                        attempts = attempts + 1,
+                        error = NULL,
+                        started_at = CURRENT_TIMESTAMP,
+                        completed_at = NULL
+                """,
+                    (
+                        job_key,
+                        source_file,
+                        content_hash,
+                        pipeline_version,
+                        options,
+                        note_id,
+                    ),
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            logger.error(f"Error starting job {job_key}: {e}")
+            return False
+
+    @traced("db.finish_job", "db")
+    def finish_job(
+        self,
+        job_key: str,
+        status: str,
+        outputs: Optional[str] = None,
+        error: Optional[str] = None,
+        duration: Optional[float] = None,
+    ) -> bool:
+        """Record the outcome of a job ('completed' or 'failed')"""
+        try:
+            with self.get_connection() as conn:
+                conn.execute("""
+                    UPDATE processing_jobs
+                    SET status = ?, outputs = ?, error = ?, duration = ?,
+                        completed_at = CURRENT_TIMESTAMP
+                    WHERE job_key = ?
+                """, (status, outputs, error, duration, job_key))
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            logger.error(f"Error finishing job {job_key}: {e}")
+            return False
+
+    def get_job_counts(self) -> Dict[str, int]:
+        """Count manifest jobs by status"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT status, COUNT(*) FROM processing_jobs GROUP BY status
+                """)
+                return {row[0]: row[1] for row in cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error(f"Error counting jobs: {e}")
+            return {}
@@ -0,0 +1,150 @@
+"""
+Single-pass directory scanning with a persisted snapshot
+
+One ``os.scandir`` walk per poll collects (size, mtime) for every
+supported file; comparing it against the previous snapshot yields created,
+modified and deleted files. The snapshot can be saved to disk so a
+restarted watcher does not treat the whole tree as new.
+"""
+
+import json
+import os
+import tempfile
+import logging
+from collections import OrderedDict
+from collections.abc import MutableSet
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Signature = Tuple[int, int]  # size, mtime_ns
+
+SNAPSHOT_VERSION = 1
+
+
+def scan_tree(
+    root: Union[str, Path], extensions: Iterable[str]
+) -> Dict[str, Signature]:
+    """Walk ``root`` once and return {path: (size, mtime_ns)} for matching files
+
+    Extensions are matched case-insensitively. Symlinked directories are not
+    followed, and unreadable directories are skipped.
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    found: Dict[str, Signature] = {}
+    stack = [os.fspath(root)]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif (
+                            entry.name.lower().endswith(extensions) and entry.is_file()
+                        ):
+                            stat = entry.stat()
+                            found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        # Removed or unreadable between listing and stat
+                        continue
+        except OSError as e:
+            logger.debug(f"Skipping unreadable directory {directory}: {e}")
+
+    return found
+
+
+@dataclass
+class SnapshotDiff:
+    """Changes between two scans"""
+    created: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> List[str]:
+        """Files that need processing, in a stable order"""
+        return sorted(self.created + self.modified)
+
+    def __bool__(self) -> bool:
+        return bool(self.created or self.modified or self.deleted)
+
+
+class DirectorySnapshot:
+    """Last known (size, mtime) of every supported file under a directory"""
+
+    def __init__(self, entries: Optional[Dict[str, Signature]] = None):
+        self.entries: Dict[str, Signature] = dict(entries or {})
+
+    def update(self, current: Dict[str, Signature]) -> SnapshotDiff:
+        """Replace the snapshot with a new scan and report what changed"""
+        diff = SnapshotDiff()
+        previous = self.entries
+        for path, signature in current.items():
+            old = previous.get(path)
+            if old is None:
+                diff.created.append(path)
+            elif old != signature:
+                diff.modified.append(path)
+        diff.deleted = [path for path in previous if path not in current]
+        self.entries = current
+        return diff
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'DirectorySnapshot':
+        """Load a saved snapshot; a missing or unreadable file gives an empty one"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != SNAPSHOT_VERSION:
+                return cls()
+            return cls({p: tuple(sig) for p, sig in data.get("files", {}).items()})
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable watch snapshot {path}: {e}")
+            return cls()
+
+    def save(self, path: Union[str, Path]):
+        """Write the snapshot atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": SNAPSHOT_VERSION, "files": self.entries}, f,
+                          separators=(",", ":"))
+            os.replace(temp_name, path)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+
+
+class RecentPaths(MutableSet):
+    """Set of the most recently added paths, capped at ``max_entries``"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, None]" = OrderedDict()
+
+    def __contains__(self, item) -> bool:
+        return item in self._items
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item: str):
+        self._items[item] = None
+        self._items.move_to_end(item)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def discard(self, item: str):
+        self._items.pop(item, None)
@@ -0,0 +1,202 @@
+"""
+Streaming JSON and NDJSON export of processing results
+
+Records are written to disk one at a time as they are encoded, so the
+whole document never exists as a nested dict or one large string. Dataclass
+fields are read in place by the encoder rather than deep-copied with
+``dataclasses.asdict``. Raw provider responses are left out by default, or
+written to a separate gzip file when they are needed for debugging.
+
+Corpus exports stream database rows the same way, as NDJSON or CSV.
+"""
+
+import csv
+import gzip
+import json
+import logging
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from pathlib import Path
+from typing import (
+    Any, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple, Union
+)
+
+logger = logging.getLogger(__name__)
+
+RAW_OMIT = "omit"
+RAW_GZIP = "gzip"
+
+# Fields that hold raw provider payloads, by dataclass name
+RAW_FIELDS = {"OCRResult": ("raw_response",)}
+
+# Sections of an export, in document order
+SECTIONS = ("elements", "concepts", "clusters", "relationships", "structures")
+
+
+def _shallow_fields(obj: Any) -> Dict[str, Any]:
+    """Field values of a dataclass without copying them; raw payloads are skipped"""
+    skip = RAW_FIELDS.get(type(obj).__name__, ())
+    return {f.name: getattr(obj, f.name) for f in fields(obj) if f.name not in skip}
+
+
+def _default(obj: Any) -> Any:
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return _shallow_fields(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+class JsonExportWriter:
+    """Write one note's results as a compact JSON document or as NDJSON
+
+    In ``ndjson`` layout every line is one record with a ``record`` field
+    naming its kind; the first line describes the note itself.
+    """
+
+    def __init__(self, stream: TextIO, ndjson: bool = False, pretty: bool = False):
+        self.stream = stream
+        self.ndjson = ndjson
+        self.pretty = pretty and not ndjson
+        separators = (",", ": ") if self.pretty else (",", ":")
+        self._encoder = json.JSONEncoder(default=_default, ensure_ascii=False,
+                                         indent=2 if self.pretty else None,
+                                         separators=separators)
+
+    def _write_value(self, value: Any):
+        for chunk in self._encoder.iterencode(value):
+            self.stream.write(chunk)
+
+    def begin(self, source_file: str, ocr_result: Any):
+        if self.ndjson:
+            self._write_record(
+                "note", {"source_file": source_file, "ocr_result": ocr_result}
+            )
+            return
+        newline = "\n" if self.pretty else ""
+        self.stream.write("{" + newline + '"source_file":')
+        self._write_value(source_file)
+        self.stream.write("," + newline + '"ocr_result":')
+        self._write_value(ocr_result)
+
+    def section(self, name: str, items: Iterable[Any]):
+        """Stream the items of one section"""
+        if self.ndjson:
+            record = name[:-1] if name.endswith("s") else name
+            for item in items:
+                self._write_record(record, item)
+            return
+
+        newline = "\n" if self.pretty else ""
+        self.stream.write("," + newline + f'"{name}":[')
+        for index, item in enumerate(items):
+            if index:
+                self.stream.write(",")
+            self.stream.write(newline)
+            self._write_value(item)
+        self.stream.write(newline + "]")
+
+    def end(self):
+        if not self.ndjson:
+            self.stream.write(("\n" if self.pretty else "") + "}\n")
+
+    def _write_record(self, record: str, value: Any):
+        # NDJSON records carry their kind next to the record's own fields
+        payload = _shallow_fields(value) if is_dataclass(value) else dict(value)
+        self._write_value({"record": record, **payload})
+        self.stream.write("\n")
+
+
+def write_raw_responses(output_file: Path, ocr_result: Any) -> Optional[str]:
+    """Write provider payloads to a gzip file; returns its name, or None without any"""
+    raw = getattr(ocr_result, "raw_response", None)
+    if raw is None:
+        return None
+    with gzip.open(output_file, "wt", encoding="utf-8") as f:
+        json.dump(
+            {"provider": getattr(ocr_result, "provider", None), "raw_response": raw},
+            f,
+            default=str,
+            separators=(",", ":"),
+        )
+    return output_file.name
+
+
+def export_note_json(
+    output_file: Path,
+    source_file: str,
+    ocr_result: Any,
+    sections: Iterable[Tuple[str, Iterable[Any]]],
+    ndjson: bool = False,
+    pretty: bool = False,
+    raw_responses: str = RAW_OMIT,
+) -> Optional[List[str]]:
+    """Stream one note's results to ``output_file``; returns the written file names"""
+    written = []
+    try:
+        with open(output_file, "w", encoding="utf-8") as f:
+            writer = JsonExportWriter(f, ndjson=ndjson, pretty=pretty)
+            writer.begin(source_file, ocr_result)
+            for name, items in sections:
+                writer.section(name, items)
+            writer.end()
+        written.append(output_file.name)
+
+        if raw_responses == RAW_GZIP:
+            raw_file = write_raw_responses(
+                output_file.with_name(f"{output_file.stem}_raw.json.gz"), ocr_result)
+            if raw_file:
+                written.append(raw_file)
+    except Exception as e:
+        logger.error(f"Failed to export {output_file.name}: {e}")
+        return None
+
+    return written
+
+
+CORPUS_FORMATS = ("ndjson", "csv")
+
+
+def write_corpus(
+    rows: Iterable[Dict[str, Any]],
+    output_path: Union[str, Path],
+    fmt: str,
+    columns: Sequence[str],
+    compress: bool = False,
+) -> int:
+    """Write note rows to ``output_path`` one at a time; returns the number written
+
+    If writing or reading ``rows`` fails part way, the partial file is
+    removed and the error re-raised.
+    """
+    if fmt not in CORPUS_FORMATS:
+        raise ValueError(f"Unknown corpus format: {fmt}")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    opener = gzip.open if compress else open
+    count = 0
+    try:
+        with opener(output_path, "wt", encoding="utf-8", newline="") as f:
+            if fmt == "csv":
+                writer = csv.DictWriter(
+                    f, fieldnames=list(columns), extrasaction="ignore"
+                )
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+            else:
+                encoder = json.JSONEncoder(
+                    default=str, ensure_ascii=False, separators=(",", ":")
+                )
+                for row in rows:
+                    f.write(encoder.encode(row))
+                    f.write("\n")
+                    count += 1
+    except BaseException:
+        output_path.unlink(missing_ok=True)
+        raise
+    return count
@@ -5,24 +5,33 @@ File Watcher utility for monitoring directories for new Supernote files
 import logging
 import time
 from pathlib import Path
-from typing import Callable, Set, List
-from threading import Thread, Event
+from typing import Callable, Optional, Set, List, Union
+from threading import Event, Lock
 
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from .directory_scanner import DirectorySnapshot, RecentPaths, scan_tree
+from .work_queue import DebouncedWorkQueue, file_signature
+
 logger = logging.getLogger(__name__)
 
 
 class NoteFileHandler(FileSystemEventHandler):
-    """Handler for file system events targeting note files"""
+    """Handler for file system events targeting note files
+
+    The handler only filters and deduplicates events; ``callback`` should
+    return quickly (FileWatcher passes its work queue's ``submit``) so that
+    one slow file never holds up the observer thread.
+    """
     
     SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".note", ".pdf"}
     
-    def __init__(self, callback: Callable[[Path], None]):
+    def __init__(self, callback: Callable[[Path], None], max_tracked: int = 10000):
         super().__init__()
         self.callback = callback
-        self.processed_files: Set[str] = set()
+        # Only the most recent paths are remembered, so memory stays bounded
+        self.processed_files: RecentPaths = RecentPaths(max_tracked)
     
     def on_created(self, event):
         """Handle new file creation"""
@@ -38,9 +47,6 @@ class NoteFileHandler(FileSystemEventHandler):
                 self.processed_files.add(str(file_path))
                 logger.info(f"New file detected: {file_path}")
                 
-                # Give the file a moment to finish being written
-                time.sleep(1)
-                
                 try:
                     self.callback(file_path)
                 except Exception as e:
@@ -58,8 +64,6 @@ class NoteFileHandler(FileSystemEventHandler):
                 self.processed_files.add(str(dest_path))
                 logger.info(f"File moved to: {dest_path}")
                 
-                time.sleep(1)
-                
                 try:
                     self.callback(dest_path)
                 except Exception as e:
@@ -67,31 +71,99 @@ class NoteFileHandler(FileSystemEventHandler):
 
 
 class FileWatcher:
-    """File watcher for monitoring directories for new note files"""
+    """File watcher for monitoring directories for new note files
+
+    While running, detected files go through a debounced work queue: a file
+    is processed once its size and mtime stop changing, by one of
+    ``workers`` long-lived threads. Outside ``start()`` (or with
+    ``use_queue=False``) files are passed to the callback directly.
+    """
     
     def __init__(self, 
                  watch_directory: Path,
                  file_callback: Callable[[Path], None],
-                 poll_interval: int = 5):
+                 poll_interval: int = 5,
+                 workers: int = 1,
+                 debounce: float = 1.0,
+                 max_queued: int = 64,
+                 use_queue: bool = True,
+                 snapshot_path: Optional[Union[str, Path]] = None):
         self.watch_directory = Path(watch_directory)
         self.file_callback = file_callback
         self.poll_interval = poll_interval
         
+        self.work_queue: Optional[DebouncedWorkQueue] = None
+        if use_queue:
+            self.work_queue = DebouncedWorkQueue(
+                self._process, workers=workers, debounce=debounce, max_queued=max_queued
+            )
+        self._queue_running = False
+
         self.observer = Observer()
-        self.handler = NoteFileHandler(self.file_callback)
+        self.handler = NoteFileHandler(self._dispatch)
         self.stop_event = Event()
         
-        # For polling mode fallback
+        # For polling mode fallback: one scandir walk per interval, compared
+        # against a snapshot that survives restarts when snapshot_path is set.
+        # Only files the callback finished are persisted, so anything still
+        # queued at shutdown is found again after a restart.
         self.poll_thread = None
-        self.last_seen_files: Set[str] = set()
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.processed = (
+            DirectorySnapshot.load(self.snapshot_path)
+            if self.snapshot_path
+            else DirectorySnapshot()
+        )
+        self.snapshot = DirectorySnapshot(self.processed.entries)
+        self._processed_lock = Lock()
+        self._processed_dirty = False
         
         logger.info(f"FileWatcher initialized for: {self.watch_directory}")
     
+    def _dispatch(self, file_path: Path):
+        """Queue a detected file, or process it right away when no queue is running"""
+        if self._queue_running:
+            self.work_queue.submit(file_path)
+        else:
+            self._process(file_path)
+
+    def _process(self, file_path: Path):
+        """Run the callback and remember the file as processed once it succeeds"""
+        signature = file_signature(file_path)
+        self.file_callback(file_path)
+        if self.snapshot_path and signature is not None:
+            with self._processed_lock:
+                self.processed.entries[str(file_path)] = signature
+                self._processed_dirty = True
+
+    def _save_snapshot(self):
+        """Persist the processed files, if any changed since the last save"""
+        if not self.snapshot_path:
+            return
+        with self._processed_lock:
+            if self._processed_dirty:
+                self.processed.save(self.snapshot_path)
+                self._processed_dirty = False
+
+    @property
+    def last_seen_files(self) -> Set[str]:
+        """Paths seen by the most recent scan"""
+        return set(self.snapshot.entries)
+
+    @property
+    def queue_depth(self) -> int:
+        """Files detected but not yet processed"""
+        return self.work_queue.depth if self._queue_running else 0
+
     def start(self):
         """Start watching the directory"""
         if not self.watch_directory.exists():
             raise ValueError(f"Watch directory does not exist: {self.watch_directory}")
         
+        if self.work_queue:
+            self.work_queue.start()
+            self._queue_running = True
+
         try:
             # Try to use native file system events first
             self.observer.schedule(
@@ -113,50 +185,37 @@ class FileWatcher:
     
     def _start_polling(self):
         """Fallback to polling mode if file system events don't work"""
-        self.poll_thread = Thread(target=self._poll_directory, daemon=True)
-        self.poll_thread.start()
-        
         # Initialize with current files
         self._scan_for_new_files()
         
         # Keep polling until stopped
-        while not self.stop_event.is_set():
-            time.sleep(self.poll_interval)
+        while not self.stop_event.wait(self.poll_interval):
             self._scan_for_new_files()
     
-    def _poll_directory(self):
-        """Poll directory for new files"""
-        while not self.stop_event.is_set():
-            try:
-                self._scan_for_new_files()
-            except Exception as e:
-                logger.error(f"Error polling directory: {e}")
-            
-            time.sleep(self.poll_interval)
-    
     def _scan_for_new_files(self):
-        """Scan directory for new files"""
+        """Scan directory for new and modified files"""
         try:
-            current_files = set()
-            
-            for ext in NoteFileHandler.SUPPORTED_EXTENSIONS:
-                for file_path in self.watch_directory.rglob(f"*{ext}"):
-                    if file_path.is_file():
-                        current_files.add(str(file_path))
-            
-            # Find new files
-            new_files = current_files - self.last_seen_files
+            current_files = scan_tree(
+                self.watch_directory, NoteFileHandler.SUPPORTED_EXTENSIONS
+            )
+            changes = self.snapshot.update(current_files)
             
-            for file_path_str in new_files:
+            for file_path_str in changes.changed:
                 file_path = Path(file_path_str)
-                logger.info(f"New file found: {file_path}")
-                
+                kind = "Modified" if file_path_str in changes.modified else "New"
+                logger.info(f"{kind} file found: {file_path}")
+
                 try:
-                    self.file_callback(file_path)
+                    self._dispatch(file_path)
                 except Exception as e:
                     logger.error(f"Error processing {file_path}: {e}")
             
-            self.last_seen_files = current_files
+            if changes.deleted and self.snapshot_path:
+                with self._processed_lock:
+                    for file_path_str in changes.deleted:
+                        if self.processed.entries.pop(file_path_str, None) is not None:
+                            self._processed_dirty = True
+            self._save_snapshot()
             
         except Exception as e:
             logger.error(f"Error scanning directory: {e}")
@@ -173,6 +232,15 @@ class FileWatcher:
         if self.poll_thread and self.poll_thread.is_alive():
             self.poll_thread.join()
         
+        if self._queue_running:
+            self._queue_running = False
+            self.work_queue.stop()
+
+        try:
+            self._save_snapshot()
+        except OSError as e:
+            logger.error(f"Could not save watch snapshot: {e}")
+
         logger.info("File watcher stopped")
     
     def __enter__(self):
@@ -0,0 +1,222 @@
+"""
+Grayscale-native image preprocessing for OCR providers
+
+Supernote pages come out of the decoder as 8-bit grayscale, so the pipeline
+stays single-channel by default. Contrast enhancement and autocontrast are
+fused into one lookup table, which means at most one filter pass and one
+point pass per image. Results are memoized per file and options.
+"""
+
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# PNG text chunk written by the .note decoder so later stages can tell
+# clean synthetic bitmaps apart from scans and photos
+DECODER_SOURCE_KEY = "ghost_writer_source"
+DECODER_SOURCE_VALUE = "decoder"
+
+DEFAULT_CACHE_SIZE = 8
+
+
+@dataclass(frozen=True)
+class PreprocessingOptions:
+    """Preprocessing steps applied before OCR"""
+    grayscale: bool = True
+    enhance_contrast: bool = False
+    contrast_factor: float = 1.2
+    remove_noise: bool = False
+    autocontrast: bool = False
+    skip_denoise_for_decoder: bool = True
+
+    @classmethod
+    def from_config(cls, preprocessing: Dict[str, Any]) -> 'PreprocessingOptions':
+        """Build options from a provider's ``preprocessing`` config section
+
+        The legacy ``deskew`` key has always meant autocontrast and is still honoured.
+        """
+        return cls(
+            grayscale=bool(preprocessing.get('grayscale', True)),
+            enhance_contrast=bool(preprocessing.get('enhance_contrast', False)),
+            contrast_factor=float(preprocessing.get('contrast_factor', 1.2)),
+            remove_noise=bool(preprocessing.get('remove_noise', False)),
+            autocontrast=bool(
+                preprocessing.get('autocontrast', preprocessing.get('deskew', False))
+            ),
+            skip_denoise_for_decoder=bool(
+                preprocessing.get('skip_denoise_for_decoder', True)
+            ),
+        )
+
+
+def is_decoder_image(image: Image.Image) -> bool:
+    """True when the image was rendered by the .note decoder"""
+    return image.info.get(DECODER_SOURCE_KEY) == DECODER_SOURCE_VALUE
+
+
+def build_tone_lut(histogram: List[int], options: PreprocessingOptions,
+                   mean: Optional[float] = None) -> Optional[List[int]]:
+    """Fuse contrast enhancement and autocontrast into a single lookup table
+
+    ``histogram`` is a PIL histogram (256 entries per band). Contrast is
+    applied around ``mean`` like ``ImageEnhance.Contrast``; autocontrast then
+    stretches the histogram as the contrast step would have left it, so the
+    result matches running both passes back to back. Returns None when
+    neither step is enabled.
+    """
+    contrast = options.enhance_contrast and options.contrast_factor != 1.0
+    if not contrast and not options.autocontrast:
+        return None
+
+    levels = np.arange(256, dtype=np.float64)
+    bands = max(1, len(histogram) // 256)
+    table: List[int] = []
+
+    if contrast and mean is None:
+        counts = np.asarray(histogram[:256], dtype=np.float64)
+        total = counts.sum()
+        mean = float((counts * levels).sum() / total) if total else 0.0
+
+    for band in range(bands):
+        counts = np.asarray(histogram[band * 256:(band + 1) * 256], dtype=np.int64)
+
+        lut = np.arange(256, dtype=np.int64)
+        if contrast:
+            # Same float32 blend and truncation as Image.blend
+            degenerate = np.float32(int(mean + 0.5))
+            blended = degenerate + np.float32(options.contrast_factor) * (
+                levels.astype(np.float32) - degenerate
+            )
+            lut = np.clip(blended.astype(np.int64), 0, 255)
+
+        if options.autocontrast:
+            # Histogram of the band after the contrast step
+            remapped = np.bincount(lut, weights=counts, minlength=256)
+            inked = np.flatnonzero(remapped)
+            if inked.size and inked[-1] > inked[0]:
+                low, high = int(inked[0]), int(inked[-1])
+                scale = 255.0 / (high - low)
+                stretch = np.clip(
+                    (levels * scale - low * scale).astype(np.int64), 0, 255
+                )
+                lut = stretch[lut]
+
+        table.extend(lut.tolist())
+
+    return table
+
+
+def preprocess(image: Image.Image, options: PreprocessingOptions) -> Image.Image:
+    """Apply the preprocessing pipeline to an in-memory image"""
+    decoder_image = is_decoder_image(image)
+
+    if options.grayscale:
+        if image.mode != 'L':
+            image = image.convert('L')
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    # Contrast pivots around the mean of the unfiltered image
+    mean = None
+    if options.enhance_contrast:
+        luminance = image if image.mode == 'L' else image.convert('L')
+        histogram = np.asarray(luminance.histogram(), dtype=np.float64)
+        total = histogram.sum()
+        mean = float((histogram * np.arange(256)).sum() / total) if total else 0.0
+
+    # The median filter commutes with monotonic tone curves, so denoising
+    # first lets contrast and autocontrast share a single LUT pass afterwards
+    if options.remove_noise and not (
+        options.skip_denoise_for_decoder and decoder_image
+    ):
+        image = image.filter(ImageFilter.MedianFilter(3))
+
+    table = build_tone_lut(image.histogram(), options, mean)
+    if table is not None:
+        image = image.point(table)
+
+    return image
+
+
+class PreprocessingCache:
+    """Thread-safe LRU cache of preprocessed images
+
+    Entries are keyed by resolved path, modification time, file size and
+    options, so an edited file or a different config is never served stale.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[Image.Image]:
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key: tuple, image: Image.Image):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = image
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+preprocessing_cache = PreprocessingCache()
+
+
+def preprocess_image_file(image_path: Union[str, Path], options: PreprocessingOptions,
+                          use_cache: bool = True) -> Image.Image:
+    """Load and preprocess an image file, reusing earlier results when possible
+
+    A copy is returned so callers can modify the image freely.
+    """
+    path = Path(image_path)
+    key = None
+
+    if use_cache:
+        try:
+            stat = path.stat()
+            key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size, options)
+        except OSError:
+            key = None
+
+    if key is not None:
+        cached = preprocessing_cache.get(key)
+        if cached is not None:
+            return cached.copy()
+
+    with span("preprocess", "ocr", image=path.name), Image.open(path) as source:
+        source.load()
+        image = preprocess(source, options)
+
+    if key is not None:
+        preprocessing_cache.put(key, image)
+        return image.copy()
+    return image
@@ -0,0 +1,179 @@
+"""
+Job manifest for idempotent, resumable batch processing
+
+Every file is identified by its resolved path and the hash of its content,
+together with the pipeline version and the options it is processed with.
+Completed jobs are skipped on reruns, interrupted ones are resumed, and note
+IDs are derived from path and content so reprocessing replaces a note
+instead of duplicating it. A copy of a notebook under another name is a
+job and a note of its own rather than being skipped as already done.
+"""
+
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a change to the pipeline alters its output, so that
+# earlier results are no longer considered up to date
+PIPELINE_VERSION = "2.0"
+
+COMPLETED = "completed"
+IN_PROGRESS = "in_progress"
+FAILED = "failed"
+
+# Options that change what OCR produces; the export format and output
+# directory only affect which files are written
+OCR_OPTIONS = ("quality", "local_only", "regions")
+
+NOTE_NAMESPACE = uuid.UUID("6f1c2a5e-3d4b-5e8f-9a0b-1c2d3e4f5a6b")
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_content_hash(file_path: Union[str, Path]) -> str:
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _canonical(options: Dict[str, Any]) -> str:
+    return json.dumps(options, sort_keys=True, separators=(",", ":"))
+
+
+def make_job_key(content_hash: str, source_path: str, options: Dict[str, Any],
+                 pipeline_version: str = PIPELINE_VERSION) -> str:
+    """Stable key for one file processed with one set of options"""
+    payload = f"{content_hash}|{source_path}|{pipeline_version}|{_canonical(options)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_note_id(content_hash: str, source_path: str, options: Dict[str, Any],
+                 pipeline_version: str = PIPELINE_VERSION) -> str:
+    """Deterministic note ID: the same file OCR'd the same way maps to one note"""
+    ocr_options = {name: options.get(name) for name in OCR_OPTIONS}
+    payload = (
+        f"{content_hash}|{source_path}|{pipeline_version}|{_canonical(ocr_options)}"
+    )
+    return str(uuid.uuid5(NOTE_NAMESPACE, payload))
+
+
+@dataclass
+class ManifestEntry:
+    """Manifest state of one input file for the current run"""
+    file_path: Path
+    job_key: str
+    content_hash: str
+    note_id: str
+    previous_status: Optional[str] = None
+    outputs: Optional[List[str]] = None
+
+    @property
+    def resumed(self) -> bool:
+        return self.previous_status in (IN_PROGRESS, FAILED)
+
+
+class JobManifest:
+    """Decide which files need work and record what happened to them
+
+    With ``record`` off the manifest is only consulted, which suits partial
+    runs that must not mark a job as completed.
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        options: Dict[str, Any],
+        output_dir: Path,
+        force: bool = False,
+        record: bool = True,
+    ):
+        self.db_manager = db_manager
+        self.options = options
+        self.output_dir = Path(output_dir)
+        self.force = force
+        self.record = record
+        self._options_json = _canonical(options)
+
+    def plan(self, file_path: Path) -> ManifestEntry:
+        """Look up a file in the manifest"""
+        content_hash = file_content_hash(file_path)
+        source_path = str(Path(file_path).resolve())
+        job_key = make_job_key(content_hash, source_path, self.options)
+        entry = ManifestEntry(
+            file_path=file_path,
+            job_key=job_key,
+            content_hash=content_hash,
+            note_id=make_note_id(content_hash, source_path, self.options)
+        )
+
+        job = self.db_manager.get_job(job_key)
+        if job:
+            entry.previous_status = job["status"]
+            entry.outputs = json.loads(job["outputs"]) if job.get("outputs") else []
+        return entry
+
+    def is_done(self, entry: ManifestEntry) -> bool:
+        """True when the job completed before and its outputs are still there"""
+        if self.force or entry.previous_status != COMPLETED:
+            return False
+        return all((self.output_dir / name).exists() for name in entry.outputs or [])
+
+    def start(self, entry: ManifestEntry):
+        if not self.record:
+            return
+        self.db_manager.start_job(
+            entry.job_key, str(entry.file_path), entry.content_hash,
+            PIPELINE_VERSION, self._options_json, entry.note_id
+        )
+
+    def complete(
+        self, entry: ManifestEntry, outputs: Optional[List[str]], duration: float
+    ):
+        """Record success with the written file names, or failure without any"""
+        if not self.record:
+            return
+        if outputs:
+            self.db_manager.finish_job(
+                entry.job_key, COMPLETED, outputs=json.dumps(outputs), duration=duration
+            )
+        else:
+            self.fail(entry, "No output produced", duration)
+
+    def fail(self, entry: ManifestEntry, error: str, duration: float):
+        if not self.record:
+            return
+        self.db_manager.finish_job(
+            entry.job_key, FAILED, error=error, duration=duration
+        )
+
+    def resume_ocr_result(self, entry: ManifestEntry):
+        """OCR text stored by an interrupted run, so resuming does not pay for OCR again
+
+        Region OCR keeps per-region layout that is not stored with the note,
+        so those jobs are always OCR'd again.
+        """
+        if not entry.resumed or self.force or self.options.get("regions"):
+            return None
+
+        note = self.db_manager.get_note(entry.note_id)
+        if not note or not (note.get("raw_text") or "").strip():
+            return None
+
+        from .ocr_factory import create_ocr_result_without_extraction
+        logger.info(f"Resuming {entry.file_path.name} from stored OCR text")
+        return create_ocr_result_without_extraction(
+            text=note["raw_text"],
+            provider=note["ocr_provider"],
+            confidence=note["ocr_confidence"] or 0.0,
+            cost=0.0,
+            metadata={"resumed": True}
+        )
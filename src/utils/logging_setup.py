@@ -168,6 +168,16 @@ def get_logger(name: str = "ghost_writer") -> GhostWriterLogger:
     return GhostWriterLogger(name)
 
 
-# Initialize default logger
-default_logger = get_logger()
-logger = default_logger.get_logger()
\ No newline at end of file
+def __getattr__(name: str):
+    """Create the default logger on first access instead of at import
+
+    Building it opens the rotating log file, which light CLI commands and
+    library imports should not pay for.
+    """
+    if name in ("default_logger", "logger"):
+        default_logger = get_logger()
+        globals().update(
+            default_logger=default_logger, logger=default_logger.get_logger()
+        )
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,293 @@
+"""
+Memory budget for files in flight and peak-RSS accounting
+
+Decoding a notebook holds every page's bitmap at once, and rendering a page
+at OCR scale briefly needs a 2x grayscale copy, its resampled array and an
+RGBA composite on top of the PNG buffer. ``MemoryBudget`` lets the pipeline
+reserve an estimate of those bytes per file and admit new files only while
+the reservations fit, so a few large notebooks arriving together queue up
+instead of getting the worker OOM-killed.
+
+Memory is attributed to a stage or file by sampling RSS while the region
+runs and recording the highest sample as ``peak_rss_mb``. The process's
+lifetime high-water mark from ``getrusage`` only ever grows, so it is
+recorded separately as ``process_peak_rss_mb``. Concurrent regions in one
+process share its RSS, so each sees the others' allocations too.
+"""
+
+import functools
+import mmap
+import os
+import sys
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Supernote A5X pages as decoded by the parser
+PAGE_WIDTH, PAGE_HEIGHT = 1404, 1872
+RENDER_SCALE = 2
+
+# One byte per pixel, held for every page until rendered
+PAGE_BITMAP_BYTES = PAGE_WIDTH * PAGE_HEIGHT
+# Rendering one page: the 2x grayscale image, its resampled array and PIL's copy,
+# an RGBA composite of the layers and the PNG buffer being written
+PAGE_RENDER_BYTES = (
+    3 * PAGE_BITMAP_BYTES * RENDER_SCALE**2 + 4 * PAGE_BITMAP_BYTES + PAGE_BITMAP_BYTES
+)
+
+_MAIN_LAYER_TAG = b"<LAYERNAME:MAINLAYER>"
+
+# Seconds between RSS samples while a measured region is running
+SAMPLE_INTERVAL = 0.005
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (0 if unknown)"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+def peak_rss_bytes() -> int:
+    """Highest resident set size this process has reached (0 if unknown)"""
+    try:
+        import resource
+    except ImportError:
+        return rss_bytes()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def count_note_pages(file_path: Union[str, Path]) -> int:
+    """Number of main layers (pages) in a .note file, at least 1"""
+    try:
+        with (
+            open(file_path, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+        ):
+            pages, pos = 0, data.find(_MAIN_LAYER_TAG)
+            while pos != -1:
+                pages += 1
+                pos = data.find(_MAIN_LAYER_TAG, pos + len(_MAIN_LAYER_TAG))
+            return max(1, pages)
+    except (OSError, ValueError):
+        return 1
+
+
+def estimate_image_bytes(image_path: Union[str, Path]) -> int:
+    """Decoded RGBA size of an image plus its encoded bytes; reads only the header"""
+    image_path = Path(image_path)
+    try:
+        from PIL import Image
+        with Image.open(image_path) as image:
+            width, height = image.size
+        return width * height * 4 + image_path.stat().st_size
+    except Exception:
+        return PAGE_BITMAP_BYTES * RENDER_SCALE ** 2 * 4
+
+
+def estimate_file_bytes(file_path: Union[str, Path]) -> int:
+    """Approximate peak bytes needed to decode and OCR one input file"""
+    file_path = Path(file_path)
+    if file_path.suffix.lower() == ".note":
+        return count_note_pages(file_path) * PAGE_BITMAP_BYTES + PAGE_RENDER_BYTES
+    return estimate_image_bytes(file_path)
+
+
+def estimate_pages_bytes(image_paths: Iterable[Union[str, Path]]) -> int:
+    """Bytes OCR holds for rendered pages: the largest decoded page plus each PNG"""
+    largest = encoded = 0
+    for path in image_paths:
+        largest = max(largest, estimate_image_bytes(path))
+        try:
+            encoded += Path(path).stat().st_size
+        except OSError:
+            pass
+    return largest + encoded
+
+
+class MemoryBudget:
+    """Byte reservations for items in flight, bounded by ``limit`` bytes
+
+    ``acquire`` blocks until the reservation fits. An item larger than the
+    whole budget is still admitted once nothing else is in flight, so an
+    oversized notebook runs alone instead of stalling the pipeline.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = int(limit)
+        self.in_use = 0
+        self.peak = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, nbytes: int, cancel: Optional[threading.Event] = None) -> int:
+        """Reserve ``nbytes``, or return 0 unreserved once ``cancel`` is set"""
+        nbytes = max(0, int(nbytes))
+        with self._condition:
+            if nbytes > self.limit:
+                logger.warning(
+                    f"Item needs ~{nbytes / MB:.0f}MB, over the "
+                    f"{self.limit / MB:.0f}MB memory budget; running it alone"
+                )
+            while self.in_use and self.in_use + nbytes > self.limit:
+                if cancel is not None and cancel.is_set():
+                    return 0
+                self._condition.wait()
+            self._reserve(nbytes)
+        return nbytes
+
+    def wake(self):
+        """Wake blocked ``acquire`` calls so they can notice cancellation"""
+        with self._condition:
+            self._condition.notify_all()
+
+    def resize(self, reserved: int, nbytes: int) -> int:
+        """Change a reservation without blocking; shrinking admits waiting items"""
+        nbytes = max(0, int(nbytes))
+        with self._condition:
+            self._reserve(nbytes - reserved)
+            if nbytes < reserved:
+                self._condition.notify_all()
+        return nbytes
+
+    def release(self, reserved: int):
+        self.resize(reserved, 0)
+
+    @contextmanager
+    def reserve(self, nbytes: int) -> Iterator[int]:
+        reserved = self.acquire(nbytes)
+        try:
+            yield reserved
+        finally:
+            self.release(reserved)
+
+    def _reserve(self, delta: int):
+        self.in_use += delta
+        self.peak = max(self.peak, self.in_use)
+
+
+class RssRegion:
+    """Highest RSS seen between entering and leaving a measured region"""
+
+    def __init__(self, peak: int = 0):
+        self.peak = peak
+
+    def sample(self, rss: int):
+        if rss > self.peak:
+            self.peak = rss
+
+
+class _RssSampler:
+    """One background thread sampling RSS for every open region of this process"""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._regions: List[RssRegion] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self) -> RssRegion:
+        if self._pid != os.getpid():
+            # Forked child: the parent's thread and regions did not come along
+            self._reset()
+        region = RssRegion(rss_bytes())
+        with self._lock:
+            self._regions.append(region)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="rss-sampler", daemon=True
+                )
+                self._thread.start()
+        return region
+
+    def close(self, region: RssRegion):
+        region.sample(rss_bytes())
+        with self._lock:
+            if region in self._regions:
+                self._regions.remove(region)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._regions or self._pid != os.getpid():
+                    self._thread = None
+                    return
+                regions = list(self._regions)
+            rss = rss_bytes()
+            for region in regions:
+                region.sample(rss)
+            time.sleep(SAMPLE_INTERVAL)
+
+
+_sampler = _RssSampler()
+
+
+@contextmanager
+def rss_region(sample: bool = True) -> Iterator[RssRegion]:
+    """Track the highest RSS while the block runs, in ``region.peak``
+
+    With ``sample`` off nothing is polled and the peak stays 0.
+    """
+    if not sample:
+        yield RssRegion()
+        return
+    region = _sampler.open()
+    try:
+        yield region
+    finally:
+        _sampler.close(region)
+
+
+def from_config(memory_config: Optional[dict]) -> Optional[MemoryBudget]:
+    """Budget from ``processing.memory``; None when no limit is configured"""
+    budget_mb = float((memory_config or {}).get("budget_mb") or 0)
+    return MemoryBudget(int(budget_mb * MB)) if budget_mb > 0 else None
+
+
+@contextmanager
+def measured(label: str) -> Iterator[None]:
+    """Record the block's peak RSS as ``peak_rss_mb``
+
+    The process's peak is recorded as ``process_peak_rss_mb``. Nothing is
+    sampled unless metrics are being recorded.
+    """
+    if not metrics.is_enabled():
+        yield
+        return
+    with rss_region() as region:
+        try:
+            yield
+        finally:
+            metrics.observe("peak_rss_mb", region.peak / MB, stage=label)
+            metrics.observe("process_peak_rss_mb", peak_rss_bytes() / MB)
+
+
+def measured_stage(stage: str):
+    """Decorator form of ``measured`` for stage functions"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with measured(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,308 @@
+"""
+Fixed-memory latency and throughput histograms persisted to SQLite
+
+Values are counted in log-linear buckets in the style of HDR histograms:
+each power of two is split into ``SUB_BUCKETS`` equal slices, so any
+percentile is reported within about 3% of the true value while a histogram
+never holds more than a few hundred counters, however many values it sees.
+Histograms with the same buckets add up exactly, which lets the ``stats``
+command merge rows written by different processes and runs.
+
+Every process, including pipeline worker processes, keeps its own registry
+and periodically appends its histograms to the ``metric_histograms`` table.
+"""
+
+import functools
+import json
+import math
+import os
+import threading
+import time
+import logging
+from contextlib import nullcontext
+from pathlib import PurePath
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DB_ENV = "GHOST_WRITER_METRICS_DB"
+
+SUB_BUCKETS = 16
+
+# Values at or below zero share one bucket
+_ZERO_BUCKET = -(2 ** 31)
+
+_NULL_TIMER = nullcontext()
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def bucket_index(value: float) -> int:
+    if value <= 0:
+        return _ZERO_BUCKET
+    # value = mantissa * 2**exponent, 0.5 <= mantissa < 1
+    mantissa, exponent = math.frexp(value)
+    return exponent * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS)
+
+
+def bucket_bounds(index: int) -> Tuple[float, float]:
+    if index == _ZERO_BUCKET:
+        return 0.0, 0.0
+    exponent, sub = divmod(index, SUB_BUCKETS)
+    low = math.ldexp(0.5 + sub / (2 * SUB_BUCKETS), exponent)
+    high = math.ldexp(0.5 + (sub + 1) / (2 * SUB_BUCKETS), exponent)
+    return low, high
+
+
+class Histogram:
+    """Log-linear bucketed histogram with exact count, sum, min and max"""
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, value: float, count: int = 1):
+        index = bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "Histogram"):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Value below which ``percent`` of the recorded values fall"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100.0))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return min(max((low + high) / 2, self.min), self.max)
+        return self.max
+
+    def to_row(self) -> Tuple[int, float, Optional[float], Optional[float], str]:
+        buckets = json.dumps(
+            {str(k): v for k, v in self.buckets.items()}, separators=(",", ":")
+        )
+        return self.count, self.total, self.min, self.max, buckets
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Histogram":
+        histogram = cls()
+        histogram.buckets = {int(k): v for k, v in json.loads(row["buckets"]).items()}
+        histogram.count = row["count"]
+        histogram.total = row["total"]
+        histogram.min = row["min_value"]
+        histogram.max = row["max_value"]
+        return histogram
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(
+            self.name, (time.perf_counter() - self.start) * 1000.0, **self.labels
+        )
+        return False
+
+
+class MetricsRegistry:
+    """Histograms keyed by metric name and labels, flushed to the database
+
+    Recorded values accumulate in memory and are written out (then reset)
+    every ``flush_interval`` seconds and on ``flush()``.
+    """
+
+    def __init__(
+        self,
+        db_manager=None,
+        db_path: Optional[str] = None,
+        flush_interval: float = 60.0,
+    ):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._db = db_manager
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.record(value)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def timer(self, name: str, **labels) -> _Timer:
+        """Context manager recording its duration in milliseconds"""
+        return _Timer(self, name, labels)
+
+    def snapshot(self, reset: bool = False) -> Dict[Tuple[str, LabelKey], Histogram]:
+        with self._lock:
+            histograms = self._histograms
+            if reset:
+                self._histograms = {}
+                self._last_flush = time.monotonic()
+            else:
+                histograms = dict(histograms)
+        return histograms
+
+    def flush(self) -> bool:
+        """Append the histograms recorded since the last flush to the database"""
+        histograms = self.snapshot(reset=True)
+        if not histograms or (self._db is None and not self.db_path):
+            return True
+        rows = [(name, json.dumps(dict(labels), sort_keys=True), *histogram.to_row())
+                for (name, labels), histogram in histograms.items()]
+        try:
+            if self._db is None:
+                from .database import DatabaseManager
+                self._db = DatabaseManager(self.db_path)
+            return self._db.insert_metric_histograms(rows)
+        except Exception as e:
+            logger.warning(f"Could not persist metrics: {e}")
+            return False
+
+    def _after_fork(self):
+        # Values recorded by the parent stay with the parent
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._last_flush = time.monotonic()
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def configure(db_manager, flush_interval: float = 60.0) -> MetricsRegistry:
+    """Start recording metrics to ``db_manager`` here and in worker processes"""
+    from multiprocessing import util
+    global _registry
+    db_path = getattr(db_manager, "db_path", None)
+    # Only real paths: spawned workers open whatever the variable names
+    if isinstance(db_path, (str, PurePath)):
+        os.environ[DB_ENV] = str(db_path)
+    _registry = MetricsRegistry(db_manager, flush_interval=flush_interval)
+    util.register_after_fork(_registry, _adopt_in_worker)
+    return _registry
+
+
+def is_enabled() -> bool:
+    return _registry is not None
+
+
+def shutdown() -> bool:
+    """Flush and stop recording"""
+    global _registry
+    registry, _registry = _registry, None
+    os.environ.pop(DB_ENV, None)
+    return registry.flush() if registry else True
+
+
+def observe(name: str, value: float, **labels):
+    registry = _registry
+    if registry is not None:
+        registry.observe(name, value, **labels)
+
+
+def timer(name: str, **labels):
+    """Record the duration of a block in milliseconds; a no-op unless configured"""
+    registry = _registry
+    if registry is None:
+        return _NULL_TIMER
+    return registry.timer(name, **labels)
+
+
+def timed(name: str, **labels):
+    """Decorator form of ``timer`` for whole functions"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            registry = _registry
+            if registry is None:
+                return func(*args, **kwargs)
+            with registry.timer(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summarize(rows: Iterable[Dict[str, Any]],
+              percentiles: Tuple[float, ...] = (50, 95, 99)) -> List[Dict[str, Any]]:
+    """Merge stored histogram rows per metric and labels and compute percentiles"""
+    merged: Dict[Tuple[str, str], Histogram] = {}
+    for row in rows:
+        key = (row["metric"], row["labels"])
+        histogram = merged.get(key)
+        if histogram is None:
+            histogram = merged[key] = Histogram()
+        histogram.merge(Histogram.from_row(row))
+
+    summary = []
+    for (metric, labels), histogram in sorted(merged.items()):
+        entry = {
+            "metric": metric,
+            "labels": json.loads(labels),
+            "count": histogram.count,
+            "mean": histogram.mean,
+            "max": histogram.max,
+        }
+        for percent in percentiles:
+            entry[f"p{percent:g}"] = histogram.percentile(percent)
+        summary.append(entry)
+    return summary
+
+
+def _flush_on_exit(registry: MetricsRegistry):
+    from multiprocessing import util
+    util.Finalize(registry, registry.flush, exitpriority=10)
+
+
+def _adopt_in_worker(registry: MetricsRegistry):
+    # Forked pipeline workers drop the parent's values and flush their own on exit
+    registry._after_fork()
+    _flush_on_exit(registry)
+
+
+# Worker processes started without fork pick metrics up from the environment
+if os.environ.get(DB_ENV):
+    _registry = MetricsRegistry(db_path=os.environ[DB_ENV])
+    _flush_on_exit(_registry)
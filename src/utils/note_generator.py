@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Synthetic Supernote .note notebooks for scale and stress testing
+
+Writes ``noteSN_FILE_VER_`` files laid out like device files: a header
+block, size-prefixed RATTA_RLE layer bitmaps, per-layer and per-page
+metadata tags and a footer. Every page is drawn from a seed derived from
+the notebook seed and the page number, so any page's bitmap can be
+regenerated to check a decoder against.
+
+    python -m src.utils.note_generator out.note --pages 100 --layers 2 \\
+        --ink 0.03 --gray 0.2
+"""
+
+import argparse
+import hashlib
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+PAGE_WIDTH, PAGE_HEIGHT = 1404, 1872
+SIGNATURE = b"noteSN_FILE_VER_20230015"
+
+# Gray level -> RATTA_RLE color code (0x66, a second black, is never written)
+COLOR_CODES = {0: 0x61, 255: 0x62, 32: 0x63, 96: 0x64, 160: 0x65, 48: 0x67, 192: 0x68}
+GRAY_LEVELS = (32, 48, 96, 160, 192)
+
+# Layers in the order they are added as ``layers`` grows
+LAYER_NAMES = ("MAINLAYER", "BGLAYER", "LAYER1", "LAYER2", "LAYER3")
+
+# The parser reads layer sizes at these fixed offsets before falling back to
+# the metadata tags; they are kept invalid so every layer comes from its tags
+_PROBED_OFFSETS = (440, 768, 847208)
+_HEADER_END = 1024
+
+_LINE_SPACING = 48
+_MARGIN = 60
+
+
+@dataclass(frozen=True)
+class NotebookSpec:
+    """Shape of a synthetic notebook
+
+    ``ink_density`` is the fraction of main-layer pixels drawn in ink,
+    ``gray_mix`` the share of strokes drawn in a gray level instead of black,
+    ``special_lengths`` how often long runs use the 0xFF and 0x89 length
+    forms instead of plain 64-pixel multiples, and ``blank_pages`` the share
+    of pages left without ink.
+    """
+    pages: int = 1
+    layers: int = 1
+    ink_density: float = 0.02
+    gray_mix: float = 0.0
+    special_lengths: float = 1.0
+    blank_pages: float = 0.0
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.pages < 1:
+            raise ValueError("pages must be at least 1")
+        if not 1 <= self.layers <= len(LAYER_NAMES):
+            raise ValueError(f"layers must be between 1 and {len(LAYER_NAMES)}")
+        for name in ("ink_density", "gray_mix", "special_lengths", "blank_pages"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1")
+
+
+@dataclass
+class NotebookInfo:
+    """What was written: the file, its spec and a digest of each page's main layer"""
+    path: Path
+    spec: NotebookSpec
+    size: int
+    page_digests: List[str] = field(default_factory=list)
+
+
+def encode_rle(bitmap: np.ndarray, special_lengths: float = 1.0,
+               rng: Optional[np.random.Generator] = None) -> bytes:
+    """Encode a grayscale bitmap as RATTA_RLE (color, length) pairs
+
+    Pixels must use the gray levels in ``COLOR_CODES``. Runs continue across
+    row ends, as on the device.
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    flat = np.ascontiguousarray(bitmap, dtype=np.uint8).ravel()
+    if flat.size == 0:
+        return b""
+    starts = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1))
+    lengths = np.diff(np.append(starts, flat.size))
+    values = flat[starts]
+
+    unknown = set(np.unique(values).tolist()) - COLOR_CODES.keys()
+    if unknown:
+        raise ValueError(
+            f"Gray levels without a RATTA_RLE color code: {sorted(unknown)}"
+        )
+
+    out = bytearray()
+    for value, length in zip(values.tolist(), lengths.tolist()):
+        _encode_run(out, COLOR_CODES[value], length, special_lengths, rng)
+    return bytes(out)
+
+
+def _encode_run(out: bytearray, code: int, pixels: int, special_lengths: float,
+                rng: np.random.Generator) -> None:
+    """Append the pairs for one run
+
+    A high-bit length byte is read as ``x * 256`` when the next pair's
+    length byte is 0x89, so 0x89 is only written after a byte where that
+    cannot happen (or deliberately, as the extended form).
+    """
+    while pixels:
+        follows_high = bool(out) and 0x80 <= out[-1] < 0xFF
+
+        if pixels >= 16384 and rng.random() < special_lengths:
+            out += bytes((code, 0xFF))
+            pixels -= 16384
+            continue
+
+        if pixels >= 256 + 640 and rng.random() < special_lengths:
+            x = min((pixels - 640) // 256, 0x7E)
+            if x == 9 and follows_high:
+                x = 8
+            # (x * 256) from the first pair, 640 from the 0x89 pair itself
+            out += bytes((code, 0x80 | x, code, 0x89))
+            pixels -= x * 256 + 640
+            continue
+
+        if pixels >= 64:
+            blocks = min(pixels // 64, 127)  # 0xFF (128 blocks) is the 16384 marker
+            if blocks == 10 and follows_high:
+                blocks = 9  # 0x89
+            out += bytes((code, 0x80 | (blocks - 1)))
+            pixels -= blocks * 64
+        elif pixels >= 17:
+            out += bytes((code, pixels - 1))
+            pixels = 0
+        elif pixels == 1:
+            out += bytes((code, 0))
+            pixels = 0
+        else:
+            # Bytes below 16 mean twice their value; odd runs end with a 1-pixel pair
+            even = pixels - pixels % 2
+            out += bytes((code, even // 2))
+            pixels -= even
+
+
+def page_layers(spec: NotebookSpec, page: int) -> Dict[str, np.ndarray]:
+    """The bitmaps of one page (1-based), by layer name"""
+    rng = np.random.default_rng([spec.seed, page])
+    density = spec.ink_density
+    if spec.blank_pages and rng.random() < spec.blank_pages:
+        density = 0.0
+    layers = {"MAINLAYER": _draw_strokes(rng, density, spec.gray_mix)}
+    for name in LAYER_NAMES[1:spec.layers]:
+        if name == "BGLAYER":
+            layers[name] = _ruled_background()
+        else:
+            layers[name] = _draw_strokes(rng, density / 4, spec.gray_mix)
+    return layers
+
+
+def _draw_strokes(
+    rng: np.random.Generator, density: float, gray_mix: float
+) -> np.ndarray:
+    """Handwriting-like strokes along text lines until ``density`` is reached"""
+    bitmap = np.full((PAGE_HEIGHT, PAGE_WIDTH), 255, dtype=np.uint8)
+    target = int(density * PAGE_WIDTH * PAGE_HEIGHT)
+    inked = 0
+    lines = np.arange(_MARGIN, PAGE_HEIGHT - _MARGIN, _LINE_SPACING)
+    thickness_max = max(3, int(density * 60))  # Dense pages get shading-like blocks
+
+    while inked < target:
+        top = int(rng.choice(lines)) + int(rng.integers(-6, 7))
+        left = int(rng.integers(_MARGIN // 2, PAGE_WIDTH - 120))
+        width = int(rng.integers(8, 240))
+        height = int(rng.integers(2, thickness_max + 1))
+        level = int(rng.choice(GRAY_LEVELS)) if rng.random() < gray_mix else 0
+        bitmap[top:top + height, left:left + width] = level
+        inked += min(width, PAGE_WIDTH - left) * height
+    return bitmap
+
+
+def _ruled_background() -> np.ndarray:
+    bitmap = np.full((PAGE_HEIGHT, PAGE_WIDTH), 255, dtype=np.uint8)
+    rules = slice(_MARGIN + _LINE_SPACING, PAGE_HEIGHT - _MARGIN, _LINE_SPACING)
+    bitmap[rules, _MARGIN:PAGE_WIDTH - _MARGIN] = 192
+    return bitmap
+
+
+class _NoteWriter:
+    """Size-prefixed blocks, kept clear of the offsets the parser probes"""
+
+    def __init__(self):
+        self.data = bytearray(SIGNATURE)
+
+    def block(self, payload: bytes) -> int:
+        probed = _PROBED_OFFSETS[-1]
+        if probed - 3 <= len(self.data) < probed + 4:
+            self.data += b"\xff" * (probed + 4 - len(self.data))
+        address = len(self.data)
+        self.data += len(payload).to_bytes(4, "little") + payload
+        return address
+
+    def pad_header(self) -> None:
+        self.data += b"\xff" * (_HEADER_END - len(self.data))
+
+
+def _tags(**values) -> bytes:
+    return "".join(f"<{key}:{value}>" for key, value in values.items()).encode("ascii")
+
+
+def build_notebook(spec: NotebookSpec) -> Tuple[bytes, List[str]]:
+    """The notebook file contents and the digest of each page's main layer"""
+    writer = _NoteWriter()
+    writer.block(_tags(
+        MODULE_LABEL="SNFILE_FEATURE", FILE_TYPE="NOTE", APPLY_EQUIPMENT="N5",
+        FILE_ID=f"F{spec.seed:020d}", FILE_PARSE_TYPE=0, FILE_RECOGN_TYPE=0,
+    ))
+    writer.pad_header()
+
+    encoder_rng = np.random.default_rng([spec.seed, 0])
+    page_addresses, digests = [], []
+    for page in range(1, spec.pages + 1):
+        layers = page_layers(spec, page)
+        digests.append(hashlib.sha1(layers["MAINLAYER"].tobytes()).hexdigest())
+
+        layer_addresses = {}
+        for name, bitmap in layers.items():
+            rle = encode_rle(bitmap, spec.special_lengths, encoder_rng)
+            bitmap_address = writer.block(rle)
+            layer_addresses[name] = writer.block(_tags(
+                LAYERTYPE="NOTE", LAYERPROTOCOL="RATTA_RLE", LAYERNAME=name,
+                LAYERPATH=0, LAYERBITMAP=bitmap_address, LAYERVECTORGRAPH=0,
+                LAYERRECOGN=0,
+            ))
+
+        page_tags = _tags(
+            PAGESTYLE="style_white", PAGEID=f"P{spec.seed:08d}{page:06d}",
+            ORIENTATION=1000, LAYERSEQ=",".join(layers),
+        )
+        page_addresses.append(writer.block(page_tags + _tags(**layer_addresses)))
+
+    pages = {f"PAGE{page}": address for page, address in enumerate(page_addresses, 1)}
+    footer = writer.block(_tags(FILE_FEATURE=24, **pages))
+    writer.data += b"tail" + footer.to_bytes(4, "little")
+    return bytes(writer.data), digests
+
+
+def generate_notebook(path: Path, spec: NotebookSpec = NotebookSpec()) -> NotebookInfo:
+    """Write a synthetic notebook to ``path``"""
+    path = Path(path)
+    data, digests = build_notebook(spec)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return NotebookInfo(path=path, spec=spec, size=len(data), page_digests=digests)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic Supernote .note notebook")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--layers", type=int, default=1,
+                        help=f"1-{len(LAYER_NAMES)}: {', '.join(LAYER_NAMES)}")
+    parser.add_argument("--ink", type=float, default=0.02,
+                        help="Fraction of main-layer pixels inked")
+    parser.add_argument("--gray", type=float, default=0.0,
+                        help="Share of strokes drawn in gray")
+    parser.add_argument("--special", type=float, default=1.0,
+                        help="How often long runs use 0xFF/0x89 lengths")
+    parser.add_argument("--blank", type=float, default=0.0,
+                        help="Share of pages left without ink")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    spec = NotebookSpec(pages=args.pages, layers=args.layers, ink_density=args.ink,
+                        gray_mix=args.gray, special_lengths=args.special,
+                        blank_pages=args.blank, seed=args.seed)
+    info = generate_notebook(args.output, spec)
+    print(f"Wrote {info.path}: {spec.pages} pages, {info.size:,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 """OCR provider factory with singleton/caching pattern."""
 
 import logging
+import threading
 from typing import Dict, Optional, Any
 from .ocr_providers import HybridOCR, OCRResult
 from .exceptions import OCRConfigurationError, OCRError
@@ -12,6 +13,7 @@ class OCRProviderFactory:
     """Factory for creating and caching OCR provider instances."""
     
     _instances: Dict[str, HybridOCR] = {}
+    _lock = threading.Lock()
     
     @classmethod
     def get_provider(cls, provider_config: Optional[Dict[str, Any]] = None) -> HybridOCR:
@@ -34,19 +36,28 @@ class OCRProviderFactory:
         # Use a simplified hash for caching (just the keys that matter)
         cache_key = cls._create_cache_key(provider_config)
         
-        if cache_key not in cls._instances:
-            try:
-                logger.debug(f"Creating new OCR provider instance for key: {cache_key}")
-                cls._instances[cache_key] = HybridOCR(provider_config=provider_config)
-            except Exception as e:
-                raise OCRConfigurationError("ocr.providers", f"Failed to create OCR provider: {e}")
-        
-        return cls._instances[cache_key]
+        # Pipeline workers ask for providers concurrently; only one builds each instance
+        with cls._lock:
+            if cache_key not in cls._instances:
+                try:
+                    logger.debug(
+                        f"Creating new OCR provider instance for key: {cache_key}"
+                    )
+                    cls._instances[cache_key] = HybridOCR(
+                        provider_config=provider_config
+                    )
+                except Exception as e:
+                    raise OCRConfigurationError(
+                        "ocr.providers", f"Failed to create OCR provider: {e}"
+                    )
+
+            return cls._instances[cache_key]
     
     @classmethod
     def clear_cache(cls) -> None:
         """Clear all cached OCR provider instances."""
-        cls._instances.clear()
+        with cls._lock:
+            cls._instances.clear()
         logger.debug("OCR provider cache cleared")
     
     @classmethod
@@ -64,16 +75,23 @@ class OCRProviderFactory:
             if "gpt4_vision" in providers:
                 key_parts.append(f"gpt4:{providers['gpt4_vision'].get('confidence_threshold', 85)}")
         
-        if "hybrid" in config:
-            hybrid = config["hybrid"]
+        hybrid = HybridOCR.hybrid_config(config)
+        if hybrid:
             key_parts.append(f"mode:{hybrid.get('quality_mode', 'balanced')}")
             key_parts.append(f"limit:{hybrid.get('cost_limit_per_day', 5.0)}")
+            refinement = hybrid.get('refinement', {})
+            key_parts.append(f"refine:{refinement.get('enabled', False)}")
         
         return "|".join(key_parts) if key_parts else "default"
 
 
-def create_ocr_result_without_extraction(text: str, provider: str, confidence: float, 
-                                       cost: float = 0.0) -> OCRResult:
+def create_ocr_result_without_extraction(
+    text: str,
+    provider: str,
+    confidence: float,
+    cost: float = 0.0,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> OCRResult:
     """
     Create an OCRResult instance without performing actual OCR extraction.
     Useful for combining multi-page results.
@@ -83,6 +101,7 @@ def create_ocr_result_without_extraction(text: str, provider: str, confidence: f
         provider: Name of the OCR provider
         confidence: OCR confidence score (0.0 to 1.0)
         cost: Processing cost in dollars
+        metadata: Optional metadata carried over from the page results
         
     Returns:
         OCRResult instance
@@ -94,5 +113,6 @@ def create_ocr_result_without_extraction(text: str, provider: str, confidence: f
         processing_time=0.0,  # No processing time for combined results
         cost=cost,
         bounding_boxes=[],  # Empty for combined results
-        word_confidences=[]  # Empty for combined results
-    )
\ No newline at end of file
+        word_confidences=[],  # Empty for combined results
+        metadata=metadata or {}
+    )
@@ -3,22 +3,30 @@ OCR Provider implementations for Ghost Writer with premium accuracy focus
 """
 
 import os
+import math
 import time
+import random
+import re
 import base64
+import threading
+import importlib.util
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Sequence, Tuple, Union, cast
 from pathlib import Path
 import logging
 
 import numpy as np
-from PIL import Image, ImageEnhance, ImageOps, ImageFilter
-import pytesseract
+from PIL import Image
 
 from .config import config
 from .logging_setup import log_calls
 from .debug_helpers import debug_decorator
 from .database import DatabaseManager
+from .exceptions import OCRProviderError
+from .image_preprocessing import PreprocessingOptions, preprocess_image_file
+from .tracing import span
+from . import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -56,31 +64,61 @@ class OCRProvider(ABC):
         """Extract text from image"""
         pass
     
+    @classmethod
+    def validate_config(cls, provider_config: Dict[str, Any]) -> List[str]:
+        """Check a provider config without importing SDKs or creating clients
+
+        Returns a list of problems; an empty list means the provider can be
+        registered and constructed on first use.
+        """
+        if not isinstance(provider_config, dict):
+            return [f"expected a mapping, got {type(provider_config).__name__}"]
+
+        problems = []
+        threshold = provider_config.get('confidence_threshold', 0)
+        if not isinstance(threshold, (int, float)) or not 0 <= threshold <= 100:
+            problems.append(
+                f"confidence_threshold must be between 0 and 100, got {threshold!r}"
+            )
+        cost = provider_config.get('cost_per_image', 0.0)
+        if not isinstance(cost, (int, float)) or cost < 0:
+            problems.append(
+                f"cost_per_image must be a non-negative number, got {cost!r}"
+            )
+        return problems
+
+    def extract_text_batch(
+        self, image_paths: Sequence[Union[str, Path]]
+    ) -> List[OCRResult]:
+        """Extract text from several images, one result per image in order
+
+        Providers with a native batch API override this; the default simply
+        processes the images one at a time.
+        """
+        return [self.extract_text(image_path) for image_path in image_paths]
+
     def preprocess_image(self, image_path: Union[str, Path]) -> Image.Image:
-        """Common image preprocessing pipeline"""
-        image: Image.Image = Image.open(image_path)
-        
-        # Convert to RGB if needed
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Apply preprocessing based on config
-        if self.config.get('preprocessing', {}).get('enhance_contrast', False):
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(1.2)
-        
-        if self.config.get('preprocessing', {}).get('remove_noise', False):
-            image = image.filter(ImageFilter.MedianFilter(3))
-        
-        if self.config.get('preprocessing', {}).get('deskew', False):
-            # Simple deskew - could be enhanced with more sophisticated algorithms
-            image = ImageOps.autocontrast(image)
+        """Common image preprocessing pipeline
         
-        return image
+        Images stay single-channel unless ``preprocessing.grayscale`` is false;
+        see ``image_preprocessing`` for the fused steps and memoization.
+        """
+        preprocessing = self.config.get('preprocessing', {})
+        options = PreprocessingOptions.from_config(preprocessing)
+        return preprocess_image_file(
+            image_path, options, use_cache=preprocessing.get('cache', True)
+        )
     
+    @classmethod
+    def estimate_cost(
+        cls, provider_config: Dict[str, Any], image_path: Union[str, Path]
+    ) -> float:
+        """Estimate the cost of one image from the config alone, without a client"""
+        return provider_config.get('cost_per_image', 0.0)
+
     def get_cost_estimate(self, image_path: Union[str, Path]) -> float:
         """Estimate cost for processing this image"""
-        return self.config.get('cost_per_image', 0.0)
+        return self.estimate_cost(self.config, image_path)
     
     def validate_result(self, result: OCRResult) -> bool:
         """Validate OCR result quality"""
@@ -98,6 +136,8 @@ class TesseractOCR(OCRProvider):
     @log_calls("ghost_writer")
     @debug_decorator(log_args=False, profile=True)
     def extract_text(self, image_path: Union[str, Path]) -> OCRResult:
+        import pytesseract
+
         start_time = time.time()
         
         try:
@@ -176,6 +216,20 @@ class TesseractOCR(OCRProvider):
 class GoogleVisionOCR(OCRProvider):
     """Google Cloud Vision API OCR provider"""
     
+    # Vision's synchronous batch_annotate_images accepts at most 16 images
+    MAX_BATCH_SIZE = 16
+    SUPPORTED_FEATURES = ('TEXT_DETECTION', 'DOCUMENT_TEXT_DETECTION')
+
+    @classmethod
+    def validate_config(cls, provider_config: Dict[str, Any]) -> List[str]:
+        problems = super().validate_config(provider_config)
+        if problems:
+            return problems
+        for feature in provider_config.get('features', ['DOCUMENT_TEXT_DETECTION']):
+            if feature not in cls.SUPPORTED_FEATURES:
+                problems.append(f"unsupported feature {feature!r}")
+        return problems
+
     def __init__(self, provider_config: Dict[str, Any]):
         super().__init__(provider_config)
         self.client = None
@@ -201,6 +255,107 @@ class GoogleVisionOCR(OCRProvider):
             logger.warning(f"Google Vision client not available: {e}")
             self.client = None
     
+    def _encode_image(self, image_path: Union[str, Path]) -> bytes:
+        """Preprocess an image and encode it as PNG bytes for the API"""
+        import io
+
+        image = self.preprocess_image(image_path)
+        img_byte_arr = io.BytesIO()
+        image.save(img_byte_arr, format='PNG')
+        return img_byte_arr.getvalue()
+
+    def _build_request(self, content: bytes):
+        """Build an AnnotateImageRequest for pre-encoded image content"""
+        from google.cloud import vision
+
+        features = self.config.get('features', ['DOCUMENT_TEXT_DETECTION'])
+        feature_objects = [
+            vision.Feature(type_=getattr(vision.Feature.Type, feature))
+            for feature in features
+        ]
+
+        return vision.AnnotateImageRequest(
+            image=vision.Image(content=content),
+            features=feature_objects
+        )
+
+    def _parse_response(self, response, image_path: Union[str, Path],
+                        processing_time: float,
+                        extra_metadata: Optional[Dict[str, Any]] = None) -> OCRResult:
+        """Convert a single AnnotateImageResponse into an OCRResult"""
+
+        # Handle errors
+        if response.error.message:
+            raise Exception(f"Google Vision API error: {response.error.message}")
+
+        # Extract text and confidence
+        if response.full_text_annotation:
+            text = response.full_text_annotation.text
+
+            # Calculate confidence from pages
+            total_confidence = 0
+            word_count = 0
+            word_confidences = []
+            bounding_boxes = []
+
+            for page in response.full_text_annotation.pages:
+                for block in page.blocks:
+                    for paragraph in block.paragraphs:
+                        for word in paragraph.words:
+                            if hasattr(word, 'confidence'):
+                                total_confidence += word.confidence
+                                word_confidences.append(word.confidence)
+                                word_count += 1
+
+                                # Extract word text and bounding box
+                                word_text = ''.join(
+                                    [symbol.text for symbol in word.symbols]
+                                )
+                                vertices = word.bounding_box.vertices
+                                if vertices:
+                                    x_coords = [v.x for v in vertices]
+                                    y_coords = [v.y for v in vertices]
+                                    bounding_boxes.append(
+                                        {
+                                            'word': word_text,
+                                            'confidence': word.confidence,
+                                            'bbox': (
+                                                min(x_coords),
+                                                min(y_coords),
+                                                max(x_coords) - min(x_coords),
+                                                max(y_coords) - min(y_coords),
+                                            ),
+                                        }
+                                    )
+
+            avg_confidence = total_confidence / word_count if word_count > 0 else 0.8
+
+        else:
+            text = ""
+            avg_confidence = 0.0
+            word_confidences = []
+            bounding_boxes = []
+
+        cost = self.get_cost_estimate(image_path)
+        metadata = {
+            'api_features': self.config.get('features', ['DOCUMENT_TEXT_DETECTION']),
+            'response_time': processing_time
+        }
+        if extra_metadata:
+            metadata.update(extra_metadata)
+
+        return OCRResult(
+            text=text.strip() if text else "",
+            confidence=avg_confidence,
+            provider='google_vision',
+            processing_time=processing_time,
+            cost=cost,
+            word_confidences=word_confidences,
+            bounding_boxes=bounding_boxes,
+            raw_response=response,
+            metadata=metadata
+        )
+
     @log_calls("ghost_writer")
     @debug_decorator(log_args=False, profile=True)
     def extract_text(self, image_path: Union[str, Path]) -> OCRResult:
@@ -210,99 +365,19 @@ class GoogleVisionOCR(OCRProvider):
             raise RuntimeError("Google Vision client not initialized")
         
         try:
-            from google.cloud import vision
-            
-            # Preprocess and prepare image
-            image = self.preprocess_image(image_path)
-            
-            # Convert PIL image to bytes
-            import io
-            img_byte_arr = io.BytesIO()
-            image.save(img_byte_arr, format='PNG')
-            content = img_byte_arr.getvalue()
-            
-            # Create Vision API image object
-            vision_image = vision.Image(content=content)
-            
-            # Perform OCR
-            features = self.config.get('features', ['DOCUMENT_TEXT_DETECTION'])
-            feature_objects = [vision.Feature(type_=getattr(vision.Feature.Type, feature)) 
-                             for feature in features]
-            
-            request = vision.AnnotateImageRequest(
-                image=vision_image,
-                features=feature_objects
-            )
-            
+            # Preprocess, encode and perform OCR
+            request = self._build_request(self._encode_image(image_path))
             response = self.client.annotate_image(request=request)
             
-            # Handle errors
-            if response.error.message:
-                raise Exception(f"Google Vision API error: {response.error.message}")
-            
-            # Extract text and confidence
-            if response.full_text_annotation:
-                text = response.full_text_annotation.text
-                
-                # Calculate confidence from pages
-                total_confidence = 0
-                word_count = 0
-                word_confidences = []
-                bounding_boxes = []
-                
-                for page in response.full_text_annotation.pages:
-                    for block in page.blocks:
-                        for paragraph in block.paragraphs:
-                            for word in paragraph.words:
-                                if hasattr(word, 'confidence'):
-                                    total_confidence += word.confidence
-                                    word_confidences.append(word.confidence)
-                                    word_count += 1
-                                    
-                                    # Extract word text and bounding box
-                                    word_text = ''.join([symbol.text for symbol in word.symbols])
-                                    vertices = word.bounding_box.vertices
-                                    if vertices:
-                                        x_coords = [v.x for v in vertices]
-                                        y_coords = [v.y for v in vertices]
-                                        bounding_boxes.append({
-                                            'word': word_text,
-                                            'confidence': word.confidence,
-                                            'bbox': (min(x_coords), min(y_coords),
-                                                   max(x_coords) - min(x_coords),
-                                                   max(y_coords) - min(y_coords))
-                                        })
-                
-                avg_confidence = total_confidence / word_count if word_count > 0 else 0.8
-                
-            else:
-                text = ""
-                avg_confidence = 0.0
-                word_confidences = []
-                bounding_boxes = []
-            
             processing_time = time.time() - start_time
-            cost = self.get_cost_estimate(image_path)
+            result = self._parse_response(response, image_path, processing_time)
             
-            result = OCRResult(
-                text=text.strip() if text else "",
-                confidence=avg_confidence,
-                provider='google_vision',
-                processing_time=processing_time,
-                cost=cost,
-                word_confidences=word_confidences,
-                bounding_boxes=bounding_boxes,
-                raw_response=response,
-                metadata={
-                    'api_features': features,
-                    'response_time': processing_time
-                }
+            logger.info(
+                f"Google Vision OCR completed - {len(result.text)} chars, "
+                f"confidence: {result.confidence:.2f}, cost: ${result.cost:.4f}, "
+                f"time: {processing_time:.2f}s"
             )
             
-            logger.info(f"Google Vision OCR completed - {len(result.text)} chars, "
-                       f"confidence: {avg_confidence:.2f}, cost: ${cost:.4f}, "
-                       f"time: {processing_time:.2f}s")
-            
             return result
             
         except Exception as e:
@@ -318,10 +393,100 @@ class GoogleVisionOCR(OCRProvider):
                 metadata={'error': str(e)}
             )
 
+    @log_calls("ghost_writer")
+    @debug_decorator(log_args=False, profile=True)
+    def extract_text_batch(
+        self, image_paths: Sequence[Union[str, Path]]
+    ) -> List[OCRResult]:
+        """OCR several pages with one batch_annotate_images call per chunk
+
+        Pages are pre-encoded, grouped into chunks of ``batch_size`` (capped at
+        the API limit) and sent as a single request. Pages whose individual
+        response carries an error, or whose whole chunk fails, are retried one
+        at a time through ``extract_text``.
+        """
+        if not self.client:
+            raise RuntimeError("Google Vision client not initialized")
+
+        batch_size = max(1, min(int(self.config.get('batch_size', self.MAX_BATCH_SIZE)),
+                                self.MAX_BATCH_SIZE))
+        results: List[OCRResult] = []
+
+        for chunk_start in range(0, len(image_paths), batch_size):
+            chunk = list(image_paths[chunk_start:chunk_start + batch_size])
+            results.extend(self._annotate_chunk(chunk))
+
+        return results
+
+    def _annotate_chunk(self, chunk: List[Union[str, Path]]) -> List[OCRResult]:
+        """Send one chunk of pages as a single batch request"""
+        start_time = time.time()
+
+        try:
+            requests = [self._build_request(self._encode_image(path)) for path in chunk]
+            batch_response = self.client.batch_annotate_images(requests=requests)
+            responses = list(batch_response.responses)
+        except Exception as e:
+            logger.warning(f"Google Vision batch of {len(chunk)} failed ({e}), "
+                           f"falling back to per-page requests")
+            return [self.extract_text(path) for path in chunk]
+
+        if len(responses) != len(chunk):
+            logger.warning(f"Google Vision batch returned {len(responses)} responses "
+                           f"for {len(chunk)} pages, falling back to per-page requests")
+            return [self.extract_text(path) for path in chunk]
+
+        # Request overhead is shared, so attribute wall time evenly per page
+        per_page_time = (time.time() - start_time) / len(chunk)
+        results = []
+
+        for index, (path, response) in enumerate(zip(chunk, responses)):
+            try:
+                result = self._parse_response(
+                    response, path, per_page_time,
+                    extra_metadata={'batch_size': len(chunk), 'batch_index': index}
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Google Vision batch page {path} failed ({e}), retrying alone"
+                )
+                result = self.extract_text(path)
+            results.append(result)
+
+        logger.info(f"Google Vision batch completed - {len(chunk)} pages, "
+                    f"time: {time.time() - start_time:.2f}s")
+
+        return results
+
 
 class GPT4VisionOCR(OCRProvider):
     """OpenAI GPT-4 Vision OCR provider"""
     
+    # gpt-4o "high" detail accounting: a base cost plus a cost per 512px tile
+    # after the image is fit within 2048x2048 and its short side scaled to 768
+    BASE_IMAGE_TOKENS = 85
+    TILE_IMAGE_TOKENS = 170
+    PAGE_DELIMITER = "=== PAGE {n} ==="
+    PAGE_DELIMITER_PATTERN = re.compile(
+        '^' + re.escape(PAGE_DELIMITER).replace(r'\{n\}', r'(\d+)') + r'[ \t]*$',
+        re.MULTILINE,
+    )
+
+    @classmethod
+    def validate_config(cls, provider_config: Dict[str, Any]) -> List[str]:
+        problems = super().validate_config(provider_config)
+        if problems:
+            return problems
+        # Constructing the client needs the SDK; look for it without importing it
+        if importlib.util.find_spec('openai') is None:
+            problems.append("openai not installed. Run: pip install openai")
+        max_tokens = provider_config.get('max_tokens', 4000)
+        if not isinstance(max_tokens, int) or max_tokens <= 0:
+            problems.append(
+                f"max_tokens must be a positive integer, got {max_tokens!r}"
+            )
+        return problems
+
     def __init__(self, provider_config: Dict[str, Any]):
         super().__init__(provider_config)
         self.client = None
@@ -349,7 +514,57 @@ class GPT4VisionOCR(OCRProvider):
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI client: {e}")
             raise
-    
+
+    def _system_prompt(self) -> str:
+        return self.config.get(
+            'system_prompt',
+            "Transcribe this handwritten text exactly as written. "
+            "Preserve structure and formatting. Mark unclear text with [unclear].",
+        )
+
+    @staticmethod
+    def _encode_image(image: Image.Image) -> str:
+        """Encode an image as a base64 PNG string"""
+        import io
+        img_byte_arr = io.BytesIO()
+        image.save(img_byte_arr, format='PNG')
+        img_byte_arr.seek(0)
+        return base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
+
+    @staticmethod
+    def _image_part(base64_image: str) -> Dict[str, Any]:
+        return {
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:image/png;base64,{base64_image}"
+            }
+        }
+
+    @staticmethod
+    def _estimate_confidence(text: str) -> float:
+        """Estimate confidence from the density of [unclear] markers
+
+        GPT-4 Vision doesn't provide confidence scores directly.
+        """
+        unclear_count = text.count('[unclear]')
+        total_words = len(text.split())
+
+        if total_words == 0:
+            return 0.0
+        if unclear_count == 0:
+            return 0.9  # High confidence when no unclear markers
+        return max(0.5, 1.0 - (unclear_count / total_words))
+
+    @classmethod
+    def estimate_image_tokens(cls, width: int, height: int) -> int:
+        """Estimate the prompt tokens an image of this size costs"""
+        scale = min(1.0, 2048 / max(width, height))
+        width, height = width * scale, height * scale
+        scale = min(1.0, 768 / min(width, height))
+        width, height = width * scale, height * scale
+        tiles = int(np.ceil(width / 512)) * int(np.ceil(height / 512))
+        return cls.BASE_IMAGE_TOKENS + cls.TILE_IMAGE_TOKENS * tiles
+
     @log_calls("ghost_writer")
     @debug_decorator(log_args=False, profile=True)
     def extract_text(self, image_path: Union[str, Path]) -> OCRResult:
@@ -359,20 +574,9 @@ class GPT4VisionOCR(OCRProvider):
             raise RuntimeError("OpenAI client not initialized")
         
         try:
-            # Preprocess image
+            # Preprocess image and encode to base64
             image = self.preprocess_image(image_path)
-            
-            # Encode image to base64
-            import io
-            img_byte_arr = io.BytesIO()
-            image.save(img_byte_arr, format='PNG')
-            img_byte_arr.seek(0)
-            base64_image = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
-            
-            # Prepare system prompt
-            system_prompt = self.config.get('system_prompt', 
-                "Transcribe this handwritten text exactly as written. "
-                "Preserve structure and formatting. Mark unclear text with [unclear].")
+            base64_image = self._encode_image(image)
             
             # Call GPT-4 Vision
             response = self.client.chat.completions.create(
@@ -380,7 +584,7 @@ class GPT4VisionOCR(OCRProvider):
                 messages=[
                     {
                         "role": "system",
-                        "content": system_prompt
+                        "content": self._system_prompt()
                     },
                     {
                         "role": "user", 
@@ -389,12 +593,7 @@ class GPT4VisionOCR(OCRProvider):
                                 "type": "text",
                                 "text": "Please transcribe this handwritten text:"
                             },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{base64_image}"
-                                }
-                            }
+                            self._image_part(base64_image)
                         ]
                     }
                 ],
@@ -404,19 +603,7 @@ class GPT4VisionOCR(OCRProvider):
             # Extract response
             if response.choices and response.choices[0].message:
                 text = response.choices[0].message.content.strip()
-                
-                # GPT-4 Vision doesn't provide confidence scores directly
-                # Estimate based on response characteristics
-                unclear_count = text.count('[unclear]')
-                total_words = len(text.split())
-                
-                if total_words == 0:
-                    confidence = 0.0
-                elif unclear_count == 0:
-                    confidence = 0.9  # High confidence when no unclear markers
-                else:
-                    confidence = max(0.5, 1.0 - (unclear_count / total_words))
-                
+                confidence = self._estimate_confidence(text)
             else:
                 text = ""
                 confidence = 0.0
@@ -457,6 +644,159 @@ class GPT4VisionOCR(OCRProvider):
                 metadata={'error': str(e)}
             )
 
+    def _prepare_batch_image(self, image_path: Union[str, Path]) -> Image.Image:
+        """Preprocess and downscale a page for a packed request"""
+        image = self.preprocess_image(image_path)
+        max_dimension = self.config.get('batch_max_dimension', 1024)
+        if max(image.size) > max_dimension:
+            image = image.copy()
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        return image
+
+    def _pack_pages(self, token_estimates: List[int]) -> List[List[int]]:
+        """Greedily group page indices so each group stays under the token budget
+
+        A page that alone exceeds the budget still gets a group of its own.
+        """
+        budget = self.config.get('image_token_budget', 4000)
+        max_pages = max(1, self.config.get('max_pages_per_request', 8))
+
+        groups: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, tokens in enumerate(token_estimates):
+            if current and (
+                current_tokens + tokens > budget or len(current) >= max_pages
+            ):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def _split_pages(self, text: str, page_count: int) -> Optional[List[str]]:
+        """Split a multi-page response on the page delimiters
+
+        Returns None unless every page from 1..page_count appears exactly once.
+        """
+        matches = list(self.PAGE_DELIMITER_PATTERN.finditer(text))
+        numbers = [int(m.group(1)) for m in matches]
+        if numbers != list(range(1, page_count + 1)):
+            return None
+
+        pages = []
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            pages.append(text[match.end():end].strip())
+        return pages
+
+    def _request_packed(self, images: List[Image.Image]):
+        """Send several page images in a single chat completion"""
+        instructions = (
+            f"You will receive {len(images)} page images. Transcribe each page "
+            f"separately. Before each transcription write a line containing only "
+            f"{self.PAGE_DELIMITER.format(n='N')} where N is the page number, "
+            f"starting at 1, in the order the pages are given."
+        )
+        content: List[Dict[str, Any]] = [{"type": "text", "text": instructions}]
+        for n, image in enumerate(images, 1):
+            content.append({"type": "text", "text": f"Page {n}:"})
+            content.append(self._image_part(self._encode_image(image)))
+
+        return self.client.chat.completions.create(
+            model=self.config.get('model', 'gpt-4o'),
+            messages=[
+                {"role": "system", "content": self._system_prompt()},
+                {"role": "user", "content": content}
+            ],
+            max_tokens=self.config.get('max_tokens', 4000)
+        )
+
+    @log_calls("ghost_writer")
+    @debug_decorator(log_args=False, profile=True)
+    def extract_text_batch(
+        self, image_paths: Sequence[Union[str, Path]]
+    ) -> List[OCRResult]:
+        """Pack several downscaled pages into each chat completion
+
+        Pages are grouped under ``image_token_budget`` and the model is asked
+        to prefix each transcription with a page delimiter. If a response
+        cannot be split back into exactly one section per page, the pages of
+        that group are retried one at a time.
+        """
+        if not self.client:
+            raise RuntimeError("OpenAI client not initialized")
+
+        if len(image_paths) <= 1:
+            return [self.extract_text(image_path) for image_path in image_paths]
+
+        try:
+            images = [self._prepare_batch_image(path) for path in image_paths]
+        except Exception as e:
+            logger.error(f"GPT-4 Vision batch preprocessing failed: {e}")
+            return [self.extract_text(image_path) for image_path in image_paths]
+
+        token_estimates = [self.estimate_image_tokens(*image.size) for image in images]
+        model = self.config.get('model', 'gpt-4o')
+        results: List[Optional[OCRResult]] = [None] * len(image_paths)
+
+        for group in self._pack_pages(token_estimates):
+            if len(group) == 1:
+                results[group[0]] = self.extract_text(image_paths[group[0]])
+                continue
+
+            start_time = time.time()
+            try:
+                response = self._request_packed([images[i] for i in group])
+                text = ""
+                if response.choices and response.choices[0].message:
+                    text = response.choices[0].message.content or ""
+                pages = self._split_pages(text, len(group))
+            except Exception as e:
+                logger.error(f"GPT-4 Vision packed request failed: {e}")
+                pages = None
+
+            if pages is None:
+                logger.warning(f"GPT-4 Vision could not split response for "
+                               f"{len(group)} pages, retrying individually")
+                for i in group:
+                    results[i] = self.extract_text(image_paths[i])
+                continue
+
+            processing_time = (time.time() - start_time) / len(group)
+            tokens_used = response.usage.total_tokens if response.usage else 0
+            for position, (i, page_text) in enumerate(zip(group, pages)):
+                results[i] = OCRResult(
+                    text=page_text,
+                    confidence=self._estimate_confidence(page_text),
+                    provider='gpt4_vision',
+                    processing_time=processing_time,
+                    cost=self.get_cost_estimate(image_paths[i]),
+                    metadata={
+                        'model': model,
+                        'tokens_used': tokens_used // len(group),
+                        'unclear_markers': page_text.count('[unclear]'),
+                        'estimated_image_tokens': token_estimates[i],
+                        'batch_size': len(group),
+                        'batch_index': position
+                    }
+                )
+
+            logger.info(
+                f"GPT-4 Vision packed {len(group)} pages into one request - "
+                f"{sum(token_estimates[i] for i in group)} estimated image tokens"
+            )
+
+        # Groups cover every page and a split response has one section per page
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            raise RuntimeError(
+                f"GPT-4 Vision batch produced no result for pages {missing}"
+            )
+        return cast(List[OCRResult], results)
+
 
 class QwenOCR(OCRProvider):
     """Qwen2.5-VL vision model OCR via Ollama"""
@@ -557,72 +897,592 @@ class QwenOCR(OCRProvider):
             )
 
 
-class HybridOCR(OCRProvider):
-    """Intelligent routing between OCR providers"""
-    
+class SimulatedOCR(OCRProvider):
+    """Stand-in provider with configurable latency, confidence, failures and cost
+
+    For load-testing routing, fallback, budgets and concurrency without local
+    models or cloud accounts. Each value is drawn from a distribution spec:
+    a number (constant) or a mapping such as ``{distribution: lognormal,
+    median: 800, sigma: 0.5}``. Latency and cost can grow with image size
+    through ``*_per_megapixel`` terms. ``time_scale`` shrinks the real sleep
+    while results still report the simulated latency.
+    """
+
+    DISTRIBUTIONS = {
+        'constant': ('value',),
+        'uniform': ('low', 'high'),
+        'normal': ('mean', 'stdev'),
+        'lognormal': ('median', 'sigma'),
+        'exponential': ('mean',),
+    }
+
+    _WORDS = ("meeting", "notes", "project", "review", "deadline", "ideas", "draft",
+              "budget", "follow", "up", "with", "team", "about", "next", "steps",
+              "design", "research")
+
     def __init__(self, provider_config: Dict[str, Any]):
         super().__init__(provider_config)
-        self.providers: Dict[str, OCRProvider] = {}
-        self._initialize_providers()
-    
-    def _initialize_providers(self):
-        """Initialize all available OCR providers"""
-        # Get provider configurations
-        ocr_config = config.get('ocr', {})
-        
-        # Initialize Qwen (if available)
-        if 'qwen' in ocr_config.get('providers', {}):
-            try:
-                self.providers['qwen'] = QwenOCR(
-                    ocr_config['providers']['qwen']
+        self.provider_name = provider_config.get('name', 'simulated')
+        self.time_scale = provider_config.get('time_scale', 1.0)
+        self.timeout = provider_config.get('timeout', 120)
+        self._random = random.Random(provider_config.get('seed'))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def validate_config(cls, provider_config: Dict[str, Any]) -> List[str]:
+        problems = super().validate_config(provider_config)
+        if not isinstance(provider_config, dict):
+            return problems
+
+        for key in ('latency_ms', 'confidence', 'cost'):
+            spec = provider_config.get(key)
+            if spec is None or isinstance(spec, (int, float)):
+                continue
+            if (
+                not isinstance(spec, dict)
+                or spec.get('distribution') not in cls.DISTRIBUTIONS
+            ):
+                problems.append(
+                    f"{key} must be a number or a mapping with distribution "
+                    f"in {sorted(cls.DISTRIBUTIONS)}, got {spec!r}"
                 )
-            except Exception as e:
-                logger.warning(f"Could not initialize Qwen: {e}")
-        
-        # Initialize Tesseract (always available as fallback)
-        if 'tesseract' in ocr_config.get('providers', {}):
-            self.providers['tesseract'] = TesseractOCR(
-                ocr_config['providers']['tesseract']
+                continue
+            required = cls.DISTRIBUTIONS[spec['distribution']]
+            missing = [name for name in required if name not in spec]
+            if missing:
+                problems.append(f"{key} {spec['distribution']} distribution needs "
+                                f"{', '.join(missing)}")
+        for key in ('failure_rate', 'timeout_rate'):
+            rate = provider_config.get(key, 0.0)
+            if not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+                problems.append(f"{key} must be between 0 and 1, got {rate!r}")
+        return problems
+
+    def _sample(self, spec: Any, default: float) -> float:
+        """Draw one value from a distribution spec (caller holds the lock)"""
+        if spec is None:
+            return default
+        if isinstance(spec, (int, float)):
+            return float(spec)
+        kind = spec['distribution']
+        if kind == 'constant':
+            return float(spec['value'])
+        if kind == 'uniform':
+            return self._random.uniform(spec['low'], spec['high'])
+        if kind == 'normal':
+            return self._random.gauss(spec['mean'], spec['stdev'])
+        if kind == 'lognormal':
+            return self._random.lognormvariate(math.log(spec['median']), spec['sigma'])
+        return self._random.expovariate(1.0 / spec['mean'])
+
+    @staticmethod
+    def _megapixels(image_path: Union[str, Path]) -> float:
+        try:
+            with Image.open(image_path) as image:
+                return image.width * image.height / 1e6
+        except (OSError, ValueError):
+            return 0.0
+
+    def _plan(self, image_path: Union[str, Path]) -> Dict[str, Any]:
+        """Draw everything about one call up front, under the lock"""
+        megapixels = self._megapixels(image_path)
+        failure_rate = self.config.get('failure_rate', 0.0)
+        timeout_rate = self.config.get('timeout_rate', 0.0)
+        words_per_page = self.config.get('words_per_page', 30)
+        with self._lock:
+            latency_ms = self._sample(self.config.get('latency_ms'), 500.0)
+            latency_ms += self.config.get('latency_per_megapixel_ms', 0.0) * megapixels
+            confidence = self._sample(self.config.get('confidence'), 0.85)
+            cost = self._sample(self.config.get('cost'),
+                                self.config.get('cost_per_image', 0.0))
+            cost += self.config.get('cost_per_megapixel', 0.0) * megapixels
+            plan = {
+                'megapixels': megapixels,
+                'latency': max(0.0, latency_ms) / 1000.0,
+                'confidence': min(1.0, max(0.0, confidence)),
+                'cost': max(0.0, cost),
+                'failed': self._random.random() < failure_rate,
+                'timed_out': self._random.random() < timeout_rate,
+                'words': [self._random.choice(self._WORDS)
+                          for _ in range(words_per_page)],
+                'word_jitter': [self._random.uniform(-0.1, 0.1)
+                                for _ in range(words_per_page)],
+            }
+        if plan['timed_out']:
+            plan['latency'] = float(self.timeout)
+        return plan
+
+    def _result(self, plan: Dict[str, Any]) -> OCRResult:
+        """Turn a drawn plan into the result (or error) a real provider would give"""
+        if plan['failed']:
+            raise OCRProviderError(self.provider_name, "Simulated provider failure")
+        if plan['timed_out']:
+            logger.error(
+                f"Simulated OCR {self.provider_name} timeout after {self.timeout}s"
+            )
+            return OCRResult(
+                text="",
+                confidence=0.0,
+                provider=self.provider_name,
+                processing_time=plan['latency'],
+                cost=0.0,
+                metadata={'error': f'Timeout after {self.timeout}s', 'simulated': True}
             )
+
+        word_confidences = [
+            min(1.0, max(0.0, plan['confidence'] + jitter))
+            for jitter in plan['word_jitter']
+        ]
+        boxes = [
+            {'word': word, 'confidence': confidence,
+             'bbox': [40 + (i % 8) * 160, 60 + (i // 8) * 48, 140, 36]}
+            for i, (word, confidence) in enumerate(zip(plan['words'], word_confidences))
+        ]
+        return OCRResult(
+            text=" ".join(plan['words']),
+            confidence=plan['confidence'],
+            provider=self.provider_name,
+            processing_time=plan['latency'],
+            cost=plan['cost'],
+            word_confidences=word_confidences,
+            bounding_boxes=boxes,
+            metadata={'simulated': True, 'megapixels': plan['megapixels']}
+        )
+
+    def extract_text(self, image_path: Union[str, Path]) -> OCRResult:
+        """Sleep for the drawn latency times ``time_scale``, then return the result"""
+        plan = self._plan(image_path)
+        time.sleep(plan['latency'] * self.time_scale)
+        return self._result(plan)
+
+    async def extract_text_async(self, image_path: Union[str, Path]) -> OCRResult:
+        """Same as ``extract_text`` without blocking the event loop"""
+        import asyncio
+        plan = self._plan(image_path)
+        await asyncio.sleep(plan['latency'] * self.time_scale)
+        return self._result(plan)
+
+    @classmethod
+    def estimate_cost(
+        cls, provider_config: Dict[str, Any], image_path: Union[str, Path]
+    ) -> float:
+        spec = provider_config.get('cost')
+        if isinstance(spec, dict):
+            spec = spec.get('value', spec.get('mean', spec.get('median')))
+        if not isinstance(spec, (int, float)):
+            spec = provider_config.get('cost_per_image', 0.0)
+        per_megapixel = provider_config.get('cost_per_megapixel', 0.0)
+        return spec + per_megapixel * cls._megapixels(image_path)
+
+
+class LazyProvider:
+    """Handle that constructs an OCR provider the first time it is used
+
+    Provider constructors import cloud SDKs and authenticate, which is wasted
+    work when routing never reaches them. The handle exposes the provider
+    interface and builds the real instance once, under a lock, on first call.
+    A failed construction is remembered so later pages fail fast.
+    """
+
+    def __init__(
+        self, name: str, provider_class: type, provider_config: Dict[str, Any]
+    ):
+        self.name = name
+        self.provider_class = provider_class
+        self.config = provider_config
+        self._instance: Optional[OCRProvider] = None
+        self._error: Optional[Exception] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> OCRProvider:
+        """Return the provider instance, constructing it if needed"""
+        if self._instance is not None:
+            return self._instance
+
+        with self._lock:
+            if self._instance is None and self._error is None:
+                try:
+                    start_time = time.time()
+                    self._instance = self.provider_class(self.config)
+                    logger.info(
+                        f"Initialized {self.name} provider on first use "
+                        f"in {time.time() - start_time:.2f}s"
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not initialize {self.name}: {e}")
+                    self._error = e
+
+        if self._instance is None:
+            raise OCRProviderError(self.name, f"{self.name} unavailable: {self._error}")
+        return self._instance
+
+    def extract_text(self, image_path: Union[str, Path]) -> OCRResult:
+        return self.get().extract_text(image_path)
+
+    def extract_text_batch(
+        self, image_paths: Sequence[Union[str, Path]]
+    ) -> List[OCRResult]:
+        return self.get().extract_text_batch(image_paths)
+
+    def get_cost_estimate(self, image_path: Union[str, Path]) -> float:
+        # Priced from the class and config, so estimating never builds the client
+        if self._instance is not None:
+            return self._instance.get_cost_estimate(image_path)
+        return self.provider_class.estimate_cost(self.config, image_path)
+
+    def __getattr__(self, attribute: str):
+        # Only reached for attributes the handle does not define itself
+        if attribute.startswith('_'):
+            raise AttributeError(attribute)
+        return getattr(self.get(), attribute)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "failed" if self._error else "deferred"
+        return f"LazyProvider({self.name!r}, {state})"
+
+
+class HybridOCR(OCRProvider):
+    """Intelligent routing between OCR providers
+    
+    Provider settings come from ``ocr.providers`` in the global config
+    unless ``providers_config`` is given, as load tests do. Routing settings
+    are the ``hybrid`` subsection; passing the whole ``ocr`` section, as the
+    CLI does, resolves ``ocr.providers.hybrid`` from it.
+    """
+
+    def __init__(self, provider_config: Dict[str, Any],
+                 providers_config: Optional[Dict[str, Any]] = None):
+        super().__init__(self.hybrid_config(provider_config))
+        self.providers: Dict[str, Union[OCRProvider, LazyProvider]] = {}
+        self._initialize_providers(providers_config)
+    
+    # Known providers in the order they are listed
+    PROVIDER_CLASSES = (
+        ('qwen', QwenOCR),
+        ('tesseract', TesseractOCR),
+        ('google_vision', GoogleVisionOCR),
+        ('gpt4_vision', GPT4VisionOCR),
+        ('simulated', SimulatedOCR),
+    )
+
+    @staticmethod
+    def hybrid_config(provider_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Routing settings from the ``hybrid`` subsection or the ``ocr`` section"""
+        provider_config = provider_config or {}
+        if 'providers' not in provider_config:
+            return provider_config
+        return {
+            **provider_config['providers'].get('hybrid', {}),
+            **provider_config.get('hybrid', {}),
+        }
+
+    @classmethod
+    def provider_class(
+        cls, name: str, provider_config: Dict[str, Any]
+    ) -> Optional[type]:
+        """Class for a configured provider; ``type: simulated`` swaps in a simulation"""
+        if (
+            isinstance(provider_config, dict)
+            and provider_config.get('type') == 'simulated'
+        ):
+            return SimulatedOCR
+        return dict(cls.PROVIDER_CLASSES).get(name)
+
+    @classmethod
+    def check_provider(
+        cls, name: str, provider_config: Dict[str, Any]
+    ) -> Tuple[Optional[type], Dict[str, Any], List[str]]:
+        """Class, effective config and validation problems of one configured provider"""
+        provider_class = cls.provider_class(name, provider_config)
+        if provider_class is None:
+            return None, provider_config, [f"unknown provider {name!r}"]
+        if provider_class is SimulatedOCR:
+            provider_config = {'name': name, **provider_config}
+        return (
+            provider_class,
+            provider_config,
+            provider_class.validate_config(provider_config),
+        )
+
+    def _initialize_providers(self, providers_config: Optional[Dict[str, Any]] = None):
+        """Register lazy handles for every configured provider
         
-        # Initialize Google Vision (if configured)
-        if 'google_vision' in ocr_config.get('providers', {}):
-            try:
-                self.providers['google_vision'] = GoogleVisionOCR(
-                    ocr_config['providers']['google_vision']
-                )
-            except Exception as e:
-                logger.warning(f"Could not initialize Google Vision: {e}")
+        Config is validated here; clients are only constructed when routing
+        first reaches a provider.
+        """
+        if providers_config is None:
+            providers_config = config.get('ocr', {}).get('providers', {})
         
-        # Initialize GPT-4 Vision (if configured)
-        if 'gpt4_vision' in ocr_config.get('providers', {}):
-            try:
-                self.providers['gpt4_vision'] = GPT4VisionOCR(
-                    ocr_config['providers']['gpt4_vision']
-                )
-            except Exception as e:
-                logger.warning(f"Could not initialize GPT-4 Vision: {e}")
+        for name, _ in self.PROVIDER_CLASSES:
+            if name not in providers_config:
+                continue
+
+            provider_class, provider_config, problems = self.check_provider(
+                name, providers_config[name]
+            )
+            if problems:
+                logger.warning(f"Could not initialize {name}: {'; '.join(problems)}")
+                continue
+
+            self.providers[name] = LazyProvider(name, provider_class, provider_config)
         
-        logger.info(f"Initialized hybrid OCR with providers: {list(self.providers.keys())}")
+        logger.info(f"Registered hybrid OCR providers: {list(self.providers.keys())}")
     
-    @log_calls("ghost_writer")
-    @debug_decorator(log_args=False, profile=True)
-    def extract_text(self, image_path: Union[str, Path]) -> OCRResult:
-        """Smart routing between providers based on configuration"""
-        
-        # Check daily budget
-        db = DatabaseManager()
+    def _usage_db(self) -> DatabaseManager:
+        """Database of daily usage; ``usage_db`` points load tests at a scratch file"""
+        usage_db = self.config.get('usage_db')
+        return DatabaseManager(usage_db) if usage_db else DatabaseManager()
+
+    def _resolve_priority(self, db: DatabaseManager, log: bool = True) -> List[str]:
+        """Check the daily budget and return the provider order to try"""
         daily_cost = sum(costs.get('cost', 0) for costs in db.get_daily_ocr_cost().values())
         budget_limit = self.config.get('cost_limit_per_day', 5.0)
         
         # Determine provider priority based on mode and budget
         quality_mode = self.config.get('quality_mode', 'balanced')
         provider_priority = self._get_provider_priority(quality_mode, daily_cost, budget_limit)
+        if not log:
+            return provider_priority
         
         logger.info(f"Hybrid OCR routing - mode: {quality_mode}, "
                    f"daily_cost: ${daily_cost:.4f}, budget: ${budget_limit}, "
                    f"priority: {provider_priority}")
         
+        return provider_priority
+
+    def _failed_result(self) -> OCRResult:
+        """Empty result returned when every provider failed"""
+        return OCRResult(
+            text="",
+            confidence=0.0,
+            provider='hybrid_failed',
+            processing_time=0.0,
+            cost=0.0,
+            metadata={'error': 'All OCR providers failed'}
+        )
+
+    def _next_provider(
+        self, provider_priority: List[str], current: str
+    ) -> Optional[str]:
+        """Name of the first initialized provider after ``current`` in the chain"""
+        remaining = provider_priority[provider_priority.index(current) + 1:]
+        return next((name for name in remaining if name in self.providers), None)
+
+    @staticmethod
+    def _merge_corrections(
+        text: str, boxes: List[Dict], corrections: Dict[int, str]
+    ) -> str:
+        """Replace corrected words in the page text, walking boxes in reading order"""
+        cursor = 0
+        for index, box in enumerate(boxes):
+            word = box.get('word', '')
+            if not word:
+                continue
+            position = text.find(word, cursor)
+            if position < 0:
+                continue
+            replacement = corrections.get(index, word)
+            text = text[:position] + replacement + text[position + len(word):]
+            cursor = position + len(replacement)
+        return text
+
+    @staticmethod
+    def _sheet_rows(
+        sheet_result: OCRResult, rows: List[Tuple[int, int]]
+    ) -> List[Optional[Tuple[str, float]]]:
+        """Split a word-sheet result back into (text, confidence) per row
+
+        Word boxes are assigned to the row their center falls in; without
+        boxes, text lines are used when there is exactly one per row.
+        """
+        boxes = [
+            box
+            for box in sheet_result.bounding_boxes
+            if box.get('word') and box.get('bbox')
+        ]
+        if boxes:
+            per_row: List[List[Dict]] = [[] for _ in rows]
+            for box in boxes:
+                x, y, w, h = box['bbox']
+                center = y + h / 2
+                for index, (top, bottom) in enumerate(rows):
+                    if top <= center < bottom:
+                        per_row[index].append(box)
+                        break
+            parsed: List[Optional[Tuple[str, float]]] = []
+            for found in per_row:
+                if not found:
+                    parsed.append(None)
+                    continue
+                found.sort(key=lambda b: b['bbox'][0])
+                text = " ".join(box['word'] for box in found)
+                total = sum(box.get('confidence', 0.0) for box in found)
+                parsed.append((text, total / len(found)))
+            return parsed
+
+        lines = [
+            " ".join(line.split())
+            for line in sheet_result.text.splitlines()
+            if line.strip()
+        ]
+        if len(lines) != len(rows):
+            return [None] * len(rows)
+        return [(line, sheet_result.confidence) for line in lines]
+
+    def _refine_low_confidence_words(
+        self,
+        image_path: Union[str, Path],
+        result: OCRResult,
+        refiner_name: str,
+        db: DatabaseManager,
+    ) -> Optional[OCRResult]:
+        """Re-OCR only the words below the per-word threshold with the next provider
+
+        The weak words are cropped and stacked one per row on a single sheet,
+        so the refiner is billed for one image however many words there are.
+        Returns None when refinement does not apply: no word boxes, nothing
+        below threshold, too many weak words for crops to be read reliably,
+        or a sheet the refiner would charge more for than the whole page.
+        """
+        refinement = self.config.get('refinement', {})
+        word_threshold = refinement.get('word_threshold', 60) / 100.0
+        max_fraction = refinement.get('max_fraction', 0.5)
+        padding = refinement.get('padding', 4)
+
+        boxes = [
+            box for box in result.bounding_boxes if box.get('word') and box.get('bbox')
+        ]
+        weak = [
+            i
+            for i, box in enumerate(boxes)
+            if box.get('confidence', 0.0) < word_threshold
+        ]
+        if not weak or len(weak) > max_fraction * len(boxes):
+            return None
+
+        import tempfile
+        import shutil
+
+        refiner = self.providers[refiner_name]
+        gap = max(8, 2 * padding)
+        crop_dir = Path(tempfile.mkdtemp(prefix="ghost_writer_refine_"))
+        try:
+            with Image.open(image_path) as page:
+                crops = []
+                for i in weak:
+                    x, y, w, h = boxes[i]['bbox']
+                    crops.append(
+                        page.crop(
+                            (
+                                max(0, x - padding),
+                                max(0, y - padding),
+                                min(page.width, x + w + padding),
+                                min(page.height, y + h + padding),
+                            )
+                        )
+                    )
+                sheet = Image.new(
+                    page.mode,
+                    (
+                        max(crop.width for crop in crops),
+                        sum(crop.height for crop in crops) + gap * (len(crops) - 1),
+                    ),
+                    "white",
+                )
+            rows = []
+            top = 0
+            for crop in crops:
+                sheet.paste(crop, (0, top))
+                rows.append((top, top + crop.height))
+                top += crop.height + gap
+            sheet_path = crop_dir / "weak_words.png"
+            sheet.save(sheet_path)
+
+            page_cost = float(refiner.get_cost_estimate(image_path))
+            sheet_cost = float(refiner.get_cost_estimate(sheet_path))
+            if sheet_cost > page_cost:
+                logger.info(
+                    f"Skipping refinement with {refiner_name}: word sheet would cost "
+                    f"${sheet_cost:.4f}, the whole page ${page_cost:.4f}"
+                )
+                return None
+
+            [sheet_result] = refiner.extract_text_batch([str(sheet_path)])
+        except Exception as e:
+            logger.error(f"Hybrid OCR refinement with {refiner_name} failed: {e}")
+            return None
+        finally:
+            shutil.rmtree(crop_dir, ignore_errors=True)
+
+        refinement_cost = sheet_result.cost
+        db.track_ocr_usage(refiner_name, refinement_cost, images_processed=1)
+
+        # Keep a correction only when the refiner is more confident than the original
+        corrections: Dict[int, str] = {}
+        refined_boxes = [dict(box) for box in boxes]
+        for i, row in zip(weak, self._sheet_rows(sheet_result, rows)):
+            if row is None:
+                continue
+            corrected, confidence = row
+            if corrected and confidence > boxes[i].get('confidence', 0.0):
+                corrections[i] = corrected
+                refined_boxes[i].update(
+                    word=corrected, confidence=confidence, refined_by=refiner_name
+                )
+
+        word_confidences = [box.get('confidence', 0.0) for box in refined_boxes]
+
+        logger.info(
+            f"Hybrid OCR refined {len(corrections)}/{len(weak)} low-confidence words "
+            f"with {refiner_name} - cost: ${refinement_cost:.4f}"
+        )
+
+        return OCRResult(
+            text=self._merge_corrections(result.text, boxes, corrections),
+            confidence=sum(word_confidences) / len(word_confidences),
+            provider=result.provider,
+            processing_time=result.processing_time + sheet_result.processing_time,
+            cost=result.cost + refinement_cost,
+            word_confidences=word_confidences,
+            bounding_boxes=refined_boxes,
+            raw_response=result.raw_response,
+            metadata={
+                **result.metadata,
+                'refined_by': refiner_name,
+                'refined_words': len(corrections),
+                'refinement_candidates': len(weak),
+                'refinement_cost': refinement_cost
+            }
+        )
+
+    def _try_refinement(
+        self,
+        image_path: Union[str, Path],
+        result: OCRResult,
+        provider_name: str,
+        provider_priority: List[str],
+        db: DatabaseManager,
+    ) -> Optional[OCRResult]:
+        """Attempt partial re-OCR when refinement mode is enabled"""
+        if not self.config.get('refinement', {}).get('enabled', False):
+            return None
+        refiner_name = self._next_provider(provider_priority, provider_name)
+        if refiner_name is None:
+            return None
+        return self._refine_low_confidence_words(image_path, result, refiner_name, db)
+
+    @log_calls("ghost_writer")
+    @debug_decorator(log_args=False, profile=True)
+    def extract_text(self, image_path: Union[str, Path]) -> OCRResult:
+        """Smart routing between providers based on configuration"""
+
+        db = self._usage_db()
+        provider_priority = self._resolve_priority(db)
+
         # Try providers in priority order
         last_result = None
         for provider_name in provider_priority:
@@ -632,7 +1492,9 @@ class HybridOCR(OCRProvider):
             provider = self.providers[provider_name]
             
             try:
-                result = provider.extract_text(image_path)
+                with span("ocr.attempt", "ocr", provider=provider_name), \
+                        metrics.timer("provider_ms", provider=provider_name):
+                    result = provider.extract_text(image_path)
                 
                 # Track usage in database
                 db.track_ocr_usage(provider_name, result.cost)
@@ -640,6 +1502,13 @@ class HybridOCR(OCRProvider):
                 # Check if result meets quality threshold
                 threshold = self.config.get('confidence_thresholds', {}).get(provider_name, 0.75)
                 
+                if result.confidence < threshold / 100.0:
+                    # Escalate only the weak words before giving up on the page
+                    refined = self._try_refinement(image_path, result, provider_name,
+                                                   provider_priority, db)
+                    if refined is not None:
+                        result = refined
+
                 if result.confidence >= threshold / 100.0:
                     logger.info(f"Hybrid OCR success with {provider_name} - "
                                f"confidence: {result.confidence:.2f} >= {threshold/100.0:.2f}")
@@ -660,14 +1529,92 @@ class HybridOCR(OCRProvider):
         
         # Final fallback - return empty result
         logger.error("Hybrid OCR: All providers failed")
-        return OCRResult(
-            text="",
-            confidence=0.0,
-            provider='hybrid_failed',
-            processing_time=0.0,
-            cost=0.0,
-            metadata={'error': 'All OCR providers failed'}
-        )
+        return self._failed_result()
+
+    @log_calls("ghost_writer")
+    @debug_decorator(log_args=False, profile=True)
+    def extract_text_batch(
+        self, image_paths: Sequence[Union[str, Path]]
+    ) -> List[OCRResult]:
+        """Route a batch of pages through the provider chain
+
+        Each provider receives all pages still pending in one
+        ``extract_text_batch`` call, so batch-capable providers such as Google
+        Vision pay request overhead once per chunk instead of once per page.
+        Pages below the provider's threshold move on to the next provider.
+        """
+        if not image_paths:
+            return []
+
+        db = self._usage_db()
+        provider_priority = self._resolve_priority(db)
+
+        accepted: Dict[int, OCRResult] = {}
+        last_results: Dict[int, OCRResult] = {}
+        pending = list(range(len(image_paths)))
+
+        for provider_name in provider_priority:
+            if not pending:
+                break
+            if provider_name not in self.providers:
+                continue
+
+            provider = self.providers[provider_name]
+
+            try:
+                attempt = span(
+                    "ocr.attempt", "ocr", provider=provider_name, pages=len(pending)
+                )
+                timer = metrics.timer("provider_batch_ms", provider=provider_name)
+                with attempt, timer:
+                    batch_results = provider.extract_text_batch(
+                        [image_paths[i] for i in pending]
+                    )
+            except Exception as e:
+                logger.error(f"Hybrid OCR {provider_name} batch failed: {e}")
+                continue
+
+            if len(batch_results) != len(pending):
+                logger.error(
+                    f"Hybrid OCR {provider_name} returned {len(batch_results)} "
+                    f"results for {len(pending)} pages, skipping provider"
+                )
+                continue
+
+            # Record the whole call as one usage row covering every page sent
+            db.track_ocr_usage(provider_name, sum(r.cost for r in batch_results),
+                               images_processed=len(batch_results))
+
+            threshold = self.config.get('confidence_thresholds', {}).get(
+                provider_name, 0.75
+            )
+            still_pending = []
+            for index, result in zip(pending, batch_results):
+                if result.confidence < threshold / 100.0:
+                    refined = self._try_refinement(
+                        image_paths[index], result, provider_name, provider_priority, db
+                    )
+                    if refined is not None:
+                        result = refined
+                if result.confidence >= threshold / 100.0:
+                    accepted[index] = result
+                else:
+                    last_results[index] = result
+                    still_pending.append(index)
+
+            logger.info(f"Hybrid OCR batch {provider_name} - accepted "
+                        f"{len(pending) - len(still_pending)}/{len(pending)} pages")
+            pending = still_pending
+
+        for index in pending:
+            accepted[index] = last_results.get(index) or self._failed_result()
+
+        if pending:
+            logger.warning(
+                f"Hybrid OCR batch: {len(pending)} pages did not meet any threshold"
+            )
+
+        return [accepted[i] for i in range(len(image_paths))]
     
     def _get_provider_priority(self, quality_mode: str, daily_cost: float, budget_limit: float) -> List[str]:
         """Determine provider priority based on mode and budget constraints"""
@@ -692,10 +1639,32 @@ class HybridOCR(OCRProvider):
             # Good balance - try local first, fallback to cloud
             return base_priority
     
+    def get_cost_estimate(self, image_path: Union[str, Path]) -> float:
+        """Estimate for the provider routing tries first at today's spend
+
+        Escalations to later providers are not included; they only happen
+        when the first result is below its confidence threshold.
+        """
+        priority = self._resolve_priority(self._usage_db(), log=False)
+        for name in priority:
+            provider = self.providers.get(name)
+            # Handles that already failed to load are skipped by routing too
+            if provider is None or (
+                isinstance(provider, LazyProvider) and provider._error is not None
+            ):
+                continue
+            return float(provider.get_cost_estimate(image_path))
+        return 0.0
+
     def get_available_providers(self) -> List[str]:
         """Get list of available initialized providers"""
         return list(self.providers.keys())
 
+    def get_loaded_providers(self) -> List[str]:
+        """Get list of providers whose clients have actually been constructed"""
+        return [name for name, provider in self.providers.items()
+                if not isinstance(provider, LazyProvider) or provider.is_loaded]
+
 
 # Factory function to create OCR providers
 def create_ocr_provider(provider_name: str) -> OCRProvider:
@@ -709,7 +1678,9 @@ def create_ocr_provider(provider_name: str) -> OCRProvider:
     
     provider_config = providers_config[provider_name]
     
-    if provider_name == 'qwen':
+    if HybridOCR.provider_class(provider_name, provider_config) is SimulatedOCR:
+        return SimulatedOCR({'name': provider_name, **provider_config})
+    elif provider_name == 'qwen':
         return QwenOCR(provider_config)
     elif provider_name == 'tesseract':
         return TesseractOCR(provider_config)
@@ -720,4 +1691,4 @@ def create_ocr_provider(provider_name: str) -> OCRProvider:
     elif provider_name == 'hybrid':
         return HybridOCR(provider_config)
     else:
-        raise ValueError(f"Unknown OCR provider: {provider_name}")
\ No newline at end of file
+        raise ValueError(f"Unknown OCR provider: {provider_name}")
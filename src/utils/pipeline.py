@@ -0,0 +1,288 @@
+"""
+Staged processing pipeline with bounded queues
+
+Each stage pulls items from its own bounded queue and pushes results into
+the next stage's queue, so a slow stage applies backpressure upstream
+instead of letting work pile up in memory. I/O-bound stages run their
+function on worker threads; CPU-bound stages hand it to a shared process
+pool, with one dispatcher thread per worker bounding the work in flight.
+The pool spawns its workers rather than forking a process that is already
+running threads; they pick up tracing, metrics and profiling from the
+environment.
+
+With a ``MemoryBudget`` the feeder also reserves each item's estimated
+footprint before admitting it, and the reservation is re-estimated after
+every stage and released when the item completes.
+
+If the caller's ``on_result`` raises, or the run is interrupted, the
+feeder stops admitting items, workers pass the rest through unprocessed,
+queued process-pool work is cancelled and every reservation is released
+before the exception propagates.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import metrics
+from .memory_budget import MemoryBudget, rss_region
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+THREAD = "thread"
+PROCESS = "process"
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One step of the pipeline
+
+    ``func`` receives the previous stage's output. Returning None drops the
+    item from the remaining stages. Functions for process stages must be
+    picklable (module-level functions or ``functools.partial`` of them).
+    """
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    kind: str = THREAD
+
+    def __post_init__(self):
+        if self.kind not in (THREAD, PROCESS):
+            raise ValueError(f"Unknown stage kind: {self.kind}")
+        self.workers = max(1, int(self.workers))
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of one input item"""
+    index: int
+    source: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+    failed_stage: Optional[str] = None
+    reserved: int = 0   # Bytes held in the memory budget
+    peak_rss: int = 0   # Highest RSS sampled while its stages ran
+    started: float = 0.0  # perf_counter() when the first stage picked it up
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.value is not None
+
+
+class Pipeline:
+    """Run items through a sequence of stages concurrently
+
+    Results are reported through ``on_result`` on the calling thread as
+    they complete, and returned in input order once every item is done.
+    ``weigh`` estimates the bytes an item (or a stage's output) holds and
+    is required with ``budget``.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        queue_size: Optional[int] = None,
+        budget: Optional[MemoryBudget] = None,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        if budget is not None and weigh is None:
+            raise ValueError("A memory budget needs a weigh function")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.budget = budget
+        self.weigh = weigh
+
+    def run(
+        self,
+        items: Iterable[Any],
+        on_result: Optional[Callable[[PipelineResult], None]] = None,
+    ) -> List[PipelineResult]:
+        queues = [queue.Queue(maxsize=self._queue_size(stage)) for stage in self.stages]
+        results: "queue.Queue" = queue.Queue()
+        stop = threading.Event()
+        process_workers = sum(s.workers for s in self.stages if s.kind == PROCESS)
+        executor = (ProcessPoolExecutor(max_workers=process_workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+                    if process_workers else None)
+
+        threads = []
+        for position, stage in enumerate(self.stages):
+            outbox = (
+                queues[position + 1] if position + 1 < len(self.stages) else results
+            )
+            next_workers = (
+                self.stages[position + 1].workers
+                if position + 1 < len(self.stages)
+                else 1
+            )
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(
+                        stage,
+                        queues[position],
+                        outbox,
+                        next_workers,
+                        remaining,
+                        lock,
+                        executor,
+                        stop,
+                    ),
+                    name=f"pipeline-{stage.name}-{worker}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        feeder = threading.Thread(
+            target=self._feed,
+            args=(items, queues[0], self.stages[0].workers, stop),
+            name="pipeline-feeder",
+            daemon=True,
+        )
+        feeder.start()
+
+        collected: Dict[int, PipelineResult] = {}
+        finished = False
+        try:
+            while True:
+                result = results.get()
+                if result is _DONE:
+                    break
+                if self.budget is not None:
+                    self.budget.release(result.reserved)
+                    result.reserved = 0
+                collected[result.index] = result
+                if on_result:
+                    on_result(result)
+            finished = True
+        finally:
+            if not finished:
+                self._abort(stop, results, executor)
+            feeder.join()
+            for thread in threads:
+                thread.join()
+            if executor:
+                executor.shutdown()
+
+        return [collected[index] for index in sorted(collected)]
+
+    def _queue_size(self, stage: Stage) -> int:
+        # Default to two items waiting per worker: enough to keep workers busy
+        return self.queue_size if self.queue_size else stage.workers * 2
+
+    def _abort(self, stop: threading.Event, results: "queue.Queue",
+               executor: Optional[ProcessPoolExecutor]):
+        """Stop feeding and processing, then drain what is still in flight"""
+        stop.set()
+        if self.budget is not None:
+            self.budget.wake()
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        while True:
+            result = results.get()
+            if result is _DONE:
+                break
+            if self.budget is not None:
+                self.budget.release(result.reserved)
+                result.reserved = 0
+
+    def _feed(
+        self,
+        items: Iterable[Any],
+        inbox: "queue.Queue",
+        workers: int,
+        stop: threading.Event,
+    ):
+        try:
+            for index, item in enumerate(items):
+                if stop.is_set():
+                    break
+                result = PipelineResult(index=index, source=item, value=item)
+                if self.budget is not None:
+                    # Blocks until items in flight release enough of the budget
+                    result.reserved = self.budget.acquire(self.weigh(item), cancel=stop)
+                    if stop.is_set():
+                        self.budget.release(result.reserved)
+                        break
+                inbox.put(result)
+        finally:
+            for _ in range(workers):
+                inbox.put(_DONE)
+
+    def _work(
+        self,
+        stage: Stage,
+        inbox: "queue.Queue",
+        outbox: "queue.Queue",
+        next_workers: int,
+        remaining: List[int],
+        lock: threading.Lock,
+        executor: Optional[ProcessPoolExecutor],
+        stop: threading.Event,
+    ):
+        # Per-item peak RSS only feeds metrics and budget runs; otherwise don't
+        # poll for it
+        sample = self.budget is not None or metrics.is_enabled()
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            if not item.started:
+                item.started = time.perf_counter()
+
+            # Failed and dropped items, and anything after a stop, pass straight through
+            if item.error is None and item.value is not None and not stop.is_set():
+                try:
+                    with span(f"stage.{stage.name}", "stage"):
+                        if stage.kind == PROCESS:
+                            item.value, peak = executor.submit(
+                                _call_measured, stage.func, item.value, sample
+                            ).result()
+                        else:
+                            item.value, peak = _call_measured(
+                                stage.func, item.value, sample
+                            )
+                    item.peak_rss = max(item.peak_rss, peak)
+                    if self.budget is not None and item.value is not None:
+                        item.reserved = self.budget.resize(
+                            item.reserved, self.weigh(item.value)
+                        )
+                except Exception as e:
+                    logger.warning(
+                        f"Pipeline stage '{stage.name}' failed for {item.source}: {e}"
+                    )
+                    item.value = None
+                    item.error = e
+                    item.failed_stage = stage.name
+
+            outbox.put(item)
+
+        # The last worker of a stage closes the next stage's queue
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(next_workers):
+                outbox.put(_DONE)
+
+
+def _call_measured(
+    func: Callable[[Any], Any], value: Any, sample: bool = True
+) -> Tuple[Any, int]:
+    # Runs in the stage's worker so the RSS sampled is that process's
+    with rss_region(sample) as region:
+        result = func(value)
+    return result, region.peak
@@ -0,0 +1,249 @@
+"""
+Opt-in profiling of processing stages and files
+
+Two modes are available. ``cprofile`` runs the deterministic profiler and
+dumps a pstats file per profiled region; ``sample`` snapshots the stack of
+the profiled thread every few milliseconds and writes collapsed stacks
+(``frame;frame;frame count`` lines) that flamegraph.pl, speedscope or
+inferno turn into flame graphs.
+
+Regions are either the stages (decode, ocr, store, analyze, export) or
+whole files. Only every Nth region can be profiled, and results faster than
+a threshold are discarded, so a production worker can be profiled in place
+and keep only the slow outliers.
+"""
+
+import cProfile
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+OPTIONS_ENV = "GHOST_WRITER_PROFILE"
+
+CPROFILE = "cprofile"
+SAMPLE = "sample"
+MODES = (CPROFILE, SAMPLE)
+
+PER_STAGE = "stage"
+PER_FILE = "file"
+
+
+@dataclass
+class ProfileOptions:
+    """What to profile and where to write the results"""
+    mode: str = CPROFILE
+    output_dir: str = "data/profiles"
+    per: str = PER_STAGE
+    every_nth: int = 1              # Keep every Nth region of each kind, from the 1st
+    slower_than: float = 0.0        # Seconds; faster regions are discarded
+    sample_interval: float = 0.005  # Seconds between stack samples
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {self.mode}")
+        if self.per not in (PER_STAGE, PER_FILE):
+            raise ValueError(f"Unknown profiling granularity: {self.per}")
+        self.every_nth = max(1, int(self.every_nth))
+
+
+class StackSampler:
+    """Periodically records the call stack of one thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                location = f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}"
+                frames.append(f"{code.co_name} ({location})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(frames))] += 1
+
+    def write(self, path: Path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """Decides which regions to profile and writes their results
+
+    Only one cProfile region runs at a time per process; regions that start
+    while another is being profiled run unprofiled.
+    """
+
+    def __init__(self, options: ProfileOptions):
+        self.options = options
+        self.output_dir = Path(options.output_dir)
+        self.written = []
+        self._reset_state()
+
+    def _reset_state(self):
+        self._calls: Dict[str, int] = {}
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()
+
+    def _selected(self, kind: str) -> bool:
+        with self._lock:
+            index = self._calls.get(kind, 0)
+            self._calls[kind] = index + 1
+        return index % self.options.every_nth == 0
+
+    def _output_path(self, label: str, suffix: str) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in label)
+        return self.output_dir / f"{safe}.{os.getpid()}-{next(self._sequence)}.{suffix}"
+
+    @contextmanager
+    def region(self, kind: str, label: str) -> Iterator[None]:
+        """Profile the enclosed block if it is selected"""
+        if not self._selected(kind):
+            yield
+            return
+
+        if self.options.mode == CPROFILE:
+            if not self._cprofile_lock.acquire(blocking=False):
+                yield
+                return
+            profile = cProfile.Profile()
+            started = time.perf_counter()
+            try:
+                profile.enable()
+                try:
+                    yield
+                finally:
+                    profile.disable()
+            finally:
+                self._cprofile_lock.release()
+                self._keep(
+                    time.perf_counter() - started, label, "pstats", profile.dump_stats
+                )
+        else:
+            sampler = StackSampler(threading.get_ident(), self.options.sample_interval)
+            started = time.perf_counter()
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                self._keep(
+                    time.perf_counter() - started, label, "folded", sampler.write
+                )
+
+    def _keep(self, elapsed: float, label: str, suffix: str, writer):
+        if elapsed < self.options.slower_than:
+            return
+        path = self._output_path(label, suffix)
+        try:
+            writer(path)
+        except OSError as e:
+            logger.warning(f"Could not write profile {path}: {e}")
+            return
+        self.written.append(path)
+        logger.info(f"Profiled {label} ({elapsed:.2f}s) -> {path}")
+
+
+_profiler: Optional[Profiler] = None
+_current = threading.local()
+
+
+def enable(options: ProfileOptions) -> Profiler:
+    """Profile stages or files in this process and any worker processes it starts"""
+    from multiprocessing import util
+    global _profiler
+    os.environ[OPTIONS_ENV] = json.dumps(asdict(options))
+    _profiler = Profiler(options)
+    util.register_after_fork(_profiler, Profiler._reset_state)
+    return _profiler
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+def disable() -> Optional[Profiler]:
+    """Stop profiling; returns the profiler so callers can report what it wrote"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    os.environ.pop(OPTIONS_ENV, None)
+    return profiler
+
+
+def _label(stage: str) -> str:
+    file_path = getattr(_current, "file_path", None)
+    return f"{Path(file_path).stem}.{stage}" if file_path else stage
+
+
+@contextmanager
+def file_region(file_path: Union[str, Path]) -> Iterator[None]:
+    """Mark the file being processed; profiles the whole block when profiling files"""
+    previous = getattr(_current, "file_path", None)
+    _current.file_path = file_path
+    try:
+        profiler = _profiler
+        if profiler is not None and profiler.options.per == PER_FILE:
+            with profiler.region("file", f"{Path(file_path).stem}.file"):
+                yield
+        else:
+            yield
+    finally:
+        _current.file_path = previous
+
+
+def profiled(stage: str):
+    """Decorator marking a stage boundary; profiled when profiling per stage"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None or profiler.options.per != PER_STAGE:
+                return func(*args, **kwargs)
+            file_path = kwargs.get("file_path", args[0] if args else None)
+            if isinstance(file_path, Path):
+                label = f"{file_path.stem}.{stage}"
+            else:
+                label = _label(stage)
+            with profiler.region(stage, label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Worker processes started without fork pick profiling up from the environment
+if os.environ.get(OPTIONS_ENV):
+    try:
+        _profiler = Profiler(ProfileOptions(**json.loads(os.environ[OPTIONS_ENV])))
+    except (TypeError, ValueError) as e:
+        logger.warning(f"Ignoring invalid profiling options: {e}")
@@ -0,0 +1,238 @@
+"""
+Region-level OCR: split a page into ink regions, OCR them concurrently and
+stitch the results back into a single page-level OCRResult
+"""
+
+import shutil
+import tempfile
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .ocr_providers import OCRProvider, OCRResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Region:
+    """A crop of the page that contains ink"""
+    index: int
+    bbox: Tuple[int, int, int, int]  # x, y, width, height in page coordinates
+
+
+def _runs(mask: np.ndarray, min_gap: int) -> List[Tuple[int, int]]:
+    """Return (start, end) spans of True values, merging gaps shorter than min_gap"""
+    indices = np.flatnonzero(mask)
+    if indices.size == 0:
+        return []
+
+    # Split wherever the distance to the next inked index exceeds the gap
+    breaks = np.flatnonzero(np.diff(indices) > min_gap)
+    starts = np.concatenate(([indices[0]], indices[breaks + 1]))
+    ends = np.concatenate((indices[breaks], [indices[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def find_ink_regions(image: Image.Image, ink_threshold: int = 200, line_gap: int = 12,
+                     block_gap: int = 80, padding: int = 6,
+                     min_area: int = 64) -> List[Region]:
+    """Find ink blocks with row and column projection profiles
+
+    Rows are first grouped into text lines separated by at least ``line_gap``
+    blank rows; each line is then split into blocks wherever ``block_gap``
+    blank columns separate the ink. Regions are returned in reading order.
+    """
+    gray = np.asarray(image.convert('L'))
+    ink = gray < ink_threshold
+    height, width = ink.shape
+
+    regions: List[Region] = []
+    for top, bottom in _runs(ink.any(axis=1), line_gap):
+        band = ink[top:bottom]
+        for left, right in _runs(band.any(axis=0), block_gap):
+            if (right - left) * (bottom - top) < min_area:
+                continue
+            x0, y0 = max(0, left - padding), max(0, top - padding)
+            x1, y1 = min(width, right + padding), min(height, bottom + padding)
+            regions.append(Region(index=len(regions), bbox=(x0, y0, x1 - x0, y1 - y0)))
+
+    return regions
+
+
+class RegionOCR(OCRProvider):
+    """Wrap a provider so that it only sees the inked regions of a page
+
+    Mostly-white pages shrink to a handful of small crops, the crops are
+    recognized concurrently, and a region that fails is retried on its own
+    instead of redoing the whole page.
+
+    Providers that bill per image charge for every crop, so a page is sent
+    whole when its regions would cost more than the page itself (times
+    ``max_cost_ratio``) or when it has more than ``max_regions`` of them.
+    """
+
+    def __init__(
+        self, provider: OCRProvider, provider_config: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(provider_config or {})
+        self.provider = provider
+        self.max_workers = max(1, self.config.get('max_workers', 4))
+        self.retries = max(0, self.config.get('retries', 1))
+        self.max_regions = self.config.get('max_regions', 64)
+        self.max_cost_ratio = self.config.get('max_cost_ratio', 1.0)
+
+    def _detect_regions(self, image: Image.Image) -> List[Region]:
+        return find_ink_regions(
+            image,
+            ink_threshold=self.config.get('ink_threshold', 200),
+            line_gap=self.config.get('line_gap', 12),
+            block_gap=self.config.get('block_gap', 80),
+            padding=self.config.get('padding', 6),
+            min_area=self.config.get('min_area', 64)
+        )
+
+    def _ocr_region(self, crop_path: Path) -> OCRResult:
+        """OCR a single crop, retrying failed or errored attempts"""
+        result = None
+        for attempt in range(self.retries + 1):
+            try:
+                result = self.provider.extract_text(crop_path)
+                if 'error' not in result.metadata:
+                    return result
+            except Exception as e:
+                logger.warning(
+                    f"Region OCR attempt {attempt + 1} failed for {crop_path.name}: {e}"
+                )
+                result = OCRResult(text="", confidence=0.0, provider=self.provider.name,
+                                   processing_time=0.0, metadata={'error': str(e)})
+        return result
+
+    def extract_text(self, image_path: Union[str, Path]) -> OCRResult:
+        start_time = time.time()
+
+        try:
+            with Image.open(image_path) as source:
+                image = source.convert('L')
+        except Exception as e:
+            logger.error(f"Region OCR could not open {image_path}: {e}")
+            return OCRResult(text="", confidence=0.0, provider=self.provider.name,
+                             processing_time=time.time() - start_time,
+                             metadata={'error': str(e)})
+
+        regions = self._detect_regions(image)
+        if not regions:
+            logger.info(f"Region OCR found no ink in {Path(image_path).name}")
+            return OCRResult(text="", confidence=0.0, provider=self.provider.name,
+                             processing_time=time.time() - start_time,
+                             metadata={'regions': [], 'image_size': image.size})
+
+        crop_dir = Path(tempfile.mkdtemp(prefix="ghost_writer_regions_"))
+        try:
+            crop_paths = []
+            for region in regions:
+                x, y, w, h = region.bbox
+                crop_path = crop_dir / f"region_{region.index:04d}.png"
+                image.crop((x, y, x + w, y + h)).save(crop_path)
+                crop_paths.append(crop_path)
+
+            fallback = self._whole_page_reason(image_path, crop_paths)
+            if fallback:
+                logger.info(
+                    f"Region OCR sending {Path(image_path).name} whole: {fallback}"
+                )
+                result = self._ocr_region(Path(image_path))
+                result.metadata = {**result.metadata, 'region_fallback': fallback}
+                result.processing_time = time.time() - start_time
+                return result
+
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_workers, len(regions))
+            ) as executor:
+                region_results = list(executor.map(self._ocr_region, crop_paths))
+        finally:
+            shutil.rmtree(crop_dir, ignore_errors=True)
+
+        result = self._stitch(regions, region_results, image.size)
+        result.processing_time = time.time() - start_time
+
+        logger.info(f"Region OCR completed - {len(regions)} regions, "
+                    f"{len(result.text)} chars, confidence: {result.confidence:.2f}, "
+                    f"time: {result.processing_time:.2f}s")
+        return result
+
+    def _whole_page_reason(
+        self, image_path: Union[str, Path], crop_paths: List[Path]
+    ) -> Optional[str]:
+        """Why the page should be OCR'd whole instead of by region, if it should"""
+        if self.max_regions and len(crop_paths) > self.max_regions:
+            return f"{len(crop_paths)} regions exceed max_regions ({self.max_regions})"
+        page_cost = float(self.provider.get_cost_estimate(image_path))
+        region_cost = sum(
+            float(self.provider.get_cost_estimate(path)) for path in crop_paths
+        )
+        if region_cost > page_cost * self.max_cost_ratio:
+            return (
+                f"regions cost ${region_cost:.4f} against ${page_cost:.4f} for the page"
+            )
+        return None
+
+    def _stitch(self, regions: List[Region], region_results: List[OCRResult],
+                image_size: Tuple[int, int]) -> OCRResult:
+        """Combine region results in reading order with page-coordinate boxes"""
+        lines = []
+        bounding_boxes = []
+        word_confidences = []
+        region_metadata = []
+        weighted_confidence = 0.0
+        total_chars = 0
+
+        for region, result in zip(regions, region_results):
+            x, y, _, _ = region.bbox
+            text = result.text.strip()
+            region_metadata.append({
+                'bbox': region.bbox,
+                'text': text,
+                'confidence': result.confidence,
+                'provider': result.provider,
+                'error': result.metadata.get('error')
+            })
+
+            if not text:
+                continue
+
+            lines.append(text)
+            weighted_confidence += result.confidence * len(text)
+            total_chars += len(text)
+            word_confidences.extend(result.word_confidences)
+
+            # Shift word boxes from crop coordinates into page coordinates
+            for box in result.bounding_boxes:
+                bx, by, bw, bh = box['bbox']
+                bounding_boxes.append({**box, 'bbox': (bx + x, by + y, bw, bh),
+                                       'region': region.index})
+
+        providers = [r.provider for r in region_results if r.text.strip()]
+        return OCRResult(
+            text="\n".join(lines),
+            confidence=weighted_confidence / total_chars if total_chars else 0.0,
+            provider=providers[0] if providers else self.provider.name,
+            processing_time=0.0,
+            cost=sum(r.cost for r in region_results),
+            word_confidences=word_confidences,
+            bounding_boxes=bounding_boxes,
+            metadata={
+                'regions': region_metadata,
+                'image_size': image_size,
+                'failed_regions': sum(1 for r in region_metadata if r['error'])
+            }
+        )
+
+    def get_cost_estimate(self, image_path: Union[str, Path]) -> float:
+        return self.provider.get_cost_estimate(image_path)
@@ -8,10 +8,12 @@ to help organize scattered thoughts into coherent structures.
 import re
 import logging
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple, Optional, Set, Any
+from typing import Dict, List, Tuple, Optional, Set, Any, Union
 from enum import Enum
 import numpy as np
 
+from .spatial_index import SpatialIndex, bbox_center
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,6 +49,90 @@ class Relationship:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+ARROW_SYMBOLS = [
+    r'→', r'->', r'=>', r'⇒', r'↦',  # Right arrows
+    r'←', r'<-', r'<=', r'⇐', r'↤',  # Left arrows
+    r'↑', r'↓', r'⇑', r'⇓',          # Vertical arrows
+    r'↗', r'↘', r'↙', r'↖',          # Diagonal arrows
+]
+
+SEQUENCE_INDICATORS = [
+    r'\bthen\b', r'\bnext\b', r'\bafter\b', r'\bbefore\b',
+    r'\bfirst\b', r'\bsecond\b', r'\bthird\b', r'\blast\b',
+    r'\bfinally\b', r'\bstep\s+\d+\b'
+]
+
+# List markers at the start of (stripped) text and the least level each implies;
+# tried in this order, so "i." is a letter marker and "ii." a roman one
+HIERARCHY_MARKERS = re.compile(
+    r'(?P<number>\d+\.)'        # 1. 2. 3.
+    r'|(?P<letter>[a-zA-Z]\.)'  # a. b. c.
+    r'|(?P<roman>[ivx]+\.)'     # i. ii. iii.
+    r'|(?P<bullet>[•\-\*])'     # Bullets
+)
+MARKER_LEVELS = {'number': 1, 'letter': 2, 'roman': 3, 'bullet': 1}
+
+GROUPING_PATTERNS = [
+    r'\[.*?\]',     # Square brackets
+    r'\(.*?\)',     # Parentheses
+    r'\{.*?\}',     # Curly braces
+    r'\".*?\"',     # Quotes
+]
+
+
+@dataclass(frozen=True)
+class PatternMatch:
+    """A hit of one pattern of a family in an element's text"""
+    kind: str                # arrow, sequence or grouping
+    index: int               # position of the pattern in its family
+    pattern: str
+    text: str
+    span: Tuple[int, int]
+
+
+class PatternFamily:
+    """Alternative patterns found in a single scan of the text
+
+    The alternatives sit in one lookahead, so every position is tried once
+    and overlapping hits of different patterns are all seen. No two
+    alternatives of a family may match at the same position; the first one
+    listed would hide the other.
+    """
+
+    def __init__(self, kind: str, patterns: List[str], flags: int = 0):
+        self.kind = kind
+        self.patterns = list(patterns)
+        alternatives = '|'.join(
+            f'(?P<p{i}>{pattern})' for i, pattern in enumerate(self.patterns)
+        )
+        self.regex = re.compile(f'(?=(?:{alternatives}))', flags)
+
+    def scan(self, text: str, first_only: bool = False) -> List[PatternMatch]:
+        """Hits ordered by pattern, then position
+
+        Per pattern these are the non-overlapping hits ``finditer`` would
+        give, or just the first one (``search``) with ``first_only``.
+        """
+        hits: Dict[int, List[PatternMatch]] = {}
+        next_start: Dict[int, int] = {}
+        for match in self.regex.finditer(text):
+            group = match.lastgroup
+            index = int(group[1:])
+            start, end = match.span(group)
+            if start < next_start.get(index, 0) or (first_only and index in hits):
+                continue
+            next_start[index] = max(end, start + 1)
+            hit = PatternMatch(self.kind, index, self.patterns[index],
+                               match.group(group), (start, end))
+            hits.setdefault(index, []).append(hit)
+        return [hit for index in sorted(hits) for hit in hits[index]]
+
+
+ARROWS = PatternFamily('arrow', ARROW_SYMBOLS)
+SEQUENCES = PatternFamily('sequence', SEQUENCE_INDICATORS, re.IGNORECASE)
+GROUPINGS = PatternFamily('grouping', GROUPING_PATTERNS, re.DOTALL)
+
+
 class RelationshipDetector:
     """Detects relationships between elements in handwritten notes"""
     
@@ -57,16 +143,13 @@ class RelationshipDetector:
         self.hierarchy_patterns = self._compile_hierarchy_patterns()
         
     def _compile_arrow_patterns(self) -> List[re.Pattern]:
-        """Compile regex patterns for arrow detection"""
-        arrow_symbols = [
-            r'→', r'->', r'=>', r'⇒', r'↦',  # Right arrows
-            r'←', r'<-', r'<=', r'⇐', r'↤',  # Left arrows  
-            r'↑', r'↓', r'⇑', r'⇓',          # Vertical arrows
-            r'↗', r'↘', r'↙', r'↖',          # Diagonal arrows
-        ]
+        """Compile regex patterns for arrow detection, one per arrow form
         
+        Detection scans with ``ARROWS`` instead; these remain for callers
+        passing a single pattern to ``_create_arrow_relationship``.
+        """
         patterns = []
-        for arrow in arrow_symbols:
+        for arrow in ARROW_SYMBOLS:
             patterns.append(re.compile(f'{arrow}'))
             patterns.append(re.compile(f'\\s+{arrow}\\s+'))  # Arrows with spaces
             
@@ -86,12 +169,15 @@ class RelationshipDetector:
         """Main method to detect all relationships between note elements"""
         relationships = []
         
+        # One index over element centers answers every detector's neighbour queries
+        index = self._build_index(elements)
+
         # Detect different types of relationships
-        relationships.extend(self._detect_arrows(elements))
-        relationships.extend(self._detect_proximity(elements))
+        relationships.extend(self._detect_arrows(elements, index))
+        relationships.extend(self._detect_proximity(elements, index))
         relationships.extend(self._detect_hierarchy(elements))
-        relationships.extend(self._detect_grouping(elements))
-        relationships.extend(self._detect_sequences(elements))
+        relationships.extend(self._detect_grouping(elements, index))
+        relationships.extend(self._detect_sequences(elements, index))
         
         # Remove duplicates and sort by confidence
         relationships = self._deduplicate_relationships(relationships)
@@ -100,47 +186,61 @@ class RelationshipDetector:
         logger.info(f"Detected {len(relationships)} relationships between {len(elements)} elements")
         return relationships
     
-    def _detect_arrows(self, elements: List[NoteElement]) -> List[Relationship]:
+    def _build_index(self, elements: List[NoteElement]) -> SpatialIndex:
+        """Spatial index over element centers, in element order"""
+        return SpatialIndex.from_bboxes([element.bbox for element in elements],
+                                        cell_size=max(self.proximity_threshold, 1))
+
+    def _detect_arrows(self, elements: List[NoteElement],
+                       index: Optional[SpatialIndex] = None) -> List[Relationship]:
         """Detect arrow-based relationships between elements"""
         relationships = []
+        index = index or self._build_index(elements)
         
         for element in elements:
-            for pattern in self.arrow_patterns:
-                if pattern.search(element.text):
-                    # Find nearby elements that this arrow might connect
-                    nearby_elements = self._find_nearby_elements(element, elements, radius=100)
-                    
-                    for target in nearby_elements:
-                        if target.element_id != element.element_id:
-                            # Determine arrow direction and create relationship
-                            relationship = self._create_arrow_relationship(element, target, pattern)
-                            if relationship:
-                                relationships.append(relationship)
+            # First occurrence of each arrow symbol; the spaced forms only repeat these
+            arrows = ARROWS.scan(element.text, first_only=True)
+            if not arrows:
+                continue
+
+            # Find nearby elements that these arrows might connect
+            nearby_elements = self._find_nearby_elements(
+                element, elements, radius=100, index=index
+            )
+
+            for arrow in arrows:
+                for target in nearby_elements:
+                    if target.element_id != element.element_id:
+                        # Determine arrow direction and create relationship
+                        relationship = self._create_arrow_relationship(
+                            element, target, arrow
+                        )
+                        if relationship:
+                            relationships.append(relationship)
         
         return relationships
     
-    def _detect_proximity(self, elements: List[NoteElement]) -> List[Relationship]:
+    def _detect_proximity(self, elements: List[NoteElement],
+                          index: Optional[SpatialIndex] = None) -> List[Relationship]:
         """Detect relationships based on spatial proximity"""
         relationships = []
+        index = index or self._build_index(elements)
         
-        for i, element1 in enumerate(elements):
-            for element2 in elements[i+1:]:
-                distance = self._calculate_distance(element1.bbox, element2.bbox)
+        for i, j, distance in index.pairs_within(self.proximity_threshold):
+            if distance < self.proximity_threshold:
+                confidence = max(0.1, 1.0 - (distance / self.proximity_threshold))
                 
-                if distance < self.proximity_threshold:
-                    confidence = max(0.1, 1.0 - (distance / self.proximity_threshold))
-                    
-                    relationship = Relationship(
-                        source_id=element1.element_id,
-                        target_id=element2.element_id,
-                        relationship_type=RelationshipType.PROXIMITY,
-                        confidence=confidence,
-                        evidence={
-                            'distance': distance,
-                            'threshold': self.proximity_threshold
-                        }
-                    )
-                    relationships.append(relationship)
+                relationship = Relationship(
+                    source_id=elements[i].element_id,
+                    target_id=elements[j].element_id,
+                    relationship_type=RelationshipType.PROXIMITY,
+                    confidence=confidence,
+                    evidence={
+                        'distance': distance,
+                        'threshold': self.proximity_threshold
+                    }
+                )
+                relationships.append(relationship)
         
         return relationships
     
@@ -151,54 +251,56 @@ class RelationshipDetector:
         # Sort elements by vertical position (top to bottom)
         sorted_elements = sorted(elements, key=lambda e: e.bbox[1])
         
-        for i, element in enumerate(sorted_elements):
+        # Earlier elements that may still parent a later one, with strictly increasing
+        # levels. An element's parent is the closest earlier element with a lower level,
+        # so anything at or above its own level can never be a later element's parent
+        # once it is pushed.
+        stack: List[Tuple[int, NoteElement]] = []
+
+        for element in sorted_elements:
             hierarchy_level = self._determine_hierarchy_level(element)
+            while stack and stack[-1][0] >= hierarchy_level:
+                stack.pop()
             
-            if hierarchy_level > 0:
-                # Find parent element (previous element with lower hierarchy)
-                for j in range(i-1, -1, -1):
-                    parent_level = self._determine_hierarchy_level(sorted_elements[j])
-                    
-                    if parent_level < hierarchy_level:
-                        confidence = 0.8 - (0.1 * abs(hierarchy_level - parent_level - 1))
-                        
-                        relationship = Relationship(
-                            source_id=sorted_elements[j].element_id,
-                            target_id=element.element_id,
-                            relationship_type=RelationshipType.HIERARCHY,
-                            confidence=max(0.3, confidence),
-                            evidence={
-                                'parent_level': parent_level,
-                                'child_level': hierarchy_level,
-                                'pattern_match': True
-                            }
-                        )
-                        relationships.append(relationship)
-                        break
+            if hierarchy_level > 0 and stack:
+                parent_level, parent = stack[-1]
+                confidence = 0.8 - (0.1 * abs(hierarchy_level - parent_level - 1))
+
+                relationship = Relationship(
+                    source_id=parent.element_id,
+                    target_id=element.element_id,
+                    relationship_type=RelationshipType.HIERARCHY,
+                    confidence=max(0.3, confidence),
+                    evidence={
+                        'parent_level': parent_level,
+                        'child_level': hierarchy_level,
+                        'pattern_match': True
+                    }
+                )
+                relationships.append(relationship)
+
+            stack.append((hierarchy_level, element))
         
         return relationships
     
-    def _detect_grouping(self, elements: List[NoteElement]) -> List[Relationship]:
+    def _detect_grouping(self, elements: List[NoteElement],
+                         index: Optional[SpatialIndex] = None) -> List[Relationship]:
         """Detect visual grouping relationships (boxes, circles, etc.)"""
         relationships = []
+        index = index or self._build_index(elements)
         
-        # Look for grouping indicators in text
-        grouping_patterns = [
-            r'\[.*?\]',     # Square brackets
-            r'\(.*?\)',     # Parentheses  
-            r'\{.*?\}',     # Curly braces
-            r'\".*?\"',     # Quotes
-        ]
+        # Look for grouping indicators in text, one scan per element
+        scanned = [(element, GROUPINGS.scan(element.text)) for element in elements]
         
-        for pattern_str in grouping_patterns:
-            pattern = re.compile(pattern_str, re.DOTALL)
-            
-            for element in elements:
-                matches = pattern.finditer(element.text)
+        # Relationships stay ordered by pattern, then element
+        for pattern_index, pattern_str in enumerate(GROUPINGS.patterns):
+            for element, matches in scanned:
                 for match in matches:
+                    if match.index != pattern_index:
+                        continue
                     # Find other elements within this grouping
                     grouped_elements = self._find_elements_in_range(
-                        elements, element.bbox, match.span()
+                        elements, element.bbox, match.span, index=index
                     )
                     
                     # Create grouping relationships
@@ -211,55 +313,63 @@ class RelationshipDetector:
                                 confidence=0.7,
                                 evidence={
                                     'pattern': pattern_str,
-                                    'match_text': match.group()
+                                    'match_text': match.text
                                 }
                             )
                             relationships.append(relationship)
         
         return relationships
     
-    def _detect_sequences(self, elements: List[NoteElement]) -> List[Relationship]:
+    def _detect_sequences(self, elements: List[NoteElement],
+                          index: Optional[SpatialIndex] = None) -> List[Relationship]:
         """Detect sequential relationships (temporal, logical flow)"""
         relationships = []
-        
-        sequence_indicators = [
-            r'\bthen\b', r'\bnext\b', r'\bafter\b', r'\bbefore\b',
-            r'\bfirst\b', r'\bsecond\b', r'\bthird\b', r'\blast\b',
-            r'\bfinally\b', r'\bstep\s+\d+\b'
-        ]
+        index = index or self._build_index(elements)
         
         for element in elements:
-            for indicator in sequence_indicators:
-                if re.search(indicator, element.text, re.IGNORECASE):
-                    # Find contextually related elements
-                    nearby_elements = self._find_nearby_elements(element, elements, radius=150)
-                    
-                    for target in nearby_elements:
-                        if target.element_id != element.element_id:
-                            confidence = 0.6 + (0.2 * element.confidence)
-                            
-                            relationship = Relationship(
-                                source_id=element.element_id,
-                                target_id=target.element_id,
-                                relationship_type=RelationshipType.SEQUENCE,
-                                confidence=min(0.9, confidence),
-                                evidence={
-                                    'sequence_indicator': indicator,
-                                    'context_match': True
-                                }
-                            )
-                            relationships.append(relationship)
+            indicators = SEQUENCES.scan(element.text, first_only=True)
+            if not indicators:
+                continue
+
+            # Find contextually related elements (the same for every indicator)
+            nearby_elements = self._find_nearby_elements(
+                element, elements, radius=150, index=index
+            )
+
+            for indicator in indicators:
+                for target in nearby_elements:
+                    if target.element_id != element.element_id:
+                        confidence = 0.6 + (0.2 * element.confidence)
+
+                        relationship = Relationship(
+                            source_id=element.element_id,
+                            target_id=target.element_id,
+                            relationship_type=RelationshipType.SEQUENCE,
+                            confidence=min(0.9, confidence),
+                            evidence={
+                                'sequence_indicator': indicator.pattern,
+                                'context_match': True
+                            }
+                        )
+                        relationships.append(relationship)
         
         return relationships
-    
-    def _create_arrow_relationship(self, source: NoteElement, target: NoteElement, 
-                                 pattern: re.Pattern) -> Optional[Relationship]:
+
+    def _create_arrow_relationship(
+        self,
+        source: NoteElement,
+        target: NoteElement,
+        pattern: Union[PatternMatch, re.Pattern],
+    ) -> Optional[Relationship]:
         """Create an arrow relationship with proper direction"""
         # Determine arrow direction based on pattern and spatial relationship
-        match = pattern.search(source.text)
-        if not match:
-            return None
-        arrow_text = match.group()
+        if isinstance(pattern, PatternMatch):
+            arrow_text = pattern.text
+        else:
+            match = pattern.search(source.text)
+            if not match:
+                return None
+            arrow_text = match.group()
         
         # Simple direction detection based on arrow symbols
         if any(symbol in arrow_text for symbol in ['→', '->', '=>', '⇒']):
@@ -288,24 +398,19 @@ class RelationshipDetector:
             }
         )
     
-    def _find_nearby_elements(self, center: NoteElement, elements: List[NoteElement], 
-                            radius: int = 100) -> List[NoteElement]:
-        """Find elements within radius of center element"""
-        nearby = []
-        center_x, center_y = center.bbox[0] + center.bbox[2]//2, center.bbox[1] + center.bbox[3]//2
-        
-        for element in elements:
-            if element.element_id == center.element_id:
-                continue
-                
-            elem_x = element.bbox[0] + element.bbox[2]//2
-            elem_y = element.bbox[1] + element.bbox[3]//2
-            
-            distance = np.sqrt((elem_x - center_x)**2 + (elem_y - center_y)**2)
-            if distance <= radius:
-                nearby.append(element)
-        
-        return nearby
+    def _find_nearby_elements(
+        self,
+        center: NoteElement,
+        elements: List[NoteElement],
+        radius: int = 100,
+        index: Optional[SpatialIndex] = None,
+    ) -> List[NoteElement]:
+        """Find elements within radius of center element, in element order"""
+        index = index or self._build_index(elements)
+        center_x, center_y = bbox_center(center.bbox)
+        
+        return [elements[i] for i, _ in index.within(center_x, center_y, radius)
+                if elements[i].element_id != center.element_id]
     
     def _calculate_distance(self, bbox1: Tuple[int, int, int, int], 
                           bbox2: Tuple[int, int, int, int]) -> float:
@@ -337,28 +442,32 @@ class RelationshipDetector:
             indent_level = 1
         
         # Check for list markers and adjust level
-        if re.match(r'^\d+\.', text):  # 1. 2. 3.
-            return max(1, indent_level)
-        elif re.match(r'^[a-zA-Z]\.', text):  # a. b. c.
-            return max(2, indent_level) 
-        elif re.match(r'^[ivx]+\.', text):  # i. ii. iii.
-            return max(3, indent_level)
-        elif re.match(r'^[•\-\*]', text):  # Bullets
-            return max(1, indent_level)
+        marker = HIERARCHY_MARKERS.match(text)
+        if marker:
+            return max(MARKER_LEVELS[marker.lastgroup], indent_level)
         
         # Pure indentation-based level
         return indent_level
     
-    def _find_elements_in_range(self, elements: List[NoteElement], 
-                              bbox: Tuple[int, int, int, int], 
-                              text_range: Tuple[int, int]) -> List[NoteElement]:
+    def _find_elements_in_range(
+        self,
+        elements: List[NoteElement],
+        bbox: Tuple[int, int, int, int],
+        text_range: Tuple[int, int],
+        index: Optional[SpatialIndex] = None,
+    ) -> List[NoteElement]:
         """Find elements that fall within a text range"""
         # This is a simplified implementation
         # In practice, you'd need more sophisticated text-to-spatial mapping
-        nearby = self._find_nearby_elements(
-            NoteElement("temp", bbox, 1.0, "temp"), elements, radius=50
-        )
-        return nearby[:3]  # Return up to 3 nearby elements
+        index = index or self._build_index(elements)
+        center_x, center_y = bbox_center(bbox)
+        nearby = []
+        for i, _ in index.within(center_x, center_y, 50):
+            if elements[i].element_id != "temp":
+                nearby.append(elements[i])
+                if len(nearby) == 3:  # Return up to 3 nearby elements
+                    break
+        return nearby
     
     def _deduplicate_relationships(self, relationships: List[Relationship]) -> List[Relationship]:
         """Remove duplicate relationships, keeping highest confidence"""
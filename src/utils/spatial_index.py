@@ -0,0 +1,143 @@
+"""
+Uniform-grid spatial index over element centers
+
+Relationship detection asks the same neighbour questions many times per
+page: everything within a radius of an element, and every pair closer
+than the proximity threshold. Scanning every element for each question
+is quadratic; bucketing the centers into square cells once lets a query
+look only at the cells its radius overlaps.
+
+Results come back in element order (ascending index), so callers that
+used to scan the list linearly see exactly the same neighbours in the
+same order.
+"""
+
+import heapq
+import math
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+
+def bbox_center(bbox: Sequence[float]) -> Point:
+    """Center of an ``(x, y, width, height)`` box, as relationship detection has it"""
+    x, y, width, height = bbox[:4]
+    return x + width // 2, y + height // 2
+
+
+class SpatialIndex:
+    """Points bucketed into square cells of ``cell_size``"""
+
+    def __init__(self, points: Sequence[Point], cell_size: float = 100):
+        if cell_size <= 0:
+            raise ValueError(f"cell_size must be positive, got {cell_size}")
+        self.points = list(points)
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for index, (x, y) in enumerate(self.points):
+            self._cells.setdefault(self._cell(x, y), []).append(index)
+        columns = [cx for cx, _ in self._cells]
+        rows = [cy for _, cy in self._cells]
+        self._bounds = None
+        if self._cells:
+            self._bounds = (min(columns), min(rows), max(columns), max(rows))
+
+    @classmethod
+    def from_bboxes(
+        cls, bboxes: Sequence[Sequence[float]], cell_size: float = 100
+    ) -> "SpatialIndex":
+        return cls([bbox_center(bbox) for bbox in bboxes], cell_size)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _candidates(self, x: float, y: float, radius: float) -> Iterator[int]:
+        """Indices in the cells a circle of ``radius`` around (x, y) overlaps"""
+        min_cx, min_cy = self._cell(x - radius, y - radius)
+        max_cx, max_cy = self._cell(x + radius, y + radius)
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self._cells):
+            # A radius wider than the occupied area: walk the occupied cells instead
+            for (cx, cy), indices in self._cells.items():
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                    yield from indices
+            return
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                yield from self._cells.get((cx, cy), ())
+
+    def within(self, x: float, y: float, radius: float) -> List[Tuple[int, float]]:
+        """``(index, distance)`` of each point within ``radius`` of (x, y), by index"""
+        if radius < 0:
+            return []
+        found = []
+        for index in self._candidates(x, y, radius):
+            px, py = self.points[index]
+            distance = math.sqrt((px - x) ** 2 + (py - y) ** 2)
+            if distance <= radius:
+                found.append((index, distance))
+        found.sort()
+        return found
+
+    def pairs_within(self, radius: float) -> List[Tuple[int, int, float]]:
+        """``(i, j, distance)`` for each pair ``i < j`` within ``radius``, i then j"""
+        pairs = []
+        for i, (x, y) in enumerate(self.points):
+            neighbours = self.within(x, y, radius)
+            pairs.extend((i, j, distance) for j, distance in neighbours if j > i)
+        return pairs
+
+    def nearest(self, x: float, y: float, k: int = 1,
+                max_radius: Optional[float] = None) -> List[Tuple[int, float]]:
+        """The ``k`` closest points as ``(index, distance)``, nearest first
+
+        Ties go to the lower index.
+        """
+        if k <= 0 or not self.points:
+            return []
+        cx, cy = self._cell(x, y)
+        best: List[Tuple[float, int]] = []  # max-heap of (-distance, -index)
+        ring = 0
+        while True:
+            for cell in self._ring(cx, cy, ring):
+                for index in self._cells.get(cell, ()):
+                    px, py = self.points[index]
+                    distance = math.sqrt((px - x) ** 2 + (py - y) ** 2)
+                    if max_radius is not None and distance > max_radius:
+                        continue
+                    entry = (-distance, -index)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+            # Points outside this ring of cells are ``ring * cell_size`` away or more
+            reach = ring * self.cell_size
+            if len(best) == k and -best[0][0] < reach:
+                break
+            if max_radius is not None and reach >= max_radius:
+                break
+            if self._encloses_points(cx, cy, ring):
+                break
+            ring += 1
+        ranked = sorted(best, reverse=True)
+        return [(-neg_index, -neg_distance) for neg_distance, neg_index in ranked]
+
+    def _ring(self, cx: int, cy: int, ring: int) -> Iterator[Tuple[int, int]]:
+        """Cells at Chebyshev distance ``ring`` from (cx, cy)"""
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
+
+    def _encloses_points(self, cx: int, cy: int, ring: int) -> bool:
+        """Whether the rings searched so far cover every occupied cell"""
+        min_cx, min_cy, max_cx, max_cy = self._bounds
+        return (cx - ring <= min_cx and cy - ring <= min_cy
+                and cx + ring >= max_cx and cy + ring >= max_cy)
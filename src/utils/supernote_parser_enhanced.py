@@ -17,7 +17,10 @@ from enum import Enum, auto
 
 import numpy as np
 from PIL import Image, ImageDraw
+from PIL.PngImagePlugin import PngInfo
 from .exceptions import SupernoteParsingError, FileProcessingError
+from .image_preprocessing import DECODER_SOURCE_KEY, DECODER_SOURCE_VALUE
+from .tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -95,33 +98,34 @@ class SupernoteParser:
         
         logger.info(f"Parsing Supernote file: {file_path}")
         
-        try:
-            with open(file_path, 'rb') as f:
-                data = f.read()
-            
-            # Check magic signature
-            if data.startswith(self.NEW_FORMAT_SIGNATURE):
-                # Handle new format (SN_FILE_VER_20230015)
-                return self._parse_new_format(data)
-            elif not data.startswith(self.MAGIC_SIGNATURE):
-                # Try fallback parsing for older formats
-                return self._parse_fallback(data)
-            
-            # Parse header
-            self._parse_header(data)
-            
-            # Parse pages based on version
-            if self.version == 3:
-                return self._parse_v3_format(data)
-            elif self.version == 2:
-                return self._parse_v2_format(data)
-            else:
-                return self._parse_v1_format(data)
+        with span("parse", "decode", file=file_path.name):
+            try:
+                with open(file_path, 'rb') as f:
+                    data = f.read()
                 
-        except Exception as e:
-            logger.error(f"Failed to parse {file_path}: {e}")
-            # Try to extract as generic binary format
-            return self._parse_fallback(data)
+                # Check magic signature
+                if data.startswith(self.NEW_FORMAT_SIGNATURE):
+                    # Handle new format (SN_FILE_VER_20230015)
+                    return self._parse_new_format(data)
+                elif not data.startswith(self.MAGIC_SIGNATURE):
+                    # Try fallback parsing for older formats
+                    return self._parse_fallback(data)
+
+                # Parse header
+                self._parse_header(data)
+
+                # Parse pages based on version
+                if self.version == 3:
+                    return self._parse_v3_format(data)
+                elif self.version == 2:
+                    return self._parse_v2_format(data)
+                else:
+                    return self._parse_v1_format(data)
+
+            except Exception as e:
+                logger.error(f"Failed to parse {file_path}: {e}")
+                # Try to extract as generic binary format
+                return self._parse_fallback(data)
     
     def _parse_header(self, data: bytes):
         """Parse the file header to determine version and metadata"""
@@ -247,7 +251,15 @@ class SupernoteParser:
                     
                     if bitmap_data:
                         # Store decoded bitmap for image rendering
-                        decoded_bitmap = self._decode_ratta_rle(bitmap_data, 1404, 1872)
+                        with span(
+                            "decode_layer",
+                            "decode",
+                            layer=layer['name'],
+                            bytes=len(bitmap_data),
+                        ):
+                            decoded_bitmap = self._decode_ratta_rle(
+                                bitmap_data, 1404, 1872
+                            )
                         if page.metadata is None:
                             page.metadata = {}
                         page.metadata['decoded_bitmap'] = decoded_bitmap
@@ -1123,7 +1135,10 @@ class SupernoteParser:
             
             if bitmap_data:
                 # Decode using RLE decoder
-                decoded_bitmap = self._decode_ratta_rle(bitmap_data, 1404, 1872)
+                with span(
+                    "decode_layer", "decode", layer=layer_name, bytes=len(bitmap_data)
+                ):
+                    decoded_bitmap = self._decode_ratta_rle(bitmap_data, 1404, 1872)
                 
                 if decoded_bitmap is not None:
                     # Convert to PIL Image - use RGBA for transparency support
@@ -1137,7 +1152,8 @@ class SupernoteParser:
             visibility_overlay = build_visibility_overlay()
         
         # Composite layers using sn2md algorithm
-        return self._flatten_layers(layer_images, visibility_overlay)
+        with span("composite", "decode", page=page_number, layers=len(layer_images)):
+            return self._flatten_layers(layer_images, visibility_overlay)
     
     def _extract_multi_layer_info(self, data: bytes, page_number: int) -> List[Dict[str, Any]]:
         """Extract information about all layers for a specific page
@@ -1343,9 +1359,19 @@ class SupernoteParser:
                         width=max(1, int(stroke.thickness * scale))
                     )
         
+        # Mark decoded bitmaps as clean synthetic images so OCR skips denoising
+        decoded = bool(page.metadata and 'decoded_bitmap' in page.metadata)
+        if decoded:
+            image.info[DECODER_SOURCE_KEY] = DECODER_SOURCE_VALUE
+
         # Save if output path provided
         if output_path:
-            image.save(output_path)
+            if decoded and Path(output_path).suffix.lower() == ".png":
+                pnginfo = PngInfo()
+                pnginfo.add_text(DECODER_SOURCE_KEY, DECODER_SOURCE_VALUE)
+                image.save(output_path, pnginfo=pnginfo)
+            else:
+                image.save(output_path)
             logger.info(f"Rendered page to: {output_path}")
         
         return image
@@ -1448,7 +1474,8 @@ def convert_note_to_images(note_file: Path, output_dir: Path) -> List[Path]:
             
             # Render page to image
             try:
-                parser.render_page_to_image(page, output_path, scale=2.0)
+                with span("render", "decode", page=i + 1):
+                    parser.render_page_to_image(page, output_path, scale=2.0)
                 image_paths.append(output_path)
                 logger.info(f"Converted page {i+1}/{len(pages)}: {output_path}")
                 
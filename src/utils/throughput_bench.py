@@ -0,0 +1,308 @@
+"""
+End-to-end throughput benchmark for ``ghost-writer process``
+
+Runs the real CLI pipeline in a fresh interpreter per worker count, against
+a generated (or existing) corpus of .note notebooks, with a simulated OCR
+provider standing in for real ones. Each run gets its own working directory,
+so its database, metrics and outputs start empty. A run records throughput,
+per-file latency from the job manifest, peak RSS (the CLI process and, via
+the ``process_peak_rss_mb`` metric, its stage workers) and how much the database grew.
+
+Reports are JSON; ``compare_reports`` lines a report up against a previous
+one by corpus shape and worker count.
+"""
+
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .memory_budget import MB, count_note_pages
+
+REPORT_VERSION = 1
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DB_RELATIVE_PATH = Path("data/database/ghost_writer.db")
+
+# Report fields compared between runs, and whether a higher value is better
+COMPARED = {
+    "pages_per_min": True,
+    "file_p95_s": False,
+    "peak_rss_mb": False,
+    "db_growth_bytes": False,
+}
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """Shape of a generated corpus: ``files`` notebooks of ``pages`` pages each"""
+    files: int = 8
+    pages: int = 10
+    blank_share: float = 0.0
+    seed: int = 0
+
+    @property
+    def label(self) -> str:
+        return f"{self.files}x{self.pages}p blank={self.blank_share:g}"
+
+
+def generate_corpus(directory: Path, spec: CorpusSpec) -> Path:
+    """Write the corpus notebooks into ``directory``"""
+    from .note_generator import NotebookSpec, generate_notebook
+
+    directory = Path(directory)
+    for index in range(spec.files):
+        notebook = NotebookSpec(pages=spec.pages, layers=2,
+                                blank_pages=spec.blank_share,
+                                seed=spec.seed * 100003 + index)
+        generate_notebook(directory / f"notebook_{index:04d}.note", notebook)
+    return directory
+
+
+def count_corpus(directory: Path) -> Tuple[int, int]:
+    """Files the CLI would pick up in ``directory`` and their total pages"""
+    files = pages = 0
+    for path in Path(directory).rglob("*"):
+        suffix = path.suffix.lower()
+        if suffix == ".note":
+            files += 1
+            pages += max(1, count_note_pages(path))
+        elif suffix in {".png", ".jpg", ".jpeg", ".pdf"}:
+            files += 1
+            pages += 1
+    return files, pages
+
+
+def stub_ocr_config(
+    ocr_config: Dict[str, Any], latency_ms: float, seed: int = 0
+) -> Dict[str, Any]:
+    """OCR settings that route every page to one simulated provider"""
+    return {
+        **ocr_config,
+        "providers": {
+            "qwen": {
+                "type": "simulated",
+                "latency_ms": {
+                    "distribution": "lognormal",
+                    "median": max(latency_ms, 1e-3),
+                    "sigma": 0.3,
+                },
+                "confidence": 0.95,
+                "seed": seed,
+            },
+        },
+        "region": {**(ocr_config.get("region") or {}), "enabled": False},
+    }
+
+
+def _file_bytes(path: Path) -> int:
+    return sum(
+        candidate.stat().st_size
+        for candidate in (path, Path(f"{path}-wal"), Path(f"{path}-journal"))
+        if candidate.exists()
+    )
+
+
+def _empty_db_bytes(directory: Path) -> int:
+    """Size of a fresh database; growth is measured in whole SQLite pages"""
+    from .database import DatabaseManager
+
+    path = directory / "empty.db"
+    DatabaseManager(str(path))
+    size = _file_bytes(path)
+    path.unlink()
+    return size
+
+
+def _run_cli(
+    args: List[str], cwd: Path, env: Dict[str, str], log_path: Path
+) -> Tuple[int, float, int]:
+    """Run the CLI; returns exit code, wall seconds and its peak RSS in bytes"""
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "src.cli", *args],
+            cwd=cwd,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        if hasattr(os, "wait4"):
+            # wait4 reports the child's own rusage, not the sum over every child so far
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            peak = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        else:
+            proc.wait()
+            peak = 0
+    return proc.returncode, time.perf_counter() - started, peak
+
+
+def _job_durations(db_path: Path) -> List[float]:
+    """Per-file latency of the completed jobs, from the job manifest"""
+    if not db_path.exists():
+        return []
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT duration FROM processing_jobs "
+            "WHERE status = 'completed' AND duration IS NOT NULL"
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def _worker_peak_rss(db_path: Path) -> float:
+    """Highest ``process_peak_rss_mb`` any process of the run reported"""
+    if not db_path.exists():
+        return 0.0
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute("SELECT MAX(max_value) FROM metric_histograms "
+                           "WHERE metric = 'process_peak_rss_mb'").fetchone()
+    return row[0] or 0.0
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = int(round(percent / 100 * (len(ordered) - 1)))
+    return ordered[min(len(ordered) - 1, index)]
+
+
+def run_process(
+    corpus_dir: Path,
+    run_dir: Path,
+    workers: int,
+    base_config: Dict[str, Any],
+    ocr_latency_ms: float,
+    output_format: str = "json",
+) -> Dict[str, Any]:
+    """One ``ghost-writer process`` run over the corpus with ``workers`` workers"""
+    import yaml
+
+    run_dir = Path(run_dir)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    run_config = {
+        **base_config,
+        "ocr": stub_ocr_config(base_config.get("ocr") or {}, ocr_latency_ms),
+        "metrics": {**(base_config.get("metrics") or {}), "enabled": True},
+    }
+    processing = dict(base_config.get("processing") or {})
+    processing["artifacts"] = {**(processing.get("artifacts") or {}), "enabled": False}
+    run_config["processing"] = processing
+    config_path = run_dir / "config.yaml"
+    config_path.write_text(
+        yaml.safe_dump(run_config, sort_keys=False), encoding="utf-8"
+    )
+
+    python_path = [str(REPO_ROOT), os.environ.get("PYTHONPATH")]
+    env = {**os.environ, "GHOST_WRITER_CONFIG_PATH": str(config_path),
+           "PYTHONPATH": os.pathsep.join(filter(None, python_path))}
+    args = ["process", str(Path(corpus_dir).resolve()),
+            "--output", str(run_dir / "output"), "--workers", str(workers),
+            "--format", output_format, "--force"]
+    returncode, wall, cli_peak = _run_cli(args, run_dir, env, run_dir / "process.log")
+
+    files, pages = count_corpus(corpus_dir)
+    db_path = run_dir / DB_RELATIVE_PATH
+    durations = _job_durations(db_path)
+    db_bytes = _file_bytes(db_path) if db_path.exists() else 0
+    db_growth = max(0, db_bytes - _empty_db_bytes(run_dir))
+
+    return {
+        "workers": workers,
+        "files": files,
+        "pages": pages,
+        "returncode": returncode,
+        "failed": max(0, files - len(durations)),
+        "wall_s": wall,
+        "pages_per_min": pages / wall * 60 if wall else 0.0,
+        "files_per_min": files / wall * 60 if wall else 0.0,
+        "file_p50_s": statistics.median(durations) if durations else 0.0,
+        "file_p95_s": _percentile(durations, 95),
+        "peak_rss_mb": max(cli_peak / MB, _worker_peak_rss(db_path)),
+        "db_bytes": db_bytes,
+        "db_growth_bytes": db_growth,
+        "db_bytes_per_page": db_growth / pages if pages else 0.0,
+    }
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def build_report(
+    results: List[Dict[str, Any]], ocr_latency_ms: float
+) -> Dict[str, Any]:
+    return {
+        "version": REPORT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "ocr_latency_ms": ocr_latency_ms,
+        "results": results,
+    }
+
+
+def save_report(path: Path, report: Dict[str, Any]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    report = json.loads(Path(path).read_text(encoding="utf-8"))
+    if report.get("version") != REPORT_VERSION:
+        raise ValueError(f"Unsupported benchmark report version in {path}")
+    return report
+
+
+def _result_key(result: Dict[str, Any]) -> Tuple:
+    return result.get("corpus"), result["workers"]
+
+
+def compare_reports(
+    current: Dict[str, Any], previous: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Relative change of each compared field, per corpus and worker count in both"""
+    before = {_result_key(result): result for result in previous.get("results", [])}
+    comparisons = []
+    for result in current.get("results", []):
+        old = before.get(_result_key(result))
+        if old is None:
+            continue
+        changes = {}
+        for name, higher_is_better in COMPARED.items():
+            if old.get(name):
+                change = result[name] / old[name] - 1.0
+                changes[name] = {
+                    "before": old[name],
+                    "after": result[name],
+                    "change": change,
+                    "worse": change < 0 if higher_is_better else change > 0,
+                }
+        comparisons.append({"corpus": result.get("corpus"),
+                            "workers": result["workers"], "changes": changes})
+    return comparisons
+
+
+def corpus_fields(spec: Optional[CorpusSpec], corpus_dir: Path) -> Dict[str, Any]:
+    """Fields identifying the corpus a result was measured on"""
+    if spec is None:
+        return {"corpus": str(corpus_dir)}
+    return {
+        "corpus": spec.label,
+        **{f"corpus_{key}": value for key, value in asdict(spec).items()},
+    }
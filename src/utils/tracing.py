@@ -0,0 +1,239 @@
+"""
+Lightweight span tracing with Chrome trace-event export
+
+``span()`` marks a timed region of the pipeline. When tracing is off it
+returns a shared no-op context manager, so instrumented code pays one
+global lookup per span. When it is on, each finished span is recorded as a
+trace event with its process and thread, and ``finish()`` writes everything
+as Chrome trace-event JSON (open it in chrome://tracing or Perfetto).
+
+Worker processes started by the pipeline record their spans to a spool
+directory named in the environment; ``finish()`` merges them into the trace.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+SPOOL_ENV = "GHOST_WRITER_TRACE_SPOOL"
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def _now_us() -> float:
+    # Monotonic clock shared by every process on the machine
+    return time.monotonic_ns() / 1000.0
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(
+        self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.tracer._enter()
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = _now_us()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(
+            self.name, self.category, self.start, end - self.start, self.args
+        )
+        return False
+
+
+class Tracer:
+    """Collects finished spans of the current process
+
+    A tracer created with ``spool_dir`` only (no output) belongs to a worker
+    process: it appends its events to ``<spool_dir>/<pid>.jsonl`` whenever a
+    thread's outermost span ends.
+    """
+
+    def __init__(self, output_path: Optional[Union[str, Path]] = None,
+                 spool_dir: Optional[Union[str, Path]] = None):
+        self.output_path = Path(output_path) if output_path else None
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self._pid = os.getpid()
+        self._events: List[Dict[str, Any]] = []
+        self._named_threads = set()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def is_worker(self) -> bool:
+        return self.output_path is None
+
+    def span(self, name: str, category: str, args: Dict[str, Any]) -> _Span:
+        return _Span(self, name, category, args)
+
+    def _enter(self):
+        if os.getpid() != self._pid:
+            self._adopt_fork()
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+
+    def _adopt_fork(self):
+        # Forked worker: drop the parent's events, span depth and (possibly held) lock
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.output_path = None
+        self._events = []
+        self._named_threads = set()
+        self._local = threading.local()
+
+    def _record(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        duration: float,
+        args: Dict[str, Any],
+    ):
+        pid = os.getpid()
+        tid = threading.get_ident()
+        with self._lock:
+            if tid not in self._named_threads:
+                self._named_threads.add(tid)
+                self._events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": tid,
+                        "args": {"name": threading.current_thread().name},
+                    }
+                )
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": duration,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            self._events.append(event)
+
+        self._local.depth -= 1
+        if self._local.depth == 0 and self.is_worker and self.spool_dir:
+            self.flush()
+
+    def flush(self):
+        """Append buffered events to this process's spool file"""
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return
+        try:
+            with open(
+                self.spool_dir / f"{os.getpid()}.jsonl", "a", encoding="utf-8"
+            ) as f:
+                for event in events:
+                    f.write(json.dumps(event, default=str, separators=(",", ":")))
+                    f.write("\n")
+        except OSError as e:
+            logger.debug(f"Could not spool trace events: {e}")
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Events of this process followed by those spooled by workers"""
+        with self._lock:
+            events = list(self._events)
+        if self.spool_dir and self.spool_dir.exists():
+            for spool_file in sorted(self.spool_dir.glob("*.jsonl")):
+                with open(spool_file, "r", encoding="utf-8") as f:
+                    events.extend(json.loads(line) for line in f if line.strip())
+        return events
+
+    def save(self) -> Optional[Path]:
+        """Write the Chrome trace file"""
+        if self.output_path is None:
+            return None
+        events = self.events()
+        events.append({"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0,
+                       "args": {"name": "ghost-writer"}})
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f,
+                      default=str, separators=(",", ":"))
+        return self.output_path
+
+
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, category: str = "pipeline", **args):
+    """Context manager timing one region; a no-op unless tracing is enabled"""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, category, args)
+
+
+def traced(name: str, category: str = "pipeline"):
+    """Decorator form of ``span`` for whole functions"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with tracer.span(name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def is_enabled() -> bool:
+    return _tracer is not None
+
+
+def enable(output_path: Union[str, Path]) -> Tracer:
+    """Start tracing this process and any worker processes it starts"""
+    global _tracer
+    spool_dir = Path(tempfile.mkdtemp(prefix="ghost_writer_trace_"))
+    os.environ[SPOOL_ENV] = str(spool_dir)
+    _tracer = Tracer(output_path, spool_dir)
+    return _tracer
+
+
+def finish() -> Optional[Path]:
+    """Stop tracing and write the trace file; returns its path"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    os.environ.pop(SPOOL_ENV, None)
+    if tracer is None:
+        return None
+    try:
+        return tracer.save()
+    except OSError as e:
+        logger.error(f"Failed to write trace {tracer.output_path}: {e}")
+        return None
+    finally:
+        if tracer.spool_dir:
+            shutil.rmtree(tracer.spool_dir, ignore_errors=True)
+
+
+# Worker processes started without fork pick tracing up from the environment
+if os.environ.get(SPOOL_ENV):
+    _tracer = Tracer(spool_dir=os.environ[SPOOL_ENV])
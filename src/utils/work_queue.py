@@ -0,0 +1,242 @@
+"""
+Debounced work queue drained by long-lived worker threads
+
+File system events for the same path are collapsed into one pending entry.
+A path is handed to the workers once its size and modification time have
+stopped changing for the debounce period, so files that are still being
+written (for example by a sync client) are not picked up half-finished.
+Queued work is bounded; when the workers fall behind, stable paths stay
+pending instead of piling up in memory.
+"""
+
+import os
+import queue
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class _Pending:
+    """A path waiting for its writes to settle"""
+    first_seen: float
+    last_change: float
+    signature: Optional[Tuple[int, int]] = None
+
+
+@dataclass
+class QueueStats:
+    """Snapshot of the queue for monitoring"""
+    pending: int = 0
+    queued: int = 0
+    active: int = 0
+    processed: int = 0
+    failed: int = 0
+    dropped: int = 0
+
+    @property
+    def depth(self) -> int:
+        """Paths detected but not yet finished"""
+        return self.pending + self.queued + self.active
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """(size, mtime_ns) of a file, or None when it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class DebouncedWorkQueue:
+    """Deduplicate, debounce and process paths on a pool of worker threads
+
+    ``handler`` is called once per settled path on one of ``workers``
+    threads. Workers live as long as the queue, so anything they keep in
+    thread-local state (OCR providers, analysis components) stays warm.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Path], None],
+        workers: int = 1,
+        debounce: float = 1.0,
+        max_queued: int = 64,
+        poll_interval: Optional[float] = None,
+        missing_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.debounce = max(0.0, debounce)
+        self.poll_interval = poll_interval or max(
+            0.05, min(0.5, self.debounce / 4 or 0.05)
+        )
+        self.missing_timeout = (
+            missing_timeout
+            if missing_timeout is not None
+            else max(10.0, self.debounce * 10)
+        )
+        self.clock = clock
+
+        self._pending: Dict[Path, _Pending] = {}
+        self._ready: "queue.Queue" = queue.Queue(maxsize=max(1, max_queued))
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._stats = QueueStats()
+        self._unfinished = 0
+
+    def submit(self, path: Path):
+        """Register an event for ``path``; repeated events restart its debounce"""
+        path = Path(path)
+        now = self.clock()
+        with self._lock:
+            entry = self._pending.get(path)
+            if entry is None:
+                self._pending[path] = _Pending(first_seen=now, last_change=now,
+                                               signature=file_signature(path))
+                self._unfinished += 1
+            else:
+                entry.last_change = now
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop_event.clear()
+        scheduler = threading.Thread(
+            target=self._schedule, name="work-queue-scheduler", daemon=True
+        )
+        self._threads.append(scheduler)
+        for index in range(self.workers):
+            self._threads.append(
+                threading.Thread(
+                    target=self._work, name=f"work-queue-worker-{index}", daemon=True
+                )
+            )
+        for thread in self._threads:
+            thread.start()
+        logger.info(
+            f"Work queue started with {self.workers} workers, debounce {self.debounce}s"
+        )
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after the files currently being processed; pending paths are dropped"""
+        if not self._threads:
+            return
+        self._stop_event.set()
+        for _ in range(self.workers):
+            # Workers may be busy; make room rather than block shutdown
+            while True:
+                try:
+                    self._ready.put(_STOP, timeout=0.1)
+                    break
+                except queue.Full:
+                    try:
+                        item = self._ready.get_nowait()
+                    except queue.Empty:
+                        continue
+                    if item is _STOP:
+                        self._ready.put_nowait(item)
+                    else:
+                        self._finish("dropped")
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+        with self._lock:
+            if self._pending:
+                logger.info(
+                    f"Work queue stopped with {len(self._pending)} paths still pending"
+                )
+                self._stats.dropped += len(self._pending)
+                self._unfinished -= len(self._pending)
+                self._pending.clear()
+
+    def stats(self) -> QueueStats:
+        with self._lock:
+            stats = QueueStats(**self._stats.__dict__)
+            stats.pending = len(self._pending)
+        stats.queued = self._ready.qsize()
+        return stats
+
+    @property
+    def depth(self) -> int:
+        return self.stats().depth
+
+    def join(self, timeout: float = 10.0) -> bool:
+        """Wait until every submitted path has been processed (mainly for tests)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._unfinished == 0:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def _settled(self, now: float):
+        """Pending paths whose size and mtime held still for the debounce period"""
+        settled = []
+        with self._lock:
+            for path, entry in list(self._pending.items()):
+                if now - entry.last_change < self.debounce:
+                    continue
+                signature = file_signature(path)
+                if signature is None:
+                    if now - entry.first_seen >= self.missing_timeout:
+                        logger.info(
+                            f"Dropping {path}: file disappeared before it settled"
+                        )
+                        del self._pending[path]
+                        self._stats.dropped += 1
+                        self._unfinished -= 1
+                    continue
+                if signature != entry.signature:
+                    # Still being written; wait another debounce period
+                    entry.signature = signature
+                    entry.last_change = now
+                    continue
+                settled.append(path)
+        return settled
+
+    def _schedule(self):
+        while not self._stop_event.is_set():
+            for path in self._settled(self.clock()):
+                with self._lock:
+                    try:
+                        self._ready.put_nowait(path)
+                    except queue.Full:
+                        # Backpressure: leave the rest pending until workers catch up
+                        break
+                    self._pending.pop(path, None)
+            self._stop_event.wait(self.poll_interval)
+
+    def _work(self):
+        while True:
+            path = self._ready.get()
+            if path is _STOP:
+                return
+            with self._lock:
+                self._stats.active += 1
+            try:
+                self.handler(path)
+                outcome = "processed"
+            except Exception as e:
+                logger.error(f"Error processing {path}: {e}")
+                outcome = "failed"
+            with self._lock:
+                self._stats.active -= 1
+            self._finish(outcome)
+
+    def _finish(self, outcome: str):
+        with self._lock:
+            setattr(self._stats, outcome, getattr(self._stats, outcome) + 1)
+            self._unfinished -= 1
@@ -0,0 +1,81 @@
+"""
+Fixtures for the microbenchmarks
+
+``bench(func, *args, **kwargs)`` times a call and records it under the
+test's name. With ``--benchmark-save`` the results of the session are
+written as a JSON baseline; with ``--benchmark-compare`` a benchmark fails
+when its median is slower than the baseline by more than the tolerance.
+
+    BASELINE=reports/benchmarks/baseline.json
+    pytest tests/benchmarks --no-cov --benchmark-save $BASELINE
+    pytest tests/benchmarks --no-cov --benchmark-compare $BASELINE
+"""
+
+from pathlib import Path
+
+import pytest
+
+from tests.benchmarks import harness
+
+_results = {}
+
+
+@pytest.fixture(scope="session")
+def benchmark_baseline(request):
+    path = request.config.getoption("--benchmark-compare")
+    if not path:
+        return {}
+    if not Path(path).exists():
+        pytest.exit(f"Benchmark baseline not found: {path}", returncode=4)
+    return harness.load_baseline(Path(path))
+
+
+@pytest.fixture
+def bench(request, benchmark_baseline):
+    """Time a callable, record the result and check it against the baseline"""
+    name = request.node.nodeid.split("::", 1)[-1]
+    module = Path(request.node.fspath).stem.replace("test_bench_", "")
+    name = f"{module}::{name}"
+    tolerance = request.config.getoption("--benchmark-tolerance")
+
+    def run(func, *args, ops: int = 1, min_time: float = 0.5, min_rounds: int = 3,
+            warmup: bool = True, **kwargs):
+        result, stats = harness.measure(
+            lambda: func(*args, **kwargs),
+            min_time=min_time,
+            min_rounds=min_rounds,
+            ops=ops,
+            warmup=warmup,
+        )
+        _results[name] = stats
+        change, regressed = harness.compare(
+            stats, benchmark_baseline.get(name), tolerance
+        )
+        if regressed:
+            before = benchmark_baseline[name]["median_ms"]
+            pytest.fail(
+                f"{name} regressed {change:+.1%}: {before:.3f} ms -> "
+                f"{stats['median_ms']:.3f} ms (tolerance {tolerance:.0%})",
+                pytrace=False,
+            )
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _results:
+        return
+    baseline_path = config.getoption("--benchmark-compare")
+    baseline = {}
+    if baseline_path and Path(baseline_path).exists():
+        baseline = harness.load_baseline(Path(baseline_path))
+    terminalreporter.section("benchmarks (median)")
+    tolerance = config.getoption("--benchmark-tolerance")
+    for line in harness.format_report(_results, baseline, tolerance):
+        terminalreporter.write_line(line)
+
+    save_path = config.getoption("--benchmark-save")
+    if save_path:
+        saved = harness.save_baseline(Path(save_path), _results)
+        terminalreporter.write_line(f"Saved baseline: {saved}")
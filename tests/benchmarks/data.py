@@ -0,0 +1,103 @@
+"""
+Deterministic synthetic inputs for the microbenchmarks
+"""
+
+import random
+from typing import List
+
+import numpy as np
+
+from src.utils.concept_clustering import Concept
+from src.utils.relationship_detector import NoteElement
+
+PAGE_WIDTH, PAGE_HEIGHT = 1404, 1872
+
+INK, BACKGROUND = 0x61, 0x62
+
+_WORDS = ("project", "deadline", "review", "design", "meeting", "budget", "Alice",
+          "Berlin", "prototype", "customer", "research", "testing", "launch",
+          "roadmap", "metrics", "API")
+_TEMPLATES = (
+    "{0} {1} notes",
+    "1. {0} {1}",
+    "a. check {0}",
+    "- {0} and {1}",
+    "{0} -> {1}",
+    "need to {0} the {1}",
+    "Why is {0} late?",
+    "  {0} details",
+    "Meeting with {0} about {1}",
+    "#{0} @{1}",
+)
+
+
+def rle_stream(
+    kind: str, width: int = PAGE_WIDTH, height: int = PAGE_HEIGHT, seed: int = 0
+) -> bytes:
+    """RATTA_RLE (color, length) pairs covering a page
+
+    ``blank`` is all 16384-pixel background runs, ``sparse`` long background
+    runs with short strokes (typical handwriting), ``dense`` short runs of
+    every color (shading and scribbles).
+    """
+    rng = random.Random(seed)
+    out = bytearray()
+    remaining = width * height
+    while remaining > 0:
+        if kind == "blank":
+            color, length_byte, pixels = BACKGROUND, 0xFF, 16384
+        elif kind == "sparse" and rng.random() < 0.8:
+            # 0x89 is an extended-length marker
+            x = rng.choice([x for x in range(0, 0x30) if x != 9])
+            color, length_byte, pixels = BACKGROUND, 0x80 | x, (x + 1) * 64
+        else:
+            colors = range(0x61, 0x69) if kind == "dense" else (INK,)
+            length_byte = rng.randint(16, 40)
+            color, pixels = rng.choice(colors), length_byte + 1
+        out += bytes((color, length_byte))
+        remaining -= pixels
+    return bytes(out)
+
+
+def page_bitmap(
+    seed: int = 0, width: int = PAGE_WIDTH, height: int = PAGE_HEIGHT
+) -> np.ndarray:
+    """Grayscale page with horizontal pen strokes on a white background"""
+    rng = np.random.default_rng(seed)
+    bitmap = np.full((height, width), 255, dtype=np.uint8)
+    for row in range(60, height - 60, 48):
+        for start in rng.integers(40, width - 300, size=6):
+            bitmap[row:row + 3, start:start + int(rng.integers(40, 240))] = 0
+    return bitmap
+
+
+def note_elements(count: int, seed: int = 0) -> List[NoteElement]:
+    """Elements in lines down successive pages, with lists, arrows and questions"""
+    rng = random.Random(seed)
+    elements = []
+    for index in range(count):
+        line, column = divmod(index, 3)
+        words = rng.sample(_WORDS, 2)
+        text = rng.choice(_TEMPLATES).format(*words)
+        x = 60 + column * 420 + rng.randint(0, 30)
+        y = 60 + line * 45
+        elements.append(NoteElement(text=text, bbox=(x, y, 40 + 9 * len(text), 30),
+                                    confidence=0.9, element_id=f"element_{index}"))
+    return elements
+
+
+def concepts(count: int, seed: int = 0) -> List[Concept]:
+    """Concepts sharing keywords and elements, so clusters actually form"""
+    rng = random.Random(seed)
+    vocabulary = [
+        f"{word.lower()}{index}"
+        for index in range(max(4, count // 8))
+        for word in _WORDS[:4]
+    ]
+    types = ("topic", "action", "entity", "general")
+    return [
+        Concept(concept_id=f"concept_{index}", keywords=rng.sample(vocabulary, 3),
+                elements=[f"element_{rng.randrange(count * 2)}" for _ in range(2)],
+                confidence=rng.uniform(0.5, 1.0), concept_type=rng.choice(types))
+        for index in range(count)
+    ]
@@ -0,0 +1,148 @@
+"""
+Timing, baseline storage and regression checks for the microbenchmarks
+
+Each benchmark is run once to warm up, then repeatedly until it has taken
+``min_time`` seconds (and at least ``min_rounds`` rounds). Baselines are
+JSON files keyed by benchmark name; a result regresses when its median is
+more than ``tolerance`` slower than the baseline median.
+"""
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BASELINE_VERSION = 1
+DEFAULT_TOLERANCE = 0.25
+
+# Differences below this many milliseconds are timer noise, whatever the ratio
+NOISE_FLOOR_MS = 0.05
+
+
+def measure(
+    func: Callable[[], Any],
+    min_time: float = 0.5,
+    min_rounds: int = 3,
+    max_rounds: int = 200,
+    ops: int = 1,
+    warmup: bool = True,
+) -> Tuple[Any, Dict[str, Any]]:
+    """Time ``func``; returns its last result and the timing summary in milliseconds"""
+    # Warm-up: imports, caches, lazy initialisation
+    result = func() if warmup else None
+    samples: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_rounds or (
+        time.perf_counter() < deadline and len(samples) < max_rounds
+    ):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000.0)
+
+    median = statistics.median(samples)
+    stats = {
+        "median_ms": median,
+        "min_ms": min(samples),
+        "mean_ms": statistics.fmean(samples),
+        "stdev_ms": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "rounds": len(samples),
+    }
+    if ops > 1:
+        stats["ops"] = ops
+        stats["ops_per_sec"] = ops / (median / 1000.0) if median else 0.0
+    return result, stats
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_baseline(path: Path, results: Dict[str, Dict[str, Any]]) -> Path:
+    """Write results as a baseline, keeping entries for benchmarks that did not run"""
+    path = Path(path)
+    benchmarks = load_baseline(path) if path.exists() else {}
+    benchmarks.update(results)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "version": BASELINE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "benchmarks": dict(sorted(benchmarks.items())),
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, Any]]:
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    if payload.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported benchmark baseline version in {path}")
+    return payload.get("benchmarks", {})
+
+
+def compare(current: Dict[str, Any], baseline: Optional[Dict[str, Any]],
+            tolerance: float = DEFAULT_TOLERANCE) -> Tuple[Optional[float], bool]:
+    """Relative change of the median against the baseline, and whether it regressed"""
+    if not baseline or not baseline.get("median_ms"):
+        return None, False
+    before, after = baseline["median_ms"], current["median_ms"]
+    change = after / before - 1.0
+    return change, change > tolerance and after - before > NOISE_FLOOR_MS
+
+
+def format_report(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """One line per benchmark: median, spread, and the change against the baseline"""
+    width = max((len(name) for name in results), default=0)
+    lines = []
+    for name, stats in sorted(results.items()):
+        line = (
+            f"{name:<{width}}  {stats['median_ms']:10.3f} ms  "
+            f"(min {stats['min_ms']:.3f}, ±{stats['stdev_ms']:.3f}, "
+            f"{stats['rounds']} rounds)"
+        )
+        if "ops_per_sec" in stats:
+            line += f"  {stats['ops_per_sec']:,.0f} ops/s"
+        change, regressed = compare(stats, baseline.get(name), tolerance)
+        if change is not None:
+            line += f"  {change:+.1%}" + ("  REGRESSION" if regressed else "")
+        lines.append(line)
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Compare two result files
+
+    ``python -m tests.benchmarks.harness BASELINE CURRENT``
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    baseline, current = load_baseline(args.baseline), load_baseline(args.current)
+    for line in format_report(current, baseline, args.tolerance):
+        print(line)
+    regressions = [name for name, stats in current.items()
+                   if compare(stats, baseline.get(name), args.tolerance)[1]]
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
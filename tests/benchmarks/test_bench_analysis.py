@@ -0,0 +1,46 @@
+"""
+Benchmarks for relationship detection, concept extraction, clustering and structures
+"""
+
+import pytest
+
+from src.utils.concept_clustering import ConceptClusterer, ConceptExtractor
+from src.utils.relationship_detector import RelationshipDetector
+from src.utils.structure_generator import StructureGenerator
+from tests.benchmarks.data import concepts, note_elements
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("count", [100, 1000, 10000])
+def test_detect_relationships(bench, count):
+    """Relationship detection as the number of elements grows"""
+    detector = RelationshipDetector()
+    relationships = bench(detector.detect_relationships, note_elements(count))
+    assert relationships
+
+
+@pytest.mark.parametrize("count", [100, 1000, 10000])
+def test_extract_concepts(bench, count):
+    """Concept extraction as the number of elements grows"""
+    assert bench(ConceptExtractor().extract_concepts, note_elements(count))
+
+
+@pytest.mark.parametrize("count", [10, 20, 40, 80])
+def test_cluster_concepts(bench, count):
+    """Agglomerative clustering as the number of concepts grows"""
+    assert bench(ConceptClusterer().cluster_concepts, concepts(count), [])
+
+
+@pytest.mark.parametrize("count", [100, 1000])
+def test_generate_structures(bench, count):
+    """All structure types from a page of analysed elements"""
+    elements = note_elements(count)
+    relationships = RelationshipDetector().detect_relationships(elements)
+    extracted = ConceptExtractor().extract_concepts(elements)
+    clusters = ConceptClusterer().cluster_concepts(extracted, relationships)
+
+    generator = StructureGenerator()
+    assert bench(
+        generator.generate_structures, elements, extracted, clusters, relationships
+    )
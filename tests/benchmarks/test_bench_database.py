@@ -0,0 +1,101 @@
+"""
+Benchmarks for DatabaseManager write and read throughput
+"""
+
+import itertools
+
+import pytest
+
+from src.utils.database import DatabaseManager
+
+pytestmark = pytest.mark.benchmark
+
+BATCH = 200
+WRITES = 50  # Each write commits (and syncs) on its own
+CORPUS = 5000
+
+
+@pytest.fixture
+def database(tmp_path):
+    return DatabaseManager(str(tmp_path / "bench.db"))
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    database = DatabaseManager(str(tmp_path_factory.mktemp("bench") / "corpus.db"))
+    with database.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO notes (note_id, source_file, raw_text, clean_text, "
+            "ocr_provider, ocr_confidence) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    f"note_{index:05d}",
+                    f"page{index}.png",
+                    f"raw text {index} project review",
+                    f"clean text {index} project review",
+                    "tesseract" if index % 2 else "qwen",
+                    0.9,
+                )
+                for index in range(CORPUS)
+            ],
+        )
+    return database
+
+
+def test_insert_notes(bench, database):
+    """Notes inserted one call (and transaction) each"""
+    ids = itertools.count()
+
+    def insert_batch():
+        for _ in range(WRITES):
+            index = next(ids)
+            database.insert_note(
+                f"note_{index}",
+                f"page{index}.png",
+                "raw text",
+                "clean text",
+                "tesseract",
+                0.9,
+            )
+
+    bench(insert_batch, ops=WRITES)
+
+
+def test_track_ocr_usage(bench, database):
+    """Daily usage upserts, as done once per OCR call"""
+    bench(
+        lambda: [database.track_ocr_usage("qwen", 0.001) for _ in range(WRITES)],
+        ops=WRITES,
+    )
+
+
+def test_get_note(bench, corpus):
+    """Point lookups by note ID"""
+    bench(
+        lambda: [
+            corpus.get_note(f"note_{index:05d}")
+            for index in range(0, CORPUS, CORPUS // BATCH)
+        ],
+        ops=BATCH,
+    )
+
+
+@pytest.mark.parametrize("batch_size", [100, 1000])
+def test_iter_notes(bench, corpus, batch_size):
+    """Streaming the whole corpus with keyset pagination"""
+    def count_rows():
+        rows = corpus.iter_notes(("note_id", "clean_text"), batch_size=batch_size)
+        return sum(1 for _ in rows)
+
+    rows = bench(count_rows, ops=CORPUS)
+    assert rows == CORPUS
+
+
+def test_get_all_notes(bench, corpus):
+    """Loading every note at once"""
+    assert len(bench(corpus.get_all_notes)) == CORPUS
+
+
+def test_search_notes_by_text(bench, corpus):
+    """LIKE search over the text columns"""
+    assert bench(corpus.search_notes_by_text, "4999 project")
@@ -0,0 +1,87 @@
+"""
+Benchmarks for .note decoding, layer compositing, rendering and preprocessing
+"""
+
+import pytest
+from PIL import Image
+
+from src.utils.image_preprocessing import PreprocessingOptions, preprocess
+from src.utils.supernote_parser_enhanced import (
+    SupernoteParser,
+    SupernotePage,
+    VisibilityOverlay,
+)
+from tests.benchmarks.data import PAGE_HEIGHT, PAGE_WIDTH, page_bitmap, rle_stream
+from src.utils.note_generator import NotebookSpec, generate_notebook
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return SupernoteParser()
+
+
+@pytest.mark.parametrize("kind", ["blank", "sparse", "dense"])
+def test_rle_decode(bench, parser, kind):
+    """RATTA_RLE decode of a full page per input shape"""
+    data = rle_stream(kind)
+    bitmap = bench(parser._decode_ratta_rle, data, PAGE_WIDTH, PAGE_HEIGHT)
+    assert bitmap.shape == (PAGE_HEIGHT, PAGE_WIDTH)
+
+
+@pytest.mark.parametrize("pages", [
+    1,
+    10,
+    pytest.param(100, marks=pytest.mark.slow),
+])
+def test_parse_notebook(bench, parser, tmp_path, pages):
+    """Parsing a whole synthetic notebook as the page count grows"""
+    info = generate_notebook(
+        tmp_path / "bench.note", NotebookSpec(pages=pages, layers=2, gray_mix=0.2)
+    )
+    rounds = {} if pages == 1 else {"min_time": 0.0, "min_rounds": 1, "warmup": False}
+    assert len(bench(parser.parse_file, info.path, ops=pages, **rounds)) == pages
+
+
+@pytest.mark.parametrize("strategy", ["coordinate", "run_length", "bitmap_chunks"])
+def test_rle_fallback_strategies(bench, parser, strategy):
+    """Fallback decoding strategies on a handwriting-like stream"""
+    decode = getattr(parser, f"_decode_{strategy}_strategy")
+    bitmap = bench(decode, rle_stream("sparse"), PAGE_WIDTH, PAGE_HEIGHT)
+    assert bitmap.shape == (PAGE_HEIGHT, PAGE_WIDTH)
+
+
+def test_layer_compositing(bench, parser):
+    """Flattening a background and a main layer into one page"""
+    layers = {
+        "BGLAYER": Image.fromarray(page_bitmap(seed=1), mode="L").convert("RGBA"),
+        "MAINLAYER": Image.fromarray(page_bitmap(seed=2), mode="L").convert("RGBA"),
+    }
+    overlay = {name: VisibilityOverlay.DEFAULT for name in layers}
+    image = bench(parser._flatten_layers, layers, overlay)
+    assert image.size == (PAGE_WIDTH, PAGE_HEIGHT)
+
+
+@pytest.mark.parametrize("scale", [1.0, 1.5, 2.0])
+def test_render_page(bench, parser, scale):
+    """Rendering a decoded page at OCR scales"""
+    page = SupernotePage(page_id=1, width=PAGE_WIDTH, height=PAGE_HEIGHT, strokes=[],
+                         metadata={"decoded_bitmap": page_bitmap()})
+    image = bench(parser.render_page_to_image, page, scale=scale)
+    assert image.size == (int(PAGE_WIDTH * scale), int(PAGE_HEIGHT * scale))
+
+
+@pytest.mark.parametrize("steps", ["grayscale", "contrast", "denoise", "all"])
+def test_preprocess(bench, steps):
+    """OCR preprocessing of a rendered page"""
+    options = {
+        "grayscale": PreprocessingOptions(),
+        "contrast": PreprocessingOptions(enhance_contrast=True),
+        "denoise": PreprocessingOptions(remove_noise=True),
+        "all": PreprocessingOptions(
+            enhance_contrast=True, remove_noise=True, autocontrast=True
+        ),
+    }[steps]
+    image = Image.fromarray(page_bitmap(), mode="L").convert("RGB")
+    assert bench(preprocess, image, options).mode == "L"
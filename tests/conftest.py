@@ -253,6 +253,33 @@ def performance_tracker():
     return PerformanceTracker()
 
 
+def pytest_addoption(parser):
+    """Options for the microbenchmarks in tests/benchmarks"""
+    group = parser.getgroup("benchmarks")
+    group.addoption("--benchmark", action="store_true", default=False,
+                    help="Run the microbenchmarks (skipped otherwise)")
+    group.addoption("--benchmark-save", metavar="PATH", default=None,
+                    help="Store benchmark results as a JSON baseline "
+                         "(implies --benchmark)")
+    group.addoption("--benchmark-compare", metavar="PATH", default=None,
+                    help="Fail benchmarks slower than this baseline "
+                         "(implies --benchmark)")
+    group.addoption("--benchmark-tolerance", type=float, default=0.25,
+                    help="Allowed slowdown against the baseline, as a fraction "
+                         "(default 0.25)")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip benchmarks unless they were asked for"""
+    if (config.getoption("--benchmark") or config.getoption("--benchmark-save")
+            or config.getoption("--benchmark-compare")):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with --benchmark")
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            item.add_marker(skip)
+
+
 # Skip tests that require external resources
 def pytest_configure(config):
     """Configure pytest markers"""
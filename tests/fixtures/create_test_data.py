@@ -199,6 +199,32 @@ def create_test_data_json():
     print(f"Created test data file: {test_data_file}")
     return test_data
 
+
+def create_synthetic_notebooks():
+    """Create synthetic .note notebooks for scale and stress testing"""
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from src.utils.note_generator import NotebookSpec, generate_notebook
+
+    notes_dir = Path(__file__).parent / "synthetic_notes"
+    specs = {
+        "single_page": NotebookSpec(pages=1),
+        "layered_gray": NotebookSpec(
+            pages=10, layers=3, ink_density=0.04, gray_mix=0.3, seed=1
+        ),
+        "plain_lengths": NotebookSpec(pages=10, special_lengths=0.0, seed=2),
+        "large": NotebookSpec(pages=100, layers=2, seed=3),
+    }
+
+    created_files = []
+    for name, spec in specs.items():
+        info = generate_notebook(notes_dir / f"{name}.note", spec)
+        created_files.append(str(info.path))
+        print(f"Created notebook: {info.path} "
+              f"({spec.pages} pages, {info.size:,} bytes)")
+
+    return created_files
+
 if __name__ == "__main__":
     print("Creating Ghost Writer test data...")
     
@@ -206,13 +232,16 @@ if __name__ == "__main__":
     images = create_test_images()
     styles = create_style_corpus()  
     test_data = create_test_data_json()
+    notebooks = create_synthetic_notebooks()
     
     print("\n=== Test Data Summary ===")
     print(f"Test Images: {len(images)} created")
     print(f"Style Samples: {len(styles)} created") 
     print(f"Structured Test Data: Created with {len(test_data['sample_notes'])} sample notes")
+    print(f"Synthetic Notebooks: {len(notebooks)} created")
     print("\nTest data generation complete!")
     print("\nTo use in tests:")
     print("  - Images: tests/fixtures/sample_images/")
     print("  - Styles: tests/fixtures/style_samples/")
-    print("  - Data: tests/fixtures/test_data.json")
\ No newline at end of file
+    print("  - Data: tests/fixtures/test_data.json")
+    print("  - Notebooks: tests/fixtures/synthetic_notes/")
@@ -0,0 +1,152 @@
+"""
+Tests for stage artifacts and partial re-runs
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from src.utils.artifact_cache import STAGE_VERSIONS, ArtifactCache
+from src.utils.ocr_providers import OCRResult
+
+
+@pytest.mark.unit
+class TestArtifactCache:
+
+    def test_compute_stores_and_reuses(self, tmp_path):
+        """A second compute with the same inputs loads instead of producing"""
+        cache = ArtifactCache(tmp_path)
+        producer = Mock(return_value=[1, 2, 3])
+
+        key, value = cache.compute("elements", ["ocr-hash"], {}, producer)
+        again_key, again = cache.compute("elements", ["ocr-hash"], {}, producer)
+
+        assert (key, value) == (again_key, again)
+        assert producer.call_count == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_keys_follow_inputs_and_config(self, tmp_path):
+        """Changing an input key or the stage config gives a new key"""
+        cache = ArtifactCache(tmp_path)
+        key = cache.stage_key("clusters", ["a", "b"], {"similarity_threshold": 0.4})
+
+        assert key == cache.stage_key(
+            "clusters", ["a", "b"], {"similarity_threshold": 0.4}
+        )
+        assert key != cache.stage_key(
+            "clusters", ["a", "c"], {"similarity_threshold": 0.4}
+        )
+        assert key != cache.stage_key(
+            "clusters", ["a", "b"], {"similarity_threshold": 0.5}
+        )
+        assert key != cache.stage_key(
+            "concepts", ["a", "b"], {"similarity_threshold": 0.4}
+        )
+
+    def test_keys_follow_stage_code_version(self, tmp_path):
+        """Bumping a stage's code version gives it new keys"""
+        cache = ArtifactCache(tmp_path)
+        key = cache.stage_key("relationships", ["a"], {})
+        elements_key = cache.stage_key("elements", ["a"], {})
+
+        with patch.dict(STAGE_VERSIONS, {"relationships": "2"}):
+            assert cache.stage_key("relationships", ["a"], {}) != key
+            assert cache.stage_key("elements", ["a"], {}) == elements_key
+
+    def test_from_stage_forces_recompute_downstream(self, tmp_path):
+        """Stages from ``from_stage`` on are recomputed; earlier ones are reused"""
+        ArtifactCache(tmp_path).save("ocr", "k1", "ocr text")
+        ArtifactCache(tmp_path).save("clusters", "k2", ["cluster"])
+
+        cache = ArtifactCache(tmp_path, from_stage="relationships")
+
+        assert cache.load("ocr", "k1") == (True, "ocr text")
+        assert cache.load("clusters", "k2") == (False, None)
+
+    def test_unpicklable_values_are_not_stored(self, tmp_path):
+        """Failing to store only costs a future miss"""
+        cache = ArtifactCache(tmp_path)
+
+        assert not cache.save("elements", "k", lambda: None)
+        assert cache.load("elements", "k") == (False, None)
+
+    def test_unknown_stage_rejected(self, tmp_path):
+        """Only artifact stages can be recomputed from"""
+        with pytest.raises(ValueError):
+            ArtifactCache(tmp_path, from_stage="export")
+
+
+@pytest.mark.integration
+class TestPartialReruns:
+
+    def run_process(self, tmp_path, provider, *extra):
+        from src.cli import cli
+
+        with (
+            patch('src.cli.OCRProviderFactory') as factory,
+            patch('src.cli.DatabaseManager') as db,
+            patch('src.cli.config') as cli_config,
+        ):
+            factory.get_provider.return_value = provider
+            db.return_value.get_job.return_value = None
+            settings = {
+                "processing.artifacts": {
+                    "enabled": True,
+                    "path": str(tmp_path / "artifacts"),
+                }
+            }
+            cli_config.get.side_effect = lambda key, default=None: settings.get(
+                key, default
+            )
+            return CliRunner().invoke(
+                cli,
+                [
+                    'process',
+                    str(tmp_path / "page.png"),
+                    '-o',
+                    str(tmp_path / "out"),
+                    *extra,
+                ],
+            )
+
+    def test_reanalysis_reuses_ocr(self, tmp_path):
+        """--from-stage reruns analysis from cached OCR output"""
+        from PIL import Image
+
+        Image.new('L', (40, 40), 255).save(tmp_path / "page.png")
+        provider = Mock()
+        provider.extract_text.return_value = OCRResult(
+            text="Project plan\n- research options\n- write summary",
+            confidence=0.9, provider='fake', processing_time=0.0
+        )
+
+        first = self.run_process(tmp_path, provider)
+        assert first.exit_code == 0
+        assert "Artifacts reused: 0" in first.output
+
+        second = self.run_process(tmp_path, provider, '--from-stage', 'relationships')
+        assert second.exit_code == 0
+        assert provider.extract_text.call_count == 1
+        assert (
+            "Artifacts reused: 2, computed: 4" in second.output
+        )  # ocr and elements reused
+
+    def test_until_stage_skips_export(self, tmp_path):
+        """--until-stage stops before writing outputs"""
+        from PIL import Image
+
+        Image.new('L', (40, 40), 255).save(tmp_path / "page.png")
+        provider = Mock()
+        provider.extract_text.return_value = OCRResult(
+            text="Heading\n- point",
+            confidence=0.9,
+            provider='fake',
+            processing_time=0.0,
+        )
+
+        result = self.run_process(tmp_path, provider, '--until-stage', 'concepts')
+
+        assert result.exit_code == 0
+        assert "stopped after concepts" in result.output
+        assert not list((tmp_path / "out").glob("*.md"))
@@ -165,6 +165,41 @@ class TestDatabaseManager:
         success = test_db.update_note_text("nonexistent", "new text")
         assert not success
 
+    def test_iter_notes_keyset_pages(self, test_db):
+        """Streaming returns every note once, oldest first, across page boundaries"""
+        with test_db.get_connection() as conn:
+            for i in range(7):
+                conn.execute(
+                    "INSERT INTO notes "
+                    "(note_id, source_file, raw_text, ocr_provider, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        f"n{i}",
+                        f"f{i}.note",
+                        f"text {i}",
+                        "tesseract" if i % 2 else "qwen",
+                        f"2024-01-0{1 + i // 3} 10:00:00",
+                    ),
+                )
+            conn.commit()
+
+        rows = list(test_db.iter_notes(batch_size=2))
+        assert [r["note_id"] for r in rows] == [f"n{i}" for i in range(7)]
+
+        projected = list(
+            test_db.iter_notes(
+                columns=["raw_text"],
+                providers=["qwen"],
+                since="2024-01-02",
+                until="2024-01-03",
+                batch_size=1,
+            )
+        )
+        assert projected == [{"raw_text": "text 4"}]
+
+        with pytest.raises(ValueError):
+            list(test_db.iter_notes(columns=["raw_text; DROP TABLE notes"]))
+
 
 @pytest.mark.integration
 @pytest.mark.database
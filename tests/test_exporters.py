@@ -0,0 +1,224 @@
+"""
+Tests for streaming JSON and NDJSON export
+"""
+
+import csv
+import gzip
+import json
+from dataclasses import asdict
+from unittest.mock import patch
+
+import pytest
+
+from click.testing import CliRunner
+
+from src.utils.exporters import RAW_GZIP, export_note_json, write_corpus
+from src.utils.ocr_providers import OCRResult
+from src.utils.relationship_detector import NoteElement, Relationship, RelationshipType
+from src.utils.concept_clustering import Concept, ConceptCluster
+from src.utils.structure_generator import (
+    DocumentStructure,
+    StructureNode,
+    StructureType,
+)
+
+
+def _results():
+    ocr_result = OCRResult(text="Meeting notes", confidence=0.9, provider="tesseract",
+                           processing_time=0.5, raw_response={"huge": "x" * 1000})
+    elements = [NoteElement(text="Meeting notes", bbox=(0, 0, 100, 20), confidence=0.9,
+                            element_id="e1")]
+    concept = Concept(
+        concept_id="c1", keywords=["meeting"], elements=["e1"], confidence=0.8
+    )
+    clusters = [
+        ConceptCluster(
+            cluster_id="k1", concepts=[concept], theme="meetings", confidence=0.7
+        )
+    ]
+    relationships = [
+        Relationship(
+            source_id="e1",
+            target_id="e1",
+            relationship_type=RelationshipType.SIMILARITY,
+            confidence=0.5,
+        )
+    ]
+    child = StructureNode(node_id="n2", content="Agenda", node_type="bullet", level=1)
+    structures = [
+        DocumentStructure(
+            structure_id="s1",
+            structure_type=StructureType.OUTLINE,
+            title="Meeting",
+            confidence=0.6,
+            root_nodes=[
+                StructureNode(
+                    node_id="n1",
+                    content="Meeting",
+                    node_type="header",
+                    level=0,
+                    children=[child],
+                )
+            ],
+        )
+    ]
+    sections = [("elements", elements), ("concepts", [concept]), ("clusters", clusters),
+                ("relationships", relationships), ("structures", structures)]
+    return ocr_result, sections
+
+
+@pytest.mark.unit
+class TestJsonExport:
+
+    def test_compact_json_matches_asdict_without_raw_response(self, tmp_path):
+        """The streamed document holds the same data as asdict, minus raw payloads"""
+        ocr_result, sections = _results()
+        output_file = tmp_path / "note_data.json"
+
+        assert (
+            export_note_json(output_file, "note.note", ocr_result, sections)
+            == ["note_data.json"]
+        )
+
+        text = output_file.read_text()
+        data = json.loads(text)
+        assert "\n  " not in text
+        assert "raw_response" not in data["ocr_result"]
+        assert data["ocr_result"]["text"] == "Meeting notes"
+        expected = json.loads(
+            json.dumps(asdict(sections[4][1][0]), default=lambda o: o.value)
+        )
+        assert data["structures"][0] == expected
+        assert (
+            data["structures"][0]["root_nodes"][0]["children"][0]["content"] == "Agenda"
+        )
+        assert data["clusters"][0]["concepts"][0]["keywords"] == ["meeting"]
+
+    def test_pretty_json_is_equivalent(self, tmp_path):
+        """Pretty mode only changes whitespace"""
+        ocr_result, sections = _results()
+        export_note_json(tmp_path / "compact.json", "note.note", ocr_result, sections)
+        export_note_json(
+            tmp_path / "pretty.json", "note.note", ocr_result, sections, pretty=True
+        )
+
+        pretty = (tmp_path / "pretty.json").read_text()
+        assert "\n" in pretty.strip()
+        assert json.loads(pretty) == json.loads((tmp_path / "compact.json").read_text())
+
+    def test_ndjson_one_record_per_line(self, tmp_path):
+        """NDJSON starts with the note record followed by one line per item"""
+        ocr_result, sections = _results()
+        output_file = tmp_path / "note_data.ndjson"
+        export_note_json(output_file, "note.note", ocr_result, sections, ndjson=True)
+
+        records = [json.loads(line) for line in output_file.read_text().splitlines()]
+        assert [r["record"] for r in records] == [
+            "note", "element", "concept", "cluster", "relationship", "structure"]
+        assert records[0]["source_file"] == "note.note"
+        assert records[4]["relationship_type"] == RelationshipType.SIMILARITY.value
+
+    def test_raw_responses_written_to_gzip(self, tmp_path):
+        """Raw payloads can be kept in a separate compressed file"""
+        ocr_result, sections = _results()
+        written = export_note_json(
+            tmp_path / "note_data.json",
+            "note.note",
+            ocr_result,
+            sections,
+            raw_responses=RAW_GZIP,
+        )
+
+        assert written == ["note_data.json", "note_data_raw.json.gz"]
+        with gzip.open(tmp_path / "note_data_raw.json.gz", "rt") as f:
+            assert json.load(f)["raw_response"]["huge"] == "x" * 1000
+
+
+@pytest.mark.unit
+class TestCorpusExport:
+
+    def test_write_corpus_consumes_rows_lazily(self, tmp_path):
+        """Rows are written as they are produced, not collected first"""
+        produced = []
+
+        def rows():
+            for i in range(3):
+                # Every earlier row is already on disk when the next one is produced
+                assert len(produced) == i
+                produced.append(i)
+                yield {"note_id": f"n{i}", "raw_text": f"line {i}\nmore"}
+
+        count = write_corpus(
+            rows(), tmp_path / "corpus.csv", "csv", ["note_id", "raw_text"]
+        )
+
+        assert count == 3
+        with open(tmp_path / "corpus.csv", newline="", encoding="utf-8") as f:
+            records = list(csv.DictReader(f))
+        assert records[2] == {"note_id": "n2", "raw_text": "line 2\nmore"}
+
+    @pytest.mark.database
+    def test_export_corpus_command(self, test_db, tmp_path):
+        """The command streams filtered, projected rows to gzipped NDJSON"""
+        from src.cli import cli
+
+        test_db.insert_note("a", "a.note", "alpha", "", "qwen", 0.9)
+        test_db.insert_note("b", "b.note", "beta", "", "tesseract", 0.8)
+        output = tmp_path / "corpus.ndjson"
+
+        with patch("src.cli.DatabaseManager", return_value=test_db):
+            args = ["export-corpus", str(output), "--gzip", "--provider", "qwen"]
+            result = CliRunner().invoke(cli, [*args, "--columns", "note_id,raw_text"])
+
+        assert result.exit_code == 0, result.output
+        with gzip.open(f"{output}.gz", "rt", encoding="utf-8") as f:
+            assert [json.loads(line) for line in f] == [
+                {"note_id": "a", "raw_text": "alpha"}
+            ]
+
+    @pytest.mark.database
+    def test_export_corpus_fails_on_database_error_mid_stream(self, test_db, tmp_path):
+        """An error after the first page exits non-zero and leaves no truncated file"""
+        import sqlite3
+        from src.cli import cli
+
+        for name in "abc":
+            test_db.insert_note(name, f"{name}.note", name, "", "qwen", 0.9)
+        output = tmp_path / "corpus.ndjson"
+        real_connection = test_db.get_connection
+
+        class FailingConnection:
+            """Serves the first page, then fails like a locked or corrupt database"""
+
+            def __init__(self):
+                self.conn = real_connection()
+                self.queries = 0
+
+            def execute(self, *args):
+                self.queries += 1
+                if self.queries > 1:
+                    raise sqlite3.OperationalError("database disk image is malformed")
+                return self.conn.execute(*args)
+
+            def close(self):
+                self.conn.close()
+
+        with patch.object(test_db, "get_connection", FailingConnection), \
+                patch("src.cli.DatabaseManager", return_value=test_db):
+            result = CliRunner().invoke(
+                cli, ["export-corpus", str(output), "--batch-size", "1"]
+            )
+
+        assert result.exit_code == 1
+        assert "Export failed" in result.output
+        assert not output.exists()
+
+    def test_export_corpus_rejects_unknown_columns(self, tmp_path):
+        """Unknown columns fail before touching the database"""
+        from src.cli import cli
+
+        result = CliRunner().invoke(cli, ["export-corpus", str(tmp_path / "out.csv"),
+                                          "--columns", "note_id,secret"])
+
+        assert result.exit_code != 0
+        assert "unknown columns: secret" in result.output
@@ -296,4 +296,75 @@ class TestFileWatcher:
         watcher._scan_for_new_files()
         
         # File should still be tracked
-        assert str(test_file) in watcher.last_seen_files
\ No newline at end of file
+        assert str(test_file) in watcher.last_seen_files
+
+
+@pytest.mark.unit
+class TestDirectoryScanner:
+    """Test the single-pass scanner and its snapshot"""
+
+    def test_scan_tree_single_walk(self, tmp_path):
+        """Nested supported files are found with case-insensitive extensions"""
+        from src.utils.directory_scanner import scan_tree
+
+        (tmp_path / "sub" / "deeper").mkdir(parents=True)
+        (tmp_path / "a.note").write_bytes(b"12345")
+        (tmp_path / "sub" / "B.PNG").touch()
+        (tmp_path / "sub" / "deeper" / "c.pdf").touch()
+        (tmp_path / "sub" / "skip.txt").touch()
+
+        with patch('pathlib.Path.rglob', side_effect=AssertionError("rglob used")):
+            found = scan_tree(tmp_path, NoteFileHandler.SUPPORTED_EXTENSIONS)
+
+        assert sorted(Path(p).name for p in found) == ["B.PNG", "a.note", "c.pdf"]
+        assert found[str(tmp_path / "a.note")][0] == 5
+
+    def test_modified_files_detected(self, tmp_path):
+        """A rewritten file is reported again; deletions are tracked"""
+        import os
+        callback = Mock()
+        watcher = FileWatcher(tmp_path, callback)
+        note = tmp_path / "note.note"
+        other = tmp_path / "other.png"
+        note.write_bytes(b"v1")
+        other.touch()
+        watcher._scan_for_new_files()
+        callback.reset_mock()
+
+        note.write_bytes(b"version 2")
+        os.utime(note, ns=(1, 2))
+        other.unlink()
+        watcher._scan_for_new_files()
+
+        callback.assert_called_once_with(note)
+        assert watcher.last_seen_files == {str(note)}
+
+    def test_snapshot_persists_across_restarts(self, tmp_path):
+        """A restarted watcher only reports files that changed while it was down"""
+        watch_dir = tmp_path / "notes"
+        watch_dir.mkdir()
+        snapshot = tmp_path / "state" / "snapshot.json"
+        (watch_dir / "old.note").touch()
+
+        first = FileWatcher(watch_dir, Mock(), snapshot_path=snapshot)
+        first._scan_for_new_files()
+        assert snapshot.exists()
+
+        (watch_dir / "new.note").touch()
+        callback = Mock()
+        FileWatcher(watch_dir, callback, snapshot_path=snapshot)._scan_for_new_files()
+
+        callback.assert_called_once_with(watch_dir / "new.note")
+
+    def test_processed_files_bounded(self):
+        """The handler remembers a bounded number of recent paths"""
+        from watchdog.events import FileCreatedEvent
+
+        callback = Mock()
+        handler = NoteFileHandler(callback, max_tracked=3)
+        for i in range(5):
+            handler.on_created(FileCreatedEvent(f"/notes/page{i}.png"))
+
+        assert len(handler.processed_files) == 3
+        assert "/notes/page0.png" not in handler.processed_files
+        assert "/notes/page4.png" in handler.processed_files
@@ -0,0 +1,146 @@
+"""
+Tests for the grayscale-native preprocessing pipeline
+"""
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+from PIL.PngImagePlugin import PngInfo
+
+from src.utils.image_preprocessing import (
+    DECODER_SOURCE_KEY, DECODER_SOURCE_VALUE, PreprocessingOptions,
+    preprocess, preprocess_image_file, preprocessing_cache
+)
+
+
+def noisy_page(mode='L', size=(160, 120)):
+    rng = np.random.default_rng(7)
+    pixels = rng.integers(40, 230, (size[1], size[0])).astype(np.uint8)
+    image = Image.fromarray(pixels, 'L')
+    return image.convert(mode) if mode != 'L' else image
+
+
+def legacy_pipeline(image, options):
+    """The original separate-pass preprocessing"""
+    if options.enhance_contrast:
+        image = ImageEnhance.Contrast(image).enhance(options.contrast_factor)
+    if options.remove_noise:
+        image = image.filter(ImageFilter.MedianFilter(3))
+    if options.autocontrast:
+        image = ImageOps.autocontrast(image)
+    return image
+
+
+@pytest.mark.unit
+class TestPreprocess:
+
+    @pytest.mark.parametrize("enhance_contrast,remove_noise,autocontrast", [
+        (True, True, True),
+        (True, False, False),
+        (False, True, True),
+        (True, False, True),
+    ])
+    def test_fused_pipeline_matches_separate_passes(
+        self, enhance_contrast, remove_noise, autocontrast
+    ):
+        """The fused LUT produces the same pixels as the original passes"""
+        options = PreprocessingOptions(
+            enhance_contrast=enhance_contrast,
+            remove_noise=remove_noise,
+            autocontrast=autocontrast,
+        )
+        image = noisy_page()
+
+        expected = np.asarray(legacy_pipeline(image, options))
+        actual = np.asarray(preprocess(image, options))
+
+        assert np.array_equal(expected, actual)
+
+    def test_rgb_mode_matches_separate_passes(self):
+        """Disabling grayscale keeps the legacy RGB output"""
+        options = PreprocessingOptions(grayscale=False, enhance_contrast=True,
+                                       remove_noise=True, autocontrast=True)
+        image = noisy_page('RGB')
+
+        result = preprocess(image, options)
+
+        assert result.mode == 'RGB'
+        assert np.array_equal(
+            np.asarray(legacy_pipeline(image, options)), np.asarray(result)
+        )
+
+    def test_grayscale_stays_single_channel(self):
+        """Grayscale and color inputs both come out as 8-bit single channel"""
+        options = PreprocessingOptions(enhance_contrast=True)
+
+        assert preprocess(noisy_page(), options).mode == 'L'
+        assert preprocess(noisy_page('RGB'), options).mode == 'L'
+
+    def test_decoder_images_skip_denoising(self):
+        """Median filtering is skipped for decoder-rendered bitmaps"""
+        options = PreprocessingOptions(remove_noise=True)
+        image = noisy_page()
+        image.info[DECODER_SOURCE_KEY] = DECODER_SOURCE_VALUE
+
+        assert np.array_equal(np.asarray(preprocess(image, options)), np.asarray(image))
+
+    def test_from_config_maps_legacy_keys(self):
+        """The deskew key keeps enabling autocontrast"""
+        options = PreprocessingOptions.from_config(
+            {'enhance_contrast': True, 'deskew': True}
+        )
+
+        assert options.autocontrast
+        assert options.enhance_contrast
+        assert options.grayscale
+
+
+@pytest.mark.unit
+class TestPreprocessImageFile:
+
+    def setup_method(self):
+        preprocessing_cache.clear()
+
+    def test_results_memoized_per_file_and_options(self, tmp_path):
+        """A second call with the same file and options is served from cache"""
+        path = tmp_path / "page.png"
+        noisy_page().save(path)
+        options = PreprocessingOptions(remove_noise=True)
+
+        first = preprocess_image_file(path, options)
+        second = preprocess_image_file(path, options)
+        preprocess_image_file(path, PreprocessingOptions())
+
+        assert np.array_equal(np.asarray(first), np.asarray(second))
+        assert first is not second
+        assert preprocessing_cache.hits == 1
+        assert preprocessing_cache.misses == 2
+
+    def test_modified_file_is_reprocessed(self, tmp_path):
+        """Changing the file invalidates its cache entry"""
+        path = tmp_path / "page.png"
+        noisy_page().save(path)
+        options = PreprocessingOptions()
+        preprocess_image_file(path, options)
+
+        Image.new('L', (10, 10), color=0).save(path)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert preprocess_image_file(path, options).size == (10, 10)
+
+    def test_decoder_marker_read_from_png(self, tmp_path):
+        """The PNG text chunk written by the decoder disables denoising"""
+        path = tmp_path / "decoded.png"
+        pnginfo = PngInfo()
+        pnginfo.add_text(DECODER_SOURCE_KEY, DECODER_SOURCE_VALUE)
+        image = noisy_page()
+        image.save(path, pnginfo=pnginfo)
+
+        result = preprocess_image_file(
+            path, PreprocessingOptions(remove_noise=True), use_cache=False
+        )
+
+        assert np.array_equal(np.asarray(result), np.asarray(image))
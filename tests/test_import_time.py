@@ -0,0 +1,69 @@
+"""
+Startup regression tests: light CLI commands must not load the OCR stack
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ["numpy", "PIL", "pytesseract", "yaml", "src.utils.ocr_providers"]
+
+
+def modules_after(code: str) -> set:
+    """Run code in a fresh interpreter and return the loaded module names"""
+    result = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys; print('\\n'.join(sys.modules))"],
+        capture_output=True, text=True, cwd=REPO_ROOT, check=True
+    )
+    return set(result.stdout.split())
+
+
+@pytest.mark.integration
+class TestCLIStartup:
+
+    def test_importing_cli_defers_heavy_modules(self):
+        """Importing the CLI loads neither the OCR stack nor the config file parser"""
+        loaded = modules_after("import src.cli")
+
+        assert not [name for name in HEAVY_MODULES if name in loaded]
+
+    def test_help_does_not_load_ocr_stack(self):
+        """--help stays on the light import path"""
+        loaded = modules_after(
+            "from click.testing import CliRunner\n"
+            "from src.cli import cli\n"
+            "assert CliRunner().invoke(cli, ['--help']).exit_code == 0"
+        )
+
+        assert not [name for name in HEAVY_MODULES if name in loaded]
+
+    def test_lazy_names_resolve_on_access(self):
+        """Pipeline classes are still reachable as attributes of src.cli"""
+        import src.cli
+        from src.utils.ocr_providers import HybridOCR
+
+        assert src.cli.HybridOCR is HybridOCR
+
+    def test_no_forbidden_modules_at_startup(self):
+        """No module listed in the budget file is imported eagerly"""
+        result = subprocess.run(
+            [sys.executable, "scripts/import_time_benchmark.py", "--modules-only"],
+            capture_output=True, text=True, cwd=REPO_ROOT
+        )
+
+        assert result.returncode == 0, result.stdout + result.stderr
+
+    @pytest.mark.slow
+    @pytest.mark.benchmark
+    def test_import_time_budget(self):
+        """The tracked import-time budget holds; machine dependent, so opt-in"""
+        result = subprocess.run(
+            [sys.executable, "scripts/import_time_benchmark.py", "--runs", "3"],
+            capture_output=True, text=True, cwd=REPO_ROOT
+        )
+
+        assert result.returncode == 0, result.stdout + result.stderr
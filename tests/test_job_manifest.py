@@ -0,0 +1,188 @@
+"""
+Tests for the content-hash job manifest and resumable processing
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from src.utils.job_manifest import (
+    JobManifest, COMPLETED, FAILED, IN_PROGRESS, make_job_key, make_note_id
+)
+from src.utils.ocr_providers import OCRResult
+
+OPTIONS = {
+    "format": "markdown",
+    "quality": "balanced",
+    "local_only": False,
+    "regions": False,
+}
+
+
+@pytest.mark.unit
+class TestJobKeys:
+
+    def test_keys_depend_on_content_path_and_options(self):
+        """Job keys follow content, path and options; note IDs only OCR options"""
+        key = make_job_key("abc", "/notes/a.note", OPTIONS)
+
+        assert key == make_job_key(
+            "abc", "/notes/a.note", dict(reversed(list(OPTIONS.items())))
+        )
+        assert key != make_job_key("abd", "/notes/a.note", OPTIONS)
+        assert key != make_job_key("abc", "/notes/copy.note", OPTIONS)
+        assert key != make_job_key(
+            "abc", "/notes/a.note", {**OPTIONS, "format": "json"}
+        )
+        assert key != make_job_key(
+            "abc", "/notes/a.note", OPTIONS, pipeline_version="0"
+        )
+
+        note_id = make_note_id("abc", "/notes/a.note", OPTIONS)
+        assert note_id == make_note_id(
+            "abc", "/notes/a.note", {**OPTIONS, "format": "json"}
+        )
+        assert note_id != make_note_id(
+            "abc", "/notes/a.note", {**OPTIONS, "quality": "fast"}
+        )
+        assert note_id != make_note_id("abc", "/notes/copy.note", OPTIONS)
+
+
+@pytest.mark.unit
+@pytest.mark.database
+class TestJobManifest:
+
+    def make_file(self, tmp_path, content=b"page"):
+        path = tmp_path / "note.png"
+        path.write_bytes(content)
+        return path
+
+    def test_completed_job_is_skipped_while_outputs_exist(self, test_db, tmp_path):
+        """A completed job is done until its outputs disappear or --force is used"""
+        path = self.make_file(tmp_path)
+        (tmp_path / "note_processed.md").write_text("# note")
+        manifest = JobManifest(test_db, OPTIONS, tmp_path)
+
+        entry = manifest.plan(path)
+        assert entry.previous_status is None
+        manifest.start(entry)
+        manifest.complete(entry, ["note_processed.md"], 0.5)
+
+        rerun = manifest.plan(path)
+        assert rerun.previous_status == COMPLETED
+        assert manifest.is_done(rerun)
+        assert not JobManifest(test_db, OPTIONS, tmp_path, force=True).is_done(rerun)
+
+        (tmp_path / "note_processed.md").unlink()
+        assert not manifest.is_done(manifest.plan(path))
+
+    def test_changed_content_is_a_new_job(self, test_db, tmp_path):
+        """Editing the file invalidates the manifest entry"""
+        path = self.make_file(tmp_path)
+        manifest = JobManifest(test_db, OPTIONS, tmp_path)
+        entry = manifest.plan(path)
+        manifest.start(entry)
+        manifest.complete(entry, ["out.md"], 0.1)
+
+        path.write_bytes(b"edited page")
+
+        assert manifest.plan(path).previous_status is None
+
+    def test_copy_under_new_name_is_its_own_job(self, test_db, tmp_path):
+        """A copied notebook is not skipped as the original's completed job"""
+        path = self.make_file(tmp_path)
+        manifest = JobManifest(test_db, OPTIONS, tmp_path)
+        entry = manifest.plan(path)
+        manifest.start(entry)
+        manifest.complete(entry, ["out.md"], 0.1)
+        (tmp_path / "out.md").write_text("# note")
+
+        copy = tmp_path / "copy.png"
+        copy.write_bytes(path.read_bytes())
+        copied = manifest.plan(copy)
+
+        assert copied.previous_status is None and not manifest.is_done(copied)
+        assert copied.note_id != entry.note_id
+        assert manifest.is_done(manifest.plan(path))
+
+    def test_failure_and_attempts_recorded(self, test_db, tmp_path):
+        """Failed jobs keep their error and count attempts"""
+        path = self.make_file(tmp_path)
+        manifest = JobManifest(test_db, OPTIONS, tmp_path)
+        entry = manifest.plan(path)
+
+        manifest.start(entry)
+        manifest.complete(entry, None, 0.2)
+        manifest.start(entry)
+
+        job = test_db.get_job(entry.job_key)
+        assert job["status"] == IN_PROGRESS
+        assert job["attempts"] == 2
+        assert test_db.get_job_counts() == {IN_PROGRESS: 1}
+
+        manifest.fail(entry, "boom", 0.1)
+        assert test_db.get_job(entry.job_key)["error"] == "boom"
+        assert manifest.plan(path).previous_status == FAILED
+
+    def test_interrupted_job_resumes_from_stored_text(self, test_db, tmp_path):
+        """An in-progress job with a stored note skips OCR on resume"""
+        path = self.make_file(tmp_path)
+        manifest = JobManifest(test_db, OPTIONS, tmp_path)
+        entry = manifest.plan(path)
+        manifest.start(entry)
+        test_db.insert_note(
+            entry.note_id, str(path), "stored text", "stored text", "tesseract", 0.8
+        )
+
+        resumed = manifest.resume_ocr_result(manifest.plan(path))
+
+        assert resumed.text == "stored text"
+        assert resumed.cost == 0.0
+        assert manifest.resume_ocr_result(entry) is None  # first run: nothing to resume
+
+    def test_deterministic_note_ids_replace_rows(self, test_db):
+        """Reinserting a note with replace=True overwrites instead of duplicating"""
+        test_db.insert_note("fixed", "a.png", "old", "old", "tesseract", 0.5)
+        assert test_db.insert_note(
+            "fixed", "a.png", "new", "new", "tesseract", 0.9, replace=True
+        )
+
+        assert test_db.get_database_stats()["total_notes"] == 1
+        assert test_db.get_note("fixed")["raw_text"] == "new"
+
+
+@pytest.mark.integration
+class TestProcessRerun:
+
+    @pytest.mark.parametrize("name", ["page.png", "Meeting, Q3.png"])
+    def test_rerun_skips_unchanged_files(self, test_db, tmp_path, name):
+        """A second run over the same directory does no OCR and adds no notes"""
+        from PIL import Image
+        from src.cli import cli
+
+        Image.new('L', (40, 40), 255).save(tmp_path / name)
+        provider = Mock()
+        provider.extract_text.return_value = OCRResult(
+            text="Heading\n- a point",
+            confidence=0.9,
+            provider='fake',
+            processing_time=0.0,
+        )
+
+        def run(*extra):
+            with patch('src.cli.OCRProviderFactory') as factory, \
+                 patch('src.cli.DatabaseManager', return_value=test_db):
+                factory.get_provider.return_value = provider
+                return CliRunner().invoke(
+                    cli, ['process', str(tmp_path), '-o', str(tmp_path / "out"), *extra]
+                )
+
+        assert run().exit_code == 0
+        second = run()
+        assert "Skipping 1 unchanged files" in second.output
+        assert provider.extract_text.call_count == 1
+
+        assert run('--force').exit_code == 0
+        assert provider.extract_text.call_count == 2
+        assert test_db.get_database_stats()["total_notes"] == 1
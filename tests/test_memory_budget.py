@@ -0,0 +1,169 @@
+"""
+Tests for the pipeline memory budget and peak-RSS accounting
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.utils import memory_budget, metrics
+from src.utils.memory_budget import MemoryBudget, MB
+from src.utils.pipeline import Pipeline, Stage
+
+
+@pytest.mark.unit
+class TestMemoryBudget:
+
+    def test_acquire_blocks_until_released(self):
+        """A reservation that does not fit waits for others to be released"""
+        budget = MemoryBudget(100)
+        first = budget.acquire(70)
+        admitted = threading.Event()
+        waiter = threading.Thread(target=lambda: (budget.acquire(50), admitted.set()))
+        waiter.start()
+
+        assert not admitted.wait(0.05)
+        budget.release(first)
+        assert admitted.wait(1)
+        waiter.join()
+        assert budget.in_use == 50 and budget.peak == 70
+
+    def test_oversized_item_runs_alone(self):
+        """An item larger than the budget is admitted once nothing else is in flight"""
+        budget = MemoryBudget(100)
+        with budget.reserve(500):
+            assert budget.in_use == 500
+        assert budget.in_use == 0
+
+    def test_shrinking_admits_waiting_items(self):
+        """Resizing a reservation down wakes items waiting for room"""
+        budget = MemoryBudget(100)
+        reserved = budget.acquire(90)
+        admitted = threading.Event()
+        threading.Thread(
+            target=lambda: (budget.acquire(40), admitted.set()), daemon=True
+        ).start()
+        assert not admitted.wait(0.05)
+        budget.resize(reserved, 10)
+        assert admitted.wait(1)
+
+    def test_note_estimate_scales_with_pages(self, tmp_path):
+        """.note estimates count the main layers in the file"""
+        one, three = tmp_path / "one.note", tmp_path / "three.note"
+        one.write_bytes(b"header<LAYERNAME:MAINLAYER>data")
+        three.write_bytes(b"x".join([b"<LAYERNAME:MAINLAYER><LAYERNAME:BGLAYER>"] * 3))
+
+        assert memory_budget.count_note_pages(three) == 3
+        extra = (memory_budget.estimate_file_bytes(three)
+                 - memory_budget.estimate_file_bytes(one))
+        assert extra == 2 * memory_budget.PAGE_BITMAP_BYTES
+        assert memory_budget.count_note_pages(tmp_path / "missing.note") == 1
+
+    def test_image_estimate_reads_dimensions(self, tmp_path):
+        """Image estimates use the decoded RGBA size from the header"""
+        from PIL import Image
+        path = tmp_path / "page.png"
+        Image.new("L", (200, 100), 255).save(path)
+        expected = 200 * 100 * 4 + path.stat().st_size
+        assert memory_budget.estimate_image_bytes(path) == expected
+
+    def test_from_config(self):
+        """A zero or missing budget disables admission control"""
+        assert memory_budget.from_config({}) is None
+        assert memory_budget.from_config({"budget_mb": 0}) is None
+        assert memory_budget.from_config({"budget_mb": 2}).limit == 2 * MB
+
+    def test_peak_rss_is_reported(self):
+        """Current and peak RSS are read for this process"""
+        assert memory_budget.rss_bytes() > 0
+        assert memory_budget.peak_rss_bytes() > 0
+
+    def test_region_peak_is_not_the_process_high_water_mark(self):
+        """A light region after a heavy one reports its own, lower peak"""
+        with memory_budget.rss_region() as heavy:
+            block = b"\x01" * (200 * MB)
+            time.sleep(0.05)
+            del block
+        with memory_budget.rss_region() as light:
+            time.sleep(0.02)
+
+        assert heavy.peak - light.peak > 100 * MB
+
+
+@pytest.mark.unit
+class TestPipelineBudget:
+
+    def test_budget_limits_items_in_flight(self):
+        """Only as many items as fit in the budget are in flight at once"""
+        lock = threading.Lock()
+        in_flight, peak = [0], [0]
+
+        def hold(value):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return value
+
+        budget = MemoryBudget(250)
+        pipeline = Pipeline(
+            [Stage("hold", hold, workers=8)], budget=budget, weigh=lambda value: 100
+        )
+        results = pipeline.run(range(8))
+
+        assert [r.value for r in results] == list(range(8))
+        assert peak[0] == 2
+        assert budget.in_use == 0 and budget.peak == 200
+
+    def test_reservation_follows_stage_output(self):
+        """Reservations are re-estimated after each stage"""
+        budget = MemoryBudget(1000)
+        seen = []
+
+        def check(value):
+            seen.append(budget.in_use)
+            return value
+
+        pipeline = Pipeline(
+            [Stage("shrink", lambda value: "small"), Stage("check", check)],
+            budget=budget,
+            weigh=lambda value: 1 if value == "small" else 900,
+        )
+        pipeline.run(["large"])
+        assert seen == [1] and budget.in_use == 0
+
+    def test_budget_requires_weigh(self):
+        """A budget without a weigh function is rejected"""
+        with pytest.raises(ValueError):
+            Pipeline([Stage("noop", lambda value: value)], budget=MemoryBudget(1))
+
+    def test_no_sampling_without_metrics_or_budget(self):
+        """Measured stages do not poll RSS when nothing would record it"""
+        @memory_budget.measured_stage("decode")
+        def decode(value):
+            assert memory_budget._sampler._regions == []
+            return value
+
+        results = Pipeline([Stage("decode", decode)]).run([1])
+
+        assert results[0].ok and results[0].peak_rss == 0
+
+    def test_peak_rss_per_item_and_stage_metric(self, test_db):
+        """Results carry their peak RSS and measured stages record the metrics"""
+        metrics.configure(test_db, flush_interval=3600)
+        try:
+            @memory_budget.measured_stage("decode")
+            def decode(value):
+                return value
+
+            results = Pipeline([Stage("decode", decode)]).run([1])
+            assert results[0].peak_rss > 0
+            histograms = metrics._registry.snapshot()
+        finally:
+            metrics.shutdown()
+
+        assert ("peak_rss_mb", (("stage", "decode"),)) in histograms
+        assert ("process_peak_rss_mb", ()) in histograms
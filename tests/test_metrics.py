@@ -0,0 +1,123 @@
+"""
+Tests for persistent latency histograms and the stats command
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from src.utils import metrics
+from src.utils.metrics import Histogram, MetricsRegistry, summarize
+
+
+def _record_in_worker(value):
+    metrics.observe("stage_ms", value, stage="decode")
+    return value
+
+
+@pytest.fixture
+def configured(test_db):
+    registry = metrics.configure(test_db, flush_interval=3600)
+    yield registry
+    metrics.shutdown()
+
+
+@pytest.mark.unit
+class TestHistogram:
+
+    def test_percentiles_within_bucket_precision(self):
+        """Percentiles stay within ~3% of the exact values using bounded memory"""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(3, 1) for _ in range(50000)]
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+
+        ordered = sorted(values)
+        for percent in (50, 95, 99):
+            exact = ordered[int(len(ordered) * percent / 100) - 1]
+            assert histogram.percentile(percent) == pytest.approx(exact, rel=0.04)
+        assert len(histogram.buckets) < 400
+        assert histogram.max == max(values) and histogram.count == len(values)
+
+    def test_merge_matches_single_histogram(self):
+        """Merging per-process histograms equals recording everything in one"""
+        combined, left, right = Histogram(), Histogram(), Histogram()
+        for value in range(1, 1000):
+            combined.record(value)
+            (left if value % 3 else right).record(value)
+        left.merge(right)
+
+        assert left.buckets == combined.buckets
+        assert (left.count, left.total, left.min, left.max) == \
+            (combined.count, combined.total, combined.min, combined.max)
+
+    def test_disabled_timer_is_noop(self):
+        """Without a configured registry timers and observations do nothing"""
+        assert metrics.timer("stage_ms", stage="ocr") is metrics.timer("other")
+        metrics.observe("stage_ms", 1.0)
+        assert metrics.shutdown() is True
+
+
+@pytest.mark.unit
+@pytest.mark.database
+class TestMetricsPersistence:
+
+    def test_flush_and_summarize_across_registries(self, test_db):
+        """Rows written by separate registries are merged per metric and labels"""
+        first, second = MetricsRegistry(test_db), MetricsRegistry(test_db)
+        for value in range(1, 101):
+            registry = first if value <= 50 else second
+            registry.observe("provider_ms", value, provider="qwen")
+        first.observe("stage_ms", 5.0, stage="ocr")
+        assert first.flush() and second.flush()
+
+        summary = {(e["metric"], tuple(e["labels"].values())): e
+                   for e in summarize(test_db.get_metric_histograms())}
+        provider = summary[("provider_ms", ("qwen",))]
+        assert provider["count"] == 100
+        assert provider["p50"] == pytest.approx(50, rel=0.04)
+        assert provider["p99"] == pytest.approx(99, rel=0.04)
+        assert summary[("stage_ms", ("ocr",))]["count"] == 1
+        # Flushing resets the in-memory histograms
+        assert first.snapshot() == {}
+
+    def test_worker_processes_flush_their_own_values(self, configured, test_db):
+        """Forked workers persist what they record; parent values are not duplicated"""
+        metrics.observe("stage_ms", 1000.0, stage="decode")
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            list(executor.map(_record_in_worker, [10.0, 20.0, 30.0]))
+        metrics.shutdown()
+
+        entry = summarize(test_db.get_metric_histograms(metric="stage_ms"))[0]
+        assert entry["count"] == 4
+        assert entry["max"] == 1000.0
+
+    def test_mocked_database_path_not_exported(self):
+        """Only real database paths reach worker processes through the environment"""
+        metrics.configure(MagicMock(), flush_interval=3600)
+        try:
+            assert metrics.DB_ENV not in os.environ
+        finally:
+            metrics.shutdown()
+
+    def test_stats_command(self, test_db):
+        """stats shows percentiles for the requested window"""
+        from src.cli import cli
+
+        registry = MetricsRegistry(test_db)
+        for value in (10, 20, 30):
+            registry.observe("stage_ms", value, stage="analyze")
+        registry.flush()
+
+        with patch("src.cli.DatabaseManager", return_value=test_db):
+            result = CliRunner().invoke(cli, ["stats", "--since", "1h"])
+            empty = CliRunner().invoke(cli, ["stats", "--metric", "provider_ms"])
+
+        assert result.exit_code == 0, result.output
+        assert "stage=analyze" in result.output and "p95" in result.output
+        assert "No metrics recorded" in empty.output
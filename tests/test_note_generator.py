@@ -0,0 +1,130 @@
+"""
+Tests for the synthetic .note notebook generator and its RATTA_RLE encoder
+"""
+
+import hashlib
+
+import numpy as np
+import pytest
+
+from src.utils.supernote_parser_enhanced import SupernoteParser
+from src.utils.note_generator import (
+    COLOR_CODES, PAGE_HEIGHT, PAGE_WIDTH, NotebookSpec, build_notebook, encode_rle,
+    generate_notebook, page_layers,
+)
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return SupernoteParser()
+
+
+def _decode(parser, bitmap, special_lengths=1.0, seed=0):
+    data = encode_rle(bitmap, special_lengths, np.random.default_rng(seed))
+    return parser._decode_ratta_rle(data, PAGE_WIDTH, PAGE_HEIGHT)
+
+
+@pytest.mark.unit
+class TestEncodeRLE:
+
+    @pytest.mark.parametrize("special_lengths", [0.0, 0.5, 1.0])
+    def test_round_trips_through_decoder(self, parser, special_lengths):
+        """Every length form decodes back to the original pixels"""
+        spec = NotebookSpec(ink_density=0.05, gray_mix=0.5, seed=3)
+        bitmap = page_layers(spec, 1)["MAINLAYER"]
+        np.testing.assert_array_equal(_decode(parser, bitmap, special_lengths), bitmap)
+
+    def test_round_trips_every_run_length(self, parser):
+        """Short, odd, 64-multiple and page-long runs of every gray level"""
+        levels = list(COLOR_CODES)
+        flat = np.full(PAGE_WIDTH * PAGE_HEIGHT, 255, dtype=np.uint8)
+        pos = 0
+        lengths = list(range(1, 200)) + [640, 704, 896, 2944, 8128, 8192, 16384, 40000]
+        for length in lengths:
+            flat[pos:pos + length] = levels[length % len(levels)]
+            pos += length + 1
+        bitmap = flat.reshape(PAGE_HEIGHT, PAGE_WIDTH)
+
+        for special_lengths in (0.0, 1.0):
+            np.testing.assert_array_equal(
+                _decode(parser, bitmap, special_lengths), bitmap
+            )
+
+    def test_special_lengths_shrink_blank_pages(self):
+        """0xFF and 0x89 runs encode long backgrounds in fewer pairs"""
+        blank = np.full((PAGE_HEIGHT, PAGE_WIDTH), 255, dtype=np.uint8)
+        assert len(encode_rle(blank, 1.0)) < len(encode_rle(blank, 0.0))
+        assert b"\x62\xff" not in encode_rle(blank, 0.0)
+
+    def test_rejects_unknown_gray_levels(self):
+        """Pixels without a color code are an error, not silently remapped"""
+        with pytest.raises(ValueError, match="128"):
+            encode_rle(np.full((2, 2), 128, dtype=np.uint8))
+
+
+@pytest.mark.unit
+class TestNotebookGenerator:
+
+    def test_same_seed_same_bytes(self):
+        """Notebooks are reproducible from their spec"""
+        spec = NotebookSpec(
+            pages=3, layers=2, gray_mix=0.3, special_lengths=0.5, seed=11
+        )
+        assert build_notebook(spec) == build_notebook(spec)
+        other = NotebookSpec(pages=3, layers=2, seed=12)
+        assert build_notebook(spec)[0] != build_notebook(other)[0]
+
+    def test_pages_regenerate_independently(self):
+        """A page's layers depend only on the seed and page number"""
+        one = page_layers(NotebookSpec(pages=1, seed=5), 1)
+        many = page_layers(NotebookSpec(pages=200, seed=5), 1)
+        np.testing.assert_array_equal(one["MAINLAYER"], many["MAINLAYER"])
+
+    def test_layers_and_density(self):
+        """Layer count follows the spec and ink density is roughly honoured"""
+        layers = page_layers(NotebookSpec(layers=3, ink_density=0.1), 1)
+        assert list(layers) == ["MAINLAYER", "BGLAYER", "LAYER1"]
+        assert 0.05 < np.mean(layers["MAINLAYER"] < 255) <= 0.1
+
+    def test_blank_pages(self):
+        """Blank pages carry no ink on the drawn layers"""
+        layers = page_layers(NotebookSpec(layers=3, blank_pages=1.0), 1)
+        drawn = [bitmap for name, bitmap in layers.items() if name != "BGLAYER"]
+        assert all((bitmap == 255).all() for bitmap in drawn)
+        with pytest.raises(ValueError):
+            NotebookSpec(blank_pages=2)
+
+    def test_invalid_spec(self):
+        """Out-of-range parameters are rejected up front"""
+        with pytest.raises(ValueError):
+            NotebookSpec(layers=6)
+        with pytest.raises(ValueError):
+            NotebookSpec(ink_density=1.5)
+
+    def test_layers_found_from_metadata_in_large_files(self, parser):
+        """Files past the probed offsets still resolve every layer from its tags"""
+        spec = NotebookSpec(pages=100, layers=2, ink_density=0.05)
+        data, _ = build_notebook(spec)
+        assert len(data) > 847208
+
+        layers = parser._extract_layer_info_enhanced(data)
+        main = [layer for layer in layers if layer["layer_name"] == "MAINLAYER"]
+        assert len(main) == 100 and len(layers) == 200
+
+
+@pytest.mark.integration
+class TestGeneratedNotebookParsing:
+
+    def test_parse_file_decodes_generated_pages(self, parser, tmp_path):
+        """The parser returns each page with the exact bitmap that was drawn"""
+        spec = NotebookSpec(pages=2, layers=3, ink_density=0.03, gray_mix=0.4,
+                            special_lengths=0.5, seed=2)
+        info = generate_notebook(tmp_path / "synthetic.note", spec)
+
+        pages = parser.parse_file(info.path)
+
+        assert [page.page_id for page in pages] == [1, 2]
+        digests = [hashlib.sha1(page.metadata["decoded_bitmap"].tobytes()).hexdigest()
+                   for page in pages]
+        assert digests == info.page_digests
+        assert all(page.metadata["format"] == "SN_FILE_VER_20230015" for page in pages)
@@ -17,12 +17,14 @@ from pathlib import Path
 import tempfile
 from PIL import Image
 import json
+import yaml
 
 from src.utils.ocr_providers import (
     OCRProvider, OCRResult, TesseractOCR, GoogleVisionOCR, 
     GPT4VisionOCR, HybridOCR, create_ocr_provider
 )
 from src.utils.database import DatabaseManager
+from src.utils.ocr_factory import OCRProviderFactory
 
 
 class TestOCRBusinessLogic:
@@ -199,6 +201,414 @@ class TestOCRBusinessLogic:
             assert result.provider == "tesseract" 
             assert result.text == "Fallback successful"
     
+    def test_batch_routes_low_confidence_pages_to_next_provider(self, temp_dir):
+        """Test batch mode escalates only the pages below threshold"""
+
+        config = {
+            'quality_mode': 'balanced',
+            'provider_priority': ['tesseract', 'google_vision'],
+            'confidence_thresholds': {'tesseract': 60, 'google_vision': 80}
+        }
+
+        mock_db = MagicMock()
+        mock_db.get_daily_ocr_cost.return_value = {}
+
+        with patch('src.utils.ocr_providers.DatabaseManager', return_value=mock_db), \
+             patch('src.utils.ocr_providers.config') as mock_config:
+
+            mock_config.get.return_value = {'providers': {}}
+
+            hybrid = HybridOCR(config)
+
+            def page_result(provider, text, confidence, cost=0.0):
+                return OCRResult(text=text, confidence=confidence, provider=provider,
+                                 processing_time=0.1, cost=cost)
+
+            mock_tesseract = MagicMock()
+            mock_tesseract.extract_text_batch.return_value = [
+                page_result("tesseract", "clear page", 0.9),
+                page_result("tesseract", "sm dg", 0.3),
+                page_result("tesseract", "tidy page", 0.7),
+            ]
+            mock_google = MagicMock()
+            mock_google.extract_text_batch.return_value = [
+                page_result("google_vision", "smudged page", 0.95, cost=0.0015)
+            ]
+
+            hybrid.providers = {
+                'tesseract': mock_tesseract,
+                'google_vision': mock_google,
+            }
+
+            pages = ["page1.png", "page2.png", "page3.png"]
+            results = hybrid.extract_text_batch(pages)
+
+            # Only the low-confidence page is sent to the paid provider, in one call
+            mock_tesseract.extract_text_batch.assert_called_once_with(pages)
+            mock_google.extract_text_batch.assert_called_once_with(["page2.png"])
+            mock_tesseract.extract_text.assert_not_called()
+            mock_google.extract_text.assert_not_called()
+
+            assert [r.text for r in results] == [
+                "clear page",
+                "smudged page",
+                "tidy page",
+            ]
+            mock_db.track_ocr_usage.assert_any_call(
+                "google_vision", 0.0015, images_processed=1
+            )
+
+    def test_refinement_reocrs_only_weak_words(self, temp_dir):
+        """Test refinement sends only low-confidence word crops to the next provider"""
+
+        config = {
+            'quality_mode': 'balanced',
+            'provider_priority': ['tesseract', 'google_vision'],
+            'confidence_thresholds': {'tesseract': 75, 'google_vision': 85},
+            'refinement': {'enabled': True, 'word_threshold': 60}
+        }
+
+        mock_db = MagicMock()
+        mock_db.get_daily_ocr_cost.return_value = {}
+
+        with patch('src.utils.ocr_providers.DatabaseManager', return_value=mock_db), \
+             patch('src.utils.ocr_providers.config') as mock_config:
+
+            mock_config.get.return_value = {'providers': {}}
+            hybrid = HybridOCR(config)
+
+            words = [
+                ("Meeting", 0.95, 10),
+                ("wiht", 0.35, 120),
+                ("the", 0.9, 220),
+                ("team", 0.85, 290),
+            ]
+            mock_tesseract = MagicMock()
+            mock_tesseract.extract_text.return_value = OCRResult(
+                text="Meeting wiht\nthe team",
+                confidence=0.66,  # Page average below the 75% threshold
+                provider="tesseract",
+                processing_time=1.0,
+                cost=0.0,
+                bounding_boxes=[{'word': w, 'confidence': c, 'bbox': (x, 10, 80, 30)}
+                                for w, c, x in words]
+            )
+
+            mock_google = MagicMock()
+            mock_google.extract_text_batch.return_value = [OCRResult(
+                text="with", confidence=0.97, provider="google_vision",
+                processing_time=0.2, cost=0.0015
+            )]
+            mock_google.get_cost_estimate.return_value = 0.0015
+
+            hybrid.providers = {
+                'tesseract': mock_tesseract,
+                'google_vision': mock_google,
+            }
+
+            test_image = temp_dir / "refine.png"
+            Image.new('RGB', (400, 60), 'white').save(test_image)
+
+            result = hybrid.extract_text(test_image)
+
+            # One word crop went to Google Vision; the page was not re-OCR'd
+            mock_google.extract_text.assert_not_called()
+            crop_paths = mock_google.extract_text_batch.call_args[0][0]
+            assert len(crop_paths) == 1
+
+            assert result.text == "Meeting with\nthe team"
+            assert result.provider == "tesseract"
+            assert result.confidence == pytest.approx((0.95 + 0.97 + 0.9 + 0.85) / 4)
+            assert result.cost == 0.0015
+            assert result.metadata['refined_by'] == "google_vision"
+            assert result.metadata['refined_words'] == 1
+            mock_db.track_ocr_usage.assert_any_call(
+                "google_vision", 0.0015, images_processed=1
+            )
+
+    def test_refinement_never_costs_more_than_whole_page(self, temp_dir):
+        """Test weak words go to the refiner as one image, billed as one page at most"""
+
+        config = {
+            'quality_mode': 'balanced',
+            'provider_priority': ['tesseract', 'google_vision'],
+            'confidence_thresholds': {'tesseract': 75, 'google_vision': 85},
+            'refinement': {'enabled': True, 'word_threshold': 60, 'padding': 2}
+        }
+
+        mock_db = MagicMock()
+        mock_db.get_daily_ocr_cost.return_value = {}
+
+        with patch('src.utils.ocr_providers.DatabaseManager', return_value=mock_db), \
+             patch('src.utils.ocr_providers.config') as mock_config:
+
+            mock_config.get.return_value = {'providers': {}}
+            hybrid = HybridOCR(config)
+
+            words = [
+                ("Plan", 0.9, 10),
+                ("teh", 0.3, 110),
+                ("next", 0.9, 210),
+                ("sprnt", 0.4, 310),
+                ("with", 0.9, 410),
+                ("desgin", 0.2, 510),
+                ("and", 0.9, 610),
+                ("QA", 0.9, 710),
+            ]
+            mock_tesseract = MagicMock()
+            mock_tesseract.extract_text.return_value = OCRResult(
+                text="Plan teh next sprnt with desgin and QA",
+                confidence=0.68,
+                provider="tesseract",
+                processing_time=1.0,
+                cost=0.0,
+                bounding_boxes=[
+                    {'word': w, 'confidence': c, 'bbox': (x, 10, 80, 30)}
+                    for w, c, x in words
+                ],
+            )
+
+            def read_sheet(paths):
+                # One 34px row per weak word, 8px apart; answer with a box per row
+                with Image.open(paths[0]) as sheet:
+                    assert sheet.height == 3 * 34 + 2 * 8
+                rows = [("the", 0), ("sprint", 42), ("design", 84)]
+                return [
+                    OCRResult(
+                        text="the\nsprint\ndesign",
+                        confidence=0.95,
+                        provider="google_vision",
+                        processing_time=0.3,
+                        cost=0.0015,
+                        bounding_boxes=[
+                            {
+                                'word': w,
+                                'confidence': 0.95,
+                                'bbox': (2, top + 2, 80, 30),
+                            }
+                            for w, top in rows
+                        ],
+                    )
+                ]
+
+            mock_google = MagicMock()
+            mock_google.get_cost_estimate.return_value = 0.0015
+            mock_google.extract_text_batch.side_effect = read_sheet
+            hybrid.providers = {
+                'tesseract': mock_tesseract,
+                'google_vision': mock_google,
+            }
+
+            test_image = temp_dir / "refine_many.png"
+            Image.new('RGB', (800, 60), 'white').save(test_image)
+
+            result = hybrid.extract_text(test_image)
+
+            mock_google.extract_text_batch.assert_called_once()
+            assert len(mock_google.extract_text_batch.call_args[0][0]) == 1
+            assert result.text == "Plan the next sprint with design and QA"
+            assert result.metadata['refinement_cost'] <= mock_google.get_cost_estimate(
+                test_image
+            )
+            mock_db.track_ocr_usage.assert_any_call(
+                "google_vision", 0.0015, images_processed=1
+            )
+
+    def test_refinement_skipped_when_sheet_costs_more_than_page(self, temp_dir):
+        """Test refinement falls back to whole-page escalation when it saves nothing"""
+
+        config = {
+            'quality_mode': 'balanced',
+            'provider_priority': ['tesseract', 'google_vision'],
+            'confidence_thresholds': {'tesseract': 75, 'google_vision': 85},
+            'refinement': {'enabled': True, 'word_threshold': 60}
+        }
+
+        mock_db = MagicMock()
+        mock_db.get_daily_ocr_cost.return_value = {}
+
+        with patch('src.utils.ocr_providers.DatabaseManager', return_value=mock_db), \
+             patch('src.utils.ocr_providers.config') as mock_config:
+
+            mock_config.get.return_value = {'providers': {}}
+            hybrid = HybridOCR(config)
+
+            mock_tesseract = MagicMock()
+            mock_tesseract.extract_text.return_value = OCRResult(
+                text="good wrd fine",
+                confidence=0.6,
+                provider="tesseract",
+                processing_time=1.0,
+                bounding_boxes=[
+                    {'word': w, 'confidence': c, 'bbox': (x, 0, 40, 20)}
+                    for w, c, x in [
+                        ("good", 0.9, 0),
+                        ("wrd", 0.2, 50),
+                        ("fine", 0.9, 100),
+                    ]
+                ],
+            )
+            mock_google = MagicMock()
+            # Priced by size: the sheet is the larger image here
+            mock_google.get_cost_estimate.side_effect = lambda path: (
+                0.002 if "weak_words" in str(path) else 0.001
+            )
+            mock_google.extract_text.return_value = OCRResult(
+                text="good word fine",
+                confidence=0.9,
+                provider="google_vision",
+                processing_time=0.5,
+                cost=0.001,
+            )
+            hybrid.providers = {
+                'tesseract': mock_tesseract,
+                'google_vision': mock_google,
+            }
+
+            test_image = temp_dir / "refine_costly.png"
+            Image.new('RGB', (200, 30), 'white').save(test_image)
+
+            result = hybrid.extract_text(test_image)
+
+            mock_google.extract_text_batch.assert_not_called()
+            assert result.text == "good word fine"
+
+    def test_refinement_skipped_when_most_words_weak(self, temp_dir):
+        """Test pages with mostly weak words escalate as whole pages"""
+
+        config = {
+            'quality_mode': 'balanced',
+            'provider_priority': ['tesseract', 'google_vision'],
+            'confidence_thresholds': {'tesseract': 75, 'google_vision': 85},
+            'refinement': {'enabled': True, 'word_threshold': 60, 'max_fraction': 0.5}
+        }
+
+        mock_db = MagicMock()
+        mock_db.get_daily_ocr_cost.return_value = {}
+
+        with patch('src.utils.ocr_providers.DatabaseManager', return_value=mock_db), \
+             patch('src.utils.ocr_providers.config') as mock_config:
+
+            mock_config.get.return_value = {'providers': {}}
+            hybrid = HybridOCR(config)
+
+            mock_tesseract = MagicMock()
+            mock_tesseract.extract_text.return_value = OCRResult(
+                text="smdg wrds",
+                confidence=0.3,
+                provider="tesseract",
+                processing_time=1.0,
+                bounding_boxes=[
+                    {'word': 'smdg', 'confidence': 0.3, 'bbox': (0, 0, 10, 10)},
+                    {'word': 'wrds', 'confidence': 0.3, 'bbox': (20, 0, 10, 10)},
+                ],
+            )
+            mock_google = MagicMock()
+            mock_google.extract_text.return_value = OCRResult(
+                text="smudged words", confidence=0.9, provider="google_vision",
+                processing_time=0.5, cost=0.0015
+            )
+
+            hybrid.providers = {
+                'tesseract': mock_tesseract,
+                'google_vision': mock_google,
+            }
+
+            result = hybrid.extract_text(temp_dir / "unused.png")
+
+            mock_google.extract_text_batch.assert_not_called()
+            assert result.text == "smudged words"
+
+    def test_refinement_enabled_from_config_file(self, temp_dir):
+        """Test refinement set under ocr.providers.hybrid in config.yaml is used"""
+
+        config_path = Path(__file__).parent.parent / "config" / "config.yaml"
+        app_config = yaml.safe_load(config_path.read_text())
+        hybrid_settings = app_config['ocr']['providers']['hybrid']
+        hybrid_settings['refinement']['enabled'] = True
+        hybrid_settings['provider_priority'] = ['tesseract', 'google_vision']
+
+        mock_db = MagicMock()
+        mock_db.get_daily_ocr_cost.return_value = {}
+
+        OCRProviderFactory.clear_cache()
+        try:
+            with (
+                patch('src.utils.ocr_providers.DatabaseManager', return_value=mock_db),
+                patch('src.utils.ocr_providers.config') as mock_config,
+            ):
+
+                mock_config.get.return_value = {'providers': {}}
+                hybrid = OCRProviderFactory.get_provider(app_config['ocr'])
+
+                mock_tesseract = MagicMock()
+                mock_tesseract.extract_text.return_value = OCRResult(
+                    text="Meeting wiht the team",
+                    confidence=0.66,
+                    provider="tesseract",
+                    processing_time=1.0,
+                    bounding_boxes=[
+                        {'word': w, 'confidence': c, 'bbox': (x, 10, 80, 30)}
+                        for w, c, x in [
+                            ("Meeting", 0.95, 10),
+                            ("wiht", 0.35, 120),
+                            ("the", 0.9, 220),
+                            ("team", 0.85, 290),
+                        ]
+                    ],
+                )
+                mock_google = MagicMock()
+                mock_google.extract_text_batch.return_value = [OCRResult(
+                    text="with", confidence=0.97, provider="google_vision",
+                    processing_time=0.2, cost=0.0015
+                )]
+                mock_google.get_cost_estimate.return_value = 0.0015
+                hybrid.providers = {
+                    'tesseract': mock_tesseract,
+                    'google_vision': mock_google,
+                }
+
+                test_image = temp_dir / "refine_configured.png"
+                Image.new('RGB', (400, 60), 'white').save(test_image)
+
+                result = hybrid.extract_text(test_image)
+
+                mock_google.extract_text.assert_not_called()
+                mock_google.extract_text_batch.assert_called_once()
+                assert result.text == "Meeting with the team"
+                assert result.metadata['refined_by'] == "google_vision"
+        finally:
+            OCRProviderFactory.clear_cache()
+
+    def test_hybrid_cost_estimate_follows_first_route(self, temp_dir):
+        """Test hybrid cost estimates use the provider routing tries first"""
+
+        mock_db = MagicMock()
+        mock_db.get_daily_ocr_cost.return_value = {}
+
+        with patch('src.utils.ocr_providers.DatabaseManager', return_value=mock_db), \
+             patch('src.utils.ocr_providers.config') as mock_config:
+            mock_config.get.return_value = {'providers': {}}
+            hybrid = HybridOCR({'provider_priority': ['google_vision', 'tesseract'],
+                                'cost_limit_per_day': 1.0})
+
+            assert hybrid.get_cost_estimate(temp_dir / "page.png") == 0.0
+
+            mock_tesseract = MagicMock()
+            mock_tesseract.get_cost_estimate.return_value = 0.0
+            mock_google = MagicMock()
+            mock_google.get_cost_estimate.return_value = 0.0015
+            hybrid.providers = {
+                'tesseract': mock_tesseract,
+                'google_vision': mock_google,
+            }
+
+            assert hybrid.get_cost_estimate(temp_dir / "page.png") == 0.0015
+
+            # Over budget, routing only uses free providers
+            mock_db.get_daily_ocr_cost.return_value = {'google_vision': {'cost': 2.0}}
+            assert hybrid.get_cost_estimate(temp_dir / "page.png") == 0.0
+
     def test_gpt4_vision_confidence_calculation(self):
         """Test GPT-4 Vision confidence scoring based on [unclear] markers"""
         
@@ -457,4 +867,4 @@ def temp_dir():
     
     temp_path = Path(tempfile.mkdtemp())
     yield temp_path
-    shutil.rmtree(temp_path)
\ No newline at end of file
+    shutil.rmtree(temp_path)
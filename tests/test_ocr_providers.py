@@ -6,12 +6,14 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
 import tempfile
+import time
 from PIL import Image
 
 from src.utils.ocr_providers import (
     OCRProvider, OCRResult, TesseractOCR, GoogleVisionOCR, 
-    GPT4VisionOCR, HybridOCR, create_ocr_provider
+    GPT4VisionOCR, HybridOCR, LazyProvider, SimulatedOCR, create_ocr_provider
 )
+from src.utils.exceptions import OCRProviderError
 
 
 @pytest.mark.unit
@@ -157,6 +159,217 @@ class TestGoogleVisionOCR:
             assert len(result.word_confidences) == 1
 
 
+class FakeVisionClient:
+    """Local stand-in for the Vision endpoint that records batch calls"""
+
+    def __init__(self, failing_pages=(), fail_batch=False):
+        self.failing_pages = set(failing_pages)
+        self.fail_batch = fail_batch
+        self.batch_calls = []
+        self.single_calls = 0
+        self._page_counter = 0
+
+    def _word(self, text, confidence, x):
+        from types import SimpleNamespace as NS
+        return NS(
+            confidence=confidence,
+            symbols=[NS(text=c) for c in text],
+            bounding_box=NS(vertices=[NS(x=x, y=10), NS(x=x + 40, y=10),
+                                      NS(x=x + 40, y=30), NS(x=x, y=30)])
+        )
+
+    def _response(self, page_number, error=""):
+        from types import SimpleNamespace as NS
+        words = [self._word("page", 0.9, 10), self._word(str(page_number), 0.8, 60)]
+        annotation = NS(
+            text=f"page {page_number}",
+            pages=[NS(blocks=[NS(paragraphs=[NS(words=words)])])]
+        )
+        return NS(error=NS(message=error), full_text_annotation=annotation)
+
+    def batch_annotate_images(self, requests):
+        from types import SimpleNamespace as NS
+        self.batch_calls.append(len(requests))
+        if self.fail_batch:
+            raise ConnectionError("batch endpoint unavailable")
+        responses = []
+        for _ in requests:
+            self._page_counter += 1
+            error = "quota" if self._page_counter in self.failing_pages else ""
+            responses.append(self._response(self._page_counter, error))
+        return NS(responses=responses)
+
+    def annotate_image(self, request):
+        self.single_calls += 1
+        return self._response(0)
+
+
+@pytest.mark.unit
+@pytest.mark.ocr
+class TestGoogleVisionBatch:
+
+    def _provider(self, client, **overrides):
+        config = {"features": ["DOCUMENT_TEXT_DETECTION"], "cost_per_image": 0.0015}
+        config.update(overrides)
+        with patch('google.cloud.vision.ImageAnnotatorClient'):
+            provider = GoogleVisionOCR(config)
+        provider.client = client
+        return provider
+
+    def _pages(self, temp_dir, count):
+        paths = []
+        for i in range(count):
+            path = temp_dir / f"batch_page_{i}.png"
+            Image.new('L', (64, 32), color=255).save(path)
+            paths.append(str(path))
+        return paths
+
+    def test_batch_groups_pages_into_chunks(self, temp_dir):
+        """Pages are sent in chunks of batch_size and split back per page"""
+        client = FakeVisionClient()
+        provider = self._provider(client, batch_size=4)
+
+        results = provider.extract_text_batch(self._pages(temp_dir, 10))
+
+        assert client.batch_calls == [4, 4, 2]
+        assert client.single_calls == 0
+        assert [r.text for r in results] == [f"page {i}" for i in range(1, 11)]
+        assert results[0].word_confidences == [0.9, 0.8]
+        assert results[0].bounding_boxes[1]['bbox'] == (60, 10, 40, 20)
+        assert results[5].metadata['batch_size'] == 4
+        assert results[5].metadata['batch_index'] == 1
+        assert all(r.cost == 0.0015 for r in results)
+
+    def test_batch_size_capped_at_api_limit(self, temp_dir):
+        """Configured batch sizes above the API limit are clamped"""
+        client = FakeVisionClient()
+        provider = self._provider(client, batch_size=100)
+
+        provider.extract_text_batch(self._pages(temp_dir, 20))
+
+        assert client.batch_calls == [16, 4]
+
+    def test_partial_errors_fall_back_per_page(self, temp_dir):
+        """Only pages whose response carries an error are retried alone"""
+        client = FakeVisionClient(failing_pages={2})
+        provider = self._provider(client, batch_size=3)
+
+        results = provider.extract_text_batch(self._pages(temp_dir, 3))
+
+        assert client.single_calls == 1
+        assert results[0].text == "page 1"
+        assert results[1].text == "page 0"  # Served by the single-page endpoint
+        assert results[2].text == "page 3"
+
+    def test_failed_batch_call_falls_back_per_page(self, temp_dir):
+        """A failing batch request degrades to one request per page"""
+        client = FakeVisionClient(fail_batch=True)
+        provider = self._provider(client, batch_size=5)
+
+        results = provider.extract_text_batch(self._pages(temp_dir, 3))
+
+        assert client.single_calls == 3
+        assert len(results) == 3
+
+
+class StubChatCompletions:
+    """Local stand-in for the chat completions API
+
+    Answers packed requests by echoing one delimited section per image, or
+    with a fixed reply when one is given.
+    """
+
+    def __init__(self, reply=None):
+        self.reply = reply
+        self.requests = []
+
+    def create(self, model, messages, max_tokens):
+        from types import SimpleNamespace as NS
+        images = [
+            part for part in messages[1]['content'] if part['type'] == 'image_url'
+        ]
+        self.requests.append(len(images))
+        if len(images) == 1:
+            content = "single page text"
+        elif self.reply is not None:
+            content = self.reply
+        else:
+            content = "\n".join(
+                (
+                    f"=== PAGE {n} ===\nline {n} [unclear]"
+                    if n == 2
+                    else f"=== PAGE {n} ===\nline {n}"
+                )
+                for n in range(1, len(images) + 1)
+            )
+        return NS(choices=[NS(message=NS(content=content))], usage=NS(total_tokens=300))
+
+
+@pytest.mark.unit
+@pytest.mark.ocr
+class TestGPT4VisionBatch:
+
+    def _provider(self, completions, **overrides):
+        from types import SimpleNamespace as NS
+        config = {"model": "gpt-4o", "cost_per_image": 0.01}
+        config.update(overrides)
+        with (
+            patch('openai.OpenAI'),
+            patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}),
+        ):
+            provider = GPT4VisionOCR(config)
+        provider.client = NS(chat=NS(completions=completions))
+        return provider
+
+    def _pages(self, temp_dir, count, size=(1404, 1872)):
+        paths = []
+        for i in range(count):
+            path = temp_dir / f"gpt_page_{i}.png"
+            Image.new('RGB', size, color='white').save(path)
+            paths.append(str(path))
+        return paths
+
+    def test_image_token_estimate(self):
+        """Token estimates follow the tile accounting"""
+        assert GPT4VisionOCR.estimate_image_tokens(2808, 3744) == 85 + 170 * 4
+        assert GPT4VisionOCR.estimate_image_tokens(100, 100) == 85 + 170
+
+    def test_pages_packed_under_token_budget(self, temp_dir):
+        """Pages are grouped so each request stays under the budget"""
+        completions = StubChatCompletions()
+        provider = self._provider(completions, image_token_budget=2000)
+
+        results = provider.extract_text_batch(self._pages(temp_dir, 5))
+
+        # 765 tokens per page: two pages per request, the last one alone
+        assert completions.requests == [2, 2, 1]
+        assert [r.text for r in results[:4]] == ["line 1", "line 2 [unclear]"] * 2
+        assert results[4].text == "single page text"
+        assert results[0].confidence == 0.9
+        assert results[1].confidence < 0.9
+        assert results[1].metadata['unclear_markers'] == 1
+        assert results[0].metadata['batch_size'] == 2
+        assert all(r.cost == 0.01 for r in results)
+
+    def test_unsplittable_response_retries_single_pages(self, temp_dir):
+        """A response missing page delimiters falls back to one request per page"""
+        completions = StubChatCompletions(reply="all the text without any delimiters")
+        provider = self._provider(completions)
+
+        results = provider.extract_text_batch(self._pages(temp_dir, 3, size=(200, 200)))
+
+        assert completions.requests == [3, 1, 1, 1]
+        assert [r.text for r in results] == ["single page text"] * 3
+
+    def test_page_left_without_result_is_an_error(self, temp_dir):
+        """A batch never returns None in place of a page's result"""
+        provider = self._provider(StubChatCompletions())
+
+        with patch.object(provider, '_pack_pages', return_value=[[0, 1]]):
+            with pytest.raises(RuntimeError, match=r"pages \[2\]"):
+                provider.extract_text_batch(self._pages(temp_dir, 3, size=(200, 200)))
+
+
 @pytest.mark.unit
 @pytest.mark.ocr  
 class TestGPT4VisionOCR:
@@ -254,6 +467,90 @@ class TestHybridOCR:
             assert provider.name == "hybrid"
             assert "tesseract" in provider.providers
     
+    def test_providers_constructed_on_first_use(self):
+        """Cloud clients are only built when routing reaches the provider"""
+        with patch('src.utils.ocr_providers.config') as mock_config, \
+             patch('google.cloud.vision.ImageAnnotatorClient') as mock_client:
+            mock_config.get.return_value = {
+                "providers": {
+                    "tesseract": {"config": "--oem 3"},
+                    "google_vision": {"confidence_threshold": 80}
+                }
+            }
+
+            provider = HybridOCR({"provider_priority": ["tesseract", "google_vision"]})
+
+            assert provider.get_available_providers() == ["tesseract", "google_vision"]
+            assert provider.get_loaded_providers() == []
+            mock_client.assert_not_called()
+
+            google = provider.providers["google_vision"]
+            assert isinstance(google.get(), GoogleVisionOCR)
+            assert google.get() is google.get()
+            mock_client.assert_called_once()
+            assert provider.get_loaded_providers() == ["google_vision"]
+
+    def test_explicit_provider_configs_bypass_global_config(self):
+        """Provider configs passed in are used instead of the global ocr.providers"""
+        with patch('src.utils.ocr_providers.config') as mock_config:
+            provider = HybridOCR({}, providers_config={"qwen": {"type": "simulated"}})
+
+        mock_config.get.assert_not_called()
+        assert provider.get_available_providers() == ["qwen"]
+        assert isinstance(provider.providers["qwen"].get(), SimulatedOCR)
+
+    def test_invalid_provider_config_skipped(self):
+        """Config problems are reported without constructing any client"""
+        with patch('src.utils.ocr_providers.config') as mock_config:
+            mock_config.get.return_value = {
+                "providers": {
+                    "tesseract": {"confidence_threshold": 60},
+                    "google_vision": {"features": ["FACE_DETECTION"]}
+                }
+            }
+
+            provider = HybridOCR({})
+
+            assert provider.get_available_providers() == ["tesseract"]
+
+    def test_lazy_provider_builds_once_across_threads(self):
+        """Concurrent first calls share a single construction"""
+        import threading
+
+        constructed = []
+
+        class SlowOCR(OCRProvider):
+            def __init__(self, provider_config):
+                super().__init__(provider_config)
+                constructed.append(self)
+
+            def extract_text(self, image_path):
+                return OCRResult(text=str(image_path), confidence=1.0,
+                                 provider='slow', processing_time=0.0)
+
+        handle = LazyProvider("slow", SlowOCR, {})
+        threads = [
+            threading.Thread(target=handle.extract_text, args=(i,)) for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(constructed) == 1
+        assert handle.extract_text_batch(["a", "b"])[1].text == "b"
+
+    def test_lazy_provider_remembers_failure(self):
+        """A provider that fails to construct is not retried on every page"""
+        factory = Mock(side_effect=ImportError("sdk missing"))
+        handle = LazyProvider('broken', factory, {})
+
+        for _ in range(3):
+            with pytest.raises(OCRProviderError, match="broken unavailable"):
+                handle.extract_text("page.png")
+
+        factory.assert_called_once()
+
     def test_hybrid_provider_priority_modes(self):
         """Test provider priority based on quality mode"""
         config = {
@@ -302,6 +599,148 @@ class TestOCRFactory:
                 create_ocr_provider("nonexistent")
 
 
+@pytest.mark.unit
+@pytest.mark.ocr
+class TestSimulatedOCR:
+
+    def test_constant_distributions(self, sample_image):
+        """Constant specs give exactly the configured result, in simulated time"""
+        provider = SimulatedOCR({"latency_ms": 2000, "confidence": 0.8, "cost": 0.01,
+                                 "words_per_page": 5, "time_scale": 0.0})
+
+        result = provider.extract_text(sample_image)
+
+        assert provider.name == "simulated" and result.provider == "simulated"
+        assert result.processing_time == 2.0
+        assert result.confidence == 0.8 and result.cost == 0.01
+        assert len(result.text.split()) == 5 and len(result.bounding_boxes) == 5
+
+    def test_latency_and_cost_scale_with_image_size(self, tmp_path):
+        """Per-megapixel terms use the image dimensions"""
+        small, large = tmp_path / "small.png", tmp_path / "large.png"
+        Image.new("L", (1000, 1000), 255).save(small)
+        Image.new("L", (2000, 2000), 255).save(large)
+        provider = SimulatedOCR({"latency_ms": 0, "latency_per_megapixel_ms": 500,
+                                 "cost_per_megapixel": 0.001, "time_scale": 0.0})
+
+        assert provider.extract_text(small).processing_time == pytest.approx(0.5)
+        assert provider.extract_text(large).processing_time == pytest.approx(2.0)
+        assert provider.get_cost_estimate(large) == pytest.approx(0.004)
+
+    def test_lazy_handle_prices_per_megapixel_without_loading(self, tmp_path):
+        """Unloaded handles and hybrid routing use the provider's own cost model"""
+        page = tmp_path / "page.png"
+        Image.new("L", (2000, 2000), 255).save(page)
+        qwen = {
+            "type": "simulated",
+            "cost": {"distribution": "constant", "value": 0.01},
+            "cost_per_megapixel": 0.005,
+            "time_scale": 0.0,
+        }
+
+        lazy = LazyProvider("qwen", SimulatedOCR, {"name": "qwen", **qwen})
+        assert lazy.get_cost_estimate(page) == pytest.approx(0.03)
+        assert not lazy.is_loaded
+
+        hybrid = HybridOCR(
+            {"provider_priority": ["qwen"], "usage_db": str(tmp_path / "usage.db")},
+            providers_config={"qwen": qwen},
+        )
+        assert hybrid.get_cost_estimate(page) == pytest.approx(0.03)
+
+    def test_failures_and_timeouts(self, sample_image):
+        """Failures raise like a provider error; timeouts return an empty result"""
+        with pytest.raises(OCRProviderError):
+            failing = SimulatedOCR({"failure_rate": 1.0, "time_scale": 0.0})
+            failing.extract_text(sample_image)
+
+        timeouts = {"timeout_rate": 1.0, "timeout": 30, "time_scale": 0.0}
+        result = SimulatedOCR(timeouts).extract_text(sample_image)
+        assert result.text == "" and result.processing_time == 30.0
+        assert "Timeout" in result.metadata["error"]
+
+    def test_seed_reproducible(self, sample_image):
+        """The same seed draws the same sequence of results"""
+        spec = {
+            "latency_ms": {"distribution": "lognormal", "median": 500, "sigma": 0.5},
+            "confidence": {"distribution": "normal", "mean": 0.8, "stdev": 0.1},
+            "time_scale": 0.0,
+            "seed": 7,
+        }
+        first = SimulatedOCR(spec).extract_text(sample_image)
+        second = SimulatedOCR(spec).extract_text(sample_image)
+
+        assert (first.processing_time, first.confidence, first.text) == \
+            (second.processing_time, second.confidence, second.text)
+
+    def test_concurrent_threads_and_tasks(self, sample_image):
+        """Draws are serialized; sleeping happens outside the lock"""
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        provider = SimulatedOCR({
+            "latency_ms": {"distribution": "uniform", "low": 10, "high": 20},
+            "confidence": {"distribution": "uniform", "low": 0.5, "high": 1.0},
+            "time_scale": 1.0,
+        })
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(provider.extract_text, [sample_image] * 40))
+        assert len(results) == 40 and all(0.5 <= r.confidence <= 1.0 for r in results)
+
+        async def run_all():
+            return await asyncio.gather(
+                *(provider.extract_text_async(sample_image) for _ in range(40))
+            )
+
+        started = time.perf_counter()
+        results = asyncio.run(run_all())
+        # Sleeps overlap
+        assert len(results) == 40 and time.perf_counter() - started < 0.4
+
+    def test_validate_config(self):
+        """Unknown distributions, missing parameters and bad rates are reported"""
+        problems = SimulatedOCR.validate_config({
+            "latency_ms": {"distribution": "poisson"},
+            "confidence": {"distribution": "normal", "mean": 0.9},
+            "failure_rate": 1.5,
+        })
+
+        assert len(problems) == 3
+        valid = {"latency_ms": 100, "timeout_rate": 0.1}
+        assert SimulatedOCR.validate_config(valid) == []
+
+    def test_stands_in_for_named_providers(self, sample_image, tmp_path):
+        """Simulated entries keep their names for routing, fallback and budgets"""
+        providers = {
+            "tesseract": {"type": "simulated", "confidence": 0.5, "time_scale": 0.0},
+            "google_vision": {
+                "type": "simulated",
+                "confidence": 0.95,
+                "cost": 0.002,
+                "time_scale": 0.0,
+            },
+        }
+        hybrid_config = {
+            "provider_priority": ["tesseract", "google_vision"],
+            "confidence_thresholds": {"tesseract": 75, "google_vision": 80},
+            "usage_db": str(tmp_path / "usage.db"),
+        }
+
+        with patch('src.utils.ocr_providers.config') as mock_config:
+            mock_config.get.return_value = {"providers": {**providers, "simulated": {}}}
+            hybrid = HybridOCR(hybrid_config)
+            assert isinstance(create_ocr_provider("google_vision"), SimulatedOCR)
+            assert isinstance(create_ocr_provider("simulated"), SimulatedOCR)
+
+        result = hybrid.extract_text(sample_image)
+
+        assert result.provider == "google_vision"
+        assert "simulated" in hybrid.get_available_providers()
+        daily = hybrid._usage_db().get_daily_ocr_cost()
+        assert daily["google_vision"]["cost"] == pytest.approx(0.002)
+        assert daily["tesseract"]["images"] == 1
+
+
 @pytest.mark.integration
 @pytest.mark.ocr
 class TestOCRIntegration:
@@ -347,4 +786,4 @@ class TestOCRIntegration:
                 # Verify data was stored
                 stored_note = test_db.get_note("integration_test")
                 assert stored_note is not None
-                assert stored_note["ocr_provider"] == "tesseract"
\ No newline at end of file
+                assert stored_note["ocr_provider"] == "tesseract"
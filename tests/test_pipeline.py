@@ -0,0 +1,223 @@
+"""
+Tests for the staged processing pipeline
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from functools import partial
+from unittest.mock import Mock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from src.utils import metrics
+from src.utils.ocr_providers import OCRResult
+from src.utils.memory_budget import MemoryBudget
+from src.utils.pipeline import Pipeline, Stage, PROCESS
+
+
+def square(value):
+    return value * value
+
+
+def worker_pid(value):
+    return os.getpid()
+
+
+def start_method(value):
+    return multiprocessing.get_start_method()
+
+
+@metrics.timed("stage_ms", stage="square")
+def timed_square(value):
+    return value * value
+
+
+@pytest.mark.unit
+class TestPipeline:
+
+    def test_results_in_input_order(self):
+        """Results come back in input order whatever order they finish in"""
+        def slow_for_small(value):
+            time.sleep(0.01 * (5 - value))
+            return value
+
+        pipeline = Pipeline([
+            Stage("wait", slow_for_small, workers=5),
+            Stage("double", lambda v: v * 2, workers=2),
+        ])
+
+        results = pipeline.run(range(5))
+
+        assert [r.value for r in results] == [0, 2, 4, 6, 8]
+        assert all(r.ok for r in results)
+
+    def test_process_stage(self):
+        """Process stages run picklable functions outside the calling process"""
+        pipeline = Pipeline([
+            Stage("square", square, workers=2, kind=PROCESS),
+            Stage("pid", partial(worker_pid), workers=1, kind=PROCESS),
+        ])
+
+        results = pipeline.run([1, 2, 3])
+
+        assert len(results) == 3
+        assert all(r.value != os.getpid() for r in results)
+
+    def test_spawned_workers_record_metrics(self, test_db):
+        """Process workers are spawned and pick up metrics from the environment"""
+        metrics.configure(test_db, flush_interval=3600)
+        try:
+            results = Pipeline(
+                [Stage("square", timed_square, workers=2, kind=PROCESS)]
+            ).run([1, 2, 3])
+        finally:
+            metrics.shutdown()
+
+        assert [r.value for r in results] == [1, 4, 9]
+        entry = metrics.summarize(test_db.get_metric_histograms(metric="stage_ms"))[0]
+        assert entry["labels"] == {"stage": "square"} and entry["count"] == 3
+        assert (
+            Pipeline([Stage("method", start_method, kind=PROCESS)]).run([0])[0].value
+            == "spawn"
+        )
+
+    def test_failures_and_drops_skip_later_stages(self):
+        """A failing item records its stage; None drops the item quietly"""
+        def check(value):
+            if value == 1:
+                raise ValueError("bad item")
+            return None if value == 2 else value
+
+        later = Mock(side_effect=lambda v: v)
+        results = Pipeline([Stage("check", check), Stage("later", later)]).run(
+            [0, 1, 2]
+        )
+
+        assert results[0].ok
+        assert isinstance(results[1].error, ValueError)
+        assert results[1].failed_stage == "check"
+        assert results[2].value is None and results[2].error is None
+        later.assert_called_once_with(0)
+
+    def test_bounded_queues_apply_backpressure(self):
+        """A stalled stage stops the feeder once its queue is full"""
+        release = threading.Event()
+        fed = []
+
+        def items():
+            for i in range(50):
+                fed.append(i)
+                yield i
+
+        def blocked(value):
+            release.wait()
+            return value
+
+        pipeline = Pipeline([Stage("blocked", blocked, workers=1)], queue_size=2)
+        runner = threading.Thread(target=pipeline.run, args=(items(),))
+        runner.start()
+        time.sleep(0.2)
+        in_flight = len(fed)
+        release.set()
+        runner.join(timeout=5)
+
+        # One item being worked on, two queued and one blocked in put()
+        assert in_flight <= 4
+        assert len(fed) == 50
+
+    def test_on_result_called_per_item(self):
+        """Progress callbacks fire once per item"""
+        seen = []
+        Pipeline([Stage("identity", lambda v: v, workers=3)]).run(
+            range(7), on_result=seen.append
+        )
+
+        assert sorted(r.index for r in seen) == list(range(7))
+
+    @pytest.mark.parametrize("budgeted", [False, True])
+    def test_failing_callback_stops_run_promptly(self, budgeted):
+        """An exception in on_result propagates without processing the rest"""
+        processed = []
+
+        def slow(value):
+            processed.append(value)
+            time.sleep(0.01)
+            return value
+
+        def fail(result):
+            raise RuntimeError("callback failed")
+
+        budget = MemoryBudget(10) if budgeted else None
+        pipeline = Pipeline([Stage("slow", slow)], budget=budget,
+                            weigh=(lambda value: 10) if budgeted else None)
+
+        started = time.perf_counter()
+        with pytest.raises(RuntimeError, match="callback failed"):
+            pipeline.run(range(500), on_result=fail)
+
+        assert time.perf_counter() - started < 2.0
+        assert len(processed) < 20
+        if budget is not None:
+            assert budget.in_use == 0
+
+    def test_invalid_stage_kind(self):
+        """Unknown executor kinds are rejected"""
+        with pytest.raises(ValueError):
+            Stage("bad", square, kind="gpu")
+
+
+@pytest.mark.integration
+class TestProcessCommandPipeline:
+
+    def test_directory_processed_with_workers(self, tmp_path):
+        """--workers routes a directory through the pipeline"""
+        from PIL import Image
+        from src.cli import cli
+
+        for i in range(3):
+            Image.new('L', (40, 40), 255).save(tmp_path / f"page{i}.png")
+
+        provider = Mock()
+        provider.extract_text.side_effect = lambda path: OCRResult(
+            text=f"Heading\n- point about {os.path.basename(path)}",
+            confidence=0.9, provider='fake', processing_time=0.0
+        )
+
+        with (
+            patch('src.cli.OCRProviderFactory') as factory,
+            patch('src.cli.DatabaseManager') as db,
+        ):
+            factory.get_provider.return_value = provider
+            db.return_value.get_job.return_value = None
+            result = CliRunner().invoke(cli, [
+                'process', str(tmp_path), '-o', str(tmp_path / "out"),
+                '--format', 'json', '--workers', '2', '--stage-workers', 'ocr=3'
+            ])
+
+        assert result.exit_code == 0
+        assert "ocr×3" in result.output
+        assert provider.extract_text.call_count == 3
+        assert db.return_value.insert_note.call_count == 3
+        assert sorted(p.name for p in (tmp_path / "out").glob("*.json")) == [
+            "page0_data.json", "page1_data.json", "page2_data.json"
+        ]
+
+    def test_invalid_stage_workers(self, tmp_path):
+        """Unknown stage names are reported instead of processed"""
+        from src.cli import cli
+
+        (tmp_path / "a.png").touch()
+        (tmp_path / "b.png").touch()
+        with (
+            patch('src.cli.OCRProviderFactory'),
+            patch('src.cli.DatabaseManager') as db,
+        ):
+            db.return_value.get_job.return_value = None
+            result = CliRunner().invoke(
+                cli, ['process', str(tmp_path), '--stage-workers', 'gpu=2']
+            )
+
+        assert "Invalid stage worker setting" in result.output
@@ -0,0 +1,144 @@
+"""
+Tests for opt-in stage and file profiling
+"""
+
+import pstats
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from src.utils import profiling
+from src.utils.profiling import ProfileOptions, StackSampler
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(200))
+
+
+@profiling.profiled("decode")
+def _decode(file_path: Path, seconds: float = 0.0):
+    _busy(seconds)
+    return file_path.name
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    def start(**options):
+        return profiling.enable(
+            ProfileOptions(output_dir=str(tmp_path / "profiles"), **options)
+        )
+    yield start
+    profiling.disable()
+
+
+@pytest.mark.unit
+class TestProfiling:
+
+    def test_disabled_stages_run_unprofiled(self):
+        """Without --profile the stage decorator just calls through"""
+        assert profiling.get_profiler() is None
+        assert _decode(Path("a.note")) == "a.note"
+        with profiling.file_region("a.note"):
+            pass
+
+    def test_cprofile_per_stage_named_by_file_and_stage(self, profiler):
+        """Each stage call writes a pstats dump named after the file and stage"""
+        active = profiler(mode="cprofile")
+        _decode(Path("meeting.note"))
+        with profiling.file_region(Path("sketch.note")):
+            profiling.profiled("analyze")(lambda result: result)({"text": ""})
+
+        names = [path.name for path in active.written]
+        assert names[0].startswith("meeting.decode.") and names[0].endswith(".pstats")
+        assert names[1].startswith("sketch.analyze.")
+        stats = pstats.Stats(str(active.written[0]))
+        assert any(func[2] == "_decode" for func in stats.stats)
+
+    def test_every_nth_and_slow_threshold(self, profiler):
+        """Only every Nth call is profiled, and fast ones are discarded"""
+        active = profiler(mode="cprofile", every_nth=3)
+        for index in range(7):
+            _decode(Path(f"page{index}.note"))
+        written = [path.name.split(".")[0] for path in active.written]
+        assert written == ["page0", "page3", "page6"]
+
+        active = profiler(mode="cprofile", slower_than=0.05)
+        _decode(Path("fast.note"))
+        _decode(Path("slow.note"), seconds=0.06)
+        assert [path.name.split(".")[0] for path in active.written] == ["slow"]
+
+    def test_per_file_profiles_whole_file_only(self, profiler):
+        """Per-file profiling covers the whole file and skips the stage hooks"""
+        active = profiler(mode="cprofile", per="file")
+        with profiling.file_region(Path("notes.note")):
+            _decode(Path("notes.note"))
+            _decode(Path("notes.note"))
+
+        assert len(active.written) == 1
+        assert active.written[0].name.startswith("notes.file.")
+
+    def test_sample_mode_writes_collapsed_stacks(self, profiler):
+        """Sampling writes 'frame;frame count' lines including the stage function"""
+        active = profiler(mode="sample", sample_interval=0.001)
+        _decode(Path("long.note"), seconds=0.1)
+
+        path = active.written[0]
+        assert path.suffix == ".folded"
+        lines = path.read_text().splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert any("_busy (test_profiling.py" in line for line in lines)
+
+    def test_sampler_only_follows_its_thread(self):
+        """Stacks of other threads are not sampled"""
+        sampler = StackSampler(threading.get_ident(), 0.001)
+        other = threading.Thread(target=_busy, args=(0.05,))
+        sampler.start()
+        other.start()
+        other.join()
+        sampler.stop()
+        assert sampler.stacks
+        assert all(
+            "test_sampler_only_follows_its_thread" in stack for stack in sampler.stacks
+        )
+        assert not any("_busy" in stack for stack in sampler.stacks)
+
+    def test_invalid_options_rejected(self):
+        """Unknown modes and granularities raise ValueError"""
+        with pytest.raises(ValueError):
+            ProfileOptions(mode="perf")
+        with pytest.raises(ValueError):
+            ProfileOptions(per="page")
+
+    def test_process_profile_option(self, tmp_path):
+        """process --profile writes a pstats dump per stage and stops on exit"""
+        from src.cli import cli
+        from src.utils.config import config
+        from src.utils.ocr_providers import OCRResult
+
+        image = tmp_path / "page.png"
+        image.touch()
+        profile_dir = tmp_path / "profiles"
+
+        with patch('src.cli.OCRProviderFactory') as mock_factory, \
+             patch('src.cli.DatabaseManager') as mock_db, \
+             patch.dict(config._config.setdefault("processing", {}),
+                        {"profiling": {"output_dir": str(profile_dir)}}):
+            provider = mock_factory.get_provider.return_value
+            provider.extract_text.return_value = OCRResult(
+                text="Project plan", confidence=0.9, provider="tesseract",
+                processing_time=0.1
+            )
+            mock_db.return_value.get_job.return_value = None
+            args = ['process', str(image), '--output', str(tmp_path / "out")]
+            result = CliRunner().invoke(cli, [*args, '--profile', 'cprofile'])
+
+        assert result.exit_code == 0, result.output
+        stages = {path.name.split(".")[1] for path in profile_dir.glob("*.pstats")}
+        assert stages == {"ocr", "store", "analyze", "export"}
+        assert profiling.get_profiler() is None
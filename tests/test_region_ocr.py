@@ -0,0 +1,254 @@
+"""
+Tests for region-level OCR fan-out and stitching
+"""
+
+import threading
+
+import pytest
+from PIL import Image, ImageDraw
+
+from src.utils.ocr_providers import OCRProvider, OCRResult
+from src.utils.region_ocr import RegionOCR, find_ink_regions
+
+
+class CropSizeOCR(OCRProvider):
+    """Fake provider that names each crop by its size and records concurrency"""
+
+    def __init__(self, fail_first_for=None):
+        super().__init__({})
+        self.name = 'fake'
+        self.fail_first_for = fail_first_for
+        self.calls = 0
+        self.failed = set()
+        self.lock = threading.Lock()
+
+    def extract_text(self, image_path):
+        with Image.open(image_path) as crop:
+            width, height = crop.size
+        with self.lock:
+            self.calls += 1
+            if width == self.fail_first_for and width not in self.failed:
+                self.failed.add(width)
+                raise ConnectionError("provider hiccup")
+        return OCRResult(
+            text=f"block {width}",
+            confidence=0.8,
+            provider='fake',
+            processing_time=0.0,
+            cost=0.001,
+            bounding_boxes=[{'word': 'block', 'confidence': 0.8, 'bbox': (2, 3, 10, 5)}]
+        )
+
+
+def make_page(tmp_path):
+    """White page with two blocks on the first line and one further down"""
+    image = Image.new('L', (600, 400), color=255)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((20, 30, 119, 49), fill=0)    # 100 wide
+    draw.rectangle((300, 32, 459, 47), fill=0)   # 160 wide, same line
+    draw.rectangle((40, 200, 249, 229), fill=0)  # 210 wide, second line
+    path = tmp_path / "page.png"
+    image.save(path)
+    return path, image
+
+
+@pytest.mark.unit
+class TestFindInkRegions:
+
+    def test_regions_in_reading_order(self, tmp_path):
+        """Blocks are split by line and column gaps and ordered top-down, left-right"""
+        _, image = make_page(tmp_path)
+
+        regions = find_ink_regions(image, padding=0)
+
+        assert [r.bbox for r in regions] == [
+            (20, 30, 100, 20),
+            (300, 30, 160, 20),
+            (40, 200, 210, 30),
+        ]
+
+    def test_blank_page_has_no_regions(self):
+        """A page without ink yields no regions"""
+        assert find_ink_regions(Image.new('L', (200, 200), color=255)) == []
+
+
+@pytest.mark.unit
+@pytest.mark.ocr
+class TestRegionOCR:
+
+    def test_regions_stitched_with_page_coordinates(self, tmp_path):
+        """Region results are joined in reading order with shifted boxes"""
+        path, _ = make_page(tmp_path)
+        region_ocr = RegionOCR(CropSizeOCR(), {'padding': 0, 'max_workers': 3})
+
+        result = region_ocr.extract_text(path)
+
+        assert result.text == "block 100\nblock 160\nblock 210"
+        assert result.provider == 'fake'
+        assert result.cost == pytest.approx(0.003)
+        assert result.confidence == pytest.approx(0.8)
+        assert [b['bbox'] for b in result.bounding_boxes] == [
+            (22, 33, 10, 5), (302, 33, 10, 5), (42, 203, 10, 5)
+        ]
+        assert result.metadata['image_size'] == (600, 400)
+        assert result.metadata['regions'][2]['bbox'] == (40, 200, 210, 30)
+
+    def test_failed_region_retried_alone(self, tmp_path):
+        """Only the failing region is sent again"""
+        path, _ = make_page(tmp_path)
+        provider = CropSizeOCR(fail_first_for=160)
+        region_ocr = RegionOCR(provider, {'padding': 0})
+
+        result = region_ocr.extract_text(path)
+
+        assert provider.calls == 4
+        assert "block 160" in result.text
+        assert result.metadata['failed_regions'] == 0
+
+    def test_exhausted_retries_keep_other_regions(self, tmp_path):
+        """A region that keeps failing is dropped without losing the page"""
+        path, _ = make_page(tmp_path)
+        region_ocr = RegionOCR(
+            CropSizeOCR(fail_first_for=160), {'padding': 0, 'retries': 0}
+        )
+
+        result = region_ocr.extract_text(path)
+
+        assert result.text == "block 100\nblock 210"
+        assert result.metadata['failed_regions'] == 1
+
+    def test_per_image_pricing_sends_page_whole(self, tmp_path):
+        """Regions are skipped when each crop would cost as much as the page"""
+        path, _ = make_page(tmp_path)
+        provider = CropSizeOCR()
+        provider.config['cost_per_image'] = 0.01
+        region_ocr = RegionOCR(provider, {'padding': 0})
+
+        result = region_ocr.extract_text(path)
+
+        assert provider.calls == 1
+        assert result.text == "block 600"
+        assert "regions cost" in result.metadata['region_fallback']
+
+    def test_hybrid_with_free_first_provider_is_split(self, tmp_path):
+        """A paid fallback later in the chain does not stop a free first route"""
+        from src.utils.ocr_providers import HybridOCR
+
+        path, _ = make_page(tmp_path)
+        providers = {
+            'qwen': {'type': 'simulated', 'cost': 0.0, 'time_scale': 0.0},
+            'gpt4_vision': {
+                'type': 'simulated',
+                'cost_per_image': 0.01,
+                'time_scale': 0.0,
+            },
+        }
+        hybrid = HybridOCR(
+            {
+                'provider_priority': ['qwen', 'gpt4_vision'],
+                'confidence_thresholds': {'qwen': 0},
+                'usage_db': str(tmp_path / "usage.db"),
+            },
+            providers_config=providers,
+        )
+
+        result = RegionOCR(hybrid, {'padding': 0}).extract_text(path)
+
+        assert 'region_fallback' not in result.metadata
+        assert len(result.metadata['regions']) == 3
+
+    def test_region_count_capped(self, tmp_path):
+        """Pages with more regions than max_regions are sent whole"""
+        path, _ = make_page(tmp_path)
+        provider = CropSizeOCR()
+        region_ocr = RegionOCR(provider, {'padding': 0, 'max_regions': 2})
+
+        result = region_ocr.extract_text(path)
+
+        assert provider.calls == 1
+        assert "max_regions" in result.metadata['region_fallback']
+
+
+@pytest.mark.unit
+class TestNoteElementsFromRegions:
+
+    def test_elements_use_region_bboxes(self):
+        """Note elements take their boxes from the OCR regions"""
+        from src.cli import create_note_elements_from_ocr
+
+        ocr_result = OCRResult(
+            text="Title\nfirst\nsecond",
+            confidence=0.9,
+            provider='fake',
+            processing_time=0.0,
+            metadata={
+                'regions': [
+                    {'bbox': (10, 20, 300, 40), 'text': 'Title', 'confidence': 0.95},
+                    {
+                        'bbox': (10, 100, 200, 60),
+                        'text': 'first\nsecond',
+                        'confidence': 0.7,
+                    },
+                    {'bbox': (400, 100, 50, 20), 'text': '', 'confidence': 0.0},
+                ]
+            },
+        )
+
+        elements = create_note_elements_from_ocr(ocr_result)
+
+        assert [(e.text, e.bbox) for e in elements] == [
+            ('Title', (10, 20, 300, 40)),
+            ('first', (10, 100, 200, 30)),
+            ('second', (10, 130, 200, 30)),
+        ]
+        assert elements[1].confidence == 0.7
+
+    def test_pages_stacked_vertically(self):
+        """Regions from later pages are offset by earlier page heights"""
+        from src.cli import merge_page_regions
+
+        pages = [
+            OCRResult(
+                text="a",
+                confidence=0.9,
+                provider='fake',
+                processing_time=0.0,
+                metadata={
+                    'regions': [
+                        {'bbox': (0, 10, 5, 5), 'text': 'a', 'confidence': 0.9}
+                    ],
+                    'image_size': (100, 200),
+                },
+            ),
+            OCRResult(
+                text="b",
+                confidence=0.9,
+                provider='fake',
+                processing_time=0.0,
+                metadata={
+                    'regions': [
+                        {'bbox': (0, 10, 5, 5), 'text': 'b', 'confidence': 0.9}
+                    ],
+                    'image_size': (100, 200),
+                },
+            ),
+        ]
+
+        regions = merge_page_regions(pages)['regions']
+
+        assert [(r['bbox'], r['page']) for r in regions] == [
+            ((0, 10, 5, 5), 1),
+            ((0, 210, 5, 5), 2),
+        ]
+
+    def test_without_regions_falls_back_to_lines(self):
+        """Plain OCR results still produce line elements"""
+        from src.cli import create_note_elements_from_ocr
+
+        ocr_result = OCRResult(
+            text="one\ntwo", confidence=0.8, provider='fake', processing_time=0.0
+        )
+
+        elements = create_note_elements_from_ocr(ocr_result)
+
+        assert [e.text for e in elements] == ['one', 'two']
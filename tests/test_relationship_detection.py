@@ -5,12 +5,16 @@ Tests the relationship detector with realistic sample data representing
 scattered handwritten thoughts that need organization.
 """
 
+import random
+import re
+
 import pytest
 from unittest.mock import MagicMock
 import numpy as np
 
 from src.utils.relationship_detector import (
-    RelationshipDetector, NoteElement, Relationship, RelationshipType
+    RelationshipDetector, NoteElement, Relationship, RelationshipType,
+    ARROWS, SEQUENCES, GROUPINGS, PatternMatch
 )
 
 
@@ -353,4 +357,99 @@ class TestRelationshipDeduplication:
         assert "E" in graph["D"]
         
         # Isolated nodes should not be in graph if they're not sources
-        assert len(graph["A"]) == 2  # Points to B and C
\ No newline at end of file
+        assert len(graph["A"]) == 2  # Points to B and C
+
+
+class TestPatternFamilies:
+    """Test the single-pass arrow, sequence and grouping matchers"""
+
+    TOKENS = ["->", "→", "<-", "<->", "<=>", "=>", " ", "a", "then", "Then", "step 4",
+              "Step", "[", "]", "(", ")", "{", "}", '"', "first", "↑", "⇐", "\n",
+              "last."]
+
+    def _texts(self, count=300):
+        rng = random.Random(0)
+        return ["".join(rng.choice(self.TOKENS) for _ in range(rng.randint(0, 15)))
+                for _ in range(count)]
+
+    def test_first_hits_match_searching_each_pattern(self):
+        """Arrow and sequence scans match re.search per pattern, overlaps included"""
+        for family, flags in ((ARROWS, 0), (SEQUENCES, re.IGNORECASE)):
+            for text in self._texts() + ["a <-> b", "x <=> y -> z"]:
+                expected = []
+                for pattern in family.patterns:
+                    match = re.search(pattern, text, flags)
+                    if match:
+                        expected.append((pattern, match.group(), match.span()))
+
+                hits = family.scan(text, first_only=True)
+                assert [(hit.pattern, hit.text, hit.span) for hit in hits] == expected
+
+    def test_all_hits_match_finditer_per_pattern(self):
+        """Grouping scans find every non-overlapping hit, in pattern order"""
+        for text in self._texts() + ['say "a" and "b" (or [c])']:
+            expected = [(pattern, match.group(), match.span())
+                        for pattern in GROUPINGS.patterns
+                        for match in re.finditer(pattern, text, re.DOTALL)]
+
+            hits = GROUPINGS.scan(text)
+            assert [(hit.pattern, hit.text, hit.span) for hit in hits] == expected
+
+    def test_arrow_relationship_from_scanned_match(self):
+        """Scanned arrows carry their symbol into the relationship evidence"""
+        detector = RelationshipDetector()
+        source = NoteElement("Start → end", (10, 20, 50, 15), 0.9, "src")
+        target = NoteElement("End", (70, 20, 40, 15), 0.85, "tgt")
+
+        [arrow] = ARROWS.scan(source.text, first_only=True)
+        relationship = detector._create_arrow_relationship(source, target, arrow)
+
+        assert isinstance(arrow, PatternMatch) and arrow.kind == "arrow"
+        assert relationship.confidence == 0.8
+        assert relationship.evidence['arrow_symbol'] == "→"
+
+
+class TestHierarchyDetection:
+    """Test the single-pass parent resolution for outlines"""
+
+    def _outline(self, count, seed=0):
+        rng = random.Random(seed)
+        prefixes = ["", "  ", "    ", "        ", "1. ", "  a. ", "    ii. ", "- ",
+                    "  * ", "• ", "i.", "12.x"]
+        return [NoteElement(f"{rng.choice(prefixes)}line {i}",
+                            (10, rng.randrange(count * 5), 100, 15), 0.9, f"line{i}")
+                for i in range(count)]
+
+    def _backward_scan(self, detector, elements):
+        """Reference: walk back from each element to the closest lower level"""
+        ordered = sorted(elements, key=lambda e: e.bbox[1])
+        levels = [detector._determine_hierarchy_level(element) for element in ordered]
+        pairs = []
+        for i, level in enumerate(levels):
+            if level > 0:
+                for j in range(i - 1, -1, -1):
+                    if levels[j] < level:
+                        pairs.append((ordered[j].element_id, ordered[i].element_id,
+                                      levels[j], level))
+                        break
+        return pairs
+
+    def test_parents_match_backward_scan(self):
+        """The stack finds the same parent as scanning back through earlier lines"""
+        detector = RelationshipDetector()
+        for seed in range(5):
+            elements = self._outline(200, seed)
+            relationships = detector._detect_hierarchy(elements)
+
+            found = [(r.source_id, r.target_id,
+                      r.evidence['parent_level'], r.evidence['child_level'])
+                     for r in relationships]
+            assert found == self._backward_scan(detector, elements)
+
+    def test_markers_without_trailing_space(self):
+        """List markers count even when text follows them directly"""
+        detector = RelationshipDetector()
+        texts = ["1.Intro", "b.item", "iii.deep", "-dash", "i.x", "plain"]
+        elements = [NoteElement(text, (0, 0, 1, 1), 1.0, "e") for text in texts]
+        levels = [detector._determine_hierarchy_level(element) for element in elements]
+        assert levels == [1, 2, 3, 1, 2, 0]
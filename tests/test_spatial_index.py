@@ -0,0 +1,131 @@
+"""
+Tests for the uniform-grid spatial index used by relationship detection
+"""
+
+import math
+import random
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.relationship_detector import NoteElement, RelationshipDetector
+from src.utils.spatial_index import SpatialIndex, bbox_center
+
+
+def _points(count, seed=0, spread=1000):
+    rng = random.Random(seed)
+    return [(rng.randrange(-50, spread), rng.randrange(-50, spread))
+            for _ in range(count)]
+
+
+def _brute_within(points, x, y, radius):
+    found = []
+    for index, (px, py) in enumerate(points):
+        distance = math.sqrt((px - x) ** 2 + (py - y) ** 2)
+        if distance <= radius:
+            found.append((index, distance))
+    return found
+
+
+@pytest.mark.unit
+class TestSpatialIndex:
+
+    @pytest.mark.parametrize("cell_size", [7, 50, 400])
+    def test_within_matches_linear_scan(self, cell_size):
+        """Radius queries return the same points, in order, as scanning the list"""
+        points = _points(500)
+        index = SpatialIndex(points, cell_size)
+        queries = [(0, 0, 100), (500, 500, 49.5), (990, 10, 3000), (200, 800, 0)]
+        for x, y, radius in queries:
+            assert index.within(x, y, radius) == _brute_within(points, x, y, radius)
+
+    def test_pairs_within_matches_linear_scan(self):
+        """Every close pair is found once, ordered by first then second index"""
+        points = _points(300, seed=1, spread=400)
+        expected = [(i, j, distance) for i, (x, y) in enumerate(points)
+                    for j, distance in _brute_within(points, x, y, 30) if j > i]
+        assert SpatialIndex(points, 30).pairs_within(30) == expected
+
+    @pytest.mark.parametrize("k", [1, 5, 40])
+    def test_nearest_matches_sorting_by_distance(self, k):
+        """k-nearest agrees with sorting all points by distance, ties broken by index"""
+        points = _points(400, seed=2) + [(500, 500), (500, 500)]
+        index = SpatialIndex(points, 60)
+        for x, y in [(500, 500), (-400, 2000), (123, 456)]:
+            found = _brute_within(points, x, y, math.inf)
+            ranked = sorted((distance, i) for i, distance in found)
+            expected = [(i, distance) for distance, i in ranked[:k]]
+            assert index.nearest(x, y, k) == expected
+
+    def test_nearest_respects_max_radius(self):
+        """Points beyond max_radius are never returned, even if fewer than k remain"""
+        index = SpatialIndex([(0, 0), (10, 0), (100, 0)], 20)
+        assert index.nearest(0, 0, 3, max_radius=50) == [(0, 0.0), (1, 10.0)]
+        assert SpatialIndex([], 20).nearest(0, 0, 3) == []
+
+    def test_rejects_non_positive_cell_size(self):
+        """A zero cell size is a configuration error"""
+        with pytest.raises(ValueError):
+            SpatialIndex([(0, 0)], 0)
+
+    def test_bbox_center_matches_detector(self):
+        """Centers use the same integer halving as the detector's distances"""
+        assert bbox_center((10, 20, 31, 15)) == (25, 27)
+
+
+@pytest.mark.unit
+class TestDetectorNeighbourQueries:
+
+    def test_nearby_elements_keep_order_and_skip_same_id(self):
+        """Neighbours come back in element order, without the center or its copies"""
+        elements = [
+            NoteElement("c", (100, 100, 10, 10), 0.9, "b"),
+            NoteElement("a", (0, 0, 10, 10), 0.9, "a"),
+            NoteElement("center", (50, 50, 10, 10), 0.9, "center"),
+            NoteElement("far", (900, 900, 10, 10), 0.9, "far"),
+            NoteElement("copy", (60, 60, 10, 10), 0.9, "center"),
+        ]
+        detector = RelationshipDetector()
+        nearby = detector._find_nearby_elements(elements[2], elements, radius=100)
+        assert [element.element_id for element in nearby] == ["b", "a"]
+
+    def test_dense_page_visits_linear_candidates(self):
+        """At constant density, candidates visited grow linearly with element count"""
+
+        def page(count):
+            rng = random.Random(0)
+            side = int(30 * math.sqrt(count))
+            return [
+                NoteElement(
+                    rng.choice(["then", "idea", "-> next", "(group)"]),
+                    (
+                        rng.randrange(side),
+                        rng.randrange(side),
+                        rng.randrange(20, 90),
+                        20,
+                    ),
+                    0.9,
+                    f"word_{i}",
+                )
+                for i in range(count)
+            ]
+
+        candidates = SpatialIndex._candidates
+
+        def visited(count):
+            total = 0
+
+            def counting(index, x, y, radius):
+                nonlocal total
+                for candidate in candidates(index, x, y, radius):
+                    total += 1
+                    yield candidate
+
+            with patch.object(SpatialIndex, "_candidates", counting):
+                assert RelationshipDetector().detect_relationships(page(count))
+            return total
+
+        small, large = visited(1000), visited(2000)
+
+        assert large < 2.5 * small
+        assert large < 2000 * 2000 / 10
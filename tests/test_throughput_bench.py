@@ -0,0 +1,101 @@
+"""
+Tests for the end-to-end throughput benchmark
+"""
+
+import pytest
+from click.testing import CliRunner
+
+from src.cli import cli
+from src.utils import throughput_bench
+from src.utils.throughput_bench import CorpusSpec
+
+
+def _report(**fields):
+    result = {
+        "corpus": "2x2p blank=0",
+        "workers": 2,
+        "pages_per_min": 100.0,
+        "file_p95_s": 2.0,
+        "peak_rss_mb": 100.0,
+        "db_growth_bytes": 4096,
+    }
+    return throughput_bench.build_report([{**result, **fields}], 10)
+
+
+@pytest.mark.unit
+class TestThroughputBench:
+
+    def test_compare_reports_flags_regressions(self):
+        """Lower throughput and higher latency count as worse, the reverse as better"""
+        previous = _report()
+        current = _report(pages_per_min=80.0, file_p95_s=1.0)
+
+        [comparison] = throughput_bench.compare_reports(current, previous)
+
+        assert comparison["workers"] == 2
+        assert comparison["changes"]["pages_per_min"]["change"] == pytest.approx(-0.2)
+        assert comparison["changes"]["pages_per_min"]["worse"]
+        assert not comparison["changes"]["file_p95_s"]["worse"]
+        assert not comparison["changes"]["peak_rss_mb"]["worse"]
+
+    def test_compare_reports_matches_corpus_and_workers(self):
+        """Runs only line up with the same corpus shape and worker count"""
+        compare = throughput_bench.compare_reports
+        assert compare(_report(workers=4), _report()) == []
+        assert compare(_report(corpus="other"), _report()) == []
+
+    def test_report_round_trip_checks_version(self, tmp_path):
+        """Saved reports load back; other versions are refused"""
+        path = throughput_bench.save_report(tmp_path / "nested" / "e2e.json", _report())
+        assert throughput_bench.load_report(path)["results"][0]["workers"] == 2
+
+        path.write_text('{"version": 0}')
+        with pytest.raises(ValueError):
+            throughput_bench.load_report(path)
+
+    def test_stub_ocr_config_routes_to_one_simulated_provider(self):
+        """Every configured provider is replaced and region OCR is switched off"""
+        ocr_config = {"providers": {"tesseract": {}, "gpt4_vision": {}},
+                      "region": {"enabled": True}}
+        ocr = throughput_bench.stub_ocr_config(ocr_config, 50)
+        assert list(ocr["providers"]) == ["qwen"]
+        assert ocr["providers"]["qwen"]["type"] == "simulated"
+        assert ocr["region"]["enabled"] is False
+
+    def test_generate_and_count_corpus(self, tmp_path):
+        """Generated corpora have the requested files and pages"""
+        spec = CorpusSpec(files=2, pages=3, seed=1)
+        throughput_bench.generate_corpus(tmp_path, spec)
+
+        assert throughput_bench.count_corpus(tmp_path) == (2, 6)
+        assert throughput_bench.corpus_fields(spec, tmp_path)["corpus"] == spec.label
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestBenchCommand:
+
+    def test_bench_e2e_writes_report_and_compares(self, tmp_path):
+        """Two runs of a tiny corpus produce a report and a comparison with the first"""
+        report = tmp_path / "e2e.json"
+        args = ["bench", "e2e", "--files", "1", "--pages", "1", "--workers", "1,2",
+                "--ocr-latency-ms", "1", "--report", str(report)]
+
+        first = CliRunner().invoke(cli, args)
+        assert first.exit_code == 0, first.output
+        results = throughput_bench.load_report(report)["results"]
+        assert [result["workers"] for result in results] == [1, 2]
+        for result in results:
+            assert result["returncode"] == 0 and result["failed"] == 0
+            assert result["pages_per_min"] > 0 and result["peak_rss_mb"] > 0
+
+        second = CliRunner().invoke(cli, args)
+        assert second.exit_code == 0, second.output
+        assert "Compared with" in second.output
+
+    def test_bench_e2e_rejects_bad_worker_lists(self, tmp_path):
+        """Worker counts must be positive integers"""
+        result = CliRunner().invoke(cli, ["bench", "e2e", "--workers", "0,2",
+                                          "--report", str(tmp_path / "e2e.json")])
+        assert result.exit_code != 0
+        assert "worker counts" in result.output
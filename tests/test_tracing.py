@@ -0,0 +1,116 @@
+"""
+Tests for pipeline tracing
+"""
+
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from src.utils import tracing
+from src.utils.tracing import span, traced
+
+
+def _traced_work(value):
+    with span("child_work", value=value):
+        return value * 2
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "trace.json"
+    tracing.enable(path)
+    yield path
+    tracing.finish()
+
+
+def _load_spans(path):
+    events = json.loads(path.read_text())["traceEvents"]
+    return [e for e in events if e["ph"] == "X"]
+
+
+@pytest.mark.unit
+class TestTracing:
+
+    def test_disabled_spans_are_shared_noops(self):
+        """Without tracing, span() returns one shared no-op and records nothing"""
+        assert not tracing.is_enabled()
+        assert span("a") is span("b", file="x")
+        with span("a"):
+            pass
+        assert tracing.finish() is None
+
+    def test_nested_spans_written_as_chrome_trace(self, trace_file):
+        """Spans become complete events nested by time, with their arguments"""
+        with span("file", file="a.note"):
+            with span("ocr", "ocr", provider="tesseract"):
+                pass
+
+        @traced("decorated", "db")
+        def write():
+            return 42
+
+        assert write() == 42
+        assert tracing.finish() == trace_file
+
+        spans = {e["name"]: e for e in _load_spans(trace_file)}
+        outer, inner = spans["file"], spans["ocr"]
+        assert inner["args"] == {"provider": "tesseract"} and inner["cat"] == "ocr"
+        assert outer["ts"] <= inner["ts"]
+        assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+        assert spans["decorated"]["cat"] == "db"
+        assert not tracing.is_enabled()
+
+    def test_failed_span_records_error(self, trace_file):
+        """An exception inside a span is recorded and still propagates"""
+        with pytest.raises(ValueError):
+            with span("analysis"):
+                raise ValueError("boom")
+        tracing.finish()
+
+        assert _load_spans(trace_file)[0]["args"]["error"] == "ValueError"
+
+    def test_threads_and_processes_are_merged(self, trace_file):
+        """Spans from worker threads and worker processes land in one trace"""
+        worker = threading.Thread(target=_traced_work, args=(1,), name="ocr-worker")
+        worker.start()
+        worker.join()
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(_traced_work, 2).result() == 4
+        tracing.finish()
+
+        events = json.loads(trace_file.read_text())["traceEvents"]
+        spans = [e for e in events if e["ph"] == "X"]
+        assert sorted(e["args"]["value"] for e in spans) == [1, 2]
+        assert len({e["pid"] for e in spans}) == 2
+        thread_names = {e["args"]["name"] for e in events if e["name"] == "thread_name"}
+        assert "ocr-worker" in thread_names
+
+    def test_process_trace_option(self, tmp_path):
+        """process --trace writes the spans of each processing step"""
+        from unittest.mock import patch
+        from click.testing import CliRunner
+        from src.cli import cli
+        from src.utils.ocr_providers import OCRResult
+
+        image = tmp_path / "page.png"
+        image.touch()
+        trace_path = tmp_path / "out.json"
+
+        with patch('src.cli.OCRProviderFactory') as mock_factory, \
+             patch('src.cli.DatabaseManager') as mock_db:
+            provider = mock_factory.get_provider.return_value
+            provider.extract_text.return_value = OCRResult(
+                text="Project plan", confidence=0.9, provider="tesseract",
+                processing_time=0.1
+            )
+            mock_db.return_value.get_job.return_value = None
+            args = ['process', str(image), '--output', str(tmp_path / "out")]
+            result = CliRunner().invoke(cli, [*args, '--trace', str(trace_path)])
+
+        assert result.exit_code == 0, result.output
+        names = {e["name"] for e in _load_spans(trace_path)}
+        stages = {"file", "ocr", "elements", "relationships", "structures", "export"}
+        assert stages <= names
+        assert not tracing.is_enabled()
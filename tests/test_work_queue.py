@@ -0,0 +1,186 @@
+"""
+Tests for the debounced watch work queue
+"""
+
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.utils.work_queue import DebouncedWorkQueue
+
+
+@pytest.fixture
+def work_queue():
+    queues = []
+
+    def make(handler, **kwargs):
+        kwargs.setdefault("debounce", 0.05)
+        kwargs.setdefault("poll_interval", 0.01)
+        q = DebouncedWorkQueue(handler, **kwargs)
+        q.start()
+        queues.append(q)
+        return q
+
+    yield make
+    for q in queues:
+        q.stop(timeout=2)
+
+
+@pytest.mark.unit
+class TestDebouncedWorkQueue:
+
+    def test_repeated_events_processed_once(self, work_queue, tmp_path):
+        """A burst of events for one path becomes a single job"""
+        path = tmp_path / "note.note"
+        path.write_bytes(b"data")
+        handler = Mock()
+        q = work_queue(handler)
+
+        for _ in range(5):
+            q.submit(path)
+
+        assert q.join(timeout=2)
+        handler.assert_called_once_with(path)
+        assert q.stats().processed == 1
+
+    def test_waits_for_file_to_stop_growing(self, work_queue, tmp_path):
+        """A file still being written is not handed out until its size settles"""
+        path = tmp_path / "sync.note"
+        path.write_bytes(b"x")
+        seen_sizes = []
+        q = work_queue(lambda p: seen_sizes.append(p.stat().st_size), debounce=0.1)
+
+        q.submit(path)
+        for _ in range(5):
+            time.sleep(0.05)
+            with open(path, "ab") as f:
+                f.write(b"x")
+
+        assert q.join(timeout=3)
+        assert seen_sizes == [6]
+
+    def test_workers_run_concurrently_and_stay_warm(self, work_queue, tmp_path):
+        """Slow files are spread over long-lived workers"""
+        barrier = threading.Barrier(3, timeout=2)
+        threads = set()
+
+        def handler(path):
+            threads.add(threading.current_thread().name)
+            barrier.wait()
+
+        q = work_queue(handler, workers=3)
+        for i in range(6):
+            path = tmp_path / f"page{i}.png"
+            path.touch()
+            q.submit(path)
+
+        assert q.join(timeout=5)
+        assert q.stats().processed == 6
+        assert len(threads) == 3
+
+    def test_bounded_queue_keeps_extra_paths_pending(self, work_queue, tmp_path):
+        """When workers are busy, settled paths wait instead of piling up"""
+        release = threading.Event()
+        q = work_queue(lambda p: release.wait(2), workers=1, max_queued=1)
+        for i in range(4):
+            path = tmp_path / f"page{i}.png"
+            path.touch()
+            q.submit(path)
+
+        time.sleep(0.3)
+        stats = q.stats()
+        release.set()
+
+        assert (stats.active, stats.queued, stats.pending) == (1, 1, 2)
+        assert stats.depth == 4
+        assert q.join(timeout=3)
+
+    def test_handler_errors_counted(self, work_queue, tmp_path):
+        """A failing file does not stop the worker"""
+        bad, good = tmp_path / "bad.png", tmp_path / "good.png"
+        bad.touch()
+        good.touch()
+
+        def handler(path):
+            if path == bad:
+                raise RuntimeError("decode failed")
+
+        q = work_queue(handler)
+        q.submit(bad)
+        q.submit(good)
+
+        assert q.join(timeout=2)
+        assert (q.stats().processed, q.stats().failed) == (1, 1)
+
+    def test_vanished_file_dropped(self, work_queue, tmp_path):
+        """A temporary file that disappears is eventually dropped"""
+        handler = Mock()
+        q = work_queue(handler, missing_timeout=0.1)
+
+        q.submit(tmp_path / "gone.note")
+
+        assert q.join(timeout=2)
+        handler.assert_not_called()
+        assert q.stats().dropped == 1
+
+
+@pytest.mark.unit
+class TestFileWatcherQueue:
+
+    @patch('src.utils.file_watcher.Observer')
+    def test_events_go_through_queue_while_running(self, mock_observer_class, tmp_path):
+        """Events are queued instead of processed on the observer thread"""
+        from watchdog.events import FileCreatedEvent
+        from src.utils.file_watcher import FileWatcher
+
+        path = tmp_path / "new.note"
+        path.write_bytes(b"note")
+        callback = Mock()
+        watcher = FileWatcher(tmp_path, callback, debounce=0.05)
+        watcher.work_queue.poll_interval = 0.01
+
+        runner = threading.Thread(target=watcher.start, daemon=True)
+        runner.start()
+        time.sleep(0.05)
+        watcher.handler.on_created(FileCreatedEvent(str(path)))
+
+        assert watcher.work_queue.join(timeout=2)
+        watcher.stop()
+        runner.join(timeout=2)
+
+        callback.assert_called_once_with(path)
+
+    @patch('src.utils.file_watcher.Observer')
+    def test_file_pending_at_shutdown_processed_after_restart(
+        self, mock_observer_class, tmp_path
+    ):
+        """A scanned file dropped from the queue on stop is not remembered as seen"""
+        from src.utils.file_watcher import FileWatcher
+
+        watch_dir = tmp_path / "notes"
+        watch_dir.mkdir()
+        snapshot = tmp_path / "snapshot.json"
+        path = watch_dir / "late.note"
+        path.write_bytes(b"note")
+        callback = Mock()
+        watcher = FileWatcher(watch_dir, callback, debounce=60, snapshot_path=snapshot)
+
+        runner = threading.Thread(target=watcher.start, daemon=True)
+        runner.start()
+        time.sleep(0.05)
+        watcher._scan_for_new_files()
+        assert watcher.queue_depth == 1
+        watcher.stop()
+        runner.join(timeout=2)
+        callback.assert_not_called()
+
+        options = dict(snapshot_path=snapshot, use_queue=False)
+        FileWatcher(watch_dir, callback, **options)._scan_for_new_files()
+        callback.assert_called_once_with(path)
+
+        callback.reset_mock()
+        FileWatcher(watch_dir, callback, **options)._scan_for_new_files()
+        callback.assert_not_called()